@@ -1,13 +1,23 @@
 import asyncio
 import hashlib
+import heapq
+import itertools
 import json
 import re
+import time
 import uuid
 import os
 import shutil
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from models import Job
+from models import Job, ACTIVE_JOB_STATUSES
+from job_output import JobOutputWriter, FLUSH_INTERVAL, compact_job_output
+from job_stream import JobStreamHub
+from job_registry import JobRegistry
+from bulk_orchestrator import BulkOrchestrator, dependency_waves
+from single_flight import SingleFlight
+from metrics import COMMANDS_RUNNING, JOB_DURATION_SECONDS, JOB_QUEUE_WAIT_SECONDS
 
 VAULT_PASS_FILE = "/tmp/.vault_pass.txt"
 CLOUDLAB_PATH = "/app/cloudlab"
@@ -18,6 +28,23 @@ ALLOWED_FILE_SUBDIRS = {"inputs", "outputs"}
 MAX_CONFIG_SIZE = 100 * 1024  # 100KB
 MAX_FILE_SIZE = 100 * 1024  # 100KB
 MAX_VERSIONS_PER_FILE = 50
+MAX_CONCURRENT_JOBS = int(os.environ.get("JOB_MAX_CONCURRENCY", "4"))
+# A generate-inventory run this recent is reused instead of starting another
+INVENTORY_FRESHNESS_SECONDS = float(os.environ.get("INVENTORY_FRESHNESS_SECONDS", "30"))
+# Threads for blocking post-job work (SQLite commits, inventory syncs, YAML/JSON parsing)
+BLOCKING_WORKERS = int(os.environ.get("JOB_BLOCKING_WORKERS", "4"))
+
+# Executor priority classes (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SCHEDULED = 1
+PRIORITY_WEBHOOK = 2
+PRIORITY_BACKGROUND = 3
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_SCHEDULED: "scheduled",
+    PRIORITY_WEBHOOK: "webhook",
+    PRIORITY_BACKGROUND: "background",
+}
 
 
 def save_config_version(session, service_name: str, filename: str, content: str,
@@ -115,9 +142,161 @@ async def _check_budget_alert(session, cost_data):
     session.commit()
 
 
+# Job coroutines run on the event loop, so anything that blocks (DB sessions,
+# inventory syncs, file parsing) goes through run_blocking(). Methods named
+# *_blocking only ever run on this pool (job persistence on the DB writer
+# thread); everything else is loop-safe.
+_blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="job-blocking")
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking callable on the bounded worker pool and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(_blocking_pool, fn, *args)
+
+
+def _append_sync_report(job: Job, report):
+    """Add an inventory sync report line (counts and phase timings) to the job log."""
+    if report is not None:
+        job.output.append(f"[Sync report: {report.summary()}]")
+
+
+def job_priority(job: Job) -> int:
+    """Derive a job's executor priority from who started it.
+
+    Uses the same username conventions as job provenance: schedules run as
+    "scheduler:<name>", webhooks as "webhook:<name>", and system tasks either
+    have no user or a "system:" username.
+    """
+    username = job.username or ""
+    if username.startswith("scheduler:"):
+        return PRIORITY_SCHEDULED
+    if username.startswith("webhook:"):
+        return PRIORITY_WEBHOOK
+    if job.user_id is None or username.startswith("system:"):
+        return PRIORITY_BACKGROUND
+    return PRIORITY_INTERACTIVE
+
+
+class JobExecutor:
+    """Runs job coroutines under a global worker limit.
+
+    Submitted jobs wait with status "queued" in a priority queue (FIFO within
+    a class). A job starts once a worker slot is free and no running job holds
+    the same serialization key, so e.g. two deploys of one service never
+    overlap. Jobs blocked on a key don't hold up other jobs behind them.
+
+    If a job coroutine raises, the job is marked failed and `on_crash(job)`
+    is awaited so the owner can persist and announce it.
+    """
+
+    def __init__(self, max_workers: int = MAX_CONCURRENT_JOBS, on_crash=None):
+        self.max_workers = max_workers
+        self._on_crash = on_crash
+        self._queue: list[tuple] = []  # heap of (priority, seq, job, factory, key, enqueued_at)
+        self._seq = itertools.count()
+        self._running_keys: set[str] = set()
+        self._running = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._done: dict[str, asyncio.Future] = {}
+        self.started_total = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def submit(self, job: Job, factory, key: str | None = None, priority: int | None = None):
+        """Queue `factory()` (a coroutine function running the job) for execution."""
+        if priority is None:
+            priority = job_priority(job)
+        job.status = "queued"
+        self._done[job.id] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), job, factory, key, time.monotonic()))
+        self._dispatch()
+
+    def _dispatch(self):
+        blocked = []
+        while self._queue and self._running < self.max_workers:
+            entry = heapq.heappop(self._queue)
+            key = entry[4]
+            if key is not None and key in self._running_keys:
+                blocked.append(entry)
+                continue
+            self._start(entry)
+        for entry in blocked:
+            heapq.heappush(self._queue, entry)
+
+    def _start(self, entry):
+        _, _, job, factory, key, enqueued_at = entry
+        waited = time.monotonic() - enqueued_at
+        self.started_total += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        JOB_QUEUE_WAIT_SECONDS.observe(waited, priority=PRIORITY_NAMES.get(entry[0], str(entry[0])))
+        self._running += 1
+        if key is not None:
+            self._running_keys.add(key)
+        job.status = "running"
+        task = asyncio.create_task(self._run(job, factory, key), name=f"job:{job.id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: Job, factory, key: str | None):
+        started = time.monotonic()
+        try:
+            await factory()
+        except Exception as e:
+            print(f"[executor] Job {job.id} crashed: {e}")
+            if job.status in ACTIVE_JOB_STATUSES:
+                job.output.append(f"[ERROR] {e}")
+                job.status = "failed"
+                job.finished_at = datetime.now(timezone.utc).isoformat()
+            if self._on_crash is not None:
+                try:
+                    await self._on_crash(job)
+                except Exception as e:
+                    print(f"[executor] Failed to finalize crashed job {job.id}: {e}")
+        finally:
+            JOB_DURATION_SECONDS.observe(time.monotonic() - started, service=job.service,
+                                         action=job.action, status=job.status)
+            self._running -= 1
+            if key is not None:
+                self._running_keys.discard(key)
+            done = self._done.pop(job.id, None)
+            if done is not None and not done.done():
+                done.set_result(job)
+            self._dispatch()
+
+    async def wait_for(self, job: Job) -> Job:
+        """Wait until a submitted job has finished; returns at once if it already has."""
+        done = self._done.get(job.id)
+        if done is not None:
+            await asyncio.shield(done)
+        return job
+
+    def metrics(self) -> dict:
+        now = time.monotonic()
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+        oldest_wait = 0.0
+        for priority, _, _, _, _, enqueued_at in self._queue:
+            depth[PRIORITY_NAMES.get(priority, str(priority))] += 1
+            oldest_wait = max(oldest_wait, now - enqueued_at)
+        return {
+            "max_workers": self.max_workers,
+            "running": self._running,
+            "queue_depth": len(self._queue),
+            "queue_depth_by_priority": depth,
+            "oldest_queued_seconds": round(oldest_wait, 3),
+            "started_total": self.started_total,
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "wait_seconds_max": round(self.wait_seconds_max, 3),
+        }
+
+
 class AnsibleRunner:
     def __init__(self):
-        self.jobs: dict[str, Job] = {}
+        self.jobs = JobRegistry()
+        self._output_writers: dict[str, JobOutputWriter] = {}
+        self.stream_hub = JobStreamHub()
+        self.executor = JobExecutor(on_crash=self._finalize_crashed_job)
+        self._inventory_flight = SingleFlight(INVENTORY_FRESHNESS_SECONDS)
 
     def get_service_scripts(self, name: str) -> list[dict]:
         scripts_path = os.path.join(SERVICES_DIR, name, "scripts.yaml")
@@ -412,7 +591,12 @@ class AnsibleRunner:
         )
         self.jobs[job_id] = job
 
-        asyncio.create_task(self._run_action_job(job, action_def, obj_data, type_slug, object_id))
+        # Script actions run the service's own scripts, so they share its key
+        key = None
+        if obj_data.get("name") and action_def.get("type", "script") in ("script", "script_stop"):
+            key = f"service:{obj_data['name']}"
+        self.executor.submit(job, lambda: self._run_action_job(job, action_def, obj_data, type_slug, object_id),
+                             key=key)
         return job
 
     async def _run_action_job(self, job: Job, action_def: dict, obj_data: dict,
@@ -453,11 +637,7 @@ class AnsibleRunner:
         elif action_type == "script_stop":
             # Generate inventory then stop instances for this service
             job.output.append("--- Generating inventory ---")
-            await self._run_command(job, [
-                "ansible-playbook",
-                "/init_playbook/generate-inventory.yaml",
-                "--vault-password-file", VAULT_PASS_FILE,
-            ])
+            await self._generate_inventory(job)
             job.output.append(f"--- Stopping {service_name} instances ---")
             ok = await self._run_command(job, [
                 "ansible-playbook",
@@ -505,33 +685,33 @@ class AnsibleRunner:
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job, object_id=object_id, type_slug=type_slug)
+        await self._persist_job(job, object_id=object_id, type_slug=type_slug)
         await self._notify_job(job)
 
         # Update last_used_at for referenced library files
         library_file_ids = action_def.get("_library_file_ids")
         if library_file_ids:
-            try:
-                from database import SessionLocal, FileLibraryItem
-                with SessionLocal() as sess:
-                    sess.query(FileLibraryItem).filter(
-                        FileLibraryItem.id.in_(library_file_ids)
-                    ).update(
-                        {"last_used_at": datetime.now(timezone.utc)},
-                        synchronize_session=False
-                    )
-                    sess.commit()
-            except Exception as e:
-                print(f"[library] Failed to update last_used_at: {e}")
+            await run_blocking(self._touch_library_files_blocking, library_file_ids)
 
         # Post-action: keep instances cache and inventory objects in sync
         if ok and type_slug == "server":
             try:
-                self._sync_server_inventory(job, action_name, object_id)
+                await run_blocking(self._sync_server_inventory_blocking, job, action_name, object_id)
             except Exception as e:
                 job.output.append(f"[Warning: Could not update inventory: {e}]")
 
-    def _sync_server_inventory(self, job: Job, action_name: str, object_id: int | None):
+    def _touch_library_files_blocking(self, library_file_ids: list[int]):
+        try:
+            from database import SessionLocal, FileLibraryItem
+            with SessionLocal() as session:
+                session.query(FileLibraryItem).filter(
+                    FileLibraryItem.id.in_(library_file_ids)
+                ).update({"last_used_at": datetime.now(timezone.utc)}, synchronize_session=False)
+                session.commit()
+        except Exception as e:
+            print(f"[library] Failed to update last_used_at: {e}")
+
+    def _sync_server_inventory_blocking(self, job: Job, action_name: str, object_id: int | None):
         """Keep instances cache and inventory objects in sync after server actions."""
         from database import SessionLocal, AppMetadata, InventoryObject
         import json as _json
@@ -572,11 +752,7 @@ class AnsibleRunner:
                     session.commit()
                     job.output.append("[Inventory cache updated]")
 
-                from inventory_sync import run_sync_for_source
-                run_sync_for_source("vultr_inventory")
-                job.output.append("[Inventory objects synced]")
-                run_sync_for_source("ssh_credential_sync")
-                job.output.append("[SSH credentials synced]")
+                self._sync_inventory_objects_blocking(job)
         finally:
             session.close()
 
@@ -585,7 +761,15 @@ class AnsibleRunner:
     async def run_script(self, name: str, script_name: str, inputs: dict,
                          user_id: int | None = None, username: str | None = None,
                          temp_dir: str | None = None,
-                         library_file_ids: list[int] | None = None) -> Job:
+                         library_file_ids: list[int] | None = None,
+                         instance: str | None = None) -> Job:
+        """Run one of a service's scripts as a job.
+
+        Scripts serialize on the service (key service:{name}), like deploys and
+        stops, so two runs against one service never overlap. Personal instance
+        scripts act on a single host and pass instance=hostname to serialize on
+        that host instead, so different users' instances run side by side.
+        """
         service = self.get_service(name)
         if not service:
             raise FileNotFoundError(f"Service '{name}' not found")
@@ -657,8 +841,10 @@ class AnsibleRunner:
         )
         self.jobs[job_id] = job
 
-        asyncio.create_task(self._run_script_job(job, script_path, env, temp_dir=temp_dir,
-                                                  library_file_ids=library_file_ids))
+        key = f"instance:{instance}" if instance else f"service:{name}"
+        self.executor.submit(job, lambda: self._run_script_job(job, script_path, env, temp_dir=temp_dir,
+                                                               library_file_ids=library_file_ids),
+                             key=key)
         return job
 
     async def _run_script_job(self, job: Job, script_path: str, env: dict,
@@ -666,31 +852,19 @@ class AnsibleRunner:
                                library_file_ids: list[int] | None = None):
         job.output.append(f"--- Running {job.script} for {job.service} ---")
         ok = await self._run_command(job, ["bash", script_path], env=env)
+        # Scripts may create or destroy instances; don't reuse an older inventory
+        self._inventory_flight.invalidate()
 
         if ok:
-            self._sync_service_outputs(job, job.service)
-            try:
-                from inventory_sync import run_sync_for_source
-                run_sync_for_source("ssh_credential_sync")
-                job.output.append("[SSH credentials synced]")
-            except Exception as e:
-                job.output.append(f"[Warning: SSH credential sync failed: {e}]")
+            await run_blocking(self._sync_after_deploy_blocking, job, job.service)
 
         # Update last_used_at for referenced library files
         if library_file_ids:
-            try:
-                from database import SessionLocal, FileLibraryItem
-                with SessionLocal() as session:
-                    session.query(FileLibraryItem).filter(
-                        FileLibraryItem.id.in_(library_file_ids)
-                    ).update({"last_used_at": datetime.now(timezone.utc)}, synchronize_session=False)
-                    session.commit()
-            except Exception as e:
-                print(f"[library] Failed to update last_used_at: {e}")
+            await run_blocking(self._touch_library_files_blocking, library_file_ids)
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
         await self._notify_job(job)
 
         # Clean up temp upload directory if present
@@ -715,7 +889,7 @@ class AnsibleRunner:
         )
         self.jobs[job_id] = job
 
-        asyncio.create_task(self._run_deploy(job))
+        self.executor.submit(job, lambda: self._run_deploy(job), key=f"service:{name}")
         return job
 
     async def stop_service(self, name: str,
@@ -733,7 +907,7 @@ class AnsibleRunner:
         )
         self.jobs[job_id] = job
 
-        asyncio.create_task(self._run_stop(job))
+        self.executor.submit(job, lambda: self._run_stop(job), key=f"service:{name}")
         return job
 
     async def stop_all(self, user_id: int | None = None, username: str | None = None) -> Job:
@@ -750,11 +924,12 @@ class AnsibleRunner:
         )
         self.jobs[job_id] = job
 
-        asyncio.create_task(self._run_stop_all(job))
+        self.executor.submit(job, lambda: self._run_stop_all(job), key="stop_all")
         return job
 
     async def bulk_stop(self, service_names: list[str],
-                        user_id: int | None = None, username: str | None = None) -> Job:
+                        user_id: int | None = None, username: str | None = None,
+                        parallelism: int | None = None, fail_fast: bool = False) -> Job:
         parent_id = str(uuid.uuid4())[:8]
         parent = Job(
             id=parent_id,
@@ -767,37 +942,31 @@ class AnsibleRunner:
             inputs={"services": service_names},
         )
         self.jobs[parent_id] = parent
-        asyncio.create_task(self._run_bulk_stop(parent, service_names))
+        # The parent only waits on its children, so it runs outside the
+        # executor and never holds a worker slot they need
+        asyncio.create_task(self._run_bulk_stop(parent, service_names, parallelism, fail_fast),
+                            name=f"job:{parent.id}")
         return parent
 
-    async def _run_bulk_stop(self, parent: Job, service_names: list[str]):
+    async def _run_bulk_stop(self, parent: Job, service_names: list[str],
+                             parallelism: int | None = None, fail_fast: bool = False):
         parent.output.append(f"--- Bulk stop: {len(service_names)} services ---")
-        child_jobs = []
-        for name in service_names:
-            parent.output.append(f"[Starting stop for {name}]")
-            child = await self.stop_service(name, user_id=parent.user_id, username=parent.username)
-            child.parent_job_id = parent.id
-            child_jobs.append((name, child))
-
-        # Wait for all children to complete
-        for name, child in child_jobs:
-            while child.status == "running":
-                await asyncio.sleep(1)
-            parent.output.append(f"[{name}] finished: {child.status}")
-
-        failed = [name for name, child in child_jobs if child.status != "completed"]
-        if failed:
-            parent.output.append(f"[Failed: {', '.join(failed)}]")
-            parent.status = "failed" if len(failed) == len(child_jobs) else "completed"
-        else:
-            parent.status = "completed"
-        parent.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(parent)
+        # Stop dependents before the services they depend on
+        waves = dependency_waves(service_names, self.get_service_dependencies(service_names),
+                                 reverse=True)
+        bulk = BulkOrchestrator(self, parent, "stop", parallelism, fail_fast)
+        child_jobs = await bulk.run([
+            [(name, self._bulk_starter(self.stop_service, name, parent)) for name in wave]
+            for wave in waves
+        ])
+        bulk.finish()
+        await self._persist_job(parent)
         await self._notify_job(parent)
         await self._notify_bulk(parent, child_jobs, "stop")
 
     async def bulk_deploy(self, service_names: list[str],
-                          user_id: int | None = None, username: str | None = None) -> Job:
+                          user_id: int | None = None, username: str | None = None,
+                          parallelism: int | None = None, fail_fast: bool = False) -> Job:
         parent_id = str(uuid.uuid4())[:8]
         parent = Job(
             id=parent_id,
@@ -810,35 +979,41 @@ class AnsibleRunner:
             inputs={"services": service_names},
         )
         self.jobs[parent_id] = parent
-        asyncio.create_task(self._run_bulk_deploy(parent, service_names))
+        # See bulk_stop: parents stay off the executor
+        asyncio.create_task(self._run_bulk_deploy(parent, service_names, parallelism, fail_fast),
+                            name=f"job:{parent.id}")
         return parent
 
-    async def _run_bulk_deploy(self, parent: Job, service_names: list[str]):
+    async def _run_bulk_deploy(self, parent: Job, service_names: list[str],
+                               parallelism: int | None = None, fail_fast: bool = False):
         parent.output.append(f"--- Bulk deploy: {len(service_names)} services ---")
-        child_jobs = []
-        for name in service_names:
-            parent.output.append(f"[Starting deploy for {name}]")
-            child = await self.deploy_service(name, user_id=parent.user_id, username=parent.username)
-            child.parent_job_id = parent.id
-            child_jobs.append((name, child))
-
-        # Wait for all children to complete
-        for name, child in child_jobs:
-            while child.status == "running":
-                await asyncio.sleep(1)
-            parent.output.append(f"[{name}] finished: {child.status}")
-
-        failed = [name for name, child in child_jobs if child.status != "completed"]
-        if failed:
-            parent.output.append(f"[Failed: {', '.join(failed)}]")
-            parent.status = "failed" if len(failed) == len(child_jobs) else "completed"
-        else:
-            parent.status = "completed"
-        parent.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(parent)
+        # Deploy dependencies before the services that need them
+        waves = dependency_waves(service_names, self.get_service_dependencies(service_names))
+        bulk = BulkOrchestrator(self, parent, "deploy", parallelism, fail_fast)
+        child_jobs = await bulk.run([
+            [(name, self._bulk_starter(self.deploy_service, name, parent)) for name in wave]
+            for wave in waves
+        ])
+        bulk.finish()
+        await self._persist_job(parent)
         await self._notify_job(parent)
         await self._notify_bulk(parent, child_jobs, "deploy")
 
+    @staticmethod
+    def _bulk_starter(entry_point, name: str, parent: Job):
+        return lambda: entry_point(name, user_id=parent.user_id, username=parent.username)
+
+    def get_service_dependencies(self, names: list[str]) -> dict[str, list[str]]:
+        """Map each service to the `depends_on` list from its instance.yaml."""
+        deps = {}
+        for name in names:
+            config = self.read_service_instance_config(name) or {}
+            depends_on = config.get("depends_on") if isinstance(config, dict) else None
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+            deps[name] = [d for d in depends_on or [] if isinstance(d, str)]
+        return deps
+
     async def stop_instance(self, label: str, region: str,
                             user_id: int | None = None, username: str | None = None) -> Job:
         job_id = str(uuid.uuid4())[:8]
@@ -854,7 +1029,8 @@ class AnsibleRunner:
         )
         self.jobs[job_id] = job
 
-        asyncio.create_task(self._run_stop_instance(job, label, region))
+        self.executor.submit(job, lambda: self._run_stop_instance(job, label, region),
+                             key=f"instance:{label}")
         return job
 
     async def refresh_instances(self, user_id: int | None = None, username: str | None = None) -> Job:
@@ -871,11 +1047,12 @@ class AnsibleRunner:
         )
         self.jobs[job_id] = job
 
-        asyncio.create_task(self._run_refresh(job))
+        self.executor.submit(job, lambda: self._run_refresh(job), key="refresh_instances")
         return job
 
     async def _run_command(self, job: Job, args: list[str], cwd: str | None = None, env: dict | None = None):
         job.output.append(f"$ {' '.join(args)}")
+        COMMANDS_RUNNING.inc()
         try:
             process = await asyncio.create_subprocess_exec(
                 *args,
@@ -885,7 +1062,12 @@ class AnsibleRunner:
                 env=env,
             )
             while True:
-                line = await process.stdout.readline()
+                try:
+                    line = await asyncio.wait_for(process.stdout.readline(), timeout=FLUSH_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Quiet period: persist whatever is buffered so far
+                    await self._flush_output(job)
+                    continue
                 if not line:
                     break
                 decoded = line.decode("utf-8", errors="replace").rstrip("\n")
@@ -894,15 +1076,22 @@ class AnsibleRunner:
                     m = re.search(r"DEPLOYMENT_ID=([\w-]+)", decoded)
                     if m:
                         job.deployment_id = m.group(1)
+                self.stream_hub.publish(job.id)
+                await self._flush_output(job)
 
             await process.wait()
+            await self._flush_output(job, force=True)
             if process.returncode != 0:
                 job.output.append(f"[EXIT CODE: {process.returncode}]")
+                self.stream_hub.publish(job.id)
                 return False
             return True
         except Exception as e:
             job.output.append(f"[ERROR: {str(e)}]")
+            self.stream_hub.publish(job.id)
             return False
+        finally:
+            COMMANDS_RUNNING.dec()
 
     async def _run_deploy(self, job: Job):
         name = job.service
@@ -911,26 +1100,21 @@ class AnsibleRunner:
             job.output.append(f"[ERROR: Service '{name}' not found]")
             job.status = "failed"
             job.finished_at = datetime.now(timezone.utc).isoformat()
-            self._persist_job(job)
+            await self._persist_job(job)
             await self._notify_job(job)
             return
 
         script_path = f"/services/{name}/deploy.sh"
         job.output.append(f"--- Running deploy.sh for {name} ---")
         ok = await self._run_command(job, ["bash", script_path])
+        self._inventory_flight.invalidate()
 
         if ok:
-            self._sync_service_outputs(job, name)
-            try:
-                from inventory_sync import run_sync_for_source
-                run_sync_for_source("ssh_credential_sync")
-                job.output.append("[SSH credentials synced]")
-            except Exception as e:
-                job.output.append(f"[Warning: SSH credential sync failed: {e}]")
+            await run_blocking(self._sync_after_deploy_blocking, job, name)
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
         await self._notify_job(job)
 
     async def _run_stop(self, job: Job):
@@ -940,17 +1124,13 @@ class AnsibleRunner:
             job.output.append(f"[ERROR: Service '{name}' not found]")
             job.status = "failed"
             job.finished_at = datetime.now(timezone.utc).isoformat()
-            self._persist_job(job)
+            await self._persist_job(job)
             await self._notify_job(job)
             return
 
         # Generate inventory then stop instances matching this service
         job.output.append("--- Generating inventory ---")
-        await self._run_command(job, [
-            "ansible-playbook",
-            "/init_playbook/generate-inventory.yaml",
-            "--vault-password-file", VAULT_PASS_FILE,
-        ])
+        await self._generate_inventory(job)
 
         job.output.append(f"--- Stopping {name} instances ---")
         ok = await self._run_command(job, [
@@ -962,20 +1142,16 @@ class AnsibleRunner:
         ])
 
         if ok:
-            self._refresh_cache_after_stop(job)
+            await self._refresh_cache_after_stop(job)
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
         await self._notify_job(job)
 
     async def _run_stop_all(self, job: Job):
         job.output.append("--- Generating inventory ---")
-        await self._run_command(job, [
-            "ansible-playbook",
-            "/init_playbook/generate-inventory.yaml",
-            "--vault-password-file", VAULT_PASS_FILE,
-        ])
+        await self._generate_inventory(job)
 
         job.output.append("--- Stopping all instances ---")
         ok = await self._run_command(job, [
@@ -986,14 +1162,37 @@ class AnsibleRunner:
         ])
 
         if ok:
-            self._refresh_cache_after_stop(job)
+            await self._refresh_cache_after_stop(job)
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
         await self._notify_job(job)
 
-    def _refresh_cache_after_stop(self, job: Job):
+    async def _generate_inventory(self, job: Job, not_before: float | None = None) -> bool:
+        """Regenerate the inventory file from Vultr, single-flight.
+
+        Concurrent callers attach to the run already in progress and callers
+        within INVENTORY_FRESHNESS_SECONDS reuse the last successful run; pass
+        `not_before` (a time.monotonic() value) to require a run that started
+        after that point instead. Reuse is recorded in the job's output.
+        """
+        ok, ran_by = await self._inventory_flight.run(
+            job.id,
+            lambda: self._run_command(job, [
+                "ansible-playbook",
+                "/init_playbook/generate-inventory.yaml",
+                "--vault-password-file", VAULT_PASS_FILE,
+            ]),
+            not_before=not_before,
+        )
+        if ran_by != job.id:
+            outcome = "" if ok else " (failed)"
+            job.output.append(f"[Reused shared inventory refresh from job {ran_by}{outcome}]")
+            self.stream_hub.publish(job.id)
+        return ok
+
+    async def _refresh_cache_after_stop(self, job: Job):
         """Re-generate inventory from Vultr API and sync DB cache/objects.
 
         Called after stop operations so destroyed instances are removed from
@@ -1001,92 +1200,87 @@ class AnsibleRunner:
         — does NOT delete certificate or key files on disk.
         """
         try:
-            from database import SessionLocal, AppMetadata
-            import subprocess
-
-            # Re-generate the inventory file from live Vultr state
+            # Re-generate the inventory file from live Vultr state; only a run
+            # started after the stop reflects the destroyed instances
             job.output.append("[Refreshing inventory after stop]")
-            result = subprocess.run(
-                [
-                    "ansible-playbook",
-                    "/init_playbook/generate-inventory.yaml",
-                    "--vault-password-file", VAULT_PASS_FILE,
-                ],
-                capture_output=True, text=True, timeout=120,
-            )
-            if result.returncode != 0:
-                job.output.append(f"[Warning: inventory refresh failed: {result.stderr[-300:] if result.stderr else 'unknown'}]")
+            if not await self._generate_inventory(job, not_before=time.monotonic()):
+                job.output.append("[Warning: inventory refresh failed]")
                 return
-
-            # Read the freshly generated inventory into the DB cache
-            if os.path.isfile(INVENTORY_FILE):
-                with open(INVENTORY_FILE, "r") as f:
-                    inv_data = yaml.safe_load(f)
-                session = SessionLocal()
-                try:
-                    AppMetadata.set(session, "instances_cache", inv_data)
-                    AppMetadata.set(session, "instances_cache_time",
-                                    datetime.now(timezone.utc).isoformat())
-                    session.commit()
-                    job.output.append("[Inventory cache updated]")
-                finally:
-                    session.close()
-
-            # Sync inventory objects (removes stale servers + orphaned passwords)
-            from inventory_sync import run_sync_for_source
-            run_sync_for_source("vultr_inventory")
-            job.output.append("[Inventory objects synced]")
-            run_sync_for_source("ssh_credential_sync")
-            job.output.append("[SSH credentials synced]")
+            await run_blocking(self._refresh_cache_after_stop_blocking, job)
         except Exception as e:
             job.output.append(f"[Warning: post-stop cleanup failed: {e}]")
+        self.stream_hub.publish(job.id)
+
+    def _refresh_cache_after_stop_blocking(self, job: Job):
+        from database import SessionLocal, AppMetadata
+
+        # Read the freshly generated inventory into the DB cache
+        if os.path.isfile(INVENTORY_FILE):
+            with open(INVENTORY_FILE, "r") as f:
+                inv_data = yaml.safe_load(f)
+            session = SessionLocal()
+            try:
+                AppMetadata.set(session, "instances_cache", inv_data)
+                AppMetadata.set(session, "instances_cache_time",
+                                datetime.now(timezone.utc).isoformat())
+                session.commit()
+                job.output.append("[Inventory cache updated]")
+            finally:
+                session.close()
+
+        # Sync inventory objects (removes stale servers + orphaned passwords)
+        self._sync_inventory_objects_blocking(job)
 
     async def _run_refresh(self, job: Job):
         job.output.append("--- Generating inventory ---")
-        ok = await self._run_command(job, [
-            "ansible-playbook",
-            "/init_playbook/generate-inventory.yaml",
-            "--vault-password-file", VAULT_PASS_FILE,
-        ])
-
-        if ok:
-            # Try to parse the generated inventory and store instances
-            if os.path.isfile(INVENTORY_FILE):
-                try:
-                    with open(INVENTORY_FILE, "r") as f:
-                        inv_data = yaml.safe_load(f)
-                    from database import SessionLocal, AppMetadata
-                    session = SessionLocal()
-                    try:
-                        AppMetadata.set(session, "instances_cache", inv_data)
-                        AppMetadata.set(session, "instances_cache_time", datetime.now(timezone.utc).isoformat())
-
-                        # Cache plan pricing data if available
-                        plans_file = "/outputs/instance_plans_output.json"
-                        if os.path.isfile(plans_file):
-                            with open(plans_file, "r") as f:
-                                plans_data = json.load(f)
-                            AppMetadata.set(session, "plans_cache", plans_data)
-                            job.output.append("[Plan pricing cached]")
-
-                        session.commit()
-                        job.output.append("[Inventory cached successfully]")
-                    finally:
-                        session.close()
+        ok = await self._generate_inventory(job)
 
-                    from inventory_sync import run_sync_for_source
-                    run_sync_for_source("vultr_inventory")
-                    job.output.append("[Inventory objects synced]")
-                    run_sync_for_source("ssh_credential_sync")
-                    job.output.append("[SSH credentials synced]")
-                except Exception as e:
-                    job.output.append(f"[Warning: Could not cache inventory: {e}]")
+        if ok and os.path.isfile(INVENTORY_FILE):
+            try:
+                await run_blocking(self._cache_inventory_blocking, job)
+            except Exception as e:
+                job.output.append(f"[Warning: Could not cache inventory: {e}]")
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
         await self._notify_job(job)
 
+    def _cache_inventory_blocking(self, job: Job):
+        """Parse the generated inventory and store instances and plan pricing."""
+        with open(INVENTORY_FILE, "r") as f:
+            inv_data = yaml.safe_load(f)
+        from database import SessionLocal, AppMetadata
+        session = SessionLocal()
+        try:
+            AppMetadata.set(session, "instances_cache", inv_data)
+            AppMetadata.set(session, "instances_cache_time", datetime.now(timezone.utc).isoformat())
+
+            # Cache plan pricing data if available
+            plans_file = "/outputs/instance_plans_output.json"
+            if os.path.isfile(plans_file):
+                with open(plans_file, "r") as f:
+                    plans_data = json.load(f)
+                AppMetadata.set(session, "plans_cache", plans_data)
+                job.output.append("[Plan pricing cached]")
+
+            session.commit()
+            job.output.append("[Inventory cached successfully]")
+        finally:
+            session.close()
+
+        self._sync_inventory_objects_blocking(job)
+
+    def _sync_inventory_objects_blocking(self, job: Job):
+        """Re-sync server objects and SSH credentials from the cached inventory."""
+        from sync_orchestrator import request_sync_blocking
+        report = request_sync_blocking("vultr_inventory")
+        job.output.append("[Inventory objects synced]")
+        _append_sync_report(job, report)
+        report = request_sync_blocking("ssh_credential_sync")
+        job.output.append("[SSH credentials synced]")
+        _append_sync_report(job, report)
+
     async def refresh_costs(self, user_id: int | None = None, username: str | None = None) -> Job:
         job_id = str(uuid.uuid4())[:8]
         job = Job(
@@ -1101,7 +1295,7 @@ class AnsibleRunner:
         )
         self.jobs[job_id] = job
 
-        asyncio.create_task(self._run_refresh_costs(job))
+        self.executor.submit(job, lambda: self._run_refresh_costs(job), key="refresh_costs")
         return job
 
     async def _run_refresh_costs(self, job: Job):
@@ -1116,44 +1310,15 @@ class AnsibleRunner:
             cost_report_file = "/outputs/cost_report.json"
             if os.path.isfile(cost_report_file):
                 try:
-                    with open(cost_report_file, "r") as f:
-                        cost_data = json.load(f)
-                    from database import SessionLocal, AppMetadata
+                    cost_data = await run_blocking(self._cache_costs_blocking, job, cost_report_file)
+
+                    # Check budget threshold and send alert if exceeded
+                    from database import SessionLocal
                     session = SessionLocal()
                     try:
-                        AppMetadata.set(session, "cost_cache", cost_data)
-                        AppMetadata.set(session, "cost_cache_time", datetime.now(timezone.utc).isoformat())
-
-                        # Also cache plan pricing data
-                        plans_file = "/outputs/instance_plans_output.json"
-                        if os.path.isfile(plans_file):
-                            with open(plans_file, "r") as f:
-                                plans_data = json.load(f)
-                            AppMetadata.set(session, "plans_cache", plans_data)
-                            AppMetadata.set(session, "plans_cache_time", datetime.now(timezone.utc).isoformat())
-
-                        # Insert cost snapshot for historical tracking
-                        from database import CostSnapshot
-                        snapshot = CostSnapshot(
-                            total_monthly_cost=str(cost_data.get("total_monthly_cost", 0)),
-                            instance_count=len(cost_data.get("instances", [])),
-                            snapshot_data=json.dumps(cost_data),
-                            source="playbook",
-                        )
-                        session.add(snapshot)
-
-                        # Clean up old snapshots beyond retention period
-                        self._cleanup_old_snapshots(session)
-
-                        session.commit()
-                        job.output.append("[Cost data cached successfully]")
-                        job.output.append("[Cost snapshot saved]")
-
-                        # Check budget threshold and send alert if exceeded
-                        try:
-                            await _check_budget_alert(session, cost_data)
-                        except Exception as e:
-                            job.output.append(f"[Warning: Budget alert check failed: {e}]")
+                        await _check_budget_alert(session, cost_data)
+                    except Exception as e:
+                        job.output.append(f"[Warning: Budget alert check failed: {e}]")
                     finally:
                         session.close()
                 except Exception as e:
@@ -1161,9 +1326,47 @@ class AnsibleRunner:
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
         await self._notify_job(job)
 
+    def _cache_costs_blocking(self, job: Job, cost_report_file: str) -> dict:
+        """Cache the cost report and plan pricing and record a cost snapshot."""
+        with open(cost_report_file, "r") as f:
+            cost_data = json.load(f)
+        from database import SessionLocal, AppMetadata
+        session = SessionLocal()
+        try:
+            AppMetadata.set(session, "cost_cache", cost_data)
+            AppMetadata.set(session, "cost_cache_time", datetime.now(timezone.utc).isoformat())
+
+            # Also cache plan pricing data
+            plans_file = "/outputs/instance_plans_output.json"
+            if os.path.isfile(plans_file):
+                with open(plans_file, "r") as f:
+                    plans_data = json.load(f)
+                AppMetadata.set(session, "plans_cache", plans_data)
+                AppMetadata.set(session, "plans_cache_time", datetime.now(timezone.utc).isoformat())
+
+            # Insert cost snapshot for historical tracking
+            from database import CostSnapshot
+            snapshot = CostSnapshot(
+                total_monthly_cost=str(cost_data.get("total_monthly_cost", 0)),
+                instance_count=len(cost_data.get("instances", [])),
+                snapshot_data=json.dumps(cost_data),
+                source="playbook",
+            )
+            session.add(snapshot)
+
+            # Clean up old snapshots beyond retention period
+            self._cleanup_old_snapshots(session)
+
+            session.commit()
+            job.output.append("[Cost data cached successfully]")
+            job.output.append("[Cost snapshot saved]")
+        finally:
+            session.close()
+        return cost_data
+
     def _cleanup_old_snapshots(self, session, retention_days=365):
         """Delete cost snapshots older than retention period."""
         from database import CostSnapshot
@@ -1183,45 +1386,55 @@ class AnsibleRunner:
         if ok:
             # Remove the destroyed instance from the local cache immediately.
             try:
-                from database import SessionLocal, AppMetadata
-                session = SessionLocal()
-                try:
-                    cache = AppMetadata.get(session, "instances_cache") or {}
-                    hosts = cache.get("all", {}).get("hosts", {})
-                    children = cache.get("all", {}).get("children", {})
-
-                    removed_hostname = None
-                    for hostname, info in list(hosts.items()):
-                        if info.get("vultr_label") == label and info.get("vultr_region") == region:
-                            removed_hostname = hostname
-                            del hosts[hostname]
-                            break
-
-                    if removed_hostname:
-                        for group in children.values():
-                            group_hosts = group.get("hosts", {})
-                            group_hosts.pop(removed_hostname, None)
-
-                    AppMetadata.set(session, "instances_cache", cache)
-                    AppMetadata.set(session, "instances_cache_time", datetime.now(timezone.utc).isoformat())
-                    session.commit()
-                    job.output.append("[Instance removed from cache]")
-                finally:
-                    session.close()
-
-                from inventory_sync import run_sync_for_source
-                run_sync_for_source("vultr_inventory")
-                job.output.append("[Inventory objects synced]")
-                run_sync_for_source("ssh_credential_sync")
-                job.output.append("[SSH credentials synced]")
+                await run_blocking(self._remove_instance_from_cache_blocking, job, label, region)
             except Exception as e:
                 job.output.append(f"[Warning: Could not update cache: {e}]")
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
         await self._notify_job(job)
 
+    def _remove_instance_from_cache_blocking(self, job: Job, label: str, region: str):
+        from database import SessionLocal, AppMetadata
+        session = SessionLocal()
+        try:
+            cache = AppMetadata.get(session, "instances_cache") or {}
+            hosts = cache.get("all", {}).get("hosts", {})
+            children = cache.get("all", {}).get("children", {})
+
+            removed_hostname = None
+            for hostname, info in list(hosts.items()):
+                if info.get("vultr_label") == label and info.get("vultr_region") == region:
+                    removed_hostname = hostname
+                    del hosts[hostname]
+                    break
+
+            if removed_hostname:
+                for group in children.values():
+                    group_hosts = group.get("hosts", {})
+                    group_hosts.pop(removed_hostname, None)
+
+            AppMetadata.set(session, "instances_cache", cache)
+            AppMetadata.set(session, "instances_cache_time", datetime.now(timezone.utc).isoformat())
+            session.commit()
+            job.output.append("[Instance removed from cache]")
+        finally:
+            session.close()
+
+        self._sync_inventory_objects_blocking(job)
+
+    def _sync_after_deploy_blocking(self, job: Job, service_name: str):
+        """Post-deploy syncs: service outputs, then SSH credentials of that service."""
+        self._sync_service_outputs(job, service_name)
+        try:
+            from sync_orchestrator import request_sync_blocking
+            report = request_sync_blocking("ssh_credential_sync", services=[service_name])
+            job.output.append("[SSH credentials synced]")
+            _append_sync_report(job, report)
+        except Exception as e:
+            job.output.append(f"[Warning: SSH credential sync failed: {e}]")
+
     def _sync_service_outputs(self, job: Job, service_name: str):
         """Read service outputs and sync credentials to inventory after a successful deploy."""
         try:
@@ -1238,7 +1451,8 @@ class AnsibleRunner:
         from notification_service import notify, EVENT_BULK_COMPLETED
         try:
             services = parent.inputs.get("services", [])
-            failed_count = sum(1 for _, child in child_jobs if child.status != "completed")
+            failed_count = sum(1 for _, child in child_jobs
+                               if child is None or child.status != "completed")
             succeeded_count = len(child_jobs) - failed_count
             await notify(EVENT_BULK_COMPLETED, {
                 "title": f"Bulk {operation} {parent.status}: {len(services)} services",
@@ -1289,7 +1503,7 @@ class AnsibleRunner:
             inputs={},
         )
         self.jobs[job_id] = job
-        asyncio.create_task(self._run_sync_snapshots(job))
+        self.executor.submit(job, lambda: self._run_sync_snapshots(job), key="sync_snapshots")
         return job
 
     async def _run_sync_snapshots(self, job: Job):
@@ -1304,64 +1518,68 @@ class AnsibleRunner:
             snapshots_file = "/outputs/snapshots.json"
             if os.path.isfile(snapshots_file):
                 try:
-                    with open(snapshots_file, "r") as f:
-                        vultr_snapshots = json.load(f)
-
-                    from database import SessionLocal, AppMetadata, Snapshot
-                    session = SessionLocal()
-                    try:
-                        # Cache raw list for fast reads
-                        AppMetadata.set(session, "snapshots_cache", vultr_snapshots)
-                        AppMetadata.set(session, "snapshots_cache_time",
-                                        datetime.now(timezone.utc).isoformat())
-
-                        # Upsert each snapshot into DB
-                        vultr_ids_seen = set()
-                        for snap_data in vultr_snapshots:
-                            vultr_id = snap_data.get("id", "")
-                            if not vultr_id:
-                                continue
-                            vultr_ids_seen.add(vultr_id)
-
-                            existing = session.query(Snapshot).filter_by(
-                                vultr_snapshot_id=vultr_id).first()
-                            if existing:
-                                existing.status = snap_data.get("status", existing.status)
-                                existing.size_gb = snap_data.get("size", existing.size_gb)
-                                existing.description = snap_data.get("description", existing.description)
-                                existing.os_id = snap_data.get("os_id", existing.os_id)
-                                existing.app_id = snap_data.get("app_id", existing.app_id)
-                                existing.vultr_created_at = snap_data.get("date_created", existing.vultr_created_at)
-                            else:
-                                new_snap = Snapshot(
-                                    vultr_snapshot_id=vultr_id,
-                                    description=snap_data.get("description"),
-                                    status=snap_data.get("status", "complete"),
-                                    size_gb=snap_data.get("size"),
-                                    os_id=snap_data.get("os_id"),
-                                    app_id=snap_data.get("app_id"),
-                                    vultr_created_at=snap_data.get("date_created"),
-                                )
-                                session.add(new_snap)
-
-                        # Orphan cleanup: remove DB rows for snapshots no longer in Vultr
-                        all_db_snaps = session.query(Snapshot).all()
-                        for db_snap in all_db_snaps:
-                            if db_snap.vultr_snapshot_id not in vultr_ids_seen:
-                                session.delete(db_snap)
-
-                        session.commit()
-                        job.output.append(f"[Synced {len(vultr_ids_seen)} snapshots]")
-                    finally:
-                        session.close()
+                    await run_blocking(self._sync_snapshots_blocking, job, snapshots_file)
                 except Exception as e:
                     job.output.append(f"[Warning: Could not sync snapshot data: {e}]")
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
         await self._notify_job(job)
 
+    def _sync_snapshots_blocking(self, job: Job, snapshots_file: str):
+        """Cache the Vultr snapshot list and reconcile the snapshots table with it."""
+        with open(snapshots_file, "r") as f:
+            vultr_snapshots = json.load(f)
+
+        from database import SessionLocal, AppMetadata, Snapshot
+        session = SessionLocal()
+        try:
+            # Cache raw list for fast reads
+            AppMetadata.set(session, "snapshots_cache", vultr_snapshots)
+            AppMetadata.set(session, "snapshots_cache_time",
+                            datetime.now(timezone.utc).isoformat())
+
+            # Upsert each snapshot into DB
+            vultr_ids_seen = set()
+            for snap_data in vultr_snapshots:
+                vultr_id = snap_data.get("id", "")
+                if not vultr_id:
+                    continue
+                vultr_ids_seen.add(vultr_id)
+
+                existing = session.query(Snapshot).filter_by(
+                    vultr_snapshot_id=vultr_id).first()
+                if existing:
+                    existing.status = snap_data.get("status", existing.status)
+                    existing.size_gb = snap_data.get("size", existing.size_gb)
+                    existing.description = snap_data.get("description", existing.description)
+                    existing.os_id = snap_data.get("os_id", existing.os_id)
+                    existing.app_id = snap_data.get("app_id", existing.app_id)
+                    existing.vultr_created_at = snap_data.get("date_created", existing.vultr_created_at)
+                else:
+                    new_snap = Snapshot(
+                        vultr_snapshot_id=vultr_id,
+                        description=snap_data.get("description"),
+                        status=snap_data.get("status", "complete"),
+                        size_gb=snap_data.get("size"),
+                        os_id=snap_data.get("os_id"),
+                        app_id=snap_data.get("app_id"),
+                        vultr_created_at=snap_data.get("date_created"),
+                    )
+                    session.add(new_snap)
+
+            # Orphan cleanup: remove DB rows for snapshots no longer in Vultr
+            all_db_snaps = session.query(Snapshot).all()
+            for db_snap in all_db_snaps:
+                if db_snap.vultr_snapshot_id not in vultr_ids_seen:
+                    session.delete(db_snap)
+
+            session.commit()
+            job.output.append(f"[Synced {len(vultr_ids_seen)} snapshots]")
+        finally:
+            session.close()
+
     async def create_snapshot(self, instance_vultr_id: str, description: str | None = None,
                               user_id: int | None = None, username: str | None = None) -> Job:
         job_id = str(uuid.uuid4())[:8]
@@ -1376,9 +1594,9 @@ class AnsibleRunner:
             inputs={"instance_vultr_id": instance_vultr_id, "description": description or ""},
         )
         self.jobs[job_id] = job
-        asyncio.create_task(self._run_create_snapshot(job, instance_vultr_id,
-                                                       description or "CloudLab snapshot",
-                                                       user_id, username))
+        self.executor.submit(job, lambda: self._run_create_snapshot(job, instance_vultr_id,
+                                                                    description or "CloudLab snapshot",
+                                                                    user_id, username))
         return job
 
     async def _run_create_snapshot(self, job: Job, instance_vultr_id: str, description: str,
@@ -1396,39 +1614,8 @@ class AnsibleRunner:
             result_file = "/outputs/snapshot_create_result.json"
             if os.path.isfile(result_file):
                 try:
-                    with open(result_file, "r") as f:
-                        snap_data = json.load(f)
-
-                    from database import SessionLocal, Snapshot, AppMetadata
-                    session = SessionLocal()
-                    try:
-                        # Look up instance label from cache
-                        instance_label = None
-                        instances_cache = AppMetadata.get(session, "instances_cache") or {}
-                        hosts = instances_cache.get("all", {}).get("hosts", {})
-                        for _hostname, info in hosts.items():
-                            if info.get("vultr_id") == instance_vultr_id:
-                                instance_label = info.get("vultr_label", _hostname)
-                                break
-
-                        new_snap = Snapshot(
-                            vultr_snapshot_id=snap_data.get("id", ""),
-                            instance_vultr_id=instance_vultr_id,
-                            instance_label=instance_label,
-                            description=snap_data.get("description", description),
-                            status=snap_data.get("status", "pending"),
-                            size_gb=snap_data.get("size"),
-                            os_id=snap_data.get("os_id"),
-                            app_id=snap_data.get("app_id"),
-                            vultr_created_at=snap_data.get("date_created"),
-                            created_by=user_id,
-                            created_by_username=username,
-                        )
-                        session.add(new_snap)
-                        session.commit()
-                        job.output.append(f"[Snapshot created: {snap_data.get('id', 'unknown')}]")
-                    finally:
-                        session.close()
+                    await run_blocking(self._record_snapshot_blocking, job, result_file, instance_vultr_id,
+                                       description, user_id, username)
                 except Exception as e:
                     job.output.append(f"[Warning: Could not save snapshot record: {e}]")
 
@@ -1456,9 +1643,45 @@ class AnsibleRunner:
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
         await self._notify_job(job)
 
+    def _record_snapshot_blocking(self, job: Job, result_file: str, instance_vultr_id: str,
+                                  description: str, user_id: int | None, username: str | None):
+        with open(result_file, "r") as f:
+            snap_data = json.load(f)
+
+        from database import SessionLocal, Snapshot, AppMetadata
+        session = SessionLocal()
+        try:
+            # Look up instance label from cache
+            instance_label = None
+            instances_cache = AppMetadata.get(session, "instances_cache") or {}
+            hosts = instances_cache.get("all", {}).get("hosts", {})
+            for _hostname, info in hosts.items():
+                if info.get("vultr_id") == instance_vultr_id:
+                    instance_label = info.get("vultr_label", _hostname)
+                    break
+
+            new_snap = Snapshot(
+                vultr_snapshot_id=snap_data.get("id", ""),
+                instance_vultr_id=instance_vultr_id,
+                instance_label=instance_label,
+                description=snap_data.get("description", description),
+                status=snap_data.get("status", "pending"),
+                size_gb=snap_data.get("size"),
+                os_id=snap_data.get("os_id"),
+                app_id=snap_data.get("app_id"),
+                vultr_created_at=snap_data.get("date_created"),
+                created_by=user_id,
+                created_by_username=username,
+            )
+            session.add(new_snap)
+            session.commit()
+            job.output.append(f"[Snapshot created: {snap_data.get('id', 'unknown')}]")
+        finally:
+            session.close()
+
     async def delete_snapshot(self, vultr_snapshot_id: str,
                               user_id: int | None = None, username: str | None = None) -> Job:
         job_id = str(uuid.uuid4())[:8]
@@ -1473,7 +1696,7 @@ class AnsibleRunner:
             inputs={"vultr_snapshot_id": vultr_snapshot_id},
         )
         self.jobs[job_id] = job
-        asyncio.create_task(self._run_delete_snapshot(job, vultr_snapshot_id, user_id, username))
+        self.executor.submit(job, lambda: self._run_delete_snapshot(job, vultr_snapshot_id, user_id, username))
         return job
 
     async def _run_delete_snapshot(self, job: Job, vultr_snapshot_id: str,
@@ -1488,17 +1711,7 @@ class AnsibleRunner:
 
         if ok:
             # Remove from DB
-            from database import SessionLocal, Snapshot
-            session = SessionLocal()
-            try:
-                snap = session.query(Snapshot).filter_by(
-                    vultr_snapshot_id=vultr_snapshot_id).first()
-                if snap:
-                    session.delete(snap)
-                    session.commit()
-                    job.output.append(f"[Snapshot {vultr_snapshot_id} removed from DB]")
-            finally:
-                session.close()
+            await run_blocking(self._delete_snapshot_record_blocking, job, vultr_snapshot_id)
 
             # Send notification
             from notification_service import notify, EVENT_SNAPSHOT_DELETED
@@ -1517,9 +1730,22 @@ class AnsibleRunner:
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
         await self._notify_job(job)
 
+    def _delete_snapshot_record_blocking(self, job: Job, vultr_snapshot_id: str):
+        from database import SessionLocal, Snapshot
+        session = SessionLocal()
+        try:
+            snap = session.query(Snapshot).filter_by(
+                vultr_snapshot_id=vultr_snapshot_id).first()
+            if snap:
+                session.delete(snap)
+                session.commit()
+                job.output.append(f"[Snapshot {vultr_snapshot_id} removed from DB]")
+        finally:
+            session.close()
+
     async def restore_snapshot(self, snapshot_vultr_id: str, label: str, hostname: str,
                                plan: str, region: str, description: str = "",
                                user_id: int | None = None, username: str | None = None) -> Job:
@@ -1541,7 +1767,7 @@ class AnsibleRunner:
             },
         )
         self.jobs[job_id] = job
-        asyncio.create_task(self._run_restore_snapshot(
+        self.executor.submit(job, lambda: self._run_restore_snapshot(
             job, snapshot_vultr_id, label, hostname, plan, region, description))
         return job
 
@@ -1610,53 +1836,117 @@ class AnsibleRunner:
 
         job.status = "completed" if ok else "failed"
         job.finished_at = datetime.now(timezone.utc).isoformat()
-        self._persist_job(job)
+        await self._persist_job(job)
+        await self._notify_job(job)
+
+    async def _flush_output(self, job: Job, force: bool = False):
+        """Append buffered output lines to job_output_chunks every N lines / M seconds.
+
+        The job row is upserted alongside the first chunk so a crash mid-run
+        still leaves a reachable, partially logged job behind.
+        """
+        writer = self._output_writers.get(job.id)
+        if writer is None:
+            writer = self._output_writers[job.id] = JobOutputWriter(job)
+        if not force and not writer.should_flush():
+            return
+        if await run_blocking(self._flush_output_blocking, job, writer):
+            writer.trim()
+
+    def _flush_output_blocking(self, job: Job, writer: JobOutputWriter) -> bool:
+        from database import SessionLocal
+        session = SessionLocal()
+        try:
+            self._write_job_record(session, job)
+            writer.flush(session)
+            session.commit()
+            return True
+        except Exception as e:
+            session.rollback()
+            print(f"Failed to flush output for job {job.id}: {e}")
+            return False
+        finally:
+            session.close()
+
+    def _write_job_record(self, session, job: Job, object_id: int | None = None,
+                          type_slug: str | None = None):
+        from database import JobRecord
+        existing = session.query(JobRecord).filter_by(id=job.id).first()
+        if existing:
+            existing.status = job.status
+            existing.finished_at = job.finished_at
+            existing.deployment_id = job.deployment_id
+            existing.inputs = json.dumps(job.inputs) if job.inputs else None
+            existing.parent_job_id = job.parent_job_id
+            if object_id is not None:
+                existing.object_id = object_id
+            if type_slug is not None:
+                existing.type_slug = type_slug
+            if job.schedule_id is not None:
+                existing.schedule_id = job.schedule_id
+            if job.webhook_id is not None:
+                existing.webhook_id = job.webhook_id
+            return existing
+        record = JobRecord(
+            id=job.id,
+            service=job.service,
+            action=job.action,
+            script=job.script,
+            status=job.status,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            deployment_id=job.deployment_id,
+            user_id=job.user_id,
+            username=job.username,
+            object_id=object_id,
+            type_slug=type_slug,
+            schedule_id=job.schedule_id,
+            webhook_id=job.webhook_id,
+            inputs=json.dumps(job.inputs) if job.inputs else None,
+            parent_job_id=job.parent_job_id,
+        )
+        session.add(record)
+        return record
+
+    async def _finalize_crashed_job(self, job: Job):
+        """Persist and announce a job whose coroutine raised before finishing it."""
+        await self._persist_job(job)
         await self._notify_job(job)
 
-    def _persist_job(self, job: Job, object_id: int | None = None, type_slug: str | None = None):
-        from database import SessionLocal, JobRecord
+    async def _persist_job(self, job: Job, object_id: int | None = None, type_slug: str | None = None):
+        # Job rows are written on the shared DB writer thread rather than
+        # the blocking pool, so concurrent jobs queue instead of contending
+        # for the SQLite write lock
+        from database import db_writer
+        writer = await db_writer.run_async(self._persist_job_blocking, job, object_id, type_slug)
+        if writer is not None:
+            writer.trim()
+            self.jobs.mark_persisted(job)
+        # Wake viewers so they pick up trailing lines and the final status
+        self.stream_hub.publish(job.id)
+
+    def _persist_job_blocking(self, job: Job, object_id: int | None = None,
+                              type_slug: str | None = None) -> JobOutputWriter | None:
+        """Upsert the job row and its output; returns the writer, or None on failure."""
+        from database import SessionLocal
         session = SessionLocal()
         try:
-            existing = session.query(JobRecord).filter_by(id=job.id).first()
-            if existing:
-                existing.status = job.status
-                existing.finished_at = job.finished_at
-                existing.output = json.dumps(job.output)
-                existing.deployment_id = job.deployment_id
-                existing.inputs = json.dumps(job.inputs) if job.inputs else None
-                existing.parent_job_id = job.parent_job_id
-                if object_id is not None:
-                    existing.object_id = object_id
-                if type_slug is not None:
-                    existing.type_slug = type_slug
-                if job.schedule_id is not None:
-                    existing.schedule_id = job.schedule_id
-                if job.webhook_id is not None:
-                    existing.webhook_id = job.webhook_id
+            record = self._write_job_record(session, job, object_id=object_id, type_slug=type_slug)
+            writer = self._output_writers.get(job.id) or JobOutputWriter(job, record.output_lines)
+            writer.flush(session)
+            if job.status in ACTIVE_JOB_STATUSES:
+                self._output_writers[job.id] = writer
+                record.output_lines = writer.flushed
             else:
-                record = JobRecord(
-                    id=job.id,
-                    service=job.service,
-                    action=job.action,
-                    script=job.script,
-                    status=job.status,
-                    started_at=job.started_at,
-                    finished_at=job.finished_at,
-                    output=json.dumps(job.output),
-                    deployment_id=job.deployment_id,
-                    user_id=job.user_id,
-                    username=job.username,
-                    object_id=object_id,
-                    type_slug=type_slug,
-                    schedule_id=job.schedule_id,
-                    webhook_id=job.webhook_id,
-                    inputs=json.dumps(job.inputs) if job.inputs else None,
-                    parent_job_id=job.parent_job_id,
-                )
-                session.add(record)
+                # Finished: fold the appended chunks into compressed segments
+                session.flush()
+                record.output_lines = compact_job_output(session, job.id)
+                self._output_writers.pop(job.id, None)
             session.commit()
+            return writer
         except Exception as e:
             session.rollback()
             print(f"Failed to persist job {job.id}: {e}")
+            return None
         finally:
             session.close()
@@ -35,10 +35,16 @@ from routes.credential_access_routes import router as credential_access_router
 from routes.credential_audit_routes import router as credential_audit_router
 from routes.update_routes import router as update_router
 from routes.file_routes import router as file_router
+from routes.diagnostics_routes import router as diagnostics_router
+from routes.metrics_routes import router as metrics_router
 from health_checker import HealthPoller, load_health_configs
 from drift_checker import DriftPoller
 from snapshot_poller import SnapshotPoller
 from update_checker import UpdateChecker
+from loop_monitor import LoopMonitor, LoopMonitorMiddleware, LOOP_MONITOR_ENABLED
+from metrics import MetricsMiddleware, instrument_sqlalchemy
+from audit import AuditWriter, AUDIT_BUFFERED
+from sync_orchestrator import SyncOrchestrator
 
 
 limiter = Limiter(key_func=get_remote_address)
@@ -60,10 +66,27 @@ async def _periodic_cost_refresh(runner):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Opt-in event-loop stall detector, started first so startup stalls show up too
+    loop_monitor = LoopMonitor()
+    app.state.loop_monitor = loop_monitor
+    if LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+
     type_configs = await startup.main()
     app.state.ansible_runner = AnsibleRunner()
     app.state.inventory_types = type_configs or []
 
+    # Opt-in buffered audit log; started before anything that logs actions
+    audit_writer = AuditWriter()
+    app.state.audit_writer = audit_writer
+    if AUDIT_BUFFERED:
+        audit_writer.start()
+
+    # Coalesces the inventory syncs jobs and the sync endpoint ask for
+    sync_orchestrator = SyncOrchestrator(app.state.inventory_types)
+    app.state.sync_orchestrator = sync_orchestrator
+    sync_orchestrator.start()
+
     # Start background scheduler
     scheduler = Scheduler(app.state.ansible_runner)
     app.state.scheduler = scheduler
@@ -101,7 +124,8 @@ async def lifespan(app: FastAPI):
     app.state.update_checker = update_checker
     update_checker.start()
 
-    cost_refresh_task = asyncio.create_task(_periodic_cost_refresh(app.state.ansible_runner))
+    cost_refresh_task = asyncio.create_task(_periodic_cost_refresh(app.state.ansible_runner),
+                                            name="cost-refresh")
 
     yield
 
@@ -127,6 +151,14 @@ async def lifespan(app: FastAPI):
     # Stop scheduler on shutdown
     await scheduler.stop()
 
+    # Finish syncs that jobs already asked for
+    await sync_orchestrator.stop()
+
+    # Write buffered audit entries last, after everything that could add more
+    await audit_writer.stop()
+
+    await loop_monitor.stop()
+
 
 app = FastAPI(lifespan=lifespan)
 app.state.limiter = limiter
@@ -146,6 +178,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(LoopMonitorMiddleware)
+app.add_middleware(MetricsMiddleware)
+instrument_sqlalchemy()
 
 app.include_router(auth_router)
 app.include_router(instance_router)
@@ -170,6 +205,8 @@ app.include_router(credential_access_router)
 app.include_router(credential_audit_router)
 app.include_router(update_router)
 app.include_router(file_router)
+app.include_router(diagnostics_router)
+app.include_router(metrics_router)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
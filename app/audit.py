@@ -1,13 +1,56 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from sqlalchemy import event, false, func, insert, literal_column, select, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from database import AuditLog
+from database import AuditLog, db_writer, search_tokens, utcnow
+from metrics import AUDIT_BUFFER_PENDING, AUDIT_FLUSH_SECONDS, AUDIT_WRITES
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: entries are queued after the request commits and bulk-inserted by
+# AuditWriter instead of being flushed inside every request transaction
+AUDIT_BUFFERED = os.environ.get("AUDIT_BUFFERED", "").lower() in ("1", "true", "yes")
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get("AUDIT_FLUSH_INTERVAL_MS", "250")) / 1000
+AUDIT_QUEUE_MAX = int(os.environ.get("AUDIT_QUEUE_MAX", "10000"))
+
+# Security-relevant actions are always written in the caller's transaction,
+# so they are on disk as soon as the request that caused them commits
+AUDIT_DURABLE_PREFIXES = (
+    "login", "mfa", "auth.", "user.", "role.", "system.", "audit.", "credential.viewed",
+    "credential_access.", "service.acl.", "inventory.acl.", "webhook.regenerate_token",
+)
+
+_PENDING_KEY = "audit_pending"
+
+# Totals for a filter set are reused for this long; rows added since the last
+# count are counted on top (an indexed id range), so pages stay cheap
+AUDIT_COUNT_CACHE_TTL = float(os.environ.get("AUDIT_COUNT_CACHE_TTL", "60"))
+AUDIT_COUNT_CACHE_SIZE = 256
+
+# filter key -> (highest id counted, total, monotonic time of the full count)
+_count_cache: OrderedDict[tuple, tuple[int, int, float]] = OrderedDict()
+_count_lock = threading.Lock()
 
 
 def log_action(session: Session, user_id: int | None, username: str | None,
                action: str, resource: str | None = None,
-               details: dict | None = None, ip_address: str | None = None):
-    """Write an entry to the audit log."""
-    import json
-    entry = AuditLog(
+               details: dict | None = None, ip_address: str | None = None,
+               durable: bool = False):
+    """Write an entry to the audit log.
+
+    While an AuditWriter is running, entries that are neither `durable` nor a
+    security action are handed to it when the session commits (and dropped
+    if it rolls back). Otherwise the entry is flushed in the session.
+    """
+    row = dict(
         user_id=user_id,
         username=username,
         action=action,
@@ -15,5 +58,232 @@ def log_action(session: Session, user_id: int | None, username: str | None,
         details=json.dumps(details) if details else None,
         ip_address=ip_address,
     )
-    session.add(entry)
-    session.flush()
+    if _writer is None or durable or is_durable_action(action):
+        session.add(AuditLog(**row))
+        session.flush()
+        AUDIT_WRITES.inc(mode="sync")
+        return
+    row["created_at"] = utcnow()
+    if not session.in_transaction():
+        # Tie the entry to a transaction so a rollback of it discards the entry
+        session.begin()
+    session.info.setdefault(_PENDING_KEY, []).append(row)
+
+
+def is_durable_action(action: str) -> bool:
+    return action.startswith(AUDIT_DURABLE_PREFIXES)
+
+
+def _hand_off_pending(session):
+    rows = session.info.pop(_PENDING_KEY, None)
+    if not rows:
+        return
+    writer = _writer
+    if writer is not None:
+        writer.submit(rows)
+    else:
+        # Stopped since the entries were logged: write them ourselves
+        _write_now(rows)
+
+
+def _discard_pending(session, transaction):
+    # after_commit has already taken the entries if the transaction committed
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(Session, "after_commit", _hand_off_pending)
+event.listen(Session, "after_transaction_end", _discard_pending)
+
+
+def _insert_batch(rows: list[dict]):
+    from database import SessionLocal
+    session = SessionLocal()
+    try:
+        session.execute(insert(AuditLog), rows)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def _insert_entries(rows: list[dict]):
+    """Insert audit rows in one transaction on a session of their own.
+
+    A row that violates a constraint (its user was deleted meanwhile, say)
+    is logged and skipped rather than failing the batch. Other errors, such
+    as a locked database, propagate so the caller can retry.
+    """
+    with AUDIT_FLUSH_SECONDS.time():
+        try:
+            _insert_batch(rows)
+        except IntegrityError:
+            for row in rows:
+                try:
+                    _insert_batch([row])
+                except IntegrityError:
+                    logger.exception("Dropping audit entry %s %s", row["action"], row["resource"])
+    AUDIT_WRITES.inc(len(rows), mode="buffered")
+
+
+def _write_now(rows: list[dict]):
+    # Runs after the caller's commit, so a failure here must not escape into it
+    try:
+        db_writer.run(_insert_entries, rows)
+    except Exception:
+        logger.exception("Failed to write %d audit entries", len(rows))
+
+
+class AuditWriter:
+    """Background task that bulk-inserts buffered audit entries.
+
+    Entries are written every `interval` seconds, or as soon as `batch_size`
+    are waiting. Past `max_pending` queued entries the committing request
+    writes its own entries, so memory stays bounded and nothing is dropped.
+    """
+
+    def __init__(self, batch_size: int = AUDIT_BATCH_SIZE, interval: float = AUDIT_FLUSH_INTERVAL,
+                 max_pending: int = AUDIT_QUEUE_MAX):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        global _writer
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="audit-writer")
+        _writer = self
+        logger.info("Buffered audit writer started (batch %d, every %.0f ms)",
+                    self.batch_size, self.interval * 1000)
+
+    async def stop(self):
+        """Stop buffering and write everything still queued."""
+        global _writer
+        if _writer is self:
+            _writer = None
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to write %d buffered audit entries on shutdown", self.pending)
+        logger.info("Buffered audit writer stopped")
+
+    def submit(self, rows: list[dict]):
+        """Queue committed entries; called from any thread."""
+        if self._task is None:
+            _write_now(rows)
+            return
+        with self._lock:
+            accepted = len(self._pending) + len(rows) <= self.max_pending
+            if accepted:
+                self._pending.extend(rows)
+            pending = len(self._pending)
+        AUDIT_BUFFER_PENDING.set(pending)
+        if not accepted:
+            _write_now(rows)
+        elif pending >= self.batch_size:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def flush(self):
+        """Write everything queued so far."""
+        while True:
+            with self._lock:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                AUDIT_BUFFER_PENDING.set(len(self._pending))
+            if not batch:
+                return
+            try:
+                await db_writer.run_async(_insert_entries, batch)
+            except Exception:
+                # Put the batch back in order and let the next flush retry it
+                with self._lock:
+                    self._pending.extendleft(reversed(batch))
+                    AUDIT_BUFFER_PENDING.set(len(self._pending))
+                raise
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Audit writer flush failed")
+
+
+_writer: AuditWriter | None = None
+
+
+def search_filter(search: str):
+    """Filter clause for entries whose action, resource or details match a search.
+
+    Each word is a prefix match against the audit_fts index and all words
+    must match. Input with nothing searchable in it matches nothing.
+    """
+    phrases = []
+    for word in search.split():
+        tokens = search_tokens(word)
+        if tokens:
+            phrases.append(f'"{" ".join(tokens)}"*')
+    if not phrases:
+        return false()
+    ids = (
+        select(literal_column("rowid"))
+        .select_from(text("audit_fts"))
+        .where(text("audit_fts MATCH :audit_match").bindparams(audit_match=" AND ".join(phrases)))
+    )
+    return AuditLog.id.in_(ids)
+
+
+def count_entries(session: Session, query, key: tuple) -> int:
+    """Total rows for a filtered audit query, cached per filter set.
+
+    Within AUDIT_COUNT_CACHE_TTL only entries newer than the last count are
+    counted. Entries deleted in that window are not noticed until it expires.
+    """
+    query = query.order_by(None)
+    max_id = session.query(func.max(AuditLog.id)).scalar() or 0
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(key)
+    if cached and cached[0] <= max_id and now - cached[2] < AUDIT_COUNT_CACHE_TTL:
+        seen_id, total, counted_at = cached
+        if max_id > seen_id:
+            total += query.filter(AuditLog.id > seen_id, AuditLog.id <= max_id).count()
+    else:
+        total = query.filter(AuditLog.id <= max_id).count()
+        counted_at = now
+    with _count_lock:
+        _count_cache[key] = (max_id, total, counted_at)
+        _count_cache.move_to_end(key)
+        while len(_count_cache) > AUDIT_COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+    return total
+
+
+def reset_count_cache():
+    with _count_lock:
+        _count_cache.clear()
@@ -1,12 +1,21 @@
+import asyncio
 import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 from database import SessionLocal, User, AppMetadata, InviteToken, PasswordResetToken
+from metrics import (
+    PASSWORD_HASH_PENDING, PASSWORD_HASH_QUEUE_SECONDS, PASSWORD_HASH_REJECTED, PASSWORD_HASH_SECONDS,
+)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
@@ -16,22 +25,134 @@ ACCESS_TOKEN_EXPIRE_HOURS = 24
 INVITE_TOKEN_EXPIRE_HOURS = 72
 RESET_TOKEN_EXPIRE_HOURS = 1
 
+# JWT signing keys. "default" is the app secret_key, which also derives the MFA
+# encryption key, so rotation adds new keys instead of replacing it.
+SIGNING_KEYS_META = "jwt_signing_keys"
+DEFAULT_KID = "default"
+SIGNING_KEYS_KEPT = int(os.environ.get("JWT_SIGNING_KEYS_KEPT", "3"))
+# How often a process re-reads the key set to pick up a rotation done elsewhere
+SIGNING_KEYS_REFRESH = float(os.environ.get("JWT_SIGNING_KEYS_REFRESH", "300"))
+
+# bcrypt runs on its own small pool so logins never block the event loop.
+# Past PASSWORD_HASH_MAX_PENDING queued calls, requests get a 503 instead of
+# queueing without bound.
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "32"))
+
+# Active users resolved from tokens, so authenticated requests skip the DB
+USER_CACHE_TTL = float(os.environ.get("AUTH_USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.environ.get("AUTH_USER_CACHE_SIZE", "1000"))
+
+_key_lock = threading.RLock()
+_secret_key: str | None = None
+_signing_keys: dict | None = None  # {"current": kid, "keys": {kid: secret}, "loaded": monotonic}
+
+_user_lock = threading.Lock()
+# user_id -> (detached User, user version, authz version, cached at)
+_user_cache: OrderedDict[int, tuple[User, int, int, float]] = OrderedDict()
+_user_versions: dict[int, int] = {}
+
 
 def get_session() -> Session:
     return SessionLocal()
 
 
 def get_secret_key() -> str:
+    """The app secret (created on first use); read from the DB once per process."""
+    global _secret_key
+    if _secret_key is not None:
+        return _secret_key
+    with _key_lock:
+        if _secret_key is None:
+            session = get_session()
+            try:
+                key = AppMetadata.get(session, "secret_key")
+                if key is None:
+                    key = secrets.token_hex(32)
+                    AppMetadata.set(session, "secret_key", key)
+                    session.commit()
+                _secret_key = key
+            finally:
+                session.close()
+    return _secret_key
+
+
+def _keyset(stored: dict) -> dict:
+    order = stored.get("order", [DEFAULT_KID])
+    keys = {kid: stored.get("keys", {}).get(kid) for kid in order}
+    if DEFAULT_KID in keys:
+        keys[DEFAULT_KID] = get_secret_key()
+    keys = {kid: key for kid, key in keys.items() if key}
+    current = stored.get("current", DEFAULT_KID)
+    if current not in keys:
+        current, keys[DEFAULT_KID] = DEFAULT_KID, get_secret_key()
+    return {"current": current, "keys": keys, "loaded": time.monotonic()}
+
+
+def _load_signing_keys() -> dict:
     session = get_session()
     try:
-        key = AppMetadata.get(session, "secret_key")
-        if key is None:
-            key = secrets.token_hex(32)
-            AppMetadata.set(session, "secret_key", key)
-            session.commit()
-        return key
+        stored = AppMetadata.get(session, SIGNING_KEYS_META) or {}
     finally:
         session.close()
+    return _keyset(stored)
+
+
+def _get_signing_keys(refresh: bool = False) -> dict:
+    global _signing_keys
+    keys = _signing_keys
+    if refresh or keys is None or time.monotonic() - keys["loaded"] >= SIGNING_KEYS_REFRESH:
+        with _key_lock:
+            if refresh or _signing_keys is keys:
+                _signing_keys = _load_signing_keys()
+            keys = _signing_keys
+    return keys
+
+
+def rotate_signing_key(session: Session) -> str:
+    """Start signing tokens with a new key; return its key ID.
+
+    Older keys keep verifying tokens until SIGNING_KEYS_KEPT newer ones exist.
+    Other processes switch to the new key within SIGNING_KEYS_REFRESH seconds.
+    """
+    global _signing_keys
+    stored = AppMetadata.get(session, SIGNING_KEYS_META) or {}
+    kid = secrets.token_hex(4)
+    order = [*stored.get("order", [DEFAULT_KID]), kid][-SIGNING_KEYS_KEPT:]
+    keys = {**stored.get("keys", {}), kid: secrets.token_hex(32)}
+    stored = {
+        "current": kid,
+        "order": order,
+        # The default key lives in secret_key, not here
+        "keys": {k: v for k, v in keys.items() if k in order and k != DEFAULT_KID},
+    }
+    AppMetadata.set(session, SIGNING_KEYS_META, stored)
+    with _key_lock:
+        _signing_keys = _keyset(stored)
+    return kid
+
+
+def _encode_token(payload: dict) -> str:
+    keys = _get_signing_keys()
+    kid = keys["current"]
+    return jwt.encode(payload, keys["keys"][kid], algorithm=ALGORITHM, headers={"kid": kid})
+
+
+def decode_token(token: str) -> dict:
+    """Verify a JWT against the key named in its header; raises JWTError.
+
+    Tokens without a kid were signed with the default key.
+    """
+    kid = jwt.get_unverified_header(token).get("kid", DEFAULT_KID)
+    keys = _get_signing_keys()
+    key = keys["keys"].get(kid)
+    if key is None and time.monotonic() - keys["loaded"] >= 1:
+        # Possibly rotated by another process since we last looked; at most
+        # one reload a second so forged key IDs can't hammer the DB
+        key = _get_signing_keys(refresh=True)["keys"].get(kid)
+    if key is None:
+        raise JWTError("Unknown signing key")
+    return jwt.decode(token, key, algorithms=[ALGORITHM])
 
 
 def hash_password(password: str) -> str:
@@ -42,10 +163,48 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+_hash_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_pending = 0  # only touched on the event loop
+
+
+async def run_hashing(op: str, fn, *args):
+    """Run a bcrypt call on the hashing pool; 503 if the queue is full."""
+    global _hash_pending
+    if _hash_pending >= PASSWORD_HASH_MAX_PENDING:
+        PASSWORD_HASH_REJECTED.inc(op=op)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Server busy, please retry", headers={"Retry-After": "1"})
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        PASSWORD_HASH_QUEUE_SECONDS.observe(started - submitted, op=op)
+        try:
+            return fn(*args)
+        finally:
+            PASSWORD_HASH_SECONDS.observe(time.perf_counter() - started, op=op)
+
+    _hash_pending += 1
+    PASSWORD_HASH_PENDING.set(_hash_pending)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, timed)
+    finally:
+        _hash_pending -= 1
+        PASSWORD_HASH_PENDING.set(_hash_pending)
+
+
+async def hash_password_async(password: str) -> str:
+    return await run_hashing("hash_password", hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await run_hashing("verify_password", verify_password, plain, hashed)
+
+
 def create_access_token(user: User) -> str:
     expire = datetime.now(timezone.utc) + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     payload = {"sub": user.username, "uid": user.id, "exp": expire}
-    return jwt.encode(payload, get_secret_key(), algorithm=ALGORITHM)
+    return _encode_token(payload)
 
 
 MFA_TOKEN_EXPIRE_MINUTES = 5
@@ -55,13 +214,13 @@ def create_mfa_token(user: User) -> str:
     """Create a short-lived token for MFA verification step."""
     expire = datetime.now(timezone.utc) + timedelta(minutes=MFA_TOKEN_EXPIRE_MINUTES)
     payload = {"sub": user.username, "uid": user.id, "exp": expire, "purpose": "mfa"}
-    return jwt.encode(payload, get_secret_key(), algorithm=ALGORITHM)
+    return _encode_token(payload)
 
 
 def validate_mfa_token(token: str) -> dict | None:
     """Validate an MFA token and return the payload, or None if invalid."""
     try:
-        payload = jwt.decode(token, get_secret_key(), algorithms=[ALGORITHM])
+        payload = decode_token(token)
         if payload.get("purpose") != "mfa":
             return None
         return payload
@@ -72,7 +231,7 @@ def validate_mfa_token(token: str) -> dict | None:
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
     token = credentials.credentials
     try:
-        payload = jwt.decode(token, get_secret_key(), algorithms=[ALGORITHM])
+        payload = decode_token(token)
         # Reject MFA intermediate tokens — they must not be used as access tokens
         if payload.get("purpose") == "mfa":
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
@@ -83,6 +242,11 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+    if user_id is not None:
+        user = _cached_user(user_id)
+        if user is not None:
+            return user
+
     session = get_session()
     try:
         user = session.query(User).filter_by(id=user_id, is_active=True).first()
@@ -92,11 +256,81 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
         # Detach from session so it can be used outside
         session.expunge(user)
+        _cache_user(user, session)
         return user
     finally:
         session.close()
 
 
+# --- Active user cache ---
+#
+# An entry is valid while its user version (bumped locally when a commit
+# changes or deletes that user) and the global authz version (bumped on role
+# changes, deactivation and deletion, and re-read from the DB at most every
+# AUTHZ_VERSION_CHECK_INTERVAL) both still match, and for at most USER_CACHE_TTL.
+
+def _cached_user(user_id: int) -> User | None:
+    from permissions import get_authz_version
+    authz_version = get_authz_version()
+    with _user_lock:
+        entry = _user_cache.get(user_id)
+        if entry is None:
+            return None
+        user, user_version, cached_authz, cached_at = entry
+        if (user_version != _user_versions.get(user_id, 0) or cached_authz != authz_version
+                or time.monotonic() - cached_at >= USER_CACHE_TTL):
+            del _user_cache[user_id]
+            return None
+        _user_cache.move_to_end(user_id)
+        return user
+
+
+def _cache_user(user: User, session: Session):
+    from permissions import get_authz_version
+    authz_version = get_authz_version(session)
+    with _user_lock:
+        _user_cache[user.id] = (user, _user_versions.get(user.id, 0), authz_version, time.monotonic())
+        _user_cache.move_to_end(user.id)
+        while len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+
+
+def invalidate_user_cache(user_id: int | None = None):
+    """Drop this process's cached user (or all users)."""
+    with _user_lock:
+        if user_id is None:
+            _user_cache.clear()
+            _user_versions.clear()
+        else:
+            _user_versions[user_id] = _user_versions.get(user_id, 0) + 1
+            _user_cache.pop(user_id, None)
+
+
+def reset_auth_caches():
+    """Forget cached keys and users (tests, or after restoring a database)."""
+    global _secret_key, _signing_keys
+    with _key_lock:
+        _secret_key = None
+        _signing_keys = None
+    invalidate_user_cache()
+
+
+def _track_user_change(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_user_cache(user_id)
+
+
+event.listen(User, "after_update", _track_user_change)
+event.listen(User, "after_delete", _track_user_change)
+event.listen(Session, "after_commit", _invalidate_changed_users)
+
+
 def is_setup_complete() -> bool:
     session = get_session()
     try:
@@ -0,0 +1,115 @@
+"""Shared engine for bulk jobs: ordered waves of child jobs under a parallelism window."""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+
+from models import Job
+
+BULK_PARALLELISM = int(os.environ.get("BULK_PARALLELISM", "4"))
+
+
+def dependency_waves(names: list[str], depends_on: dict[str, list[str]],
+                     reverse: bool = False) -> list[list[str]]:
+    """Group `names` into waves so every service comes after its dependencies.
+
+    Only dependencies within `names` are considered. With reverse=True the
+    waves are flipped so dependents go first (the order for stopping).
+    Services caught in a dependency cycle end up together in a final wave.
+    """
+    selected = set(names)
+    remaining = {n: {d for d in depends_on.get(n, []) if d in selected and d != n} for n in names}
+    waves: list[list[str]] = []
+    done: set[str] = set()
+    while remaining:
+        wave = [n for n in names if n in remaining and remaining[n] <= done]
+        if not wave:
+            wave = [n for n in names if n in remaining]
+        for n in wave:
+            del remaining[n]
+        done.update(wave)
+        waves.append(wave)
+    return waves[::-1] if reverse else waves
+
+
+class BulkOrchestrator:
+    """Runs a bulk parent job's children in waves, at most `parallelism` at a time.
+
+    Each wave item is (label, start) where start() is an awaitable returning
+    the child Job (e.g. a runner entry point). Children finish through the
+    runner's executor futures, so nothing polls. With fail_fast, the first
+    failed child stops further launches; in-flight children still finish.
+    """
+
+    def __init__(self, runner, parent: Job, verb: str,
+                 parallelism: int | None = None, fail_fast: bool = False):
+        self.runner = runner
+        self.parent = parent
+        self.verb = verb
+        self.parallelism = max(1, parallelism or BULK_PARALLELISM)
+        self.fail_fast = fail_fast
+        self.results: list[tuple[str, Job | None]] = []
+        self.failed = False
+
+    def log(self, line: str):
+        self.parent.output.append(line)
+        self.runner.stream_hub.publish(self.parent.id)
+
+    async def run(self, waves: list[list[tuple]]) -> list[tuple[str, Job | None]]:
+        for number, wave in enumerate(waves, start=1):
+            if self.fail_fast and self.failed:
+                self._skip(wave)
+                continue
+            if len(waves) > 1:
+                labels = ", ".join(label for label, _ in wave)
+                self.log(f"--- Wave {number}/{len(waves)}: {labels} ---")
+            await self._run_wave(wave)
+        return self.results
+
+    async def _run_wave(self, wave: list[tuple]):
+        pending = list(wave)
+        in_flight: dict[asyncio.Task, tuple[str, Job]] = {}
+        while pending or in_flight:
+            while pending and len(in_flight) < self.parallelism:
+                if self.fail_fast and self.failed:
+                    self._skip(pending)
+                    pending = []
+                    break
+                label, start = pending.pop(0)
+                self.log(f"[Starting {self.verb} for {label}]")
+                try:
+                    child = await start()
+                except Exception as e:
+                    self.log(f"[{label}] failed to start: {e}")
+                    self.results.append((label, None))
+                    self.failed = True
+                    continue
+                child.parent_job_id = self.parent.id
+                task = asyncio.create_task(self.runner.executor.wait_for(child))
+                in_flight[task] = (label, child)
+            if not in_flight:
+                continue
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                label, child = in_flight.pop(task)
+                self.log(f"[{label}] finished: {child.status}")
+                self.results.append((label, child))
+                if child.status != "completed":
+                    self.failed = True
+
+    def _skip(self, items: list[tuple]):
+        for label, _ in items:
+            self.log(f"[{label}] skipped (fail-fast)")
+            self.results.append((label, None))
+
+    def finish(self):
+        """Set the parent's final status from the child results."""
+        parent = self.parent
+        failed = [label for label, child in self.results
+                  if child is None or child.status != "completed"]
+        if failed:
+            parent.output.append(f"[Failed: {', '.join(failed)}]")
+            parent.status = "failed" if len(failed) == len(self.results) else "completed"
+        else:
+            parent.status = "completed"
+        parent.finished_at = datetime.now(timezone.utc).isoformat()
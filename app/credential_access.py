@@ -6,7 +6,7 @@ from database import (
     CredentialAccessRule, InventoryObject, InventoryTag, InventoryType,
     User, object_tags,
 )
-from permissions import get_user_permissions
+from permissions import get_authz_snapshot
 from audit import log_action
 
 
@@ -21,20 +21,16 @@ def user_can_view_credential(session: Session, user: User, credential_obj: Inven
        - The credential's credential_type
        - The credential's scope (instance hostname, service, tag, or "all")
     """
-    perms = get_user_permissions(session, user.id)
-    if "*" in perms:
+    snapshot = get_authz_snapshot(session, user.id)
+    if "*" in snapshot.permissions:
         return True
 
-    role_ids = [r.id for r in user.roles]
-    if not role_ids:
+    if not snapshot.role_ids:
         return False
 
     # Check if any credential access rules exist for user's roles
-    any_rules = session.query(CredentialAccessRule).filter(
-        CredentialAccessRule.role_id.in_(role_ids)
-    ).first()
-
-    if not any_rules:
+    rules = snapshot.credential_rules
+    if not rules:
         # No rules defined for this user's roles -- fall through to standard perms
         return True  # Let the caller's existing check_inventory_permission handle it
 
@@ -50,10 +46,6 @@ def user_can_view_credential(session: Session, user: User, credential_obj: Inven
     service_names = {t.split(":", 1)[1] for t in tag_names if t.startswith("svc:")}
 
     # Check rules
-    rules = session.query(CredentialAccessRule).filter(
-        CredentialAccessRule.role_id.in_(role_ids)
-    ).all()
-
     for rule in rules:
         # Check credential type match
         if rule.credential_type != "*" and rule.credential_type != cred_type:
@@ -86,25 +78,18 @@ def filter_portal_credentials(session: Session, user: User, outputs: list[dict],
     Portal outputs don't have DB objects, so we match against the output's
     credential_type and the service/instance context.
     """
-    perms = get_user_permissions(session, user.id)
-    if "*" in perms:
+    snapshot = get_authz_snapshot(session, user.id)
+    if "*" in snapshot.permissions:
         return outputs
 
-    role_ids = [r.id for r in user.roles]
-    if not role_ids:
+    if not snapshot.role_ids:
         return [o for o in outputs if o.get("type") != "credential"]
 
     # If no rules exist for user's roles, show everything (backwards compatible)
-    any_rules = session.query(CredentialAccessRule).filter(
-        CredentialAccessRule.role_id.in_(role_ids)
-    ).first()
-    if not any_rules:
+    rules = snapshot.credential_rules
+    if not rules:
         return outputs
 
-    rules = session.query(CredentialAccessRule).filter(
-        CredentialAccessRule.role_id.in_(role_ids)
-    ).all()
-
     result = []
     for output in outputs:
         if output.get("type") != "credential":
@@ -149,13 +134,7 @@ def filter_portal_credentials(session: Session, user: User, outputs: list[dict],
 def check_personal_key_required(session: Session, user: User, cred_type: str,
                                  service_name: str, hostname: str) -> bool:
     """Check if any matching rule for the user has require_personal_key=True."""
-    role_ids = [r.id for r in user.roles]
-    if not role_ids:
-        return False
-    rules = session.query(CredentialAccessRule).filter(
-        CredentialAccessRule.role_id.in_(role_ids),
-        CredentialAccessRule.require_personal_key == True,
-    ).all()
+    rules = [r for r in get_authz_snapshot(session, user.id).credential_rules if r.require_personal_key]
     for rule in rules:
         if rule.credential_type != "*" and rule.credential_type != cred_type:
             continue
@@ -1,26 +1,120 @@
+import asyncio
 import json
-from datetime import datetime, timezone
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, TypeVar
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Boolean, Text, DateTime,
-    ForeignKey, Index, Table, event, text, UniqueConstraint,
+    create_engine, Column, DDL, Integer, String, Boolean, Text, DateTime,
+    ForeignKey, Index, LargeBinary, Table, bindparam, event, inspect, select, text, UniqueConstraint,
 )
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 
+T = TypeVar("T")
+
 DB_PATH = "/data/cloudlab.db"
 DATABASE_URL = f"sqlite:///{DB_PATH}"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False, "timeout": 30})
+# Connection tuning. WAL with synchronous=NORMAL only fsyncs at checkpoints:
+# a power loss can drop the last commits but never corrupts the database.
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "30000"))
+DB_SYNCHRONOUS = os.environ.get("DB_SYNCHRONOUS", "NORMAL").upper()
+DB_CACHE_SIZE_KB = int(os.environ.get("DB_CACHE_SIZE_KB", "65536"))
+DB_MMAP_SIZE = int(os.environ.get("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_TEMP_STORE = os.environ.get("DB_TEMP_STORE", "MEMORY").upper()
+DB_READ_POOL_SIZE = int(os.environ.get("DB_READ_POOL_SIZE", "8"))
+
+if DB_SYNCHRONOUS not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+    raise ValueError(f"DB_SYNCHRONOUS must be OFF, NORMAL, FULL or EXTRA, not {DB_SYNCHRONOUS!r}")
+if DB_TEMP_STORE not in ("DEFAULT", "FILE", "MEMORY"):
+    raise ValueError(f"DB_TEMP_STORE must be DEFAULT, FILE or MEMORY, not {DB_TEMP_STORE!r}")
+
+
+def connection_pragmas(read_only: bool = False) -> list[str]:
+    """PRAGMAs run on every new connection."""
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}",
+        "PRAGMA foreign_keys=ON",
+        f"PRAGMA synchronous={DB_SYNCHRONOUS}",
+        f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={DB_MMAP_SIZE}",
+        f"PRAGMA temp_store={DB_TEMP_STORE}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
 
-# Enable WAL mode for better concurrent read performance
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
+
+def _apply_pragmas(dbapi_connection, read_only: bool):
     cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA journal_mode=WAL")
-    cursor.execute("PRAGMA busy_timeout=30000")
-    cursor.execute("PRAGMA foreign_keys=ON")
+    for pragma in connection_pragmas(read_only):
+        cursor.execute(pragma)
     cursor.close()
 
+
+engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False,
+                                                   "timeout": DB_BUSY_TIMEOUT_MS / 1000})
+
+# Readers get their own pool of query_only connections. Under WAL they read
+# a snapshot and never wait on a writer, so listing pages stays responsive
+# while a long write holds the lock.
+read_engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False,
+                                                        "timeout": DB_BUSY_TIMEOUT_MS / 1000},
+                            pool_size=DB_READ_POOL_SIZE, max_overflow=DB_READ_POOL_SIZE)
+
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    _apply_pragmas(dbapi_connection, read_only=False)
+
+
+@event.listens_for(read_engine, "connect")
+def set_read_only_pragma(dbapi_connection, connection_record):
+    _apply_pragmas(dbapi_connection, read_only=True)
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+class DBWriter:
+    """Runs database writes one at a time, in submission order, on one thread.
+
+    Background writers (health results, job persistence, buffered audit
+    entries) go through here instead of each taking the SQLite write lock
+    from their own thread, so they queue in memory rather than in
+    busy_timeout waits that can hold up request handlers.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._thread_id: int | None = None
+
+    def submit(self, fn: Callable[..., T], *args) -> Future:
+        return self._executor.submit(self._call, fn, *args)
+
+    def run(self, fn: Callable[..., T], *args) -> T:
+        """Run fn on the writer thread and wait for it (inline if already there)."""
+        if self.on_writer_thread():
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args) -> T:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def on_writer_thread(self) -> bool:
+        return threading.get_ident() == self._thread_id
+
+    def _call(self, fn, *args):
+        self._thread_id = threading.get_ident()
+        return fn(*args)
+
+
+db_writer = DBWriter()
+
 
 Base = declarative_base()
 
@@ -146,6 +240,7 @@ class MFABackupCode(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     code_hash = Column(String(255), nullable=False)  # bcrypt hash of the backup code
+    lookup = Column(String(32), nullable=True, index=True)  # truncated HMAC of the code; NULL for legacy rows
     is_used = Column(Boolean, default=False, nullable=False)
     used_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
@@ -174,6 +269,46 @@ class AuditLog(Base):
     ip_address = Column(String(45), nullable=True)
     created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False, index=True)
 
+    __table_args__ = (
+        # Common audit log filters, newest first within each
+        Index("ix_audit_log_action_created", "action", "created_at"),
+        Index("ix_audit_log_username_created", "username", "created_at"),
+        Index("ix_audit_log_user_created", "user_id", "created_at"),
+    )
+
+
+# Full-text index over audit entries (external content: the text lives only in
+# audit_log). Triggers keep it current, including bulk deletes.
+AUDIT_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS audit_fts USING fts5("
+    "action, resource, details, content = 'audit_log', content_rowid = 'id', "
+    "tokenize = \"unicode61 tokenchars '_'\")",
+    "CREATE TRIGGER IF NOT EXISTS audit_log_fts_insert AFTER INSERT ON audit_log BEGIN "
+    "INSERT INTO audit_fts (rowid, action, resource, details) "
+    "VALUES (new.id, new.action, new.resource, new.details); END",
+    "CREATE TRIGGER IF NOT EXISTS audit_log_fts_delete AFTER DELETE ON audit_log BEGIN "
+    "INSERT INTO audit_fts (audit_fts, rowid, action, resource, details) "
+    "VALUES ('delete', old.id, old.action, old.resource, old.details); END",
+    "CREATE TRIGGER IF NOT EXISTS audit_log_fts_update AFTER UPDATE ON audit_log BEGIN "
+    "INSERT INTO audit_fts (audit_fts, rowid, action, resource, details) "
+    "VALUES ('delete', old.id, old.action, old.resource, old.details); "
+    "INSERT INTO audit_fts (rowid, action, resource, details) "
+    "VALUES (new.id, new.action, new.resource, new.details); END",
+]
+for _ddl in AUDIT_FTS_DDL:
+    event.listen(AuditLog.__table__, "after_create", DDL(_ddl).execute_if(dialect="sqlite"))
+event.listen(AuditLog.__table__, "before_drop", DDL("DROP TABLE IF EXISTS audit_fts").execute_if(dialect="sqlite"))
+
+
+def _ensure_audit_fts(conn):
+    """Create and backfill audit_fts on databases that predate it."""
+    exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'audit_fts'")).first()
+    for ddl in AUDIT_FTS_DDL:
+        conn.execute(text(ddl))
+    if not exists:
+        conn.execute(text("INSERT INTO audit_fts (audit_fts) VALUES ('rebuild')"))
+    conn.commit()
+
 
 class ConfigVersion(Base):
     __tablename__ = "config_versions"
@@ -226,6 +361,16 @@ class AppMetadata(Base):
 
 class JobRecord(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index('ix_jobs_started_id', 'started_at', 'id'),
+        Index('ix_jobs_status_started', 'status', 'started_at'),
+        Index('ix_jobs_service_started', 'service', 'started_at'),
+        Index('ix_jobs_user_started', 'user_id', 'started_at'),
+        Index('ix_jobs_parent_job_id', 'parent_job_id'),
+        Index('ix_jobs_object_id', 'object_id'),
+        Index('ix_jobs_schedule_id', 'schedule_id'),
+        Index('ix_jobs_webhook_id', 'webhook_id'),
+    )
 
     id = Column(String(20), primary_key=True)
     service = Column(String(100), nullable=False)
@@ -244,6 +389,22 @@ class JobRecord(Base):
     inputs = Column(Text, nullable=True)  # JSON dict of original inputs
     parent_job_id = Column(String(20), ForeignKey("jobs.id", ondelete="SET NULL"), nullable=True)
     webhook_id = Column(Integer, ForeignKey("webhook_endpoints.id", ondelete="SET NULL"), nullable=True)
+    output_lines = Column(Integer, nullable=True)  # line count when output lives in job_output_chunks
+
+
+class JobOutputChunk(Base):
+    __tablename__ = "job_output_chunks"
+    __table_args__ = (
+        Index('ix_job_output_chunks_job_line', 'job_id', 'start_line'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(20), nullable=False)  # no FK: chunks are written before the job row exists
+    start_line = Column(Integer, nullable=False)
+    line_count = Column(Integer, nullable=False)
+    compressed = Column(Boolean, default=False, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # JSON array of lines, zlib-compressed when `compressed`
+    created_at = Column(DateTime(timezone=True), default=utcnow, nullable=False)
 
 
 class ScheduledJob(Base):
@@ -355,6 +516,9 @@ class InventoryObject(Base):
     type_id = Column(Integer, ForeignKey("inventory_types.id", ondelete="CASCADE"), nullable=False)
     data = Column(Text, nullable=False)  # JSON blob of field values
     search_text = Column(Text, nullable=True)  # denormalized searchable text
+    # sha256 of the record a sync adapter last wrote; lets the next sync skip
+    # unchanged objects. Cleared whenever data or search_text changes otherwise.
+    content_hash = Column(String(64), nullable=True)
     created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime(timezone=True), default=utcnow)
     updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
@@ -364,6 +528,284 @@ class InventoryObject(Base):
     acl_rules = relationship("ObjectACL", back_populates="object", cascade="all, delete-orphan")
 
 
+class InventoryObjectKey(Base):
+    """Indexed copy of selected InventoryObject.data fields, one row per value.
+
+    Maintained by the mapper events below; list fields (vultr_tags) get one
+    row per element. Queried through inventory_keys.py.
+    """
+    __tablename__ = "inventory_object_keys"
+
+    object_id = Column(Integer, ForeignKey("inventory_objects.id", ondelete="CASCADE"), primary_key=True)
+    field = Column(String(100), primary_key=True)
+    value = Column(String(255), primary_key=True)
+    type_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_inventory_object_keys_lookup", "type_id", "field", "value"),
+    )
+
+
+# Fields copied into inventory_object_keys. Type configs add more with
+# `indexed: true` (see inventory_keys.configure_key_fields).
+INVENTORY_KEY_FIELDS = {"hostname", "name", "username", "vultr_id", "vultr_tags", "job_id", "credential_type"}
+
+
+def inventory_object_keys(data) -> set[tuple[str, str]]:
+    """(field, value) pairs to index for an object's data (dict or JSON text)."""
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return set()
+    if not isinstance(data, dict):
+        return set()
+    keys = set()
+    for field in INVENTORY_KEY_FIELDS:
+        value = data.get(field)
+        for item in value if isinstance(value, list) else (value,):
+            if item is None or item == "" or isinstance(item, (dict, list)):
+                continue
+            keys.add((field, str(item)))
+    return keys
+
+
+def _write_object_keys(connection, obj: InventoryObject, replace: bool):
+    table = InventoryObjectKey.__table__
+    if replace:
+        connection.execute(table.delete().where(table.c.object_id == obj.id))
+    rows = [{"object_id": obj.id, "type_id": obj.type_id, "field": field, "value": value}
+            for field, value in inventory_object_keys(obj.data)]
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+class PersonalInstance(Base):
+    """Projection of personal-instance servers, one row per tagged object.
+
+    Ownership, service and TTL only exist as pi-* strings in a server's
+    vultr_tags; this table copies them out so quota checks, listings and TTL
+    cleanup are indexed queries. Maintained alongside inventory_object_keys
+    (mapper events and write_object_index); rebuilt by
+    inventory_keys.rebuild_personal_instances.
+    """
+    __tablename__ = "personal_instances"
+
+    object_id = Column(Integer, ForeignKey("inventory_objects.id", ondelete="CASCADE"), primary_key=True)
+    hostname = Column(String(255), nullable=False, index=True)
+    owner = Column(String(100), nullable=True, index=True)
+    service = Column(String(100), nullable=True, index=True)
+    ttl_hours = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)  # NULL: never expires
+
+
+PERSONAL_INSTANCE_TAG = "personal-instance"
+PI_USER_TAG_PREFIX = "pi-user:"
+PI_SERVICE_TAG_PREFIX = "pi-service:"
+PI_TTL_TAG_PREFIX = "pi-ttl:"
+
+
+def personal_instance_fields(data) -> dict | None:
+    """hostname, owner, service and ttl_hours of a personal instance's data (dict or JSON text).
+
+    None unless vultr_tags carries the personal-instance tag. When a prefix
+    appears more than once the last tag wins.
+    """
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return None
+    if not isinstance(data, dict):
+        return None
+    tags = data.get("vultr_tags")
+    if not isinstance(tags, list) or PERSONAL_INSTANCE_TAG not in tags:
+        return None
+    fields = {"hostname": str(data.get("hostname") or ""), "owner": None, "service": None, "ttl_hours": None}
+    for tag in tags:
+        if not isinstance(tag, str):
+            continue
+        if tag.startswith(PI_USER_TAG_PREFIX):
+            fields["owner"] = tag[len(PI_USER_TAG_PREFIX):]
+        elif tag.startswith(PI_SERVICE_TAG_PREFIX):
+            fields["service"] = tag[len(PI_SERVICE_TAG_PREFIX):]
+        elif tag.startswith(PI_TTL_TAG_PREFIX):
+            try:
+                fields["ttl_hours"] = int(tag[len(PI_TTL_TAG_PREFIX):])
+            except ValueError:
+                pass
+    return fields
+
+
+def personal_instance_row(object_id: int, data, created_at: datetime | None) -> dict | None:
+    """The personal_instances row for an object, or None if it isn't one."""
+    fields = personal_instance_fields(data)
+    if fields is None:
+        return None
+    if created_at is not None and created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    ttl = fields["ttl_hours"]
+    expires_at = created_at + timedelta(hours=ttl) if created_at is not None and ttl else None
+    return {"object_id": object_id, **fields, "created_at": created_at, "expires_at": expires_at}
+
+
+def _write_personal_instance(connection, obj: InventoryObject, replace: bool):
+    table = PersonalInstance.__table__
+    if replace:
+        connection.execute(table.delete().where(table.c.object_id == obj.id))
+    row = personal_instance_row(obj.id, obj.data, obj.created_at)
+    if row:
+        connection.execute(table.insert(), row)
+
+
+# Full-text index over inventory objects (queried through inventory_search.py).
+# rowid is the object id; `body` holds search_text, `fields` holds one
+# "<field>__<token>" term per token of each INVENTORY_SEARCH_FIELDS value so
+# that field-scoped queries (hostname:web*) are plain prefix lookups.
+INVENTORY_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts USING fts5("
+    "body, fields, tokenize = \"unicode61 tokenchars '_'\", prefix = '2 3')"
+)
+event.listen(InventoryObject.__table__, "after_create", DDL(INVENTORY_FTS_DDL).execute_if(dialect="sqlite"))
+event.listen(InventoryObject.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS inventory_fts").execute_if(dialect="sqlite"))
+
+# Fields searchable with `field:term`. Type configs add their `searchable: true`
+# fields (see inventory_search.configure_search_fields).
+INVENTORY_SEARCH_FIELDS = {
+    "hostname", "name", "username", "display_name", "email", "ip_address",
+    "region", "vultr_id", "vultr_label", "vultr_tags", "service_name", "status",
+}
+
+_SEARCH_TOKEN = re.compile(r"\w+")
+
+
+def search_tokens(value: str) -> list[str]:
+    """Split text the way the inventory_fts tokenizer does (word characters and _)."""
+    return _SEARCH_TOKEN.findall(value.lower())
+
+
+def inventory_search_fields(data) -> str:
+    """The `fields` column for an object's data (dict or JSON text)."""
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return ""
+    if not isinstance(data, dict):
+        return ""
+    terms = []
+    for field in sorted(INVENTORY_SEARCH_FIELDS):
+        value = data.get(field)
+        for item in value if isinstance(value, list) else (value,):
+            if item is None or isinstance(item, (dict, list)):
+                continue
+            terms.extend(f"{field.lower()}__{token}" for token in search_tokens(str(item)))
+    return " ".join(terms)
+
+
+def _write_object_search(connection, obj: InventoryObject, replace: bool):
+    if replace:
+        connection.execute(text("DELETE FROM inventory_fts WHERE rowid = :id"), {"id": obj.id})
+    connection.execute(
+        text("INSERT INTO inventory_fts (rowid, body, fields) VALUES (:id, :body, :fields)"),
+        {"id": obj.id, "body": obj.search_text or "", "fields": inventory_search_fields(obj.data)},
+    )
+
+
+@event.listens_for(InventoryObject, "after_insert")
+def _index_object_on_insert(mapper, connection, target):
+    _write_object_keys(connection, target, replace=False)
+    _write_object_search(connection, target, replace=False)
+    _write_personal_instance(connection, target, replace=False)
+
+
+@event.listens_for(InventoryObject, "before_update")
+def _clear_content_hash(mapper, connection, target):
+    attrs = inspect(target).attrs
+    changed = attrs.data.history.has_changes() or attrs.search_text.history.has_changes()
+    if changed and not attrs.content_hash.history.has_changes():
+        target.content_hash = None
+
+
+@event.listens_for(InventoryObject, "after_update")
+def _index_object_on_update(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if attrs.data.history.has_changes() or attrs.type_id.history.has_changes():
+        _write_object_keys(connection, target, replace=True)
+    if attrs.data.history.has_changes() or attrs.search_text.history.has_changes():
+        _write_object_search(connection, target, replace=True)
+    # Extending a personal instance's TTL resets created_at
+    if attrs.data.history.has_changes() or attrs.created_at.history.has_changes():
+        _write_personal_instance(connection, target, replace=True)
+
+
+@event.listens_for(InventoryObject, "after_delete")
+def _index_object_on_delete(mapper, connection, target):
+    # The FK cascade covers this too, but only while PRAGMA foreign_keys is on
+    for table in (InventoryObjectKey.__table__, PersonalInstance.__table__):
+        connection.execute(table.delete().where(table.c.object_id == target.id))
+    connection.execute(text("DELETE FROM inventory_fts WHERE rowid = :id"), {"id": target.id})
+
+
+# Bulk writes (inventory_upsert.py) use Core statements, which skip the mapper
+# events above; these do the same index maintenance for many objects at once
+INDEX_BATCH = 500
+
+
+def write_object_index(connection, rows: list[dict], replace: bool):
+    """Index objects written without the ORM.
+
+    Each row holds the object's id, type_id, data (dict or JSON text) and
+    search_text.
+    """
+    if not rows:
+        return
+    if replace:
+        remove_object_index(connection, [row["id"] for row in rows])
+    key_rows = [{"object_id": row["id"], "type_id": row["type_id"], "field": field, "value": value}
+                for row in rows for field, value in inventory_object_keys(row["data"])]
+    if key_rows:
+        connection.execute(InventoryObjectKey.__table__.insert(), key_rows)
+    connection.execute(
+        text("INSERT INTO inventory_fts (rowid, body, fields) VALUES (:id, :body, :fields)"),
+        [{"id": row["id"], "body": row["search_text"] or "", "fields": inventory_search_fields(row["data"])}
+         for row in rows],
+    )
+    _write_personal_instances(connection, rows)
+
+
+def _write_personal_instances(connection, rows: list[dict]):
+    # The bulk writer doesn't carry created_at, so it's looked up for the
+    # (few) personal instances among the rows
+    instances = {row["id"]: row["data"] for row in rows if personal_instance_fields(row["data"]) is not None}
+    if not instances:
+        return
+    table = InventoryObject.__table__
+    ids = list(instances)
+    created = {}
+    for start in range(0, len(ids), INDEX_BATCH):
+        chunk = ids[start:start + INDEX_BATCH]
+        created.update(connection.execute(
+            select(table.c.id, table.c.created_at).where(table.c.id.in_(chunk))).all())
+    connection.execute(PersonalInstance.__table__.insert(), [
+        personal_instance_row(object_id, data, created.get(object_id))
+        for object_id, data in instances.items()])
+
+
+def remove_object_index(connection, object_ids: list[int]):
+    table = InventoryObjectKey.__table__
+    projection = PersonalInstance.__table__
+    delete_fts = text("DELETE FROM inventory_fts WHERE rowid IN :ids").bindparams(
+        bindparam("ids", expanding=True))
+    for start in range(0, len(object_ids), INDEX_BATCH):
+        chunk = object_ids[start:start + INDEX_BATCH]
+        connection.execute(table.delete().where(table.c.object_id.in_(chunk)))
+        connection.execute(projection.delete().where(projection.c.object_id.in_(chunk)))
+        connection.execute(delete_fts, {"ids": chunk})
+
+
 class InventoryTag(Base):
     __tablename__ = "inventory_tags"
 
@@ -636,6 +1078,23 @@ def create_tables():
         "ALTER TABLE notification_rules ADD COLUMN is_default BOOLEAN NOT NULL DEFAULT 0",
         "ALTER TABLE users ADD COLUMN personal_ssh_public_key TEXT",
         "ALTER TABLE users ADD COLUMN storage_quota_mb INTEGER NOT NULL DEFAULT 500",
+        # Indexes for keyset-paginated job listing (create_all skips existing tables)
+        "CREATE INDEX IF NOT EXISTS ix_jobs_started_id ON jobs (started_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_status_started ON jobs (status, started_at)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_service_started ON jobs (service, started_at)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_user_started ON jobs (user_id, started_at)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_parent_job_id ON jobs (parent_job_id)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_object_id ON jobs (object_id)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_schedule_id ON jobs (schedule_id)",
+        "CREATE INDEX IF NOT EXISTS ix_jobs_webhook_id ON jobs (webhook_id)",
+        "ALTER TABLE jobs ADD COLUMN output_lines INTEGER",
+        "ALTER TABLE mfa_backup_codes ADD COLUMN lookup VARCHAR(32)",
+        "CREATE INDEX IF NOT EXISTS ix_mfa_backup_codes_lookup ON mfa_backup_codes (lookup)",
+        INVENTORY_FTS_DDL,
+        "CREATE INDEX IF NOT EXISTS ix_audit_log_action_created ON audit_log (action, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_audit_log_username_created ON audit_log (username, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_audit_log_user_created ON audit_log (user_id, created_at)",
+        "ALTER TABLE inventory_objects ADD COLUMN content_hash VARCHAR(64)",
     ]
     with engine.connect() as conn:
         for sql in migrations:
@@ -644,3 +1103,4 @@ def create_tables():
                 conn.commit()
             except Exception:
                 conn.rollback()
+        _ensure_audit_fts(conn)
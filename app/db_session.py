@@ -1,4 +1,14 @@
-from database import SessionLocal
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from database import ReadSessionLocal, SessionLocal
+
+# Threads that run database work for async handlers (AsyncDBSession)
+DB_ASYNC_WORKERS = int(os.environ.get("DB_ASYNC_WORKERS", "8"))
+
+_db_pool = ThreadPoolExecutor(max_workers=DB_ASYNC_WORKERS, thread_name_prefix="db-async")
 
 
 def get_db_session():
@@ -11,3 +21,78 @@ def get_db_session():
         raise
     finally:
         session.close()
+
+
+def get_read_session():
+    """Session on the query_only read pool, for endpoints that never write."""
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+class AsyncDBSession:
+    """Awaitable database access for async handlers.
+
+    The ORM session lives on the db-async pool: `await db.run_sync(fn, ...)`
+    calls fn(session, ...) there, so queries never block the event loop that
+    also serves SSE streams and WebSockets. The API mirrors SQLAlchemy's
+    AsyncSession.run_sync(). Calls are awaited one at a time, so the session
+    is never used by two threads at once.
+    """
+
+    def __init__(self, factory, commit: bool):
+        self._factory = factory
+        self._commit = commit
+        self._session = None
+
+    async def run_sync(self, fn, *args):
+        return await self._run(self._call, fn, *args)
+
+    @staticmethod
+    async def _run(fn, *args):
+        # run_in_executor doesn't carry contextvars (per-request DB stats in
+        # metrics.py) to the worker; copy them in as asyncio.to_thread does
+        ctx = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(_db_pool, ctx.run, fn, *args)
+
+    def _call(self, fn, *args):
+        if self._session is None:
+            self._session = self._factory()
+        return fn(self._session, *args)
+
+    def _finish(self, failed: bool):
+        session = self._session
+        if session is None:
+            return
+        try:
+            if failed:
+                session.rollback()
+            elif self._commit:
+                session.commit()
+        finally:
+            session.close()
+
+    async def close(self, failed: bool = False):
+        await self._run(self._finish, failed)
+
+
+async def get_async_db_session():
+    """Async counterpart of get_db_session: commits on success, rolls back on error."""
+    db = AsyncDBSession(SessionLocal, commit=True)
+    try:
+        yield db
+    except Exception:
+        await db.close(failed=True)
+        raise
+    await db.close()
+
+
+async def get_async_read_session():
+    """Async counterpart of get_read_session, on the query_only read pool."""
+    db = AsyncDBSession(ReadSessionLocal, commit=False)
+    try:
+        yield db
+    finally:
+        await db.close()
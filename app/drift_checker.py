@@ -9,6 +9,7 @@ from datetime import datetime, timezone, timedelta
 from html import escape as html_escape
 
 from database import SessionLocal, DriftReport, AppMetadata
+from metrics import poller_tick
 
 logger = logging.getLogger("drift_checker")
 
@@ -331,7 +332,7 @@ class DriftPoller:
         if self._task is not None:
             return
         self._running = True
-        self._task = asyncio.create_task(self._loop())
+        self._task = asyncio.create_task(self._loop(), name="drift-poller")
         logger.info("Drift poller started (interval=%ds)", self._check_interval)
 
     async def stop(self):
@@ -350,13 +351,14 @@ class DriftPoller:
         if _check_in_progress:
             logger.info("Drift check already in progress, skipping manual trigger")
             return
-        asyncio.create_task(run_drift_check("manual"))
+        asyncio.create_task(run_drift_check("manual"), name="drift-check")
 
     async def _loop(self):
         """Main loop — runs drift check every _check_interval seconds."""
         while self._running:
             try:
-                await run_drift_check("poller")
+                with poller_tick("drift"):
+                    await run_drift_check("poller")
             except Exception:
                 logger.exception("Drift poller tick error")
 
@@ -11,7 +11,8 @@ from datetime import datetime, timezone, timedelta
 
 import httpx
 
-from database import SessionLocal, HealthCheckResult, AppMetadata
+from database import SessionLocal, HealthCheckResult, AppMetadata, db_writer
+from metrics import poller_tick
 
 logger = logging.getLogger("health_checker")
 
@@ -211,6 +212,41 @@ async def _check_ssh_command(host: str, key_path: str, command: str,
         }
 
 
+def _store_result_blocking(service_name: str, check_name: str, check_type: str,
+                           target: str, result: dict) -> str:
+    """Insert a check result (on the DB writer thread); returns the previous status."""
+    session = SessionLocal()
+    try:
+        # Get previous status for transition detection
+        prev = (
+            session.query(HealthCheckResult)
+            .filter_by(service_name=service_name, check_name=check_name)
+            .order_by(HealthCheckResult.checked_at.desc())
+            .first()
+        )
+        previous_status = prev.status if prev else "unknown"
+
+        record = HealthCheckResult(
+            service_name=service_name,
+            check_name=check_name,
+            status=result.get("status", "unknown"),
+            previous_status=previous_status,
+            response_time_ms=result.get("response_time_ms"),
+            status_code=result.get("status_code"),
+            error_message=result.get("error_message"),
+            check_type=check_type,
+            target=target,
+        )
+        session.add(record)
+        session.commit()
+        return previous_status
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
 # ---------------------------------------------------------------------------
 # HealthPoller — background asyncio loop
 # ---------------------------------------------------------------------------
@@ -230,7 +266,7 @@ class HealthPoller:
         if self._task is not None:
             return
         self._running = True
-        self._task = asyncio.create_task(self._loop())
+        self._task = asyncio.create_task(self._loop(), name="health-poller")
         logger.info("Health poller started")
 
     async def stop(self):
@@ -253,7 +289,8 @@ class HealthPoller:
         """Main loop — checks every 15 seconds which services are due."""
         while self._running:
             try:
-                await self._tick()
+                with poller_tick("health"):
+                    await self._tick()
             except Exception:
                 logger.exception("Health poller tick error")
 
@@ -454,66 +491,42 @@ class HealthPoller:
                              check_type: str, target: str, result: dict,
                              service_config: dict):
         """Store health check result in the database and handle state transitions."""
-        session = SessionLocal()
         try:
-            # Get previous status for transition detection
-            prev = (
-                session.query(HealthCheckResult)
-                .filter_by(service_name=service_name, check_name=check_name)
-                .order_by(HealthCheckResult.checked_at.desc())
-                .first()
-            )
-            previous_status = prev.status if prev else "unknown"
-
-            record = HealthCheckResult(
-                service_name=service_name,
-                check_name=check_name,
-                status=result.get("status", "unknown"),
-                previous_status=previous_status,
-                response_time_ms=result.get("response_time_ms"),
-                status_code=result.get("status_code"),
-                error_message=result.get("error_message"),
-                check_type=check_type,
-                target=target,
+            previous_status = await db_writer.run_async(
+                _store_result_blocking, service_name, check_name, check_type, target, result)
+        except Exception:
+            logger.exception("Failed to store health check result for %s/%s", service_name, check_name)
+            return
+
+        # Check for state transition (healthy -> unhealthy or vice versa)
+        current_status = result.get("status", "unknown")
+        if previous_status != current_status and previous_status != "unknown":
+            logger.info(
+                "Health state transition: %s/%s %s -> %s",
+                service_name, check_name, previous_status, current_status,
             )
-            session.add(record)
-            session.commit()
+            await self._maybe_notify(service_name, check_name, previous_status,
+                                      current_status, result, service_config)
 
-            # Check for state transition (healthy -> unhealthy or vice versa)
-            current_status = result.get("status", "unknown")
-            if previous_status != current_status and previous_status != "unknown":
-                logger.info(
-                    "Health state transition: %s/%s %s -> %s",
-                    service_name, check_name, previous_status, current_status,
-                )
-                await self._maybe_notify(service_name, check_name, previous_status,
-                                          current_status, result, service_config)
-
-                # Also fire through the notification system
-                from notification_service import notify, EVENT_HEALTH_STATE_CHANGE
-
-                direction = "recovered" if current_status == "healthy" else "down"
-                severity = "success" if current_status == "healthy" else "error"
-
-                try:
-                    await notify(EVENT_HEALTH_STATE_CHANGE, {
-                        "title": f"Health {direction}: {service_name}/{check_name}",
-                        "body": f"{service_name}/{check_name} changed from {previous_status} to {current_status}.",
-                        "severity": severity,
-                        "action_url": "/health",
-                        "service_name": service_name,
-                        "check_name": check_name,
-                        "old_status": previous_status,
-                        "new_status": current_status,
-                    })
-                except Exception as e:
-                    logger.exception("Failed to dispatch health notification for %s/%s", service_name, check_name)
+            # Also fire through the notification system
+            from notification_service import notify, EVENT_HEALTH_STATE_CHANGE
 
-        except Exception:
-            session.rollback()
-            logger.exception("Failed to store health check result for %s/%s", service_name, check_name)
-        finally:
-            session.close()
+            direction = "recovered" if current_status == "healthy" else "down"
+            severity = "success" if current_status == "healthy" else "error"
+
+            try:
+                await notify(EVENT_HEALTH_STATE_CHANGE, {
+                    "title": f"Health {direction}: {service_name}/{check_name}",
+                    "body": f"{service_name}/{check_name} changed from {previous_status} to {current_status}.",
+                    "severity": severity,
+                    "action_url": "/health",
+                    "service_name": service_name,
+                    "check_name": check_name,
+                    "old_status": previous_status,
+                    "new_status": current_status,
+                })
+            except Exception as e:
+                logger.exception("Failed to dispatch health notification for %s/%s", service_name, check_name)
 
     async def _maybe_notify(self, service_name: str, check_name: str,
                              old_status: str, new_status: str,
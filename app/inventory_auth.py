@@ -6,13 +6,16 @@
 5. Role-based type permissions
 """
 
+import json
+
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from database import (
-    InventoryObject, InventoryType, ObjectACL, TagPermission,
-    object_tags, User,
-)
-from permissions import get_user_permissions
+from database import InventoryObject, InventoryType, object_tags, User
+from permissions import get_authz_snapshot, get_user_permissions
+
+
+# Map inventory action names to service permission suffixes
+_SERVICE_ACTION_PERM_MAP = {"run_script": "deploy", "destroy": "stop"}
 
 
 def check_inventory_permission(session: Session, user: User, object_id: int,
@@ -20,80 +23,90 @@ def check_inventory_permission(session: Session, user: User, object_id: int,
     """Check if user has permission on a specific inventory object.
     permission_suffix is like 'view', 'edit', 'deploy', etc.
     """
-    perms = get_user_permissions(session, user.id)
+    return check_inventory_permissions(session, user, [object_id], permission_suffix)[object_id]
+
+
+def check_inventory_permissions(session: Session, user: User, object_ids,
+                                 permission_suffix: str) -> dict[int, bool]:
+    """Batch form of check_inventory_permission: {object_id: allowed}.
+
+    Evaluates the same layers in the same order. ACL and tag rules come from
+    the user's authz snapshot; the objects and their tags are loaded with one
+    query each, so the number of queries does not grow with the page or bulk
+    selection size. Unknown IDs map to False (unless the user has the wildcard).
+    """
+    ids = list(dict.fromkeys(object_ids))
+    snapshot = get_authz_snapshot(session, user.id)
+    perms = snapshot.permissions
 
     # 1. Wildcard — super-admin
     if "*" in perms:
-        return True
-
-    # Load the object to get its type
-    obj = session.query(InventoryObject).filter_by(id=object_id).first()
-    if not obj:
-        return False
-
-    inv_type = session.query(InventoryType).filter_by(id=obj.type_id).first()
-    if not inv_type:
-        return False
-
-    type_slug = inv_type.slug
-    full_perm = f"inventory.{type_slug}.{permission_suffix}"
-
-    # Get user's role IDs
-    role_ids = [r.id for r in user.roles]
-    if not role_ids:
-        return full_perm in perms
-
-    # 2. Per-object ACL deny
-    deny_rules = session.query(ObjectACL).filter(
-        ObjectACL.object_id == object_id,
-        ObjectACL.role_id.in_(role_ids),
-        ObjectACL.permission == permission_suffix,
-        ObjectACL.effect == "deny",
-    ).first()
-    if deny_rules:
-        return False
-
-    # 3. Per-object ACL allow
-    allow_rules = session.query(ObjectACL).filter(
-        ObjectACL.object_id == object_id,
-        ObjectACL.role_id.in_(role_ids),
-        ObjectACL.permission == permission_suffix,
-        ObjectACL.effect == "allow",
-    ).first()
-    if allow_rules:
-        return True
+        return {oid: True for oid in ids}
+
+    result = {oid: False for oid in ids}
+    if not ids:
+        return result
+
+    # Load objects and their type slugs
+    rows = session.query(InventoryObject.id, InventoryObject.type_id, InventoryObject.data).filter(
+        InventoryObject.id.in_(ids)
+    ).all()
+    type_ids = {type_id for _, type_id, _ in rows}
+    slugs = dict(session.query(InventoryType.id, InventoryType.slug).filter(
+        InventoryType.id.in_(type_ids)
+    ).all()) if type_ids else {}
+    objects = {oid: (slugs[type_id], data) for oid, type_id, data in rows if type_id in slugs}
+    if not objects:
+        return result
+
+    if not snapshot.role_ids:
+        for oid, (slug, _) in objects.items():
+            result[oid] = f"inventory.{slug}.{permission_suffix}" in perms
+        return result
+
+    # 2/3. Per-object ACL deny and allow
+    denied = snapshot.object_deny.get(permission_suffix, frozenset())
+    allowed = snapshot.object_allow.get(permission_suffix, frozenset())
 
     # 4. Tag-based permissions
-    tag_ids = [row[0] for row in session.query(object_tags.c.tag_id).filter(
-        object_tags.c.object_id == object_id
-    ).all()]
-    if tag_ids:
-        tag_perm = session.query(TagPermission).filter(
-            TagPermission.tag_id.in_(tag_ids),
-            TagPermission.role_id.in_(role_ids),
-            TagPermission.permission == permission_suffix,
-        ).first()
-        if tag_perm:
-            return True
-
-    # 5. For service objects, delegate to ServiceACL-aware check
-    if type_slug == "service":
-        import json
-        from service_auth import check_service_permission
-        try:
-            data = json.loads(obj.data) if isinstance(obj.data, str) else obj.data
-            service_name = data.get("name", "")
-        except (json.JSONDecodeError, AttributeError):
-            service_name = ""
+    granted_tags = snapshot.tag_grants.get(permission_suffix)
+    tag_allowed = {row[0] for row in session.query(object_tags.c.object_id).filter(
+        object_tags.c.object_id.in_(objects.keys()),
+        object_tags.c.tag_id.in_(granted_tags),
+    ).distinct()} if granted_tags else set()
+
+    # Service objects left undecided by the layers above go to ServiceACL
+    pending_services: dict[int, str] = {}
+    for oid, (slug, data) in objects.items():
+        if oid in denied:
+            continue
+        if oid in allowed or oid in tag_allowed:
+            result[oid] = True
+            continue
+        service_name = _service_name(data) if slug == "service" else ""
         if service_name:
-            # Map inventory action names to service permission suffixes
-            svc_perm = {"run_script": "deploy", "destroy": "stop"}.get(
-                permission_suffix, permission_suffix
-            )
-            return check_service_permission(session, user, service_name, svc_perm)
-
-    # 6. Role-based type permissions (non-service types)
-    return full_perm in perms
+            pending_services[oid] = service_name
+        else:
+            # 6. Role-based type permissions (non-service types)
+            result[oid] = f"inventory.{slug}.{permission_suffix}" in perms
+
+    # 5. For service objects, delegate to the ServiceACL-aware check
+    if pending_services:
+        from service_auth import check_service_permissions
+        svc_perm = _SERVICE_ACTION_PERM_MAP.get(permission_suffix, permission_suffix)
+        svc_allowed = check_service_permissions(session, user, pending_services.values(), svc_perm)
+        for oid, service_name in pending_services.items():
+            result[oid] = svc_allowed[service_name]
+
+    return result
+
+
+def _service_name(data) -> str:
+    try:
+        data = json.loads(data) if isinstance(data, str) else data
+        return data.get("name", "") or ""
+    except (json.JSONDecodeError, AttributeError):
+        return ""
 
 
 _LEGACY_SERVICE_PERM_MAP = {
@@ -0,0 +1,117 @@
+"""Indexed point lookups on inventory object fields.
+
+InventoryObject.data is a JSON blob, so finding a server by hostname used to
+mean loading and parsing every object of the type. The fields listed in
+database.INVENTORY_KEY_FIELDS are copied into inventory_object_keys on every
+write, and the helpers here turn "data[field] == value" (or "value in
+data[field]" for lists such as vultr_tags) into an indexed subquery.
+
+The personal_instances projection (owner, service and TTL parsed out of a
+server's pi-* tags) is maintained the same way; it is rebuilt here too.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import (
+    INVENTORY_KEY_FIELDS, PERSONAL_INSTANCE_TAG, AppMetadata, InventoryObject, InventoryObjectKey,
+    PersonalInstance, inventory_object_keys, personal_instance_row,
+)
+
+KEY_FIELDS_META = "inventory_key_fields"
+# Bump when personal_instance_row changes so ensure_personal_instances rebuilds
+PERSONAL_INSTANCES_META = "personal_instances_version"
+PERSONAL_INSTANCES_VERSION = 1
+REBUILD_BATCH = 500
+
+
+def configure_key_fields(type_configs: list[dict]) -> list[str]:
+    """Add fields marked `indexed: true` in type configs to the indexed set."""
+    for config in type_configs or []:
+        for field in config.get("fields", []):
+            if field.get("indexed") and field.get("type") != "secret":
+                INVENTORY_KEY_FIELDS.add(field["name"])
+    return sorted(INVENTORY_KEY_FIELDS)
+
+
+def is_indexed(field: str) -> bool:
+    return field in INVENTORY_KEY_FIELDS
+
+
+def key_filter(type_id: int, field: str, value):
+    """Filter clause matching objects of a type whose data[field] equals or contains value."""
+    if field not in INVENTORY_KEY_FIELDS:
+        raise ValueError(f"Inventory field '{field}' is not indexed")
+    ids = select(InventoryObjectKey.object_id).where(
+        InventoryObjectKey.type_id == type_id,
+        InventoryObjectKey.field == field,
+        InventoryObjectKey.value == str(value),
+    )
+    return InventoryObject.id.in_(ids)
+
+
+def objects_with_key(session: Session, type_id: int, field: str, value):
+    """Query for objects of a type whose data[field] equals or contains value."""
+    return (
+        session.query(InventoryObject)
+        .filter(InventoryObject.type_id == type_id)
+        .filter(key_filter(type_id, field, value))
+    )
+
+
+def rebuild_object_keys(session: Session) -> int:
+    """Recompute inventory_object_keys for every object. Returns rows written."""
+    table = InventoryObjectKey.__table__
+    session.flush()
+    objects = session.query(InventoryObject.id, InventoryObject.type_id, InventoryObject.data).all()
+    rows = [{"object_id": object_id, "type_id": type_id, "field": field, "value": value}
+            for object_id, type_id, data in objects
+            for field, value in inventory_object_keys(data)]
+    session.execute(table.delete())
+    for start in range(0, len(rows), REBUILD_BATCH):
+        session.execute(table.insert(), rows[start:start + REBUILD_BATCH])
+    session.flush()
+    return len(rows)
+
+
+def ensure_object_keys(session: Session) -> bool:
+    """Rebuild the key table if the indexed field set changed since the last build.
+
+    Covers the first start after this table was added and type configs that
+    gain `indexed: true` fields. Returns True if a rebuild ran.
+    """
+    fields = sorted(INVENTORY_KEY_FIELDS)
+    if AppMetadata.get(session, KEY_FIELDS_META) == fields:
+        return False
+    rebuild_object_keys(session)
+    AppMetadata.set(session, KEY_FIELDS_META, fields)
+    return True
+
+
+def rebuild_personal_instances(session: Session) -> int:
+    """Recompute the personal_instances projection from every object. Returns rows written."""
+    table = PersonalInstance.__table__
+    session.flush()
+    objects = session.query(InventoryObject.id, InventoryObject.data, InventoryObject.created_at).filter(
+        InventoryObject.id.in_(select(InventoryObjectKey.object_id).where(
+            InventoryObjectKey.field == "vultr_tags", InventoryObjectKey.value == PERSONAL_INSTANCE_TAG)))
+    rows = [row for object_id, data, created_at in objects
+            if (row := personal_instance_row(object_id, data, created_at)) is not None]
+    session.execute(table.delete())
+    for start in range(0, len(rows), REBUILD_BATCH):
+        session.execute(table.insert(), rows[start:start + REBUILD_BATCH])
+    session.flush()
+    return len(rows)
+
+
+def ensure_personal_instances(session: Session) -> bool:
+    """Build the personal_instances projection on the first start after it was added.
+
+    Returns True if a rebuild ran. Run it after ensure_object_keys, whose
+    vultr_tags rows it uses to find candidate objects.
+    """
+    if AppMetadata.get(session, PERSONAL_INSTANCES_META) == PERSONAL_INSTANCES_VERSION:
+        return False
+    rebuild_personal_instances(session)
+    AppMetadata.set(session, PERSONAL_INSTANCES_META, PERSONAL_INSTANCES_VERSION)
+    return True
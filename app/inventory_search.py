@@ -0,0 +1,135 @@
+"""Full-text search over inventory objects using SQLite FTS5.
+
+The inventory_fts table is kept in step with inventory_objects by the mapper
+events in database.py. This module turns a user's search box input into an
+FTS5 MATCH expression and builds the ranked subquery that list_objects joins
+against.
+
+Query syntax:
+    web              words are prefix matches ("web" finds "web01")
+    "web server"     quoted phrases match exactly, in order
+    hostname:web*    field-scoped; the field must be in INVENTORY_SEARCH_FIELDS
+    region:"new york"
+Multiple terms must all match. Results are ordered by BM25 relevance.
+"""
+
+import html
+import re
+
+from sqlalchemy import literal_column, select, text
+from sqlalchemy.orm import Session
+
+from database import (
+    INVENTORY_SEARCH_FIELDS, AppMetadata, InventoryObject, inventory_search_fields, search_tokens,
+)
+
+SEARCH_FIELDS_META = "inventory_search_fields"
+REBUILD_BATCH = 500
+
+# bm25 column weights: a hit in the field-tagged column (an exact field
+# match) outranks the same word somewhere in search_text
+BODY_WEIGHT = 1.0
+FIELDS_WEIGHT = 2.0
+SNIPPET_TOKENS = 12
+
+# Control characters can't appear in search_text, so they mark highlights
+# safely until the snippet is HTML-escaped
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+_QUERY_TERM = re.compile(r'(?:(\w+):)?(?:"([^"]*)"?|(\S+))')
+_FIELD_NAME = re.compile(r"^\w+$")
+
+
+def configure_search_fields(type_configs: list[dict]) -> list[str]:
+    """Add `searchable: true` fields from type configs to the field-scoped set."""
+    for config in type_configs or []:
+        for field in config.get("fields", []):
+            name = field.get("name", "")
+            if field.get("searchable") and field.get("type") != "secret" and _FIELD_NAME.match(name):
+                INVENTORY_SEARCH_FIELDS.add(name)
+    return sorted(INVENTORY_SEARCH_FIELDS)
+
+
+def _phrase(column: str, tokens: list[str], prefix: bool) -> str:
+    # Tokens are \w+ only, so they can be quoted without escaping
+    return f'{column} : "{" ".join(tokens)}"' + ("*" if prefix else "")
+
+
+def build_match(query: str) -> str | None:
+    """Translate search box input into an FTS5 MATCH expression.
+
+    Returns None when the input has nothing searchable in it.
+    """
+    search_fields = {f.lower() for f in INVENTORY_SEARCH_FIELDS}
+    clauses = []
+    for m in _QUERY_TERM.finditer(query):
+        field, phrase, word = m.groups()
+        prefix = phrase is None
+        value = word if prefix else phrase
+        if field and field.lower() in search_fields:
+            tokens = search_tokens(value)
+            if not tokens:
+                continue
+            scoped = _phrase("fields", [f"{field.lower()}__{t}" for t in tokens], prefix)
+            # The OR is always true given the scoped phrase; it only puts the
+            # plain words in the query so snippet() highlights them in body
+            clauses.append(f"{scoped} AND ({_phrase('body', tokens, prefix)} OR {scoped})")
+        else:
+            # No field, or not a searchable one ("10.0.0.1:22"): search it all
+            tokens = search_tokens(m.group(0))
+            if tokens:
+                clauses.append(_phrase("body", tokens, prefix))
+    return " AND ".join(clauses) or None
+
+
+def search_matches(match: str):
+    """Subquery of (object_id, rank, snippet) for an FTS5 MATCH expression.
+
+    Lower rank is better.
+    """
+    return (
+        select(
+            literal_column("inventory_fts.rowid").label("object_id"),
+            literal_column(f"bm25(inventory_fts, {BODY_WEIGHT}, {FIELDS_WEIGHT})").label("rank"),
+            literal_column(
+                f"snippet(inventory_fts, 0, '{_MARK_START}', '{_MARK_END}', '…', {SNIPPET_TOKENS})"
+            ).label("snippet"),
+        )
+        .select_from(text("inventory_fts"))
+        .where(text("inventory_fts MATCH :match").bindparams(match=match))
+        .subquery("matches")
+    )
+
+
+def highlight_html(snippet: str | None) -> str:
+    """HTML-escape a snippet and wrap matched words in <mark>."""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def rebuild_search_index(session: Session) -> int:
+    """Repopulate inventory_fts from every object. Returns objects indexed."""
+    session.flush()
+    objects = session.query(InventoryObject.id, InventoryObject.search_text, InventoryObject.data).all()
+    rows = [{"id": object_id, "body": search_text or "", "fields": inventory_search_fields(data)}
+            for object_id, search_text, data in objects]
+    session.execute(text("DELETE FROM inventory_fts"))
+    insert = text("INSERT INTO inventory_fts (rowid, body, fields) VALUES (:id, :body, :fields)")
+    for start in range(0, len(rows), REBUILD_BATCH):
+        session.execute(insert, rows[start:start + REBUILD_BATCH])
+    session.flush()
+    return len(rows)
+
+
+def ensure_search_index(session: Session) -> bool:
+    """Rebuild inventory_fts if the field-scoped set changed since the last build.
+
+    Also covers the first start after the table was added. Returns True if a
+    rebuild ran.
+    """
+    fields = sorted(INVENTORY_SEARCH_FIELDS)
+    if AppMetadata.get(session, SEARCH_FIELDS_META) == fields:
+        return False
+    rebuild_search_index(session)
+    AppMetadata.set(session, SEARCH_FIELDS_META, fields)
+    return True
@@ -1,14 +1,88 @@
 """Sync adapters that populate inventory from external sources."""
 
+import hashlib
 import json
 import os
+import time
+from datetime import datetime, timezone
+
 import yaml
 from sqlalchemy.orm import Session
-from database import InventoryType, InventoryObject, InventoryTag, AppMetadata, User, JobRecord, SessionLocal
+from database import (
+    INDEX_BATCH, InventoryType, InventoryObject, InventoryTag, AppMetadata, User, JobRecord, SessionLocal,
+)
+from inventory_upsert import (
+    TagCache, TypeIndex, UpsertRecord, UpsertResult, delete_objects, field_key, upsert_objects,
+)
 
 SERVICES_DIR = "/app/cloudlab/services"
 INVENTORY_FILE = "/inventory/vultr.yml"
 
+ROOT_PASSWORD_SUFFIX = " — Root Password"
+INSTANCE_TAG_COLOR = "#6366f1"
+SVC_TAG_COLOR = "#8b5cf6"
+CREDTYPE_TAG_COLOR = "#f59e0b"  # amber for credtype tags
+
+# app_metadata key holding the last report of each source
+SYNC_REPORT_KEY = "inventory_sync_report:{source}"
+# app_metadata key of SSHCredentialSync's file manifest
+SSH_MANIFEST_KEY = "ssh_credential_manifest"
+# A file written this close to the scan that recorded it could change again
+# within the same mtime tick, so its stat isn't trusted by the next scan
+STAT_SLACK_NS = 2_000_000_000
+
+
+class SyncReport:
+    """What one adapter run changed, and where its time went.
+
+    Adapters call lap(phase) after each step; the time since the previous
+    lap is added to that phase, so a phase can be entered more than once.
+    Phases are "read" (source data and building records), "index" (loading
+    existing objects and tags) and "write" (the bulk statements).
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.phases: dict[str, float] = {}
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._started = self._last = time.perf_counter()
+
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def add(self, result: UpsertResult):
+        self.created += result.created
+        self.updated += result.updated
+        self.unchanged += result.unchanged
+        self.deleted += result.deleted
+
+    @property
+    def elapsed(self) -> float:
+        return self._last - self._started
+
+    def summary(self) -> str:
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases.items())
+        return (f"{self.source}: {self.created} created, {self.updated} updated, "
+                f"{self.unchanged} unchanged, {self.deleted} deleted in {self.elapsed:.2f}s ({phases})")
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "deleted": self.deleted,
+            "started_at": self.started_at,
+            "elapsed_seconds": round(self.elapsed, 4),
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+        }
+
 
 def _build_search_text(data: dict, fields: list[dict]) -> str:
     """Build denormalized search text from searchable fields."""
@@ -20,44 +94,88 @@ def _build_search_text(data: dict, fields: list[dict]) -> str:
     return " ".join(parts).lower()
 
 
-def _find_or_create_object(session: Session, type_id: int, data: dict,
-                            unique_field: str, fields: list[dict]) -> InventoryObject:
-    """Find existing object by unique field or create new one."""
-    unique_value = data.get(unique_field)
-    if unique_value:
-        for obj in session.query(InventoryObject).filter_by(type_id=type_id).all():
-            obj_data = json.loads(obj.data)
-            if obj_data.get(unique_field) == unique_value:
-                # Update existing
-                obj.data = json.dumps(data)
-                obj.search_text = _build_search_text(data, fields)
-                return obj
-
-    # Create new
-    obj = InventoryObject(
-        type_id=type_id,
-        data=json.dumps(data),
-        search_text=_build_search_text(data, fields),
-    )
-    session.add(obj)
-    return obj
-
-
-def _get_or_create_credtype_tag(session: Session, credential_type: str) -> InventoryTag:
-    """Get or create a credtype: tag for the given credential type."""
-    tag_name = f"credtype:{credential_type}"
-    tag = session.query(InventoryTag).filter_by(name=tag_name).first()
-    if not tag:
-        tag = InventoryTag(name=tag_name, color="#f59e0b")  # amber for credtype tags
-        session.add(tag)
-        session.flush()
-    return tag
+def _service_for_vultr_tags(vultr_tags: list) -> str | None:
+    """The first Vultr tag naming a service directory (pi-* tags are skipped)."""
+    for vtag in vultr_tags:
+        if isinstance(vtag, str) and not vtag.startswith("pi-"):
+            if os.path.isdir(os.path.join(SERVICES_DIR, vtag)):
+                return vtag
+    return None
+
+
+def _root_password_key(data: dict, tag_names: set[str]):
+    """Key auto-created root password credentials by name, given their instance tag."""
+    name = data.get("name")
+    if not isinstance(name, str) or not name.endswith(ROOT_PASSWORD_SUFFIX):
+        return None
+    hostname = name[:-len(ROOT_PASSWORD_SUFFIX)]
+    return name if f"instance:{hostname}" in tag_names else None
+
+
+def _ssh_key_key(data: dict, tag_names: set[str]):
+    """Key SSH key credentials by the host in their instance: tag."""
+    if data.get("credential_type") != "ssh_key":
+        return None
+    hostnames = sorted(name.split(":", 1)[1] for name in tag_names if name.startswith("instance:"))
+    return hostnames[0] if hostnames else None
+
+
+def _object_data(session: Session, object_ids: set[int]) -> dict[int, dict]:
+    """Parsed data of the given objects, fetched in batches."""
+    ids = sorted(object_ids)
+    found = {}
+    for start in range(0, len(ids), INDEX_BATCH):
+        rows = (session.query(InventoryObject.id, InventoryObject.data)
+                .filter(InventoryObject.id.in_(ids[start:start + INDEX_BATCH])).all())
+        for object_id, raw in rows:
+            found[object_id] = json.loads(raw)
+    return found
+
+
+def _read_bytes(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _file_state(path: str, previous: dict | None, scanned_ns: int) -> tuple[dict | None, bytes | None]:
+    """A file's manifest state (mtime_ns, size, hash), and its bytes if they were read.
+
+    previous is returned as-is, without reading the file, when the stat
+    matches and the file had settled before previous was recorded. Returns
+    (None, None) for a missing or unreadable file.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, None
+    if (previous and previous["settled"] and previous["mtime_ns"] == st.st_mtime_ns
+            and previous["size"] == st.st_size):
+        return previous, None
+    content = _read_bytes(path)
+    if content is None:
+        return None, None
+    return {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "hash": hashlib.sha256(content).hexdigest(),
+        "settled": st.st_mtime_ns < scanned_ns - STAT_SLACK_NS,
+    }, content
+
+
+def _manifest_keys(manifest: dict) -> set[tuple[str, str]]:
+    """(service, hostname) of every host in the manifest with a public key on disk."""
+    return {(entry["service"], host["hostname"])
+            for entry in manifest.values() for host in entry["hosts"] if host["pub"]}
 
 
 class VultrInventorySync:
     """Sync servers from Vultr inventory cache."""
 
-    def sync(self, session: Session, type_config: dict):
+    def sync(self, session: Session, type_config: dict) -> SyncReport | None:
+        report = SyncReport("vultr_inventory")
         inv_type = session.query(InventoryType).filter_by(slug="server").first()
         if not inv_type:
             print("WARN: 'server' inventory type not found, skipping Vultr sync")
@@ -83,11 +201,12 @@ class VultrInventorySync:
         hosts = cache.get("all", {}).get("hosts", {})
         if not hosts:
             return
+        report.lap("read")
 
-        synced = 0
-        seen_hostnames = set()
+        servers = TypeIndex(session, inv_type.id, field_key("hostname"))
+        report.lap("index")
+        records = []
         for hostname, info in hosts.items():
-            seen_hostnames.add(hostname)
             data = {
                 "hostname": hostname,
                 "ip_address": info.get("ansible_host", ""),
@@ -105,123 +224,82 @@ class VultrInventorySync:
             # Preserve existing credentials if incoming values are empty
             # (generate-inventory may not have these fields)
             if not data["default_password"] or not data["kvm_url"]:
-                for obj in session.query(InventoryObject).filter_by(type_id=inv_type.id).all():
-                    obj_data = json.loads(obj.data)
-                    if obj_data.get("hostname") == hostname:
-                        if not data["default_password"]:
-                            data["default_password"] = obj_data.get("default_password", "")
-                        if not data["kvm_url"]:
-                            data["kvm_url"] = obj_data.get("kvm_url", "")
-                        break
-
-            _find_or_create_object(session, inv_type.id, data, "hostname", fields)
-            synced += 1
-
-            # Auto-create credential object if password is present
-            password = data.get("default_password", "")
-            if password and cred_type:
-                cred_tag_name = f"instance:{hostname}"
-                cred_tag = session.query(InventoryTag).filter_by(name=cred_tag_name).first()
-                if not cred_tag:
-                    cred_tag = InventoryTag(name=cred_tag_name, color="#6366f1")
-                    session.add(cred_tag)
-                    session.flush()
-
-                cred_name = f"{hostname} — Root Password"
-                cred_data = {
-                    "name": cred_name,
-                    "credential_type": "password",
-                    "username": "root",
-                    "value": password,
-                    "notes": f"Auto-captured from Vultr instance provisioning ({hostname})",
-                }
-                cred_search = f"{cred_name} root".lower()
-
-                # Find existing credential with this tag
-                existing_cred = None
-                existing_creds = (
-                    session.query(InventoryObject)
-                    .filter_by(type_id=cred_type.id)
-                    .filter(InventoryObject.tags.any(InventoryTag.id == cred_tag.id))
-                    .all()
-                )
-                for ec in existing_creds:
-                    ec_data = json.loads(ec.data)
-                    if ec_data.get("name") == cred_name:
-                        existing_cred = ec
-                        break
-
-                if existing_cred:
-                    existing_cred.data = json.dumps(cred_data)
-                    existing_cred.search_text = cred_search
-                else:
-                    new_cred = InventoryObject(
-                        type_id=cred_type.id,
-                        data=json.dumps(cred_data),
-                        search_text=cred_search,
-                    )
-                    session.add(new_cred)
-                    session.flush()
-                    new_cred.tags.append(cred_tag)
-
-                # Add svc: tag based on Vultr tags
-                vultr_tags = data.get("vultr_tags", [])
-                service_name = None
-                for vtag in vultr_tags:
-                    if isinstance(vtag, str) and not vtag.startswith("pi-"):
-                        svc_dir = os.path.join(SERVICES_DIR, vtag)
-                        if os.path.isdir(svc_dir):
-                            service_name = vtag
-                            break
-
-                if service_name:
-                    svc_tag_name = f"svc:{service_name}"
-                    svc_tag = session.query(InventoryTag).filter_by(name=svc_tag_name).first()
-                    if not svc_tag:
-                        svc_tag = InventoryTag(name=svc_tag_name, color="#8b5cf6")
-                        session.add(svc_tag)
-                        session.flush()
-                    target = existing_cred or new_cred
-                    if svc_tag not in target.tags:
-                        target.tags.append(svc_tag)
-
-                # Add credtype: tag
-                credtype_tag = _get_or_create_credtype_tag(session, "password")
-                target = existing_cred or new_cred
-                if credtype_tag not in target.tags:
-                    target.tags.append(credtype_tag)
-
-        # Remove objects for servers no longer in the cache
-        removed = 0
-        for obj in session.query(InventoryObject).filter_by(type_id=inv_type.id).all():
-            obj_data = json.loads(obj.data)
-            if obj_data.get("hostname") not in seen_hostnames:
-                session.delete(obj)
-                removed += 1
+                existing = servers.get(hostname)
+                if existing:
+                    if not data["default_password"]:
+                        data["default_password"] = existing.get("default_password", "")
+                    if not data["kvm_url"]:
+                        data["kvm_url"] = existing.get("kvm_url", "")
+
+            records.append(UpsertRecord(data, _build_search_text(data, fields)))
+        report.lap("read")
+
+        # Servers no longer in the cache are removed
+        result = upsert_objects(session, servers, records, delete_missing=True)
+        report.add(result)
+        report.lap("write")
 
-        # Also clean up orphaned password credentials (created by VultrInventorySync)
-        # SSH key credentials are managed by SSHCredentialSync
         if cred_type:
-            for obj in session.query(InventoryObject).filter_by(type_id=cred_type.id).all():
-                obj_data = json.loads(obj.data)
-                if obj_data.get("credential_type") != "password":
-                    continue
-                obj_tags = [t.name for t in obj.tags]
-                instance_tags = [t for t in obj_tags if t.startswith("instance:")]
-                for it in instance_tags:
-                    instance_hostname = it.split(":", 1)[1]
-                    if instance_hostname not in seen_hostnames:
-                        session.delete(obj)
-                        break
+            self._sync_root_passwords(session, cred_type, [r.data for r in records], set(hosts), report)
 
         session.flush()
-        print(f"  Vultr sync: {synced} server(s), {removed} removed")
+        report.lap("write")
+        print(f"  Vultr sync: {len(records)} server(s), {result.deleted} removed")
+        return report
+
+    def _sync_root_passwords(self, session: Session, cred_type: InventoryType,
+                             servers: list[dict], seen_hostnames: set[str], report: SyncReport):
+        """Keep a root password credential for every server that has a password."""
+        tags = TagCache(session)
+        creds = TypeIndex(session, cred_type.id, _root_password_key, with_tags=True)
+        report.lap("index")
+
+        with_password = [(data, _service_for_vultr_tags(data.get("vultr_tags", [])))
+                         for data in servers if data.get("default_password")]
+        tag_colors = {}
+        for data, service_name in with_password:
+            tag_colors["credtype:password"] = CREDTYPE_TAG_COLOR
+            tag_colors[f"instance:{data['hostname']}"] = INSTANCE_TAG_COLOR
+            if service_name:
+                tag_colors[f"svc:{service_name}"] = SVC_TAG_COLOR
+        tags.ensure(tag_colors)
+
+        records = []
+        for data, service_name in with_password:
+            password = data["default_password"]
+            hostname = data["hostname"]
+            cred_name = f"{hostname}{ROOT_PASSWORD_SUFFIX}"
+            cred_data = {
+                "name": cred_name,
+                "credential_type": "password",
+                "username": "root",
+                "value": password,
+                "notes": f"Auto-captured from Vultr instance provisioning ({hostname})",
+            }
+            cred_tags = [tags.get(f"instance:{hostname}", INSTANCE_TAG_COLOR)]
+            if service_name:
+                cred_tags.append(tags.get(f"svc:{service_name}", SVC_TAG_COLOR))
+            cred_tags.append(tags.get("credtype:password", CREDTYPE_TAG_COLOR))
+            records.append(UpsertRecord(cred_data, f"{cred_name} root".lower(), cred_tags))
+        report.lap("read")
+
+        report.add(upsert_objects(session, creds, records))
+
+        # Also clean up orphaned password credentials (created by VultrInventorySync)
+        # SSH key credentials are managed by SSHCredentialSync
+        orphans = [
+            object_id for object_id, hostnames in creds.ids_with_tag_prefix("instance:").items()
+            if creds.data[object_id].get("credential_type") == "password"
+            and any(hostname not in seen_hostnames for hostname in hostnames)
+        ]
+        report.deleted += delete_objects(session, creds, orphans)
 
 
 class ServiceDiscoverySync:
     """Sync services by scanning the services directory for deploy.sh files."""
 
-    def sync(self, session: Session, type_config: dict):
+    def sync(self, session: Session, type_config: dict) -> SyncReport | None:
+        report = SyncReport("service_discovery")
         inv_type = session.query(InventoryType).filter_by(slug="service").first()
         if not inv_type:
             print("WARN: 'service' inventory type not found, skipping service discovery")
@@ -232,7 +310,7 @@ class ServiceDiscoverySync:
         if not os.path.isdir(SERVICES_DIR):
             return
 
-        synced = 0
+        records = []
         for dirname in sorted(os.listdir(SERVICES_DIR)):
             service_path = os.path.join(SERVICES_DIR, dirname)
             deploy_path = os.path.join(service_path, "deploy.sh")
@@ -244,17 +322,23 @@ class ServiceDiscoverySync:
                 "service_dir": f"/services/{dirname}",
                 "status": "available",
             }
-            _find_or_create_object(session, inv_type.id, data, "name", fields)
-            synced += 1
+            records.append(UpsertRecord(data, _build_search_text(data, fields)))
 
+        report.lap("read")
+        index = TypeIndex(session, inv_type.id, field_key("name"))
+        report.lap("index")
+        report.add(upsert_objects(session, index, records))
         session.flush()
-        print(f"  Service discovery: {synced} service(s)")
+        report.lap("write")
+        print(f"  Service discovery: {len(records)} service(s)")
+        return report
 
 
 class UserSync:
     """Sync users from the CloudLab Manager users table."""
 
-    def sync(self, session: Session, type_config: dict):
+    def sync(self, session: Session, type_config: dict) -> SyncReport | None:
+        report = SyncReport("user_sync")
         inv_type = session.query(InventoryType).filter_by(slug="user").first()
         if not inv_type:
             print("WARN: 'user' inventory type not found, skipping user sync")
@@ -263,7 +347,7 @@ class UserSync:
         fields = type_config.get("fields", [])
         users = session.query(User).all()
 
-        synced = 0
+        records = []
         for user in users:
             # Derive status from is_active and invite_accepted_at
             if not user.is_active:
@@ -285,17 +369,23 @@ class UserSync:
                 "status": status,
                 "last_login_at": str(user.last_login_at) if user.last_login_at else "",
             }
-            _find_or_create_object(session, inv_type.id, data, "username", fields)
-            synced += 1
+            records.append(UpsertRecord(data, _build_search_text(data, fields)))
 
+        report.lap("read")
+        index = TypeIndex(session, inv_type.id, field_key("username"))
+        report.lap("index")
+        report.add(upsert_objects(session, index, records))
         session.flush()
-        print(f"  User sync: {synced} user(s)")
+        report.lap("write")
+        print(f"  User sync: {len(records)} user(s)")
+        return report
 
 
 class DeploymentSync:
     """Sync deployments from the jobs table."""
 
-    def sync(self, session: Session, type_config: dict):
+    def sync(self, session: Session, type_config: dict) -> SyncReport | None:
+        report = SyncReport("deployment_sync")
         inv_type = session.query(InventoryType).filter_by(slug="deployment").first()
         if not inv_type:
             print("WARN: 'deployment' inventory type not found, skipping deployment sync")
@@ -325,17 +415,17 @@ class DeploymentSync:
                 for tag in tags:
                     server_lookup[tag] = {"hostname": hostname, "ip_address": ip}
 
-        synced = 0
+        linked_objects = _object_data(session, {job.object_id for job in jobs if job.object_id})
+
+        records = []
         for job in jobs:
             # Try to find hostname/IP from linked inventory object
             hostname = ""
             ip_address = ""
-            if job.object_id:
-                linked = session.query(InventoryObject).get(job.object_id)
-                if linked:
-                    obj_data = json.loads(linked.data)
-                    hostname = obj_data.get("hostname", "")
-                    ip_address = obj_data.get("ip_address", "")
+            linked = linked_objects.get(job.object_id)
+            if linked:
+                hostname = linked.get("hostname", "")
+                ip_address = linked.get("ip_address", "")
             # Fallback: look up by service name in server cache
             if not hostname and job.service:
                 match = server_lookup.get(job.service)
@@ -354,218 +444,205 @@ class DeploymentSync:
                 "started_at": job.started_at or "",
                 "finished_at": job.finished_at or "",
             }
-            _find_or_create_object(session, inv_type.id, data, "job_id", fields)
-            synced += 1
+            records.append(UpsertRecord(data, _build_search_text(data, fields)))
 
+        report.lap("read")
+        index = TypeIndex(session, inv_type.id, field_key("job_id"))
+        report.lap("index")
+        report.add(upsert_objects(session, index, records))
         session.flush()
-        print(f"  Deployment sync: {synced} deployment(s)")
+        report.lap("write")
+        print(f"  Deployment sync: {len(records)} deployment(s)")
+        return report
 
 
 class SSHCredentialSync:
-    """Sync SSH keys from service temp_inventory.yaml files into credential objects."""
+    """Sync SSH keys from service temp_inventory.yaml files into credential objects.
+
+    A manifest of every inventory file (and each host's .pub file) seen by
+    the last run is kept in app_metadata: path, mtime_ns, size and content
+    hash. A file whose stat matches its manifest entry isn't read again, a
+    file that was touched but hashes the same isn't parsed again, and when
+    nothing on disk changed the run doesn't touch the credentials at all.
+    Pass services to look only at those services' outputs/ directories.
+    """
 
     SERVICES_DIR = "/app/cloudlab/services"
 
-    def sync(self, session: Session, type_config: dict):
+    def sync(self, session: Session, type_config: dict,
+             services: list[str] | None = None) -> SyncReport | None:
+        report = SyncReport("ssh_credential_sync")
         cred_type = session.query(InventoryType).filter_by(slug="credential").first()
         if not cred_type:
             print("WARN: 'credential' type not found, skipping SSH credential sync")
             return
 
-        fields = type_config.get("fields", [])
-        seen_cred_keys = set()  # Track (service, hostname) pairs we've seen
-        synced = 0
-
         # Scan all services for instance.yaml files
         if not os.path.isdir(self.SERVICES_DIR):
             return
 
-        for service_name in sorted(os.listdir(self.SERVICES_DIR)):
-            service_path = os.path.join(self.SERVICES_DIR, service_name)
-            if not os.path.isdir(service_path):
+        previous = AppMetadata.get(session, SSH_MANIFEST_KEY) or {}
+        keys_before = _manifest_keys(previous)
+        scanned_ns = time.time_ns()
+        in_scope = set(services) if services is not None else None
+        manifest = {path: entry for path, entry in previous.items()
+                    if in_scope is not None and entry["service"] not in in_scope}
+
+        changed = []  # (service_name, manifest host, parsed host vars or None, public key)
+        for path, service_name in self._inventory_files(services).items():
+            entry = previous.get(path)
+            state, content = _file_state(path, entry, scanned_ns)
+            if state is None:
                 continue
+            if entry is None or state["hash"] != entry["hash"]:
+                hosts = [({"hostname": hostname, "user": info.get("ansible_user", "root"),
+                           "key_file": key_file, "pub": None}, info)
+                         for hostname, info, key_file in self._read_inventory(path, content)]
+            else:
+                hosts = [(dict(host), None) for host in entry["hosts"]]
+            for host, info in hosts:
+                old_pub = host["pub"]
+                host["pub"], pub_content = _file_state(host["key_file"] + ".pub", old_pub, scanned_ns)
+                if host["pub"] is None:
+                    continue
+                if info is not None or old_pub is None or host["pub"]["hash"] != old_pub["hash"]:
+                    if pub_content is None:
+                        pub_content = _read_bytes(host["key_file"] + ".pub") or b""
+                    pub_key = pub_content.decode(errors="replace").strip()
+                    changed.append((service_name, host, info, pub_key))
+            manifest[path] = {"service": service_name, **state, "hosts": [host for host, _ in hosts]}
+
+        keys_on_disk = _manifest_keys(manifest)
+        if manifest != previous:
+            AppMetadata.set(session, SSH_MANIFEST_KEY, manifest)
+        report.lap("read")
+        if not changed and keys_on_disk == keys_before:
+            report.unchanged = len(keys_on_disk)
+            print(f"  SSH credential sync: {len(keys_on_disk)} key(s), no inventory changes")
+            return report
+
+        tags = TagCache(session)
+        tag_colors = {}
+        for service_name, host, info, _ in changed:
+            tag_colors["credtype:ssh_key"] = CREDTYPE_TAG_COLOR
+            tag_colors[f"svc:{service_name}"] = SVC_TAG_COLOR
+            tag_colors[f"instance:{host['hostname']}"] = INSTANCE_TAG_COLOR
+            if info and info.get("vultr_default_password"):
+                tag_colors["credtype:password"] = CREDTYPE_TAG_COLOR
+        tags.ensure(tag_colors)
+        creds = TypeIndex(session, cred_type.id, _ssh_key_key, with_tags=True)
+        report.lap("index")
+        # Hosts that already have a password credential (from VultrInventorySync or a backfill)
+        with_password = {
+            hostname
+            for object_id, hostnames in creds.ids_with_tag_prefix("instance:").items()
+            if creds.data[object_id].get("credential_type") == "password"
+            for hostname in hostnames
+        }
 
-            outputs_path = os.path.join(service_path, "outputs")
-            if not os.path.isdir(outputs_path):
-                continue
+        records = []
+        for service_name, host, info, pub_key in changed:
+            hostname, ssh_user = host["hostname"], host["user"]
+            svc_tag = tags.get(f"svc:{service_name}", SVC_TAG_COLOR)
+            inst_tag = tags.get(f"instance:{hostname}", INSTANCE_TAG_COLOR)
 
-            # Check for direct temp_inventory.yaml (shared services)
-            temp_inv = os.path.join(outputs_path, "temp_inventory.yaml")
-            if os.path.isfile(temp_inv):
-                count = self._process_inventory(
-                    session, cred_type, fields, service_name,
-                    temp_inv, seen_cred_keys
-                )
-                synced += count
+            cred_name = f"{hostname} — SSH Key"
+            cred_data = {
+                "name": cred_name,
+                "credential_type": "ssh_key",
+                "username": ssh_user,
+                "value": pub_key,
+                "key_path": host["key_file"],
+                "notes": f"Auto-synced from {service_name} ({hostname})",
+            }
+            records.append(UpsertRecord(cred_data, f"{cred_name} {ssh_user}".lower(), [
+                svc_tag, inst_tag, tags.get("credtype:ssh_key", CREDTYPE_TAG_COLOR)]))
 
-            # Check for per-instance subdirectories (personal instances)
-            for subdir in sorted(os.listdir(outputs_path)):
-                subdir_path = os.path.join(outputs_path, subdir)
-                if not os.path.isdir(subdir_path):
-                    continue
-                sub_inv = os.path.join(subdir_path, "temp_inventory.yaml")
-                if os.path.isfile(sub_inv):
-                    count = self._process_inventory(
-                        session, cred_type, fields, service_name,
-                        sub_inv, seen_cred_keys
-                    )
-                    synced += count
+            # Also backfill root password if present and not already tracked
+            default_pw = info.get("vultr_default_password", "") if info else ""
+            if default_pw and hostname not in with_password:
+                with_password.add(hostname)
+                records.append(self._root_password_record(
+                    hostname, default_pw, service_name,
+                    [inst_tag, svc_tag, tags.get("credtype:password", CREDTYPE_TAG_COLOR)]))
+
+        report.lap("read")
+
+        report.add(upsert_objects(session, creds, records))
+        report.unchanged += max(len(keys_on_disk) - len(changed), 0)
 
         # Clean up SSH credential objects for keys that no longer exist on disk
-        removed = 0
-        for obj in session.query(InventoryObject).filter_by(type_id=cred_type.id).all():
-            obj_data = json.loads(obj.data)
-            if obj_data.get("credential_type") != "ssh_key":
+        stale = []
+        for object_id, data in creds.data.items():
+            if data.get("credential_type") != "ssh_key":
                 continue
             # Check if this was auto-created by us (has key_path set)
-            key_path = obj_data.get("key_path", "")
-            if not key_path:
+            if not data.get("key_path", ""):
                 continue
             # Extract service and hostname from tags
-            obj_tags = {t.name for t in obj.tags}
+            obj_tags = sorted(creds.tags[object_id])
             svc_tags = [t for t in obj_tags if t.startswith("svc:")]
             inst_tags = [t for t in obj_tags if t.startswith("instance:")]
             if svc_tags and inst_tags:
                 svc = svc_tags[0].split(":", 1)[1]
                 hostname = inst_tags[0].split(":", 1)[1]
-                if (svc, hostname) not in seen_cred_keys:
-                    session.delete(obj)
-                    removed += 1
+                if (svc, hostname) not in keys_on_disk:
+                    stale.append(object_id)
+        removed = delete_objects(session, creds, stale)
+        report.deleted += removed
 
         session.flush()
-        print(f"  SSH credential sync: {synced} key(s), {removed} removed")
+        report.lap("write")
+        print(f"  SSH credential sync: {len(keys_on_disk)} key(s), {len(changed)} re-read, {removed} removed")
+        return report
+
+    def _inventory_files(self, services: list[str] | None) -> dict[str, str]:
+        """temp_inventory.yaml paths of every service (or just services), mapped to the service."""
+        names = sorted(os.listdir(self.SERVICES_DIR)) if services is None else sorted(set(services))
+        found = {}
+        for service_name in names:
+            outputs_path = os.path.join(self.SERVICES_DIR, service_name, "outputs")
+            if not os.path.isdir(outputs_path):
+                continue
+
+            # Check for direct temp_inventory.yaml (shared services)
+            temp_inv = os.path.join(outputs_path, "temp_inventory.yaml")
+            if os.path.isfile(temp_inv):
+                found[temp_inv] = service_name
+
+            # Check for per-instance subdirectories (personal instances)
+            for subdir in sorted(os.listdir(outputs_path)):
+                sub_inv = os.path.join(outputs_path, subdir, "temp_inventory.yaml")
+                if os.path.isfile(sub_inv):
+                    found[sub_inv] = service_name
+        return found
+
+    def _read_inventory(self, inventory_path: str, content: bytes) -> list[tuple]:
+        """Hosts with an SSH key in one temp_inventory.yaml.
 
-    def _process_inventory(self, session, cred_type, fields, service_name,
-                           inventory_path, seen_cred_keys) -> int:
-        """Process a single temp_inventory.yaml file and create/update SSH key credentials."""
+        Returns (hostname, host vars, key path) tuples.
+        """
         try:
-            with open(inventory_path, "r") as f:
-                inv = yaml.safe_load(f)
+            inv = yaml.safe_load(content)
         except Exception as e:
             print(f"WARN: Could not read {inventory_path}: {e}")
-            return 0
+            return []
 
-        if not inv:
-            return 0
+        if not isinstance(inv, dict):
+            return []
 
-        hosts = inv.get("all", {}).get("hosts", {})
-        if not hosts:
-            return 0
-
-        count = 0
+        hosts = (inv.get("all") or {}).get("hosts") or {}
+        found = []
         for hostname, info in hosts.items():
-            key_file = info.get("ansible_ssh_private_key_file", "")
-            if not key_file:
-                continue
-
-            pub_file = key_file + ".pub"
-            if not os.path.isfile(pub_file):
-                continue
-
-            # Read public key
-            try:
-                with open(pub_file, "r") as f:
-                    pub_key = f.read().strip()
-            except Exception:
-                pub_key = ""
-
-            ssh_user = info.get("ansible_user", "root")
-            seen_cred_keys.add((service_name, hostname))
-
-            # Ensure tags exist
-            svc_tag_name = f"svc:{service_name}"
-            inst_tag_name = f"instance:{hostname}"
-
-            svc_tag = session.query(InventoryTag).filter_by(name=svc_tag_name).first()
-            if not svc_tag:
-                svc_tag = InventoryTag(name=svc_tag_name, color="#8b5cf6")
-                session.add(svc_tag)
-                session.flush()
-
-            inst_tag = session.query(InventoryTag).filter_by(name=inst_tag_name).first()
-            if not inst_tag:
-                inst_tag = InventoryTag(name=inst_tag_name, color="#6366f1")
-                session.add(inst_tag)
-                session.flush()
-
-            cred_name = f"{hostname} — SSH Key"
-            cred_data = {
-                "name": cred_name,
-                "credential_type": "ssh_key",
-                "username": ssh_user,
-                "value": pub_key,
-                "key_path": key_file,
-                "notes": f"Auto-synced from {service_name} ({hostname})",
-            }
-            cred_search = f"{cred_name} {ssh_user}".lower()
-
-            # Find existing SSH key credential with this instance tag
-            existing = None
-            existing_creds = (
-                session.query(InventoryObject)
-                .filter_by(type_id=cred_type.id)
-                .filter(InventoryObject.tags.any(InventoryTag.id == inst_tag.id))
-                .all()
-            )
-            for ec in existing_creds:
-                ec_data = json.loads(ec.data)
-                if ec_data.get("credential_type") == "ssh_key":
-                    existing = ec
-                    break
-
-            if existing:
-                existing.data = json.dumps(cred_data)
-                existing.search_text = cred_search
-                # Ensure svc tag is present (may have been added later)
-                if svc_tag not in existing.tags:
-                    existing.tags.append(svc_tag)
-                # Add credtype: tag
-                credtype_tag = _get_or_create_credtype_tag(session, "ssh_key")
-                if credtype_tag not in existing.tags:
-                    existing.tags.append(credtype_tag)
-            else:
-                new_cred = InventoryObject(
-                    type_id=cred_type.id,
-                    data=json.dumps(cred_data),
-                    search_text=cred_search,
-                )
-                session.add(new_cred)
-                session.flush()
-                new_cred.tags.append(svc_tag)
-                new_cred.tags.append(inst_tag)
-                # Add credtype: tag
-                credtype_tag = _get_or_create_credtype_tag(session, "ssh_key")
-                if credtype_tag not in new_cred.tags:
-                    new_cred.tags.append(credtype_tag)
-
-            # Also backfill root password if present and not already tracked
-            default_pw = info.get("vultr_default_password", "")
-            if default_pw:
-                self._backfill_root_password(
-                    session, cred_type, fields, hostname,
-                    default_pw, inst_tag, svc_tag, service_name
-                )
-
-            count += 1
-
-        return count
-
-    def _backfill_root_password(self, session, cred_type, fields, hostname,
-                                 password, inst_tag, svc_tag, service_name):
-        """Create root password credential if VultrInventorySync missed it."""
-        pw_name = f"{hostname} — Root Password"
-        # Check if password credential already exists for this instance
-        existing_creds = (
-            session.query(InventoryObject)
-            .filter_by(type_id=cred_type.id)
-            .filter(InventoryObject.tags.any(InventoryTag.id == inst_tag.id))
-            .all()
-        )
-        for ec in existing_creds:
-            ec_data = json.loads(ec.data)
-            if ec_data.get("credential_type") == "password":
-                return  # Already exists, don't overwrite
-
+            key_file = (info or {}).get("ansible_ssh_private_key_file", "")
+            if key_file:
+                found.append((hostname, info, key_file))
+        return found
+
+    def _root_password_record(self, hostname: str, password: str, service_name: str,
+                              tags: list[InventoryTag]) -> UpsertRecord:
+        """Root password credential for a host VultrInventorySync missed."""
+        pw_name = f"{hostname}{ROOT_PASSWORD_SUFFIX}"
         pw_data = {
             "name": pw_name,
             "credential_type": "password",
@@ -573,21 +650,7 @@ class SSHCredentialSync:
             "value": password,
             "notes": f"Backfilled from temp inventory ({service_name}/{hostname})",
         }
-        pw_search = f"{pw_name} root".lower()
-        new_pw = InventoryObject(
-            type_id=cred_type.id,
-            data=json.dumps(pw_data),
-            search_text=pw_search,
-        )
-        session.add(new_pw)
-        session.flush()
-        new_pw.tags.append(inst_tag)
-        if svc_tag not in new_pw.tags:
-            new_pw.tags.append(svc_tag)
-        # Add credtype: tag
-        credtype_tag = _get_or_create_credtype_tag(session, "password")
-        if credtype_tag not in new_pw.tags:
-            new_pw.tags.append(credtype_tag)
+        return UpsertRecord(pw_data, f"{pw_name} root".lower(), tags)
 
 
 SYNC_ADAPTERS = {
@@ -599,49 +662,74 @@ SYNC_ADAPTERS = {
 }
 
 
+def _store_report(session: Session, report) -> SyncReport | None:
+    """Keep an adapter's report in app_metadata for GET /api/inventory/{type}/sync."""
+    if not isinstance(report, SyncReport):
+        return None
+    AppMetadata.set(session, SYNC_REPORT_KEY.format(source=report.source), report.to_dict())
+    return report
+
+
+def last_sync_report(session: Session, source: str) -> dict | None:
+    return AppMetadata.get(session, SYNC_REPORT_KEY.format(source=source))
+
+
+def sync_source(config: dict) -> str | None:
+    """The sync source a type config names, if any."""
+    sync_config = config.get("sync")
+    if not sync_config:
+        return None
+    return sync_config.get("source") if isinstance(sync_config, dict) else sync_config
+
+
 def run_sync(session: Session, type_configs: list[dict]):
     """Run all sync adapters for types that have sync configured."""
     for config in type_configs:
-        sync_config = config.get("sync")
-        if not sync_config:
-            continue
-        source = sync_config.get("source") if isinstance(sync_config, dict) else sync_config
-        adapter = SYNC_ADAPTERS.get(source)
+        adapter = SYNC_ADAPTERS.get(sync_source(config))
         if adapter:
             try:
-                adapter.sync(session, config)
+                _store_report(session, adapter.sync(session, config))
             except Exception as e:
                 print(f"ERROR: Sync failed for {config['slug']}: {e}")
 
 
-def run_sync_for_source(source_name: str):
-    """Re-run a single sync adapter by source name. Loads type configs from disk."""
+def run_adapter(source_name: str, config: dict, **options) -> SyncReport | None:
+    """Run one adapter for a type config in a session of its own and commit.
+
+    options are passed on to the adapter's sync (e.g. services= for
+    ssh_credential_sync). Errors propagate after the session is rolled back.
+    """
+    adapter = SYNC_ADAPTERS[source_name]
+    session = SessionLocal()
+    try:
+        report = _store_report(session, adapter.sync(session, config, **options))
+        session.commit()
+        return report
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def run_sync_for_source(source_name: str, **options) -> SyncReport | None:
+    """Re-run a single sync adapter by source name. Loads type configs from disk.
+
+    Returns the adapter's report, or None if nothing ran or the sync failed.
+    Jobs and routes go through sync_orchestrator.request_sync instead, which
+    coalesces concurrent requests and uses type configs loaded once.
+    """
     from type_loader import load_type_configs
 
-    adapter = SYNC_ADAPTERS.get(source_name)
-    if not adapter:
-        return
-
-    configs = load_type_configs()
-    config = None
-    for c in configs:
-        sync_config = c.get("sync")
-        if not sync_config:
-            continue
-        src = sync_config.get("source") if isinstance(sync_config, dict) else sync_config
-        if src == source_name:
-            config = c
-            break
+    if source_name not in SYNC_ADAPTERS:
+        return None
 
+    config = next((c for c in load_type_configs() if sync_source(c) == source_name), None)
     if not config:
-        return
+        return None
 
-    session = SessionLocal()
     try:
-        adapter.sync(session, config)
-        session.commit()
+        return run_adapter(source_name, config, **options)
     except Exception as e:
-        session.rollback()
         print(f"ERROR: Sync failed for {source_name}: {e}")
-    finally:
-        session.close()
+        return None
@@ -0,0 +1,319 @@
+"""Bulk upserts for the inventory sync adapters.
+
+A sync pass hands over every record it found for one inventory type. The
+existing objects of that type are loaded once (one query, one json.loads
+each) into a TypeIndex keyed by the type's unique field; records are diffed
+against it in memory and the resulting inserts, updates and deletes go out
+as executemany statements inside the caller's transaction. Syncing N
+objects is therefore O(N) rather than a query and full scan per record.
+
+Each written object stores a content_hash of its record. A record whose
+hash matches is skipped outright, so an unchanged object keeps its
+updated_at and costs no write.
+
+Core statements skip the InventoryObject mapper events, so the key and
+full-text side tables are maintained with database.write_object_index and
+remove_object_index, and objects already loaded in the session are expired
+so they don't show stale data.
+"""
+
+import hashlib
+import json
+from typing import Callable, Hashable, Iterable
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+from database import (
+    INDEX_BATCH, InventoryObject, InventoryTag, object_tags, remove_object_index, utcnow,
+    write_object_index,
+)
+
+# key(data, tag_names) -> hashable key, or None for "never matches"
+KeyFunc = Callable[[dict, set[str]], Hashable | None]
+
+
+def field_key(field: str) -> KeyFunc:
+    """Match objects on data[field]; empty or non-scalar values never match."""
+    def key(data: dict, tag_names: set[str]):
+        value = data.get(field)
+        return value if value and isinstance(value, (str, int, float)) else None
+    return key
+
+
+def content_hash(data: dict, search_text: str | None) -> str:
+    """Stable hash of a record: key order in data doesn't matter."""
+    canonical = json.dumps([data, search_text or ""], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class UpsertRecord:
+    """One incoming object and the tags it must carry (existing tags are kept)."""
+
+    __slots__ = ("data", "search_text", "tags", "hash")
+
+    def __init__(self, data: dict, search_text: str, tags: Iterable[InventoryTag] = ()):
+        self.data = data
+        self.search_text = search_text
+        self.tags = list(tags)
+        self.hash = content_hash(data, search_text)
+
+    @property
+    def tag_names(self) -> set[str]:
+        return {tag.name for tag in self.tags}
+
+
+class UpsertResult:
+    __slots__ = ("created", "updated", "unchanged", "deleted", "ids")
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.ids: dict = {}  # key -> object id, for every keyed record written
+
+
+class TagCache:
+    """Inventory tags by name, loaded with one query; missing tags are created on use."""
+
+    def __init__(self, session: Session):
+        self.session = session
+        self._tags = {tag.name: tag for tag in session.query(InventoryTag).all()}
+
+    def ensure(self, colors: dict[str, str]):
+        """Create every missing tag in colors (name -> color) with one insert."""
+        missing = [{"name": name, "color": color, "created_at": utcnow()}
+                   for name, color in colors.items() if name not in self._tags]
+        if not missing:
+            return
+        self.session.flush()
+        self.session.connection().execute(InventoryTag.__table__.insert(), missing)
+        names = [row["name"] for row in missing]
+        for start in range(0, len(names), INDEX_BATCH):
+            chunk = names[start:start + INDEX_BATCH]
+            for tag in self.session.query(InventoryTag).filter(InventoryTag.name.in_(chunk)):
+                self._tags[tag.name] = tag
+
+    def get(self, name: str, color: str) -> InventoryTag:
+        tag = self._tags.get(name)
+        if tag is None:
+            tag = InventoryTag(name=name, color=color)
+            self.session.add(tag)
+            self.session.flush()
+            self._tags[name] = tag
+        return tag
+
+
+class TypeIndex:
+    """The objects of one inventory type, loaded once and indexed by key.
+
+    When several objects share a key the oldest wins, as the old
+    first-match lookup did; the others are left alone. Pass with_tags=True
+    to load tag names too (needed when the key or a caller looks at tags).
+    """
+
+    def __init__(self, session: Session, type_id: int, key: KeyFunc, with_tags: bool = False):
+        session.flush()
+        self.type_id = type_id
+        self.key = key
+        self.data: dict[int, dict] = {}
+        self.hashes: dict[int, str | None] = {}
+        self.tags: dict[int, set[str]] = {}
+        self.keys: dict[int, Hashable | None] = {}
+        self.by_key: dict[Hashable, int] = {}
+
+        rows = session.execute(
+            select(InventoryObject.id, InventoryObject.data, InventoryObject.content_hash)
+            .where(InventoryObject.type_id == type_id)
+            .order_by(InventoryObject.id)
+        )
+        for object_id, raw, stored_hash in rows:
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                data = {}
+            self.data[object_id] = data if isinstance(data, dict) else {}
+            self.hashes[object_id] = stored_hash
+            self.tags[object_id] = set()
+
+        if with_tags:
+            tag_rows = session.execute(
+                select(object_tags.c.object_id, InventoryTag.name)
+                .join(InventoryTag, InventoryTag.id == object_tags.c.tag_id)
+                .join(InventoryObject, InventoryObject.id == object_tags.c.object_id)
+                .where(InventoryObject.type_id == type_id)
+            )
+            for object_id, name in tag_rows:
+                self.tags[object_id].add(name)
+
+        for object_id, data in self.data.items():
+            self._set_key(object_id, key(data, self.tags[object_id]))
+
+    def _set_key(self, object_id: int, key: Hashable | None):
+        self.keys[object_id] = key
+        if key is not None:
+            self.by_key.setdefault(key, object_id)
+
+    def get(self, key: Hashable) -> dict | None:
+        """Stored data of the object with this key, if any."""
+        object_id = self.by_key.get(key)
+        return None if object_id is None else self.data[object_id]
+
+    def ids_with_tag_prefix(self, prefix: str) -> dict[int, list[str]]:
+        """Objects carrying tags that start with prefix, with the rest of each tag name."""
+        found = {}
+        for object_id, names in self.tags.items():
+            values = sorted(name[len(prefix):] for name in names if name.startswith(prefix))
+            if values:
+                found[object_id] = values
+        return found
+
+
+def upsert_objects(session: Session, index: TypeIndex, records: Iterable[UpsertRecord],
+                   delete_missing: bool = False) -> UpsertResult:
+    """Insert or update records against index; optionally delete objects with no record.
+
+    A record whose key matches an indexed object replaces that object's data
+    and search text, unless the stored content_hash says nothing changed,
+    in which case the row is left alone; later records with the same key win. Records without a
+    key are always inserted. With delete_missing, every indexed object whose
+    key no incoming record has is deleted.
+    """
+    result = UpsertResult()
+    keyed: dict[Hashable, UpsertRecord] = {}
+    unkeyed: list[UpsertRecord] = []
+    for record in records:
+        key = index.key(record.data, record.tag_names)
+        if key is None:
+            unkeyed.append(record)
+        else:
+            keyed[key] = record
+
+    inserts: list[tuple[Hashable | None, UpsertRecord]] = []
+    updates: list[tuple[int, UpsertRecord]] = []
+    matched: list[tuple[int, UpsertRecord]] = []
+    for key, record in keyed.items():
+        object_id = index.by_key.get(key)
+        if object_id is None:
+            inserts.append((key, record))
+            continue
+        result.ids[key] = object_id
+        matched.append((object_id, record))
+        if record.hash == index.hashes[object_id]:
+            result.unchanged += 1
+        else:
+            updates.append((object_id, record))
+    inserts.extend((None, record) for record in unkeyed)
+
+    connection = session.connection()
+    table = InventoryObject.__table__
+    now = utcnow()
+
+    if updates:
+        connection.execute(
+            table.update().where(table.c.id == bindparam("object_id")).values(
+                data=bindparam("new_data"), search_text=bindparam("new_search_text"),
+                content_hash=bindparam("new_hash"), updated_at=now),
+            [{"object_id": object_id, "new_data": json.dumps(record.data),
+              "new_search_text": record.search_text, "new_hash": record.hash}
+             for object_id, record in updates],
+        )
+        write_object_index(connection, [
+            {"id": object_id, "type_id": index.type_id, "data": record.data, "search_text": record.search_text}
+            for object_id, record in updates], replace=True)
+        for object_id, record in updates:
+            index.data[object_id] = record.data
+            index.hashes[object_id] = record.hash
+        result.updated = len(updates)
+
+    if inserts:
+        rows = [{"type_id": index.type_id, "data": json.dumps(record.data),
+                 "search_text": record.search_text, "content_hash": record.hash,
+                 "created_at": now, "updated_at": now}
+                for _, record in inserts]
+        ids = connection.execute(
+            table.insert().returning(table.c.id, sort_by_parameter_order=True), rows,
+        ).scalars().all()
+        write_object_index(connection, [
+            {"id": object_id, "type_id": index.type_id, "data": record.data, "search_text": record.search_text}
+            for (_, record), object_id in zip(inserts, ids)], replace=False)
+        for (key, record), object_id in zip(inserts, ids):
+            index.data[object_id] = record.data
+            index.hashes[object_id] = record.hash
+            index.tags[object_id] = set()
+            if key is not None:
+                index._set_key(object_id, key)
+                result.ids[key] = object_id
+        result.created = len(inserts)
+    else:
+        ids = []
+
+    written = matched + list(zip(ids, (record for _, record in inserts)))
+    retagged = _link_tags(session, index, written)
+
+    if delete_missing:
+        written_ids = {object_id for object_id, _ in written}
+        stale = [object_id for object_id, key in index.keys.items()
+                 if object_id not in written_ids and key not in keyed]
+        result.deleted = delete_objects(session, index, stale)
+
+    _expire_loaded(session, {object_id for object_id, _ in updates} | retagged)
+    return result
+
+
+def _link_tags(session: Session, index: TypeIndex, written: list[tuple[int, UpsertRecord]]) -> set[int]:
+    """Add each record's missing tags; returns the ids of objects that gained one."""
+    links = []
+    linked_tags = {}
+    for object_id, record in written:
+        current = index.tags.setdefault(object_id, set())
+        for tag in record.tags:
+            if tag.name not in current:
+                current.add(tag.name)
+                links.append({"object_id": object_id, "tag_id": tag.id})
+                linked_tags[tag.id] = tag
+    if links:
+        session.connection().execute(object_tags.insert(), links)
+        for tag in linked_tags.values():
+            session.expire(tag, ["objects"])
+    return {link["object_id"] for link in links}
+
+
+def delete_objects(session: Session, index: TypeIndex, object_ids: list[int]) -> int:
+    """Delete indexed objects (and their tag links and index rows) in bulk."""
+    if not object_ids:
+        return 0
+    connection = session.connection()
+    table = InventoryObject.__table__
+    remove_object_index(connection, object_ids)
+    for start in range(0, len(object_ids), INDEX_BATCH):
+        chunk = object_ids[start:start + INDEX_BATCH]
+        connection.execute(object_tags.delete().where(object_tags.c.object_id.in_(chunk)))
+        connection.execute(table.delete().where(table.c.id.in_(chunk)))
+
+    for object_id in object_ids:
+        key = index.keys.pop(object_id, None)
+        index.data.pop(object_id, None)
+        index.hashes.pop(object_id, None)
+        index.tags.pop(object_id, None)
+        if key is not None and index.by_key.get(key) == object_id:
+            del index.by_key[key]
+
+    mapper = InventoryObject.__mapper__
+    for object_id in object_ids:
+        obj = session.identity_map.get(mapper.identity_key_from_primary_key((object_id,)))
+        if obj is not None:
+            session.expunge(obj)
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, InventoryTag):
+            session.expire(obj, ["objects"])
+    return len(object_ids)
+
+
+def _expire_loaded(session: Session, object_ids: Iterable[int]):
+    mapper = InventoryObject.__mapper__
+    for object_id in object_ids:
+        obj = session.identity_map.get(mapper.identity_key_from_primary_key((object_id,)))
+        if obj is not None:
+            session.expire(obj)
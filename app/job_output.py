@@ -0,0 +1,197 @@
+"""Chunked, append-only storage for job output lines (job_output_chunks table)."""
+
+import json
+import time
+import zlib
+from datetime import datetime, timezone
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from database import JobOutputChunk, JobRecord
+from models import ACTIVE_JOB_STATUSES
+
+FLUSH_LINES = 200          # flush a running job's buffer every N lines...
+FLUSH_INTERVAL = 1.0       # ...or every M seconds, whichever comes first
+MAX_RESIDENT_LINES = 1000  # lines kept in Job.output once they are safely on disk
+SEGMENT_LINES = 5000       # lines per compressed segment for finished jobs
+
+INTERRUPTED_LINE = "[Interrupted by restart]"
+
+
+def _encode(lines: list[str], compress: bool) -> bytes:
+    raw = json.dumps(lines).encode("utf-8")
+    return zlib.compress(raw) if compress else raw
+
+
+def _decode(chunk) -> list[str]:
+    raw = zlib.decompress(chunk.data) if chunk.compressed else chunk.data
+    return json.loads(raw)
+
+
+def append_chunk(session: Session, job_id: str, start_line: int, lines: list[str],
+                 compress: bool = False) -> JobOutputChunk:
+    """Append a chunk of output lines starting at absolute line `start_line`."""
+    chunk = JobOutputChunk(
+        job_id=job_id,
+        start_line=start_line,
+        line_count=len(lines),
+        compressed=compress,
+        data=_encode(lines, compress),
+    )
+    session.add(chunk)
+    return chunk
+
+
+def count_lines(session: Session, job_id: str) -> int:
+    """Number of lines stored in chunks for a job."""
+    total = (session.query(func.max(JobOutputChunk.start_line + JobOutputChunk.line_count))
+             .filter(JobOutputChunk.job_id == job_id)
+             .scalar())
+    return total or 0
+
+
+def read_chunk_lines(session: Session, job_id: str, offset: int = 0,
+                     limit: int | None = None) -> list[str]:
+    """Read lines [offset, offset + limit) from a job's stored chunks."""
+    end = offset + limit if limit is not None else None
+    query = (session.query(JobOutputChunk)
+             .filter(JobOutputChunk.job_id == job_id,
+                     JobOutputChunk.start_line + JobOutputChunk.line_count > offset))
+    if end is not None:
+        query = query.filter(JobOutputChunk.start_line < end)
+
+    lines: list[str] = []
+    for chunk in query.order_by(JobOutputChunk.start_line).yield_per(16):
+        chunk_lines = _decode(chunk)
+        lo = max(offset - chunk.start_line, 0)
+        hi = len(chunk_lines) if end is None else min(end - chunk.start_line, len(chunk_lines))
+        lines.extend(chunk_lines[lo:hi])
+    return lines
+
+
+def read_record_output(session: Session, record: JobRecord, offset: int = 0,
+                       limit: int | None = None) -> tuple[list[str], int]:
+    """Return (lines, total) for a persisted job.
+
+    Jobs written before chunked storage keep their output as a JSON array in
+    JobRecord.output; everything newer is read from job_output_chunks.
+    """
+    end = offset + limit if limit is not None else None
+    if record.output:
+        output = json.loads(record.output)
+        return output[offset:end], len(output)
+    total = record.output_lines if record.output_lines is not None else count_lines(session, record.id)
+    return read_chunk_lines(session, record.id, offset, limit), total
+
+
+def read_job_output(session: Session, job, offset: int = 0,
+                    limit: int | None = None) -> tuple[list[str], int]:
+    """Return (lines, total) for an in-memory Job, stitching stored and resident lines."""
+    end = offset + limit if limit is not None else None
+    total = job.output_offset + len(job.output)
+    if end is None or end > total:
+        end = total
+    lines: list[str] = []
+    if offset < job.output_offset:
+        lines = read_chunk_lines(session, job.id, offset, min(end, job.output_offset) - offset)
+    resident_start = max(offset, job.output_offset) - job.output_offset
+    if end > job.output_offset:
+        lines.extend(job.output[resident_start:end - job.output_offset])
+    return lines, total
+
+
+def compact_job_output(session: Session, job_id: str) -> int:
+    """Rewrite a finished job's chunks as compressed segments of SEGMENT_LINES.
+
+    Streams through the existing chunks so memory stays bounded by one segment.
+    Returns the total number of lines.
+    """
+    rows = (session.query(JobOutputChunk.id, JobOutputChunk.line_count, JobOutputChunk.compressed)
+            .filter(JobOutputChunk.job_id == job_id)
+            .order_by(JobOutputChunk.start_line)
+            .all())
+    if all(r.compressed for r in rows):
+        return sum(r.line_count for r in rows)
+
+    segment: list[str] = []
+    segment_start = 0
+    for row in rows:
+        # Column-level query keeps the raw chunk out of the identity map
+        chunk = (session.query(JobOutputChunk.data, JobOutputChunk.compressed)
+                 .filter(JobOutputChunk.id == row.id).one())
+        segment.extend(_decode(chunk))
+        session.query(JobOutputChunk).filter(JobOutputChunk.id == row.id).delete(
+            synchronize_session=False)
+        while len(segment) >= SEGMENT_LINES:
+            append_chunk(session, job_id, segment_start, segment[:SEGMENT_LINES], compress=True)
+            segment = segment[SEGMENT_LINES:]
+            segment_start += SEGMENT_LINES
+    if segment:
+        append_chunk(session, job_id, segment_start, segment, compress=True)
+    return segment_start + len(segment)
+
+
+def fail_interrupted_jobs(session: Session) -> list[str]:
+    """Mark jobs a previous process left queued or running as failed.
+
+    Running jobs are upserted as they go, so a crash or restart strands their
+    rows in an active status; nothing in memory will ever finish them. Each
+    gets INTERRUPTED_LINE appended to its output and is compacted like any
+    finished job. Returns the ids of the jobs marked. The caller commits.
+    """
+    records = session.query(JobRecord).filter(JobRecord.status.in_(ACTIVE_JOB_STATUSES)).all()
+    now = datetime.now(timezone.utc).isoformat()
+    for record in records:
+        if record.output:
+            output = json.loads(record.output)
+            output.append(INTERRUPTED_LINE)
+            record.output = json.dumps(output)
+        else:
+            append_chunk(session, record.id, count_lines(session, record.id), [INTERRUPTED_LINE])
+            session.flush()
+            record.output_lines = compact_job_output(session, record.id)
+        record.status = "failed"
+        record.finished_at = record.finished_at or now
+    return [record.id for record in records]
+
+
+class JobOutputWriter:
+    """Batches a running job's new output lines into job_output_chunks.
+
+    Tracks how many lines (absolute index) have been persisted and trims
+    Job.output down to MAX_RESIDENT_LINES once older lines are on disk, so
+    memory per job stays bounded regardless of log length.
+    """
+
+    def __init__(self, job, flushed: int | None = None):
+        self.job = job
+        # A finished job persisted again resumes after the lines already stored
+        self.flushed = job.output_offset if flushed is None else max(flushed, job.output_offset)
+        self.last_flush = time.monotonic()
+
+    def pending(self) -> int:
+        return self.job.output_offset + len(self.job.output) - self.flushed
+
+    def should_flush(self) -> bool:
+        pending = self.pending()
+        if pending >= FLUSH_LINES:
+            return True
+        return pending > 0 and (time.monotonic() - self.last_flush) >= FLUSH_INTERVAL
+
+    def flush(self, session: Session):
+        """Add buffered lines as a new chunk. The caller commits, then calls trim()."""
+        job = self.job
+        self.last_flush = time.monotonic()
+        pending = self.pending()
+        if pending > 0:
+            start = self.flushed - job.output_offset
+            append_chunk(session, job.id, self.flushed, job.output[start:start + pending])
+            self.flushed += pending
+
+    def trim(self):
+        """Drop persisted lines from Job.output beyond MAX_RESIDENT_LINES."""
+        job = self.job
+        excess = len(job.output) - MAX_RESIDENT_LINES
+        if excess > 0:
+            drop = min(excess, self.flushed - job.output_offset)
+            del job.output[:drop]
+            job.output_offset += drop
@@ -0,0 +1,120 @@
+"""Bounded in-memory registry of jobs (AnsibleRunner.jobs)."""
+
+import os
+import sys
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from models import Job, ACTIVE_JOB_STATUSES
+
+# Finished jobs stay resident this long after their final persist...
+FINISHED_JOB_TTL = float(os.environ.get("JOB_REGISTRY_TTL_SECONDS", "900"))
+# ...unless the finished set grows past either budget (least recently used go first)
+MAX_FINISHED_JOBS = int(os.environ.get("JOB_REGISTRY_MAX_FINISHED", "200"))
+MAX_FINISHED_BYTES = int(os.environ.get("JOB_REGISTRY_MAX_BYTES", str(64 * 1024 * 1024)))
+
+JOB_OVERHEAD_BYTES = 1024
+
+
+def estimate_job_bytes(job: Job) -> int:
+    """Rough resident size of a job, dominated by its output lines."""
+    return JOB_OVERHEAD_BYTES + sum(sys.getsizeof(line) for line in job.output)
+
+
+class JobRegistry(MutableMapping):
+    """Dict-like job store that keeps running jobs and evicts finished ones.
+
+    A finished job becomes evictable only once the runner has persisted its
+    final state (mark_persisted), so anything evicted can be read back from
+    the jobs table. Lookups that miss here should fall back to the DB.
+    """
+
+    def __init__(self, ttl: float = FINISHED_JOB_TTL, max_finished: int = MAX_FINISHED_JOBS,
+                 max_bytes: int = MAX_FINISHED_BYTES):
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._jobs: dict[str, Job] = {}
+        # job_id -> (persisted_at, bytes) for finished jobs, least recently used first
+        self._evictable: OrderedDict[str, tuple[float, int]] = OrderedDict()
+        self._evictable_bytes = 0
+
+    def __getitem__(self, job_id: str) -> Job:
+        job = self._jobs[job_id]
+        if job_id in self._evictable:
+            self._evictable.move_to_end(job_id)
+        return job
+
+    def __setitem__(self, job_id: str, job: Job):
+        self._jobs[job_id] = job
+        self._discard(job_id)
+        self.prune()
+
+    def __delitem__(self, job_id: str):
+        del self._jobs[job_id]
+        self._discard(job_id)
+
+    def __iter__(self):
+        return iter(self._jobs)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self._jobs
+
+    # Bulk views don't count as use for LRU purposes
+    def values(self):
+        return self._jobs.values()
+
+    def items(self):
+        return self._jobs.items()
+
+    def mark_persisted(self, job: Job):
+        """Record that the job's current state is in the DB; finished jobs become evictable."""
+        if self._jobs.get(job.id) is not job:
+            return
+        self._discard(job.id)
+        if job.status in ACTIVE_JOB_STATUSES:
+            return
+        size = estimate_job_bytes(job)
+        self._evictable[job.id] = (time.monotonic(), size)
+        self._evictable_bytes += size
+        self.prune()
+
+    def prune(self, now: float | None = None) -> int:
+        """Evict expired finished jobs, then LRU ones until within budget."""
+        now = time.monotonic() if now is None else now
+        before = self.evictions
+        expired = [jid for jid, (persisted_at, _) in self._evictable.items()
+                   if now - persisted_at >= self.ttl]
+        for jid in expired:
+            self._evict(jid)
+        while self._evictable and (len(self._evictable) > self.max_finished
+                                   or self._evictable_bytes > self.max_bytes):
+            self._evict(next(iter(self._evictable)))
+        return self.evictions - before
+
+    def metrics(self) -> dict:
+        running = [j for jid, j in self._jobs.items() if jid not in self._evictable]
+        running_bytes = sum(estimate_job_bytes(j) for j in running)
+        return {
+            "resident_jobs": len(self._jobs),
+            "active_jobs": len(running),
+            "evictable_jobs": len(self._evictable),
+            "resident_bytes": running_bytes + self._evictable_bytes,
+            "evictable_bytes": self._evictable_bytes,
+            "evictions_total": self.evictions,
+        }
+
+    def _discard(self, job_id: str):
+        entry = self._evictable.pop(job_id, None)
+        if entry is not None:
+            self._evictable_bytes -= entry[1]
+
+    def _evict(self, job_id: str):
+        self._discard(job_id)
+        self._jobs.pop(job_id, None)
+        self.evictions += 1
@@ -0,0 +1,44 @@
+"""In-process broadcast hub that wakes SSE viewers when a job produces output."""
+
+import asyncio
+
+
+class JobStreamHub:
+    """Per-job wakeup signal shared by every viewer of that job.
+
+    The producer (AnsibleRunner._run_command) calls publish() after appending
+    output; all viewers waiting on the job's current signal wake at once and
+    read the new lines themselves, so N viewers cost one producer plus N
+    cheap fan-out reads. A job with no viewers has no signal and publish()
+    is a dict miss.
+    """
+
+    def __init__(self):
+        self._signals: dict[str, asyncio.Event] = {}
+
+    def signal(self, job_id: str) -> asyncio.Event:
+        """Return the job's current signal. Grab it *before* reading output so
+        a publish that lands between the read and the wait is not missed."""
+        event = self._signals.get(job_id)
+        if event is None:
+            event = self._signals[job_id] = asyncio.Event()
+        return event
+
+    def publish(self, job_id: str):
+        """Wake every viewer waiting on this job."""
+        event = self._signals.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    @staticmethod
+    async def wait(signal: asyncio.Event, timeout: float) -> bool:
+        """Wait for a publish on `signal`; returns False on timeout."""
+        try:
+            await asyncio.wait_for(signal.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @property
+    def active_jobs(self) -> int:
+        return len(self._signals)
@@ -0,0 +1,200 @@
+"""Opt-in event-loop stall detector.
+
+A heartbeat coroutine measures how late the loop wakes it up (loop lag). A
+watchdog thread notices when the heartbeat is overdue by more than the stall
+threshold and, while the loop is still blocked, captures the loop thread's
+stack and the task it is running (labelled with the request route or the
+background task name). Finished stalls go into a ring buffer, and every lag
+sample into a histogram, both exposed via GET /api/system/loop-stalls.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from datetime import datetime, timezone
+
+from metrics import EVENT_LOOP_LAG_SECONDS, EVENT_LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+LOOP_MONITOR_ENABLED = os.environ.get("LOOP_MONITOR_ENABLED", "").lower() in ("1", "true", "yes")
+LOOP_MONITOR_INTERVAL = float(os.environ.get("LOOP_MONITOR_INTERVAL_MS", "50")) / 1000
+LOOP_STALL_THRESHOLD = float(os.environ.get("LOOP_STALL_THRESHOLD_MS", "100")) / 1000
+LOOP_STALL_HISTORY = int(os.environ.get("LOOP_STALL_HISTORY", "100"))
+
+# Upper bounds (ms) of the loop lag histogram buckets; the last bucket is +Inf
+LAG_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+MAX_STACK_FRAMES = 40
+
+
+class LoopMonitor:
+    """Measures event-loop lag and records what was running during stalls."""
+
+    def __init__(self, interval: float = LOOP_MONITOR_INTERVAL,
+                 threshold: float = LOOP_STALL_THRESHOLD, history: int = LOOP_STALL_HISTORY):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: deque[dict] = deque(maxlen=history)
+        self.stalls_total = 0
+        self.max_lag = 0.0
+        self.lag_buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.lag_sum = 0.0
+        self.lag_count = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._last_beat = 0.0
+        self._capture: tuple[float, dict] | None = None  # (beat it belongs to, details)
+        # task -> ASGI scope of the request it is serving
+        self._requests: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info("Loop monitor started (threshold %.0f ms)", self.threshold * 1000)
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+        logger.info("Loop monitor stopped")
+
+    def track_request(self, scope: dict):
+        """Associate the current task with an HTTP request so stalls can name its route."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._requests[task] = scope
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            with self._lock:
+                beat = self._last_beat
+                self._last_beat = now
+                capture = self._capture
+                self._capture = None
+            lag = max(0.0, now - beat - self.interval)
+            self._observe(lag)
+            if lag >= self.threshold:
+                details = capture[1] if capture and capture[0] == beat else {}
+                self._record_stall(lag, details)
+
+    def _watch(self):
+        """Watchdog thread: snapshot the loop thread while a stall is in progress."""
+        while not self._stop.wait(self.interval / 2):
+            with self._lock:
+                beat = self._last_beat
+                already = self._capture is not None and self._capture[0] == beat
+            if already or time.monotonic() - beat < self.interval + self.threshold:
+                continue
+            details = self._snapshot()
+            with self._lock:
+                if self._last_beat == beat:
+                    self._capture = (beat, details)
+
+    def _snapshot(self) -> dict:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-MAX_STACK_FRAMES:] if frame else []
+        return {"task": self._describe_task(), "stack": [line.rstrip() for line in stack]}
+
+    def _describe_task(self) -> str:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        if task is None:
+            return "(event loop callback)"
+        scope = self._requests.get(task)
+        if scope is not None:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or scope.get("path", "")
+            return f"{scope.get('method', '')} {path}".strip()
+        return task.get_name()
+
+    def _observe(self, lag: float):
+        lag_ms = lag * 1000
+        for i, bound in enumerate(LAG_BUCKETS_MS):
+            if lag_ms <= bound:
+                self.lag_buckets[i] += 1
+                break
+        else:
+            self.lag_buckets[-1] += 1
+        self.lag_sum += lag
+        self.lag_count += 1
+        self.max_lag = max(self.max_lag, lag)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+
+    def _record_stall(self, lag: float, details: dict):
+        self.stalls_total += 1
+        EVENT_LOOP_STALLS.inc()
+        stall = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(lag * 1000, 1),
+            "task": details.get("task", "(not captured)"),
+            "stack": details.get("stack", []),
+        }
+        self.stalls.append(stall)
+        logger.warning("Event loop blocked for %.0f ms in %s", lag * 1000, stall["task"])
+
+    def metrics(self) -> dict:
+        cumulative, buckets = 0, {}
+        for bound, count in zip([*LAG_BUCKETS_MS, "+Inf"], self.lag_buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "enabled": self.running,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "samples": self.lag_count,
+            "lag_seconds_sum": round(self.lag_sum, 6),
+            "lag_ms_buckets": buckets,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls_total": self.stalls_total,
+        }
+
+    def recent_stalls(self) -> list[dict]:
+        """Recorded stalls, newest first."""
+        return list(reversed(self.stalls))
+
+
+class LoopMonitorMiddleware:
+    """ASGI middleware that tells the app's LoopMonitor which request a task serves."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            monitor = getattr(scope["app"].state, "loop_monitor", None) if "app" in scope else None
+            if monitor is not None and monitor.running:
+                monitor.track_request(scope)
+        await self.app(scope, receive, send)
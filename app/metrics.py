@@ -0,0 +1,328 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Counters, gauges and histograms are plain module-level objects updated in
+place (a lock and a dict lookup per update), so no client library or
+external service is needed. GET /metrics renders everything in REGISTRY.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+JOB_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list["_Metric"] = []
+
+    def register(self, metric: "_Metric"):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), registry: MetricsRegistry = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _snapshot(self) -> list[tuple]:
+        with self._lock:
+            return sorted(self._values.items())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        for key, value in self._snapshot():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS, registry: MetricsRegistry = REGISTRY):
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # per-bucket counts (not cumulative), then +Inf, sum
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = entry[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self):
+        for key, (counts, total) in self._snapshot():
+            cumulative = 0
+            for bound, count in zip([*self.buckets, float("inf")], counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+# --- HTTP and database ---
+
+HTTP_REQUESTS_TOTAL = Counter(
+    "clm_http_requests_total", "HTTP requests by route template and status.",
+    ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = Histogram(
+    "clm_http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route"))
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "clm_http_request_db_queries", "SQL statements executed per HTTP request.",
+    ("method", "route"), buckets=QUERY_COUNT_BUCKETS)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "clm_http_request_db_seconds", "Time spent in SQL statements per HTTP request.",
+    ("method", "route"))
+DB_QUERY_SECONDS = Histogram(
+    "clm_db_query_duration_seconds", "Duration of individual SQL statements (all callers).")
+
+# --- Jobs ---
+
+JOB_DURATION_SECONDS = Histogram(
+    "clm_job_duration_seconds", "Run time of executor jobs by service, action and final status.",
+    ("service", "action", "status"), buckets=JOB_BUCKETS)
+JOB_QUEUE_WAIT_SECONDS = Histogram(
+    "clm_job_queue_wait_seconds", "Time jobs spent queued before a worker picked them up.",
+    ("priority",), buckets=JOB_BUCKETS)
+JOB_QUEUE_DEPTH = Gauge("clm_job_queue_depth", "Jobs waiting in the executor queue.", ("priority",))
+JOBS_RUNNING = Gauge("clm_jobs_running", "Jobs currently holding an executor worker.")
+JOB_WORKERS = Gauge("clm_job_workers", "Executor worker limit (JOB_MAX_CONCURRENCY).")
+COMMANDS_RUNNING = Gauge("clm_commands_running", "Playbook and script subprocesses currently running.")
+JOB_REGISTRY_JOBS = Gauge("clm_job_registry_jobs", "Jobs resident in the in-memory registry.")
+JOB_REGISTRY_BYTES = Gauge("clm_job_registry_bytes", "Estimated size of jobs resident in the registry.")
+
+# --- Background work ---
+
+POLLER_TICK_SECONDS = Histogram(
+    "clm_poller_tick_duration_seconds", "Duration of one background poller cycle.",
+    ("poller",), buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300))
+POLLER_TICK_ERRORS = Counter(
+    "clm_poller_tick_errors_total", "Background poller cycles that raised.", ("poller",))
+NOTIFICATION_DISPATCH_SECONDS = Histogram(
+    "clm_notification_dispatch_seconds", "Time to dispatch one notification event to all channels.",
+    ("event_type",))
+PASSWORD_HASH_SECONDS = Histogram(
+    "clm_password_hash_seconds", "Duration of bcrypt hash/verify calls on the hashing pool.", ("op",))
+PASSWORD_HASH_QUEUE_SECONDS = Histogram(
+    "clm_password_hash_queue_seconds", "Time bcrypt calls waited for a hashing pool worker.", ("op",))
+PASSWORD_HASH_PENDING = Gauge(
+    "clm_password_hash_pending", "bcrypt calls queued or running on the hashing pool.")
+PASSWORD_HASH_REJECTED = Counter(
+    "clm_password_hash_rejected_total", "bcrypt calls refused because the hashing queue was full.", ("op",))
+AUDIT_WRITES = Counter(
+    "clm_audit_writes_total", "Audit entries written, in the request (sync) or by the audit writer.",
+    ("mode",))
+AUDIT_BUFFER_PENDING = Gauge(
+    "clm_audit_buffer_pending", "Committed audit entries waiting for the audit writer.")
+AUDIT_FLUSH_SECONDS = Histogram(
+    "clm_audit_flush_seconds", "Duration of one buffered audit batch insert.")
+INVENTORY_SYNC_REQUESTS = Counter(
+    "clm_inventory_sync_requests_total",
+    "Inventory sync requests by source; coalesced ones joined a run already scheduled.",
+    ("source", "outcome"))
+INVENTORY_SYNC_SECONDS = Histogram(
+    "clm_inventory_sync_duration_seconds", "Duration of orchestrated inventory sync runs.", ("source",))
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "clm_event_loop_lag_seconds", "Event-loop lag samples (only while LOOP_MONITOR_ENABLED).")
+EVENT_LOOP_STALLS = Counter(
+    "clm_event_loop_stalls_total", "Event-loop stalls past the loop monitor threshold.")
+
+
+@contextmanager
+def poller_tick(poller: str):
+    """Time one poller cycle; exceptions are counted and re-raised."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        POLLER_TICK_ERRORS.inc(poller=poller)
+        raise
+    finally:
+        POLLER_TICK_SECONDS.observe(time.perf_counter() - started, poller=poller)
+
+
+def update_job_gauges(runner):
+    """Refresh scrape-time job gauges from the runner's executor and registry."""
+    stats = runner.executor.metrics()
+    for priority, depth in stats["queue_depth_by_priority"].items():
+        JOB_QUEUE_DEPTH.set(depth, priority=priority)
+    JOBS_RUNNING.set(stats["running"])
+    JOB_WORKERS.set(stats["max_workers"])
+    registry = runner.jobs.metrics()
+    JOB_REGISTRY_JOBS.set(registry["resident_jobs"])
+    JOB_REGISTRY_BYTES.set(registry["resident_bytes"])
+
+
+# --- Request instrumentation ---
+
+class _RequestDBStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Set for the duration of an HTTP request; sync handlers run in a threadpool
+# with a copy of the context, so they update the same stats object
+_request_db: contextvars.ContextVar[_RequestDBStats | None] = contextvars.ContextVar(
+    "request_db_stats", default=None)
+
+_sqlalchemy_instrumented = False
+
+
+def instrument_sqlalchemy():
+    """Time every SQL statement on every engine; idempotent."""
+    global _sqlalchemy_instrumented
+    if _sqlalchemy_instrumented:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("clm_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("clm_query_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        DB_QUERY_SECONDS.observe(elapsed)
+        stats = _request_db.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+
+    _sqlalchemy_instrumented = True
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and SQL usage per route template.
+
+    Requests that match no API route are labelled "unmatched" to keep
+    label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = _RequestDBStats()
+        token = _request_db.set(stats)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db.reset(token)
+            method = scope.get("method", "")
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUESTS_TOTAL.inc(method=method, route=route, status=status)
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=method, route=route)
+            HTTP_REQUEST_DB_QUERIES.observe(stats.queries, method=method, route=route)
+            HTTP_REQUEST_DB_SECONDS.observe(stats.seconds, method=method, route=route)
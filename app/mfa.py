@@ -1,3 +1,5 @@
+import hashlib
+import hmac
 import secrets
 import pyotp
 import qrcode
@@ -5,7 +7,7 @@ import io
 import base64
 from cryptography.fernet import Fernet
 from passlib.context import CryptContext
-from auth import get_secret_key
+from auth import get_secret_key, run_hashing
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -78,3 +80,26 @@ def hash_backup_code(code: str) -> str:
 def verify_backup_code(plain: str, hashed: str) -> bool:
     """Verify a backup code against its hash."""
     return pwd_context.verify(plain.upper(), hashed)
+
+
+def backup_code_lookup(code: str) -> str:
+    """Keyed index for a backup code, stored alongside its bcrypt hash.
+
+    Lets verification fetch the one candidate row instead of trying every
+    hash. Truncated so the index alone can't serve as a fast verifier.
+    """
+    key = hashlib.sha256(b"mfa-backup-code:" + bytes.fromhex(get_secret_key())).digest()
+    return hmac.new(key, code.strip().upper().encode(), hashlib.sha256).hexdigest()[:16]
+
+
+async def hash_backup_codes_async(codes: list[str]) -> list[str]:
+    """bcrypt-hash backup codes on the hashing pool.
+
+    The whole batch is one pool task, so an MFA setup takes a single slot of
+    PASSWORD_HASH_MAX_PENDING rather than one per code and can't crowd out logins.
+    """
+    return await run_hashing("hash_backup_codes", lambda: [hash_backup_code(c) for c in codes])
+
+
+async def verify_backup_code_async(plain: str, hashed: str) -> bool:
+    return await run_hashing("verify_backup_code", verify_backup_code, plain, hashed)
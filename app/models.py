@@ -53,6 +53,10 @@ class Service(BaseModel):
     filename: str
 
 
+# Job statuses that mean "not finished yet" ("queued" = waiting for an executor slot)
+ACTIVE_JOB_STATUSES = ("queued", "running")
+
+
 class Job(BaseModel):
     id: str
     service: str
@@ -62,6 +66,7 @@ class Job(BaseModel):
     started_at: str = ""
     finished_at: Optional[str] = None
     output: list[str] = []
+    output_offset: int = 0  # absolute index of output[0]; earlier lines live in job_output_chunks
     deployment_id: Optional[str] = None
     user_id: Optional[int] = None
     username: Optional[str] = None
@@ -369,6 +374,8 @@ class BulkServiceACLRequest(BaseModel):
 class BulkServiceActionRequest(BaseModel):
     """Request for bulk service operations (stop, deploy)."""
     service_names: list[str] = Field(max_length=MAX_BULK_ITEMS)
+    parallelism: int | None = Field(None, ge=1, le=MAX_BULK_ITEMS)  # default BULK_PARALLELISM
+    fail_fast: bool = False
 
     @field_validator("service_names")
     @classmethod
@@ -390,6 +397,8 @@ class BulkInventoryTagRequest(BaseModel):
 class BulkInventoryActionRequest(BaseModel):
     """Request for bulk action execution on inventory objects."""
     object_ids: list[int] = Field(max_length=MAX_BULK_ITEMS)
+    parallelism: int | None = Field(None, ge=1, le=MAX_BULK_ITEMS)
+    fail_fast: bool = False
 
 class BulkActionResult(BaseModel):
     """Response for bulk operations with partial success support."""
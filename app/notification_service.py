@@ -1,11 +1,13 @@
 import html
 import json
 import logging
+import time
 from datetime import timedelta
 from database import (
     SessionLocal, NotificationRule, Notification, NotificationChannel,
     User, user_roles, utcnow,
 )
+from metrics import NOTIFICATION_DISPATCH_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +52,7 @@ async def notify(event_type: str, context: dict):
             - service_name: Service name (for filtering)
             - status: Status string (for filtering)
     """
+    started = time.perf_counter()
     session = SessionLocal()
     try:
         rules = (
@@ -92,6 +95,7 @@ async def notify(event_type: str, context: dict):
         logger.exception("Failed to dispatch notifications for event %s", event_type)
     finally:
         session.close()
+        NOTIFICATION_DISPATCH_SECONDS.observe(time.perf_counter() - started, event_type=event_type)
 
 
 def _matches_filters(filters_json: str | None, context: dict) -> bool:
@@ -1,4 +1,6 @@
+import os
 import time
+from dataclasses import dataclass, field
 from functools import wraps
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
@@ -102,10 +104,18 @@ STATIC_PERMISSION_DEFS = [
     ("files.manage", "files", "Manage Files", "Manage all users' files (admin)"),
 ]
 
-# In-memory permission cache: user_id -> (permissions_set, timestamp)
-_cache: dict[int, tuple[set[str], float]] = {}
+# In-memory authorization cache: user_id -> (AuthzSnapshot, timestamp).
+# Entries are dropped when the authz version in app_metadata moves on; the
+# TTL only bounds staleness after out-of-band DB edits.
+_cache: dict[int, tuple["AuthzSnapshot", float]] = {}
 _CACHE_TTL = 60.0
 
+AUTHZ_VERSION_KEY = "authz_version"
+# How long a process trusts its last read of the authz version before
+# re-reading it, i.e. the worst-case delay for changes made by another process
+AUTHZ_VERSION_CHECK_INTERVAL = float(os.environ.get("AUTHZ_VERSION_CHECK_INTERVAL", "1"))
+_version = {"value": None, "checked": 0.0}
+
 
 def generate_inventory_permissions(type_configs: list[dict]) -> list[tuple]:
     """Generate permission definitions from inventory type configs.
@@ -191,36 +201,156 @@ def seed_permissions(session: Session, type_configs: list[dict] | None = None):
     all_perms = session.query(Permission).all()
     super_admin.permissions = all_perms
     session.flush()
+    bump_authz_version(session)
+
+
+@dataclass(frozen=True)
+class CredentialRule:
+    credential_type: str
+    scope_type: str
+    scope_value: str | None
+    require_personal_key: bool
+
+
+@dataclass(frozen=True)
+class AuthzSnapshot:
+    """Everything needed to authorize one user, compiled from the DB in one pass.
+
+    Per-permission maps are keyed by the ACL permission suffix ("view",
+    "deploy", ...) and only contain rules for the user's own roles.
+    """
+    user_id: int
+    version: int
+    role_ids: frozenset[int] = frozenset()
+    permissions: frozenset[str] = frozenset()
+    # Services with at least one ServiceACL row (for any role)
+    acl_services: frozenset[str] = frozenset()
+    service_grants: dict[str, frozenset[str]] = field(default_factory=dict)
+    object_deny: dict[str, frozenset[int]] = field(default_factory=dict)
+    object_allow: dict[str, frozenset[int]] = field(default_factory=dict)
+    tag_grants: dict[str, frozenset[int]] = field(default_factory=dict)
+    credential_rules: tuple[CredentialRule, ...] = ()
+
+
+def _group(pairs) -> dict:
+    grouped: dict = {}
+    for key, value in pairs:
+        grouped.setdefault(key, set()).add(value)
+    return {key: frozenset(values) for key, values in grouped.items()}
+
+
+def _compile_snapshot(session: Session, user_id: int, version: int) -> AuthzSnapshot | None:
+    from database import (
+        CredentialAccessRule, ObjectACL, Permission, ServiceACL, TagPermission, User,
+    )
+    if session.query(User.id).filter_by(id=user_id).first() is None:
+        return None
+
+    role_ids = frozenset(row[0] for row in session.query(user_roles.c.role_id).filter(
+        user_roles.c.user_id == user_id))
+    if not role_ids:
+        return AuthzSnapshot(user_id=user_id, version=version)
+
+    codenames = frozenset(row[0] for row in session.query(Permission.codename).join(
+        role_permissions, role_permissions.c.permission_id == Permission.id
+    ).filter(role_permissions.c.role_id.in_(role_ids)))
+    if "*" in codenames:
+        # Super-admins bypass every other layer
+        return AuthzSnapshot(user_id=user_id, version=version, role_ids=role_ids, permissions=codenames)
+
+    acl_rows = session.query(ServiceACL.service_name, ServiceACL.role_id, ServiceACL.permission).all()
+    object_rules = session.query(ObjectACL.permission, ObjectACL.object_id, ObjectACL.effect).filter(
+        ObjectACL.role_id.in_(role_ids)).all()
+    tag_rows = session.query(TagPermission.permission, TagPermission.tag_id).filter(
+        TagPermission.role_id.in_(role_ids)).all()
+    credential_rules = session.query(
+        CredentialAccessRule.credential_type, CredentialAccessRule.scope_type,
+        CredentialAccessRule.scope_value, CredentialAccessRule.require_personal_key,
+    ).filter(CredentialAccessRule.role_id.in_(role_ids)).order_by(CredentialAccessRule.id).all()
+
+    return AuthzSnapshot(
+        user_id=user_id,
+        version=version,
+        role_ids=role_ids,
+        permissions=codenames,
+        acl_services=frozenset(name for name, _, _ in acl_rows),
+        service_grants=_group((name, perm) for name, role_id, perm in acl_rows if role_id in role_ids),
+        object_deny=_group((perm, oid) for perm, oid, effect in object_rules if effect == "deny"),
+        object_allow=_group((perm, oid) for perm, oid, effect in object_rules if effect == "allow"),
+        tag_grants=_group(tag_rows),
+        credential_rules=tuple(CredentialRule(*row) for row in credential_rules),
+    )
+
+
+def get_authz_version(session: Session | None = None) -> int:
+    """Current global authz version, re-read at most every AUTHZ_VERSION_CHECK_INTERVAL.
+
+    Without a session, one is opened only when the value has to be re-read.
+    """
+    now = time.monotonic()
+    if _version["value"] is None or now - _version["checked"] >= AUTHZ_VERSION_CHECK_INTERVAL:
+        from database import AppMetadata, SessionLocal
+        own_session = session is None
+        if own_session:
+            session = SessionLocal()
+        try:
+            _version["value"] = int(AppMetadata.get(session, AUTHZ_VERSION_KEY) or 0)
+        finally:
+            if own_session:
+                session.close()
+        _version["checked"] = now
+    return _version["value"]
+
+
+def bump_authz_version(session: Session):
+    """Record a role, permission or ACL change so every process recompiles snapshots.
+
+    Call in the same transaction as the change. Local snapshots are dropped
+    now and again once the transaction commits, so none compiled from the
+    pre-commit state survive.
+    """
+    from database import AppMetadata
+    from sqlalchemy import event
+
+    AppMetadata.set(session, AUTHZ_VERSION_KEY, int(AppMetadata.get(session, AUTHZ_VERSION_KEY) or 0) + 1)
+    invalidate_cache()
+    if not session.info.get("authz_bump_pending"):
+        session.info["authz_bump_pending"] = True
+
+        def _after_commit(session):
+            session.info.pop("authz_bump_pending", None)
+            invalidate_cache()
+
+        event.listen(session, "after_commit", _after_commit, once=True)
 
 
 def invalidate_cache(user_id: int | None = None):
-    """Clear permission cache for a user or all users."""
+    """Clear this process's authz snapshots for a user or all users."""
     if user_id is not None:
         _cache.pop(user_id, None)
     else:
         _cache.clear()
+        _version["value"] = None
 
 
-def get_user_permissions(session: Session, user_id: int) -> set[str]:
-    """Get all permission codenames for a user via their roles. Uses in-memory cache."""
+def get_authz_snapshot(session: Session, user_id: int) -> AuthzSnapshot:
+    """Compiled authorization state for a user, cached until the authz version changes."""
     now = time.time()
+    version = get_authz_version(session)
     cached = _cache.get(user_id)
-    if cached and (now - cached[1]) < _CACHE_TTL:
+    if cached and cached[0].version == version and (now - cached[1]) < _CACHE_TTL:
         return cached[0]
 
-    # Query all codenames through user_roles -> role_permissions -> permissions
-    from database import User
-    user = session.query(User).filter_by(id=user_id).first()
-    if not user:
-        return set()
+    snapshot = _compile_snapshot(session, user_id, version)
+    if snapshot is None:
+        return AuthzSnapshot(user_id=user_id, version=version)
+    _cache[user_id] = (snapshot, now)
+    return snapshot
 
-    perms = set()
-    for role in user.roles:
-        for perm in role.permissions:
-            perms.add(perm.codename)
 
-    _cache[user_id] = (perms, now)
-    return perms
+def get_user_permissions(session: Session, user_id: int) -> frozenset[str]:
+    """Get all permission codenames for a user via their roles. Uses in-memory cache."""
+    return get_authz_snapshot(session, user_id).permissions
 
 
 # Map legacy permission codenames to their inventory-based equivalents
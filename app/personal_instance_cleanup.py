@@ -1,16 +1,16 @@
 """
 Personal Instance TTL cleanup.
 
-Scans inventory objects tagged with 'personal-instance' and checks if
-their TTL has expired based on creation time + pi-ttl tag value.
-Triggers destroy jobs for expired hosts.
+Looks up inventory objects tagged with 'personal-instance' whose TTL has
+expired (creation time + pi-ttl tag value) in the personal_instances
+projection. Triggers destroy jobs for expired hosts.
 """
 
-import json
 import logging
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
 
-from database import SessionLocal, InventoryType, InventoryObject, JobRecord
+from database import SessionLocal, PersonalInstance
+from models import ACTIVE_JOB_STATUSES
 import yaml
 
 logger = logging.getLogger("personal_instance_cleanup")
@@ -60,6 +60,7 @@ async def check_and_cleanup_expired(runner) -> list[str]:
                         {"hostname": hostname},
                         user_id=None,
                         username="system:ttl-cleanup",
+                        instance=hostname,
                     )
                     destroyed.append(hostname)
                 except Exception:
@@ -97,68 +98,43 @@ def _load_personal_config(service_name: str) -> dict | None:
 
 
 def _find_expired_hosts(session, runner) -> list[dict]:
-    """Find all personal instances whose TTL has expired."""
-    inv_type = session.query(InventoryType).filter_by(slug="server").first()
-    if not inv_type:
-        return []
+    """Find all personal instances whose TTL has expired.
 
+    expires_at is kept on the personal_instances projection (created_at +
+    pi-ttl), so this is one indexed range query instead of a scan of every
+    tagged server. Hosts with no TTL or TTL=0 have no expires_at.
+    """
     now = datetime.now(timezone.utc)
-    expired = []
-
-    for obj in session.query(InventoryObject).filter_by(type_id=inv_type.id).all():
-        data = json.loads(obj.data)
-        vultr_tags = data.get("vultr_tags", [])
+    rows = (
+        session.query(PersonalInstance)
+        .filter(
+            PersonalInstance.expires_at.isnot(None),
+            PersonalInstance.expires_at <= now.replace(tzinfo=None),
+            PersonalInstance.ttl_hours > 0,
+        )
+        .order_by(PersonalInstance.expires_at)
+        .all()
+    )
 
-        if "personal-instance" not in vultr_tags:
-            continue
-
-        # Extract TTL, owner, and service from tags
-        ttl_hours = None
-        owner = None
-        service = None
-        for tag in vultr_tags:
-            if tag.startswith("pi-ttl:"):
-                try:
-                    ttl_hours = int(tag.split(":", 1)[1])
-                except ValueError:
-                    pass
-            elif tag.startswith("pi-user:"):
-                owner = tag.split(":", 1)[1]
-            elif tag.startswith("pi-service:"):
-                service = tag.split(":", 1)[1]
-
-        # Skip hosts with no TTL or TTL=0 (never expire)
-        if not ttl_hours or ttl_hours == 0:
+    expired = []
+    for instance in rows:
+        hostname = instance.hostname
+        if not hostname or not instance.service:
             continue
 
-        # Use inventory object created_at as the creation timestamp
-        created_at = obj.created_at
-        if not created_at:
+        # Skip if there's already a running destroy job for this host
+        if _has_running_destroy_job(runner, hostname):
+            logger.debug("Skipping %s — destroy job already running", hostname)
             continue
 
-        # Make created_at timezone-aware if needed
-        if created_at.tzinfo is None:
-            created_at = created_at.replace(tzinfo=timezone.utc)
-
-        expires_at = created_at + timedelta(hours=ttl_hours)
-        if now >= expires_at:
-            hostname = data.get("hostname", "")
-            if not hostname or not service:
-                continue
-
-            # Skip if there's already a running destroy job for this host
-            if _has_running_destroy_job(runner, hostname):
-                logger.debug("Skipping %s — destroy job already running", hostname)
-                continue
-
-            expired.append({
-                "hostname": hostname,
-                "owner": owner,
-                "service": service,
-                "ttl_hours": ttl_hours,
-                "created_at": created_at.isoformat(),
-                "expired_at": expires_at.isoformat(),
-            })
+        expired.append({
+            "hostname": hostname,
+            "owner": instance.owner,
+            "service": instance.service,
+            "ttl_hours": instance.ttl_hours,
+            "created_at": instance.created_at.replace(tzinfo=timezone.utc).isoformat(),
+            "expired_at": instance.expires_at.replace(tzinfo=timezone.utc).isoformat(),
+        })
 
     return expired
 
@@ -167,7 +143,7 @@ def _has_running_destroy_job(runner, hostname: str) -> bool:
     """Check if there's already a running job for destroying this specific host."""
     for job in runner.jobs.values():
         if (
-            job.status == "running"
+            job.status in ACTIVE_JOB_STATUSES
             and job.script == "destroy"
             and job.inputs.get("hostname") == hostname
         ):
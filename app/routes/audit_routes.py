@@ -4,14 +4,17 @@ import json
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from database import AuditLog
 from permissions import require_permission
-from db_session import get_db_session
-from audit import log_action
+from db_session import get_db_session, get_read_session
+from audit import count_entries, log_action, search_filter
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
+EXPORT_BATCH = 500
+
 
 def _utc_iso(dt: datetime | None) -> str | None:
     """Serialize a datetime as ISO 8601 with explicit UTC offset."""
@@ -22,11 +25,6 @@ def _utc_iso(dt: datetime | None) -> str | None:
     return dt.isoformat()
 
 
-def _escape_like(value: str) -> str:
-    """Escape SQL LIKE wildcard characters."""
-    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
-
-
 def _build_audit_query(session, action=None, action_prefix=None, username=None,
                        user_id=None, date_from=None, date_to=None, search=None):
     """Build a filtered AuditLog query. Used by both list and export endpoints."""
@@ -37,8 +35,10 @@ def _build_audit_query(session, action=None, action_prefix=None, username=None,
     if action:
         query = query.filter(AuditLog.action == action)
     if action_prefix:
-        safe_prefix = _escape_like(action_prefix)
-        query = query.filter(AuditLog.action.like(f"{safe_prefix}.%", escape="\\"))
+        # A range rather than LIKE so ix_audit_log_action_created applies
+        # ('/' sorts right after '.')
+        query = query.filter(AuditLog.action >= f"{action_prefix}.",
+                             AuditLog.action < f"{action_prefix}/")
     if username:
         query = query.filter(AuditLog.username == username)
     if user_id is not None:
@@ -50,17 +50,20 @@ def _build_audit_query(session, action=None, action_prefix=None, username=None,
         dt_to = datetime.fromisoformat(date_to.replace(" ", "+"))
         query = query.filter(AuditLog.created_at <= dt_to)
     if search:
-        safe_search = _escape_like(search)
-        term = f"%{safe_search}%"
-        query = query.filter(
-            (AuditLog.action.ilike(term, escape="\\"))
-            | (AuditLog.resource.ilike(term, escape="\\"))
-            | (AuditLog.details.ilike(term, escape="\\"))
-        )
+        query = query.filter(search_filter(search))
 
     return query
 
 
+def _active_filters(**filters) -> dict:
+    """The filters a request actually set, as keyword arguments for _build_audit_query."""
+    return {k: v for k, v in filters.items() if v is not None}
+
+
+def _filter_key(filters: dict) -> tuple:
+    return tuple(sorted(filters.items()))
+
+
 @router.get("/export")
 async def export_audit_log(
     request: Request,
@@ -76,36 +79,43 @@ async def export_audit_log(
     date_to: str | None = Query(None, max_length=50),
     search: str | None = Query(None, max_length=500),
 ):
-    query = _build_audit_query(
-        session, action=action, action_prefix=action_prefix,
-        username=username, user_id=user_id, date_from=date_from,
-        date_to=date_to, search=search,
+    filters = _active_filters(
+        action=action, action_prefix=action_prefix, username=username, user_id=user_id,
+        date_from=date_from, date_to=date_to, search=search,
     )
+    query = _build_audit_query(session, **filters)
 
-    total = query.count()
-    entries = query.limit(limit).all()
-
-    filters = {
-        k: v for k, v in {
-            "action": action, "action_prefix": action_prefix,
-            "username": username, "user_id": user_id,
-            "date_from": date_from, "date_to": date_to,
-            "search": search,
-        }.items() if v is not None
-    }
+    # Entries written from here on, including this export's own, are left out
+    max_id = session.query(func.max(AuditLog.id)).scalar() or 0
+    count = min(count_entries(session, query, _filter_key(filters)), limit)
     log_action(
         session, user.id, user.username, "audit.export",
-        details={"format": format, "filters": filters, "count": len(entries)},
+        details={"format": format, "filters": filters, "count": count},
         ip_address=request.client.host if request.client else None,
     )
     session.commit()
 
+    def _entries():
+        # Stream in batches on a session of our own; the request's session
+        # may be closed before the response body is sent
+        from database import ReadSessionLocal
+        stream_session = ReadSessionLocal()
+        try:
+            stream_query = (
+                _build_audit_query(stream_session, **filters)
+                .filter(AuditLog.id <= max_id)
+                .limit(limit)
+            )
+            yield from stream_query.yield_per(EXPORT_BATCH)
+        finally:
+            stream_session.close()
+
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
 
     if format == "json":
         def _generate_json():
             yield "[\n"
-            for i, entry in enumerate(entries):
+            for i, entry in enumerate(_entries()):
                 row = {
                     "id": entry.id,
                     "timestamp": _utc_iso(entry.created_at),
@@ -134,7 +144,7 @@ async def export_audit_log(
         output.seek(0)
         output.truncate(0)
 
-        for entry in entries:
+        for entry in _entries():
             writer.writerow([
                 entry.id,
                 _utc_iso(entry.created_at) or "",
@@ -158,7 +168,7 @@ async def export_audit_log(
 @router.get("")
 async def list_audit_log(
     user=Depends(require_permission("system.audit_log")),
-    session: Session = Depends(get_db_session),
+    session: Session = Depends(get_read_session),
     cursor: int | None = None,
     per_page: int = Query(50, ge=1, le=200),
     action: str | None = Query(None, max_length=200),
@@ -169,13 +179,13 @@ async def list_audit_log(
     date_to: str | None = Query(None, max_length=50),
     search: str | None = Query(None, max_length=500),
 ):
-    query = _build_audit_query(
-        session, action=action, action_prefix=action_prefix,
-        username=username, user_id=user_id, date_from=date_from,
-        date_to=date_to, search=search,
+    filters = _active_filters(
+        action=action, action_prefix=action_prefix, username=username, user_id=user_id,
+        date_from=date_from, date_to=date_to, search=search,
     )
+    query = _build_audit_query(session, **filters)
 
-    total = query.count()
+    total = count_entries(session, query, _filter_key(filters))
 
     if cursor:
         query = query.filter(AuditLog.id < cursor)
@@ -206,7 +216,7 @@ async def list_audit_log(
 @router.get("/filters")
 async def audit_filter_options(
     user=Depends(require_permission("system.audit_log")),
-    session: Session = Depends(get_db_session),
+    session: Session = Depends(get_read_session),
 ):
     usernames = [
         r[0]
@@ -11,15 +11,15 @@ from models import (
     VerifyIdentityRequest,
 )
 from auth import (
-    hash_password, verify_password, create_access_token,
+    hash_password_async, verify_password_async, create_access_token,
     get_current_user, is_setup_complete, write_vault_password_file,
     validate_invite_token, validate_reset_token,
-    create_password_reset_token,
+    create_password_reset_token, rotate_signing_key,
 )
 from database import (
     SessionLocal, User, Role, AppMetadata, InviteToken, PasswordResetToken,
 )
-from permissions import get_user_permissions, seed_permissions
+from permissions import get_user_permissions, require_permission, seed_permissions
 from db_session import get_db_session
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -62,7 +62,7 @@ async def setup(req: SetupRequest, session: Session = Depends(get_db_session)):
 
     user = User(
         username=req.username,
-        password_hash=hash_password(req.password),
+        password_hash=await hash_password_async(req.password),
         is_active=True,
         invite_accepted_at=datetime.now(timezone.utc),
     )
@@ -93,7 +93,7 @@ async def login(req: LoginRequest, request: Request, session: Session = Depends(
         raise HTTPException(status_code=400, detail="Setup not completed")
 
     user = session.query(User).filter_by(username=req.username, is_active=True).first()
-    if not user or not user.password_hash or not verify_password(req.password, user.password_hash):
+    if not user or not user.password_hash or not await verify_password_async(req.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Check if MFA is enabled
@@ -160,9 +160,9 @@ async def update_me(req: UpdateProfileRequest, user: User = Depends(get_current_
 async def change_password(req: ChangePasswordRequest, user: User = Depends(get_current_user),
                           session: Session = Depends(get_db_session)):
     db_user = session.query(User).filter_by(id=user.id).first()
-    if not db_user or not verify_password(req.current_password, db_user.password_hash):
+    if not db_user or not await verify_password_async(req.current_password, db_user.password_hash):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
-    db_user.password_hash = hash_password(req.new_password)
+    db_user.password_hash = await hash_password_async(req.new_password)
     session.flush()
     return {"status": "ok"}
 
@@ -266,7 +266,7 @@ async def accept_invite(req: AcceptInviteRequest, request: Request, session: Ses
     if not user:
         raise HTTPException(status_code=400, detail="Invalid or expired invite token")
 
-    user.password_hash = hash_password(req.password)
+    user.password_hash = await hash_password_async(req.password)
     user.is_active = True
     user.invite_accepted_at = datetime.now(timezone.utc)
     if req.display_name:
@@ -314,7 +314,7 @@ async def reset_password(req: PasswordResetConfirm, request: Request, session: S
     if not user:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
 
-    user.password_hash = hash_password(req.password)
+    user.password_hash = await hash_password_async(req.password)
 
     # Mark token as used
     reset = session.query(PasswordResetToken).filter_by(token=req.token).first()
@@ -352,7 +352,6 @@ async def verify_identity(req: VerifyIdentityRequest,
     """Verify current user's identity via password or MFA code.
     Used as a re-authentication gate before sensitive operations."""
     from database import UserMFA
-    from auth import verify_password
 
     verified = False
 
@@ -368,7 +367,7 @@ async def verify_identity(req: VerifyIdentityRequest,
     if not verified and req.password:
         db_user = session.query(User).filter_by(id=user.id).first()
         if db_user:
-            verified = verify_password(req.password, db_user.password_hash)
+            verified = await verify_password_async(req.password, db_user.password_hash)
 
     if not verified:
         raise HTTPException(status_code=400, detail="Invalid password or code")
@@ -416,7 +415,9 @@ async def mfa_confirm(req: MFAConfirmRequest,
                       user: User = Depends(get_current_user),
                       session: Session = Depends(get_db_session)):
     from database import UserMFA, MFABackupCode
-    from mfa import decrypt_totp_secret, verify_totp, generate_backup_codes, hash_backup_code
+    from mfa import (
+        decrypt_totp_secret, verify_totp, generate_backup_codes, backup_code_lookup, hash_backup_codes_async,
+    )
 
     mfa = session.query(UserMFA).filter_by(user_id=user.id).first()
     if not mfa or not mfa.totp_secret_encrypted:
@@ -434,10 +435,11 @@ async def mfa_confirm(req: MFAConfirmRequest,
 
     # Generate backup codes
     codes = generate_backup_codes()
-    for code in codes:
+    for code, code_hash in zip(codes, await hash_backup_codes_async(codes)):
         session.add(MFABackupCode(
             user_id=user.id,
-            code_hash=hash_backup_code(code),
+            code_hash=code_hash,
+            lookup=backup_code_lookup(code),
         ))
     session.flush()
 
@@ -463,7 +465,7 @@ async def mfa_verify(req: MFAVerifyRequest, request: Request,
                      session: Session = Depends(get_db_session)):
     from auth import validate_mfa_token, create_access_token
     from database import UserMFA, MFABackupCode
-    from mfa import decrypt_totp_secret, verify_totp, verify_backup_code
+    from mfa import decrypt_totp_secret, verify_totp, backup_code_lookup, verify_backup_code_async
 
     payload = validate_mfa_token(req.mfa_token)
     if not payload:
@@ -487,13 +489,17 @@ async def mfa_verify(req: MFAVerifyRequest, request: Request,
     if code.isdigit() and len(code) == 6:
         verified = verify_totp(secret, code)
 
-    # If TOTP didn't match, try backup codes
+    # If TOTP didn't match, try backup codes: the keyed lookup finds the one
+    # candidate; codes issued before it existed (lookup NULL) are tried in turn
     if not verified:
-        backup_codes = session.query(MFABackupCode).filter_by(
-            user_id=user.id, is_used=False
+        from sqlalchemy import or_
+        backup_codes = session.query(MFABackupCode).filter(
+            MFABackupCode.user_id == user.id,
+            MFABackupCode.is_used == False,
+            or_(MFABackupCode.lookup == backup_code_lookup(code), MFABackupCode.lookup.is_(None)),
         ).all()
         for bc in backup_codes:
-            if verify_backup_code(code, bc.code_hash):
+            if await verify_backup_code_async(code, bc.code_hash):
                 bc.is_used = True
                 bc.used_at = datetime.now(timezone.utc)
                 verified = True
@@ -527,7 +533,6 @@ async def mfa_disable(req: MFADisableRequest,
                       session: Session = Depends(get_db_session)):
     from database import UserMFA, MFABackupCode
     from mfa import decrypt_totp_secret, verify_totp
-    from auth import verify_password
 
     mfa = session.query(UserMFA).filter_by(user_id=user.id, is_enabled=True).first()
     if not mfa:
@@ -540,7 +545,7 @@ async def mfa_disable(req: MFADisableRequest,
         verified = verify_totp(secret, req.code.strip())
     if not verified and req.password:
         db_user = session.query(User).filter_by(id=user.id).first()
-        verified = verify_password(req.password, db_user.password_hash)
+        verified = await verify_password_async(req.password, db_user.password_hash)
     if not verified:
         raise HTTPException(status_code=400, detail="Invalid code or password")
 
@@ -567,7 +572,7 @@ async def mfa_disable(req: MFADisableRequest,
 async def mfa_regenerate_backup_codes(user: User = Depends(get_current_user),
                                        session: Session = Depends(get_db_session)):
     from database import UserMFA, MFABackupCode
-    from mfa import generate_backup_codes, hash_backup_code
+    from mfa import generate_backup_codes, backup_code_lookup, hash_backup_codes_async
 
     mfa = session.query(UserMFA).filter_by(user_id=user.id, is_enabled=True).first()
     if not mfa:
@@ -578,11 +583,25 @@ async def mfa_regenerate_backup_codes(user: User = Depends(get_current_user),
 
     # Generate new ones
     codes = generate_backup_codes()
-    for code in codes:
+    for code, code_hash in zip(codes, await hash_backup_codes_async(codes)):
         session.add(MFABackupCode(
             user_id=user.id,
-            code_hash=hash_backup_code(code),
+            code_hash=code_hash,
+            lookup=backup_code_lookup(code),
         ))
     session.flush()
 
     return {"backup_codes": codes}
+
+
+@router.post("/signing-keys/rotate")
+async def rotate_jwt_signing_key(request: Request,
+                                 user: User = Depends(require_permission("system.settings.edit")),
+                                 session: Session = Depends(get_db_session)):
+    """Sign new tokens with a fresh key; tokens signed with recent keys stay valid."""
+    from audit import log_action
+    kid = rotate_signing_key(session)
+    log_action(session, user.id, user.username, "auth.signing_key.rotate", "auth",
+               details={"kid": kid},
+               ip_address=request.client.host if request.client else None)
+    return {"kid": kid}
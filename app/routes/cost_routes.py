@@ -12,7 +12,7 @@ from routes.personal_instance_routes import (
     PI_TAG,
     PI_USER_TAG_PREFIX,
 )
-from db_session import get_db_session
+from db_session import AsyncDBSession, get_async_read_session, get_db_session
 from audit import log_action
 
 _EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
@@ -83,25 +83,25 @@ def _get_cost_data(session):
     return computed
 
 
-@router.get("")
-async def get_costs(user: User = Depends(require_permission("costs.view"))):
-    session = SessionLocal()
-    try:
-        data = _get_cost_data(session)
+def _costs_with_snapshots(session) -> dict:
+    data = _get_cost_data(session)
 
-        # Add snapshot storage cost info
-        snapshots = session.query(Snapshot).filter(Snapshot.status == "complete").all()
-        total_snapshot_gb = sum(s.size_gb or 0 for s in snapshots)
-        snapshot_monthly_cost = total_snapshot_gb * 0.05  # Vultr charges $0.05/GB/month
-        data["snapshot_storage"] = {
-            "total_size_gb": total_snapshot_gb,
-            "snapshot_count": len(snapshots),
-            "monthly_cost": round(snapshot_monthly_cost, 2),
-        }
+    # Add snapshot storage cost info
+    snapshots = session.query(Snapshot).filter(Snapshot.status == "complete").all()
+    total_snapshot_gb = sum(s.size_gb or 0 for s in snapshots)
+    snapshot_monthly_cost = total_snapshot_gb * 0.05  # Vultr charges $0.05/GB/month
+    data["snapshot_storage"] = {
+        "total_size_gb": total_snapshot_gb,
+        "snapshot_count": len(snapshots),
+        "monthly_cost": round(snapshot_monthly_cost, 2),
+    }
+    return data
 
-        return data
-    finally:
-        session.close()
+
+@router.get("")
+async def get_costs(user: User = Depends(require_permission("costs.view")),
+                    db: AsyncDBSession = Depends(get_async_read_session)):
+    return await db.run_sync(_costs_with_snapshots)
 
 
 @router.get("/by-tag")
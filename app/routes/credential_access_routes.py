@@ -6,7 +6,7 @@ from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from database import CredentialAccessRule, InventoryObject, InventoryType, Role, User
 from db_session import get_db_session
-from permissions import require_permission
+from permissions import require_permission, bump_authz_version
 from audit import log_action
 from models import CredentialAccessRuleCreate, CredentialAccessRuleUpdate
 
@@ -48,6 +48,7 @@ async def create_rule(
     )
     session.add(rule)
     session.flush()
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "credential_access.rule.create",
                f"credential-access/rules/{rule.id}",
@@ -86,6 +87,7 @@ async def update_rule(
         raise HTTPException(status_code=400, detail="scope_value required for non-'all' scope_type")
 
     session.flush()
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "credential_access.rule.update",
                f"credential-access/rules/{rule_id}",
@@ -106,6 +108,7 @@ async def delete_rule(
         raise HTTPException(status_code=404, detail="Rule not found")
 
     session.delete(rule)
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "credential_access.rule.delete",
                f"credential-access/rules/{rule_id}",
@@ -181,6 +184,8 @@ async def bulk_manage_access(
                     deleted += 1
 
     session.flush()
+    if created or deleted:
+        bump_authz_version(session)
 
     log_action(session, user.id, user.username, "credential_access.bulk",
                "credential-access/rules/bulk",
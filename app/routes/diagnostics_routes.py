@@ -0,0 +1,36 @@
+"""Runtime diagnostics API routes."""
+
+from fastapi import APIRouter, Depends, Request
+
+from database import User
+from permissions import require_permission
+
+router = APIRouter(prefix="/api/system", tags=["system"])
+
+
+@router.get("/loop-stalls")
+async def get_loop_stalls(
+    request: Request,
+    user: User = Depends(require_permission("system.settings.view")),
+):
+    """Event-loop lag histogram and the most recent stalls (newest first).
+
+    The monitor is opt-in (LOOP_MONITOR_ENABLED); when it isn't running the
+    response just reports enabled=false.
+    """
+    monitor = getattr(request.app.state, "loop_monitor", None)
+    if monitor is None:
+        return {"enabled": False, "stalls": []}
+    return {**monitor.metrics(), "stalls": monitor.recent_stalls()}
+
+
+@router.get("/sync")
+async def get_sync_stats(
+    request: Request,
+    user: User = Depends(require_permission("system.settings.view")),
+):
+    """Inventory sync orchestrator stats per source: requests, coalesced, runs, durations."""
+    orchestrator = getattr(request.app.state, "sync_orchestrator", None)
+    if orchestrator is None:
+        return {"enabled": False, "sources": {}}
+    return orchestrator.stats()
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 
 from database import HealthCheckResult
-from db_session import get_db_session
+from db_session import AsyncDBSession, get_async_read_session, get_read_session
 from permissions import require_permission
 from health_checker import get_health_configs, load_health_configs
 
@@ -26,18 +26,8 @@ def _utc_iso(dt: datetime | None) -> str | None:
     return dt.isoformat()
 
 
-@router.get("/status")
-async def get_health_status(
-    session: Session = Depends(get_db_session),
-    user=Depends(require_permission("health.view")),
-):
-    """Get current health status for all services.
-
-    Returns the latest check result for each service/check combination.
-    """
-    configs = get_health_configs()
-
-    # Get the latest result for each service+check_name combination
+def _latest_results(session: Session) -> list[HealthCheckResult]:
+    """The latest result for each service+check_name combination."""
     subq = (
         session.query(
             HealthCheckResult.service_name,
@@ -47,8 +37,7 @@ async def get_health_status(
         .group_by(HealthCheckResult.service_name, HealthCheckResult.check_name)
         .subquery()
     )
-
-    latest_results = (
+    return (
         session.query(HealthCheckResult)
         .join(
             subq,
@@ -61,6 +50,20 @@ async def get_health_status(
         .all()
     )
 
+
+@router.get("/status")
+async def get_health_status(
+    db: AsyncDBSession = Depends(get_async_read_session),
+    user=Depends(require_permission("health.view")),
+):
+    """Get current health status for all services.
+
+    Returns the latest check result for each service/check combination.
+    """
+    configs = get_health_configs()
+
+    latest_results = await db.run_sync(_latest_results)
+
     # Group by service
     services = {}
     for r in latest_results:
@@ -123,7 +126,7 @@ async def get_health_history(
     check_name: str = Query(None, description="Filter by check name"),
     hours: int = Query(24, ge=1, le=168, description="Hours of history to return (max 168)"),
     limit: int = Query(100, ge=1, le=1000, description="Max results (max 1000)"),
-    session: Session = Depends(get_db_session),
+    session: Session = Depends(get_read_session),
     user=Depends(require_permission("health.view")),
 ):
     """Get health check history for a service."""
@@ -188,35 +191,13 @@ async def recheck_health(
 
 @router.get("/summary")
 async def get_health_summary(
-    session: Session = Depends(get_db_session),
+    db: AsyncDBSession = Depends(get_async_read_session),
     user=Depends(require_permission("health.view")),
 ):
     """Get a compact summary of health status (for dashboard stat cards)."""
     configs = get_health_configs()
 
-    # Get latest result per service+check
-    subq = (
-        session.query(
-            HealthCheckResult.service_name,
-            HealthCheckResult.check_name,
-            func.max(HealthCheckResult.checked_at).label("max_checked_at"),
-        )
-        .group_by(HealthCheckResult.service_name, HealthCheckResult.check_name)
-        .subquery()
-    )
-
-    latest = (
-        session.query(HealthCheckResult)
-        .join(
-            subq,
-            and_(
-                HealthCheckResult.service_name == subq.c.service_name,
-                HealthCheckResult.check_name == subq.c.check_name,
-                HealthCheckResult.checked_at == subq.c.max_checked_at,
-            ),
-        )
-        .all()
-    )
+    latest = await db.run_sync(_latest_results)
 
     healthy = 0
     unhealthy = 0
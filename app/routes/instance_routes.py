@@ -3,9 +3,9 @@ import json
 import re
 from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
-from jose import jwt, JWTError
+from jose import JWTError
 from sqlalchemy.orm import Session
-from auth import get_current_user, get_secret_key, ALGORITHM
+from auth import get_current_user, decode_token
 from database import SessionLocal, User, AppMetadata
 from permissions import require_permission, has_permission
 from db_session import get_db_session
@@ -70,7 +70,7 @@ async def refresh_instances(request: Request,
 def _authenticate_ws_token(token: str) -> dict:
     """Validate JWT token and return user info. Raises ValueError on failure."""
     try:
-        payload = jwt.decode(token, get_secret_key(), algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username = payload.get("sub")
         user_id = payload.get("uid")
         if not username:
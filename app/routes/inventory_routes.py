@@ -4,15 +4,18 @@ import re
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel as PydanticBaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from database import (
     SessionLocal, User, InventoryType, InventoryObject, InventoryTag,
     ObjectACL, TagPermission, object_tags, AppMetadata,
 )
-from auth import get_current_user, get_secret_key, ALGORITHM
-from permissions import require_permission, has_permission
-from inventory_auth import check_inventory_permission, check_type_permission
-from db_session import get_db_session
+from auth import get_current_user, decode_token
+from permissions import require_permission, has_permission, bump_authz_version
+from inventory_auth import (
+    check_inventory_permission, check_inventory_permissions, check_type_permission,
+)
+from db_session import AsyncDBSession, get_async_db_session, get_db_session
+from inventory_search import build_match, highlight_html, search_matches
 from audit import log_action
 from routes.service_routes import resolve_library_files
 
@@ -30,13 +33,14 @@ from models import (
     BulkInventoryDeleteRequest, BulkInventoryTagRequest, BulkInventoryActionRequest,
     BulkActionResult,
 )
+from bulk_orchestrator import BulkOrchestrator
 
 try:
     import asyncssh
 except ImportError:
     asyncssh = None
 
-from jose import jwt, JWTError
+from jose import JWTError
 
 router = APIRouter(prefix="/api/inventory", tags=["inventory"])
 
@@ -165,6 +169,7 @@ async def delete_tag(tag_id: int, request: Request,
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
     session.delete(tag)
+    bump_authz_version(session)  # cascades to the tag's TagPermission rows
 
     log_action(session, user.id, user.username, "inventory.tag.delete",
                f"tags/{tag_id}",
@@ -203,6 +208,7 @@ async def set_tag_permission(tag_id: int, body: TagPermissionSet,
     tp = TagPermission(tag_id=tag.id, role_id=body.role_id, permission=body.permission)
     session.add(tp)
     session.flush()
+    bump_authz_version(session)
 
     return {"id": tp.id, "role_id": tp.role_id, "permission": tp.permission}
 
@@ -224,34 +230,54 @@ async def sync_type(type_slug: str, request: Request,
 
     source = sync_config.get("source") if isinstance(sync_config, dict) else sync_config
 
-    from inventory_sync import run_sync_for_source
-    run_sync_for_source(source)
+    from sync_orchestrator import request_sync
+    report = await request_sync(source)
 
     log_action(session, user.id, user.username, "inventory.sync",
                f"inventory/{type_slug}",
                details={"source": source},
                ip_address=request.client.host if request.client else None)
 
-    return {"ok": True}
+    return {"ok": True, "report": report.to_dict() if report else None}
+
+
+@router.get("/{type_slug}/sync")
+async def get_sync_report(type_slug: str, request: Request,
+                          user: User = Depends(get_current_user),
+                          session: Session = Depends(get_db_session)):
+    """The report of the last sync run for this type's source."""
+    tc = _get_type_config(request, type_slug)
+    if not check_type_permission(session, user, type_slug, "view"):
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    sync_config = tc.get("sync")
+    if not sync_config:
+        raise HTTPException(status_code=400, detail="This type has no sync source")
+
+    source = sync_config.get("source") if isinstance(sync_config, dict) else sync_config
+
+    from inventory_sync import last_sync_report
+    return {"source": source, "report": last_sync_report(session, source)}
 
 
 # --- Object CRUD ---
 
-@router.get("/{type_slug}")
-async def list_objects(type_slug: str, request: Request,
-                       search: str = "", tag: str = "",
-                       page: int = 1, per_page: int = 100,
-                       user: User = Depends(get_current_user),
-                       session: Session = Depends(get_db_session)):
-    tc = _get_type_config(request, type_slug)
+def _list_objects_page(session: Session, user: User, type_slug: str, tc: dict,
+                       search: str, tag: str, page: int, per_page: int) -> dict:
+    """One page of a type's objects; blocking (credential checks may log denials)."""
     if not check_type_permission(session, user, type_slug, "view"):
         raise HTTPException(status_code=403, detail="Permission denied")
 
     inv_type = _get_type_db(session, type_slug)
     query = session.query(InventoryObject).filter_by(type_id=inv_type.id)
 
+    matches = None
     if search:
-        query = query.filter(InventoryObject.search_text.contains(search.lower()))
+        match = build_match(search)
+        if match is None:
+            return {"objects": [], "total": 0, "page": page, "per_page": per_page}
+        matches = search_matches(match)
+        query = query.join(matches, matches.c.object_id == InventoryObject.id)
 
     if tag:
         tag_obj = session.query(InventoryTag).filter_by(name=tag).first()
@@ -261,24 +287,44 @@ async def list_objects(type_slug: str, request: Request,
             return {"objects": [], "total": 0, "page": page}
 
     total = query.count()
-    objects = query.order_by(InventoryObject.id.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    query = query.options(selectinload(InventoryObject.tags))
+    highlights = {}
+    if matches is not None:
+        # Best match first; snippets come back alongside each object
+        rows = query.add_columns(matches.c.snippet).order_by(
+            matches.c.rank, InventoryObject.id.desc()).offset((page - 1) * per_page).limit(per_page).all()
+        objects = [obj for obj, _ in rows]
+        highlights = {obj.id: highlight_html(snippet) for obj, snippet in rows}
+    else:
+        objects = query.order_by(
+            InventoryObject.id.desc()).offset((page - 1) * per_page).limit(per_page).all()
 
     # Filter by per-object ACL
-    results = []
-    for obj in objects:
-        if check_inventory_permission(session, user, obj.id, "view"):
-            results.append(_serialize_object(obj, tc))
+    allowed = check_inventory_permissions(session, user, [obj.id for obj in objects], "view")
+    objects = [obj for obj in objects if allowed[obj.id]]
 
     # For credential type, apply credential access rules
     if type_slug == "credential":
         from credential_access import user_can_view_credential
-        results = [r for r in results
-                   if user_can_view_credential(session, user,
-                       session.query(InventoryObject).get(r["id"]))]
+        objects = [obj for obj in objects if user_can_view_credential(session, user, obj)]
 
+    results = [_serialize_object(obj, tc) for obj in objects]
+    for result in results:
+        if result["id"] in highlights:
+            result["highlight"] = highlights[result["id"]]
     return {"objects": results, "total": total, "page": page, "per_page": per_page}
 
 
+@router.get("/{type_slug}")
+async def list_objects(type_slug: str, request: Request,
+                       search: str = "", tag: str = "",
+                       page: int = 1, per_page: int = 100,
+                       user: User = Depends(get_current_user),
+                       db: AsyncDBSession = Depends(get_async_db_session)):
+    tc = _get_type_config(request, type_slug)
+    return await db.run_sync(_list_objects_page, user, type_slug, tc, search, tag, page, per_page)
+
+
 @router.post("/{type_slug}")
 async def create_object(type_slug: str, body: InventoryObjectCreate, request: Request,
                         user: User = Depends(get_current_user),
@@ -478,6 +524,32 @@ async def remove_tag_from_object(type_slug: str, obj_id: int, tag_id: int,
 
 # --- Bulk operations ---
 
+def _authorize_bulk(session: Session, user: User, inv_type: InventoryType,
+                    object_ids: list[int], permission_suffix: str,
+                    with_tags: bool = False) -> tuple[list[InventoryObject], list[dict]]:
+    """Load the selected objects and check permission on all of them at once.
+
+    Returns (permitted objects in request order, skipped entries).
+    """
+    query = session.query(InventoryObject).filter(
+        InventoryObject.id.in_(object_ids), InventoryObject.type_id == inv_type.id)
+    if with_tags:
+        query = query.options(selectinload(InventoryObject.tags))
+    found = {obj.id: obj for obj in query.all()}
+    allowed = check_inventory_permissions(session, user, found.keys(), permission_suffix)
+
+    permitted, skipped = [], []
+    for obj_id in object_ids:
+        obj = found.get(obj_id)
+        if not obj:
+            skipped.append({"name": str(obj_id), "reason": "Object not found"})
+        elif not allowed[obj_id]:
+            skipped.append({"name": str(obj_id), "reason": "Permission denied"})
+        else:
+            permitted.append(obj)
+    return permitted, skipped
+
+
 @router.post("/{type_slug}/bulk/delete")
 async def bulk_delete_objects(type_slug: str, body: BulkInventoryDeleteRequest,
                                request: Request,
@@ -486,21 +558,14 @@ async def bulk_delete_objects(type_slug: str, body: BulkInventoryDeleteRequest,
     tc = _get_type_config(request, type_slug)
     inv_type = _get_type_db(session, type_slug)
 
+    objects, skipped = _authorize_bulk(session, user, inv_type, body.object_ids, "delete")
     succeeded = []
-    skipped = []
-    for obj_id in body.object_ids:
-        obj = session.query(InventoryObject).filter_by(id=obj_id, type_id=inv_type.id).first()
-        if not obj:
-            skipped.append({"name": str(obj_id), "reason": "Object not found"})
-            continue
-        if not check_inventory_permission(session, user, obj.id, "delete"):
-            skipped.append({"name": str(obj_id), "reason": "Permission denied"})
-            continue
+    for obj in objects:
         session.delete(obj)
         log_action(session, user.id, user.username, "inventory.delete",
-                   f"inventory/{type_slug}/{obj_id}",
+                   f"inventory/{type_slug}/{obj.id}",
                    ip_address=request.client.host if request.client else None)
-        succeeded.append(str(obj_id))
+        succeeded.append(str(obj.id))
 
     session.flush()
 
@@ -521,21 +586,14 @@ async def bulk_add_tags(type_slug: str, body: BulkInventoryTagRequest,
 
     tags = session.query(InventoryTag).filter(InventoryTag.id.in_(body.tag_ids)).all()
 
+    objects, skipped = _authorize_bulk(session, user, inv_type, body.object_ids, "edit", with_tags=True)
     succeeded = []
-    skipped = []
-    for obj_id in body.object_ids:
-        obj = session.query(InventoryObject).filter_by(id=obj_id, type_id=inv_type.id).first()
-        if not obj:
-            skipped.append({"name": str(obj_id), "reason": "Object not found"})
-            continue
-        if not check_inventory_permission(session, user, obj.id, "edit"):
-            skipped.append({"name": str(obj_id), "reason": "Permission denied"})
-            continue
+    for obj in objects:
         existing_ids = {t.id for t in obj.tags}
         for tag in tags:
             if tag.id not in existing_ids:
                 obj.tags.append(tag)
-        succeeded.append(str(obj_id))
+        succeeded.append(str(obj.id))
 
     session.flush()
 
@@ -556,18 +614,11 @@ async def bulk_remove_tags(type_slug: str, body: BulkInventoryTagRequest,
 
     tag_ids_to_remove = set(body.tag_ids)
 
+    objects, skipped = _authorize_bulk(session, user, inv_type, body.object_ids, "edit", with_tags=True)
     succeeded = []
-    skipped = []
-    for obj_id in body.object_ids:
-        obj = session.query(InventoryObject).filter_by(id=obj_id, type_id=inv_type.id).first()
-        if not obj:
-            skipped.append({"name": str(obj_id), "reason": "Object not found"})
-            continue
-        if not check_inventory_permission(session, user, obj.id, "edit"):
-            skipped.append({"name": str(obj_id), "reason": "Permission denied"})
-            continue
+    for obj in objects:
         obj.tags = [t for t in obj.tags if t.id not in tag_ids_to_remove]
-        succeeded.append(str(obj_id))
+        succeeded.append(str(obj.id))
 
     session.flush()
 
@@ -597,17 +648,8 @@ async def bulk_run_action(type_slug: str, action_name: str,
 
     runner = request.app.state.ansible_runner
 
-    valid_objects = []
-    skipped = []
-    for obj_id in body.object_ids:
-        obj = session.query(InventoryObject).filter_by(id=obj_id, type_id=inv_type.id).first()
-        if not obj:
-            skipped.append({"name": str(obj_id), "reason": "Object not found"})
-            continue
-        if not check_inventory_permission(session, user, obj.id, action_name):
-            skipped.append({"name": str(obj_id), "reason": "Permission denied"})
-            continue
-        valid_objects.append((obj_id, json.loads(obj.data)))
+    objects, skipped = _authorize_bulk(session, user, inv_type, body.object_ids, action_name)
+    valid_objects = [(obj.id, json.loads(obj.data)) for obj in objects]
 
     if not valid_objects:
         return BulkActionResult(
@@ -634,33 +676,21 @@ async def bulk_run_action(type_slug: str, action_name: str,
     )
     runner.jobs[parent_id] = parent
 
+    def _starter(obj_id, obj_data):
+        return lambda: runner.run_action(action_def, obj_data, type_slug,
+                                         user_id=user.id, username=user.username,
+                                         object_id=obj_id)
+
     async def _run_bulk_action():
         parent.output.append(f"--- Bulk {action_name}: {len(valid_objects)} objects ---")
-        child_jobs = []
-        for obj_id, obj_data in valid_objects:
-            parent.output.append(f"[Starting {action_name} for object {obj_id}]")
-            child = await runner.run_action(action_def, obj_data, type_slug,
-                                             user_id=user.id, username=user.username,
-                                             object_id=obj_id)
-            child.parent_job_id = parent.id
-            child_jobs.append((obj_id, child))
-
-        for obj_id, child in child_jobs:
-            while child.status == "running":
-                await asyncio.sleep(1)
-            parent.output.append(f"[Object {obj_id}] finished: {child.status}")
-
-        failed = [str(oid) for oid, child in child_jobs if child.status != "completed"]
-        if failed:
-            parent.output.append(f"[Failed: {', '.join(failed)}]")
-            parent.status = "failed" if len(failed) == len(child_jobs) else "completed"
-        else:
-            parent.status = "completed"
-        parent.finished_at = datetime.now(timezone.utc).isoformat()
-        runner._persist_job(parent)
+        bulk = BulkOrchestrator(runner, parent, action_name, body.parallelism, body.fail_fast)
+        await bulk.run([[(f"object {obj_id}", _starter(obj_id, obj_data))
+                         for obj_id, obj_data in valid_objects]])
+        bulk.finish()
+        await runner._persist_job(parent)
         await runner._notify_job(parent)
 
-    asyncio.create_task(_run_bulk_action())
+    asyncio.create_task(_run_bulk_action(), name=f"job:{parent_id}")
 
     log_action(session, user.id, user.username, f"inventory.bulk_action.{action_name}",
                f"inventory/{type_slug}",
@@ -806,6 +836,7 @@ async def add_acl_rule(type_slug: str, obj_id: int, body: ACLRuleCreate,
     )
     session.add(rule)
     session.flush()
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "inventory.acl.add",
                f"inventory/{type_slug}/{obj_id}",
@@ -824,6 +855,7 @@ async def remove_acl_rule(type_slug: str, obj_id: int, acl_id: int,
     if not rule:
         raise HTTPException(status_code=404, detail="ACL rule not found")
     session.delete(rule)
+    bump_authz_version(session)
     return {"status": "deleted"}
 
 
@@ -832,7 +864,7 @@ async def remove_acl_rule(type_slug: str, obj_id: int, acl_id: int,
 def _authenticate_ws_token(token: str) -> dict:
     """Validate JWT token and return user info."""
     try:
-        payload = jwt.decode(token, get_secret_key(), algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username = payload.get("sub")
         user_id = payload.get("uid")
         if not username:
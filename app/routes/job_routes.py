@@ -1,13 +1,17 @@
 import asyncio
+import base64
 import json
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sse_starlette.sse import EventSourceResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, defer
 from database import User, SessionLocal, JobRecord, ScheduledJob, WebhookEndpoint
 from auth import get_current_user
 from permissions import has_permission, require_permission
 from audit import log_action
-from db_session import get_db_session
+from db_session import AsyncDBSession, get_async_read_session, get_db_session
+from job_output import read_job_output, read_record_output
+from models import ACTIVE_JOB_STATUSES
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
@@ -73,117 +77,302 @@ def _resolve_provenance_batch(jobs: list[dict], session: Session) -> None:
             j["webhook_name"] = None
 
 
-def _get_all_jobs(runner, session: Session, user: User) -> list[dict]:
-    """Get merged in-memory + persisted jobs, filtered by permission."""
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+STREAM_COALESCE_INTERVAL = 0.05  # seconds to gather a burst into one SSE frame
+STREAM_IDLE_TIMEOUT = 2.0        # wake without a publish to catch unpublished lines
+STREAM_MAX_FRAME_LINES = 500
+
+
+def _job_record_to_dict(j: JobRecord) -> dict:
+    """Serialize a persisted job's summary fields (output is loaded separately)."""
+    job_dict = {
+        "id": j.id,
+        "service": j.service,
+        "action": j.action,
+        "script": j.script,
+        "status": j.status,
+        "started_at": j.started_at,
+        "finished_at": j.finished_at,
+        "deployment_id": j.deployment_id,
+        "user_id": j.user_id,
+        "username": j.username,
+        "schedule_id": j.schedule_id,
+        "inputs": json.loads(j.inputs) if j.inputs else None,
+        "parent_job_id": j.parent_job_id,
+        "object_id": j.object_id,
+        "type_slug": j.type_slug,
+        "webhook_id": j.webhook_id,
+    }
+    return job_dict
+
+
+def _encode_cursor(started_at: str, job_id: str) -> str:
+    raw = json.dumps([started_at or "", job_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        started_at, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(started_at), str(job_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _sort_key(job_dict: dict) -> tuple[str, str]:
+    return (job_dict.get("started_at") or "", job_dict["id"])
+
+
+def _job_records_page(session: Session, user: User, filters: dict,
+                      after: tuple[str, str] | None, limit: int) -> tuple[dict, list[dict]] | None:
+    """Persisted half of a jobs page: the effective filters and up to limit + 1 job dicts.
+
+    Returns None if the user may not view jobs at all. Blocking; the
+    in-memory overlay is done on the loop by _merge_live_jobs.
+    """
     can_view_all = has_permission(session, user.id, "jobs.view_all")
     can_view_own = has_permission(session, user.id, "jobs.view_own")
 
     if not can_view_all and not can_view_own:
-        return []
-
-    jobs = {}
-
-    # Load persisted jobs from SQLite
-    db_jobs = session.query(JobRecord).order_by(JobRecord.started_at.desc()).all()
-    for j in db_jobs:
-        job_dict = {
-            "id": j.id,
-            "service": j.service,
-            "action": j.action,
-            "script": j.script,
-            "status": j.status,
-            "started_at": j.started_at,
-            "finished_at": j.finished_at,
-            "output": json.loads(j.output) if j.output else [],
-            "deployment_id": j.deployment_id,
-            "user_id": j.user_id,
-            "username": j.username,
-            "schedule_id": j.schedule_id,
-            "inputs": json.loads(j.inputs) if j.inputs else None,
-            "parent_job_id": j.parent_job_id,
-            "object_id": j.object_id,
-            "type_slug": j.type_slug,
-            "webhook_id": j.webhook_id,
-        }
-        if can_view_all or (can_view_own and j.user_id == user.id):
-            jobs[j.id] = job_dict
-
-    # Overlay in-memory jobs (more current for running jobs)
+        return None
+
+    if not can_view_all:
+        filters = {**filters, "user_id": user.id}
+
+    query = session.query(JobRecord).options(defer(JobRecord.output))
+    for field in ("status", "service", "user_id", "parent_job_id",
+                  "object_id", "schedule_id", "webhook_id"):
+        if filters.get(field) is not None:
+            query = query.filter(getattr(JobRecord, field) == filters[field])
+    if filters.get("started_after"):
+        query = query.filter(JobRecord.started_at >= filters["started_after"])
+    if filters.get("started_before"):
+        query = query.filter(JobRecord.started_at < filters["started_before"])
+    if after:
+        query = query.filter(or_(
+            JobRecord.started_at < after[0],
+            and_(JobRecord.started_at == after[0], JobRecord.id < after[1]),
+        ))
+    rows = (query.order_by(JobRecord.started_at.desc(), JobRecord.id.desc())
+            .limit(limit + 1).all())
+    return filters, [_job_record_to_dict(j) for j in rows]
+
+
+def _merge_live_jobs(runner, records: list[dict], filters: dict,
+                     after: tuple[str, str] | None, limit: int) -> tuple[list[dict], str | None]:
+    """Overlay in-memory jobs on a persisted page and cut it to one page.
+
+    Runs on the loop, which owns the job registry.
+    """
+    jobs = {j["id"]: j for j in records}
+
+    # Overlay in-memory jobs (more current for running jobs); finished jobs
+    # past their TTL are dropped first since the DB rows above cover them
+    runner.jobs.prune()
     for jid, job in runner.jobs.items():
-        job_dict = job.model_dump()
-        if can_view_all or (can_view_own and job.user_id == user.id):
-            jobs[jid] = job_dict
+        job_dict = job.model_dump(exclude={"output"})
+        persisted = jobs.pop(jid, {})
+        job_dict.setdefault("object_id", persisted.get("object_id"))
+        job_dict.setdefault("type_slug", persisted.get("type_slug"))
+        if not _matches_filters(job_dict, filters):
+            continue
+        if after and _sort_key(job_dict) >= after:
+            continue
+        jobs[jid] = job_dict
+
+    ordered = sorted(jobs.values(), key=_sort_key, reverse=True)
+    page = ordered[:limit]
+    next_cursor = None
+    if len(ordered) > limit or len(records) > limit:
+        last = page[-1] if page else records[-1]
+        next_cursor = _encode_cursor(*_sort_key(last))
+    return page, next_cursor
+
+
+def _matches_filters(job_dict: dict, filters: dict) -> bool:
+    """Apply list filters to an in-memory job dict."""
+    for field in ("status", "service", "user_id", "parent_job_id",
+                  "object_id", "schedule_id", "webhook_id"):
+        if filters.get(field) is not None and job_dict.get(field) != filters[field]:
+            return False
+    started_at = job_dict.get("started_at") or ""
+    if filters.get("started_after") and started_at < filters["started_after"]:
+        return False
+    if filters.get("started_before") and started_at >= filters["started_before"]:
+        return False
+    return True
+
+
+def _visible_job(session: Session, user: User, job_id: str, job):
+    """Return the in-memory Job (looked up by the caller, or None) or the persisted
+    JobRecord, enforcing view permissions. Blocking; call through db.run_sync."""
+    can_view_all = has_permission(session, user.id, "jobs.view_all")
+    can_view_own = has_permission(session, user.id, "jobs.view_own")
 
-    sorted_jobs = sorted(jobs.values(), key=lambda j: j.get("started_at", ""), reverse=True)
-    _resolve_provenance_batch(sorted_jobs, session)
-    return sorted_jobs
+    if job is None:
+        job = session.query(JobRecord).filter_by(id=job_id).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if can_view_all or (can_view_own and job.user_id == user.id):
+        return job
+    raise HTTPException(status_code=403, detail="Permission denied")
 
 
 @router.get("")
 async def list_jobs(request: Request,
+                    status: str | None = None,
+                    service: str | None = None,
+                    user_id: int | None = None,
                     parent_job_id: str | None = None,
                     object_id: int | None = None,
-                    user: User = Depends(get_current_user)):
+                    schedule_id: int | None = None,
+                    webhook_id: int | None = None,
+                    started_after: str | None = None,
+                    started_before: str | None = None,
+                    cursor: str | None = None,
+                    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                    user: User = Depends(get_current_user),
+                    db: AsyncDBSession = Depends(get_async_read_session)):
     runner = request.app.state.ansible_runner
-    session = SessionLocal()
-    try:
-        jobs = _get_all_jobs(runner, session, user)
-        if parent_job_id:
-            jobs = [j for j in jobs if j.get("parent_job_id") == parent_job_id]
-        if object_id is not None:
-            jobs = [j for j in jobs if j.get("object_id") == object_id]
-        return {"jobs": jobs}
-    finally:
-        session.close()
+    filters = {
+        "status": status,
+        "service": service,
+        "user_id": user_id,
+        "parent_job_id": parent_job_id,
+        "object_id": object_id,
+        "schedule_id": schedule_id,
+        "webhook_id": webhook_id,
+        "started_after": started_after,
+        "started_before": started_before,
+    }
+    after = _decode_cursor(cursor) if cursor else None
+    persisted = await db.run_sync(_job_records_page, user, filters, after, limit)
+    if persisted is None:
+        return {"jobs": [], "next_cursor": None}
+    filters, records = persisted
+    jobs, next_cursor = _merge_live_jobs(runner, records, filters, after, limit)
+    await db.run_sync(lambda session: _resolve_provenance_batch(jobs, session))
+    return {"jobs": jobs, "next_cursor": next_cursor}
+
+
+def _job_status_counts(session: Session, user: User,
+                       live_ids: list[str]) -> tuple[dict, dict, int | None] | None:
+    """Persisted job counts per status, plus the stored status of each live job.
+
+    Returns (counts, stored statuses, user scope), or None if the user may
+    not view jobs at all.
+    """
+    can_view_all = has_permission(session, user.id, "jobs.view_all")
+    if not can_view_all and not has_permission(session, user.id, "jobs.view_own"):
+        return None
+    scope = None if can_view_all else user.id
+
+    query = session.query(JobRecord.status, func.count()).group_by(JobRecord.status)
+    stored = session.query(JobRecord.id, JobRecord.status).filter(JobRecord.id.in_(live_ids))
+    if scope is not None:
+        query = query.filter(JobRecord.user_id == scope)
+        stored = stored.filter(JobRecord.user_id == scope)
+    return dict(query.all()), (dict(stored.all()) if live_ids else {}), scope
+
+
+@router.get("/counts")
+async def job_counts(request: Request,
+                     user: User = Depends(get_current_user),
+                     db: AsyncDBSession = Depends(get_async_read_session)):
+    """Number of visible jobs per status, for summaries that can't page through the list."""
+    runner = request.app.state.ansible_runner
+    runner.jobs.prune()
+    live = {jid: job.status for jid, job in runner.jobs.items()}
+    live_users = {jid: job.user_id for jid, job in runner.jobs.items()}
+    result = await db.run_sync(_job_status_counts, user, list(live))
+    if result is None:
+        return {"counts": {}, "total": 0}
+    counts, stored, scope = result
+
+    # In-memory status wins over the row, which may lag or not exist yet
+    for jid, status in live.items():
+        if scope is not None and live_users[jid] != scope:
+            continue
+        if jid in stored:
+            counts[stored[jid]] -= 1
+        counts[status] = counts.get(status, 0) + 1
+    counts = {status: n for status, n in counts.items() if n > 0}
+    return {"counts": counts, "total": sum(counts.values())}
+
+
+@router.get("/registry")
+async def job_registry_stats(request: Request,
+                             user: User = Depends(require_permission("jobs.view_all"))):
+    """Resident job count/bytes and eviction totals for the in-memory job registry."""
+    runner = request.app.state.ansible_runner
+    runner.jobs.prune()
+    return runner.jobs.metrics()
 
 
-@router.get("/{job_id}")
-async def get_job(job_id: str, request: Request, user: User = Depends(get_current_user)):
+@router.get("/executor")
+async def job_executor_stats(request: Request,
+                             user: User = Depends(require_permission("jobs.view_all"))):
+    """Worker usage, queue depth per priority class and queue wait times."""
     runner = request.app.state.ansible_runner
-    session = SessionLocal()
-    try:
-        can_view_all = has_permission(session, user.id, "jobs.view_all")
-        can_view_own = has_permission(session, user.id, "jobs.view_own")
-
-        # Check in-memory first
-        if job_id in runner.jobs:
-            job = runner.jobs[job_id]
-            if can_view_all or (can_view_own and job.user_id == user.id):
-                job_dict = job.model_dump()
-                _resolve_provenance(job_dict, session)
-                return job_dict
-            raise HTTPException(status_code=403, detail="Permission denied")
-
-        # Check persisted
-        db_job = session.query(JobRecord).filter_by(id=job_id).first()
-        if db_job:
-            if can_view_all or (can_view_own and db_job.user_id == user.id):
-                job_dict = {
-                    "id": db_job.id,
-                    "service": db_job.service,
-                    "action": db_job.action,
-                    "script": db_job.script,
-                    "status": db_job.status,
-                    "started_at": db_job.started_at,
-                    "finished_at": db_job.finished_at,
-                    "output": json.loads(db_job.output) if db_job.output else [],
-                    "deployment_id": db_job.deployment_id,
-                    "user_id": db_job.user_id,
-                    "username": db_job.username,
-                    "schedule_id": db_job.schedule_id,
-                    "inputs": json.loads(db_job.inputs) if db_job.inputs else None,
-                    "parent_job_id": db_job.parent_job_id,
-                    "object_id": db_job.object_id,
-                    "type_slug": db_job.type_slug,
-                    "webhook_id": db_job.webhook_id,
-                }
-                _resolve_provenance(job_dict, session)
-                return job_dict
-            raise HTTPException(status_code=403, detail="Permission denied")
+    return runner.executor.metrics()
 
-        raise HTTPException(status_code=404, detail="Job not found")
-    finally:
-        session.close()
+
+def _job_detail(session: Session, user: User, job_id: str, job, live: dict | None) -> dict:
+    job = _visible_job(session, user, job_id, job)
+    if isinstance(job, JobRecord):
+        job_dict = _job_record_to_dict(job)
+        job_dict["output"], _ = read_record_output(session, job)
+    else:
+        job_dict = live
+        if job.output_offset:
+            job_dict["output"], _ = read_job_output(session, job)
+    _resolve_provenance(job_dict, session)
+    return job_dict
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, request: Request, user: User = Depends(get_current_user),
+                  db: AsyncDBSession = Depends(get_async_read_session)):
+    runner = request.app.state.ansible_runner
+    # The registry belongs to the loop: snapshot the live job here, and do
+    # the permission check, DB lookups and output reads off the loop
+    job = runner.jobs.get(job_id)
+    live = job.model_dump() if job is not None else None
+    return await db.run_sync(_job_detail, user, job_id, job, live)
+
+
+def _job_output_slice(session: Session, user: User, job_id: str, job,
+                      offset: int, limit: int | None) -> dict:
+    job = _visible_job(session, user, job_id, job)
+    if isinstance(job, JobRecord):
+        lines, total = read_record_output(session, job, offset, limit)
+    else:
+        lines, total = read_job_output(session, job, offset, limit)
+    return {
+        "job_id": job_id,
+        "status": job.status,
+        "offset": offset,
+        "total": total,
+        "lines": lines,
+    }
+
+
+@router.get("/{job_id}/output")
+async def get_job_output(job_id: str, request: Request,
+                         offset: int = Query(0, ge=0),
+                         limit: int | None = Query(None, ge=1),
+                         user: User = Depends(get_current_user),
+                         db: AsyncDBSession = Depends(get_async_read_session)):
+    """Return a slice of a job's output lines starting at `offset`."""
+    runner = request.app.state.ansible_runner
+    # Snapshot the live job's resident lines on the loop, which keeps
+    # appending to and trimming them; chunk reads happen off the loop
+    job = runner.jobs.get(job_id)
+    if job is not None:
+        job = job.model_copy(update={"output": list(job.output)})
+    return await db.run_sync(_job_output_slice, user, job_id, job, offset, limit)
 
 
 @router.post("/{job_id}/rerun")
@@ -203,7 +392,7 @@ async def rerun_job(job_id: str, request: Request,
     if not can_view_all and not (can_view_own and db_job.user_id == user.id):
         raise HTTPException(status_code=404, detail="Job not found")
 
-    if db_job.status == "running":
+    if db_job.status in ACTIVE_JOB_STATUSES:
         raise HTTPException(status_code=400, detail="Cannot rerun a running job")
 
     original_inputs = json.loads(db_job.inputs) if db_job.inputs else {}
@@ -289,64 +478,102 @@ async def rerun_job(job_id: str, request: Request,
     return {"job_id": new_job.id, "parent_job_id": job_id}
 
 
+def _check_stream_allowed(session: Session, user: User, job_id: str, live: bool, owner_id: int | None):
+    can_view_all = has_permission(session, user.id, "jobs.view_all")
+    can_view_own = has_permission(session, user.id, "jobs.view_own")
+
+    if not can_view_all and not can_view_own:
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    # Check ownership for view_own users
+    if not can_view_all:
+        if live:
+            if owner_id != user.id:
+                raise HTTPException(status_code=403, detail="Permission denied")
+        else:
+            db_job = session.query(JobRecord).filter_by(id=job_id).first()
+            if db_job and db_job.user_id != user.id:
+                raise HTTPException(status_code=403, detail="Permission denied")
+
+
 @router.get("/{job_id}/stream")
-async def stream_job(job_id: str, request: Request, user: User = Depends(get_current_user)):
+async def stream_job(job_id: str, request: Request,
+                     offset: int = Query(0, ge=0),
+                     user: User = Depends(get_current_user),
+                     db: AsyncDBSession = Depends(get_async_read_session)):
     runner = request.app.state.ansible_runner
 
-    # Permission check before streaming
-    session = SessionLocal()
-    try:
-        can_view_all = has_permission(session, user.id, "jobs.view_all")
-        can_view_own = has_permission(session, user.id, "jobs.view_own")
-
-        if not can_view_all and not can_view_own:
-            raise HTTPException(status_code=403, detail="Permission denied")
-
-        # Check ownership for view_own users
-        if not can_view_all:
-            job = runner.jobs.get(job_id)
-            if job:
-                if job.user_id != user.id:
-                    raise HTTPException(status_code=403, detail="Permission denied")
-            else:
-                db_job = session.query(JobRecord).filter_by(id=job_id).first()
-                if db_job and db_job.user_id != user.id:
-                    raise HTTPException(status_code=403, detail="Permission denied")
-    finally:
-        session.close()
-
-    async def event_generator():
-        last_index = 0
-        while True:
-            job = runner.jobs.get(job_id)
-            if job is None:
-                # Check persisted for completed jobs
+    # Permission check before streaming, off the loop
+    job = runner.jobs.get(job_id)
+    owner_id = job.user_id if job is not None else None
+    await db.run_sync(_check_stream_allowed, user, job_id, job is not None, owner_id)
+
+    # Resume from the line offset the client last saw (SSE Last-Event-ID)
+    start = offset
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        start = int(last_event_id)
+
+    return EventSourceResponse(_job_event_stream(runner, job_id, start))
+
+
+async def _job_event_stream(runner, job_id: str, start: int = 0):
+    """Yield batched SSE frames of job output from absolute line `start`.
+
+    Each frame carries every line produced since the previous one, joined by
+    newlines, with `id` set to the next line offset so a reconnecting client
+    can resume via Last-Event-ID. Viewers sleep on the runner's stream hub
+    and only wake when the job publishes new output.
+    """
+    last_index = start
+    hub = runner.stream_hub
+    while True:
+        job = runner.jobs.get(job_id)
+        if job is None:
+            # Check persisted for completed jobs
+            s = SessionLocal()
+            try:
+                db_job = s.query(JobRecord).filter_by(id=job_id).first()
+                if db_job:
+                    output, _ = read_record_output(s, db_job, last_index)
+                    for i in range(0, len(output), STREAM_MAX_FRAME_LINES):
+                        batch = output[i:i + STREAM_MAX_FRAME_LINES]
+                        last_index += len(batch)
+                        yield {"id": str(last_index), "data": "\n".join(batch)}
+                    yield {"event": "done", "data": db_job.status or "unknown"}
+                    return
+            finally:
+                s.close()
+            yield {"event": "error", "data": "Job not found"}
+            return
+
+        # Take the signal before reading so no publish is missed in between
+        signal = hub.signal(job_id)
+
+        # last_index is absolute; older lines may already have been trimmed
+        # from memory into job_output_chunks
+        total = job.output_offset + len(job.output)
+        if total > last_index:
+            if last_index < job.output_offset:
                 s = SessionLocal()
                 try:
-                    db_job = s.query(JobRecord).filter_by(id=job_id).first()
-                    if db_job:
-                        output = json.loads(db_job.output) if db_job.output else []
-                        for line in output[last_index:]:
-                            yield {"data": line}
-                        yield {"event": "done", "data": db_job.status or "unknown"}
-                        return
+                    lines, _ = read_job_output(s, job, last_index)
                 finally:
                     s.close()
-                yield {"event": "error", "data": "Job not found"}
-                return
-
-            # Send new output lines
-            current_output = job.output
-            if len(current_output) > last_index:
-                for line in current_output[last_index:]:
-                    yield {"data": line}
-                last_index = len(current_output)
-
-            # If job is done, send final event
-            if job.status in ("completed", "failed"):
-                yield {"event": "done", "data": job.status}
-                return
-
-            await asyncio.sleep(0.5)
-
-    return EventSourceResponse(event_generator())
+            else:
+                lines = job.output[last_index - job.output_offset:]
+            for i in range(0, len(lines), STREAM_MAX_FRAME_LINES):
+                batch = lines[i:i + STREAM_MAX_FRAME_LINES]
+                last_index += len(batch)
+                yield {"id": str(last_index), "data": "\n".join(batch)}
+
+        # If job is done, send final event
+        if job.status in ("completed", "failed"):
+            yield {"event": "done", "data": job.status}
+            return
+
+        # Lines appended outside _run_command are not published, so wake
+        # periodically as a safety net
+        await hub.wait(signal, STREAM_IDLE_TIMEOUT)
+        # Coalesce a burst of lines into a single frame
+        await asyncio.sleep(STREAM_COALESCE_INTERVAL)
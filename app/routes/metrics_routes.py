@@ -0,0 +1,46 @@
+"""Prometheus-compatible metrics endpoint."""
+
+import hmac
+import os
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from auth import get_current_user
+from database import SessionLocal
+from metrics import REGISTRY, update_job_gauges
+from permissions import has_permission
+
+router = APIRouter(tags=["metrics"])
+
+# Static bearer token for Prometheus scrapers (user JWTs expire). Users with
+# system.settings.view can always read the metrics with their own token.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_PERMISSION = "system.settings.view"
+
+
+def _authorize(request: Request):
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    if METRICS_TOKEN and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        return
+    user = get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+    session = SessionLocal()
+    try:
+        if not has_permission(session, user.id, METRICS_PERMISSION):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                                detail=f"Permission denied: {METRICS_PERMISSION}")
+    finally:
+        session.close()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(request: Request):
+    """HTTP, database, job, poller and notification metrics in Prometheus text format."""
+    _authorize(request)
+    runner = getattr(request.app.state, "ansible_runner", None)
+    if runner is not None:
+        update_job_gauges(runner)
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
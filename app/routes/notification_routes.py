@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from database import Notification, NotificationRule, NotificationChannel, Role, User
-from db_session import get_db_session
+from db_session import AsyncDBSession, get_async_read_session, get_db_session
 from permissions import require_permission
 from audit import log_action
 from models import (
@@ -58,25 +58,36 @@ def _utc_iso(dt: datetime | None) -> str:
 # User-facing notification endpoints
 # ------------------------------------------------------------------
 
+def _notifications_page(session: Session, user_id: int, limit: int, offset: int,
+                        unread_only: bool) -> tuple[int, list[Notification]]:
+    query = (
+        session.query(Notification)
+        .filter(Notification.user_id == user_id)
+        .order_by(Notification.created_at.desc())
+    )
+    if unread_only:
+        query = query.filter(Notification.is_read == False)
+    return query.count(), query.offset(offset).limit(limit).all()
+
+
+def _unread_count(session: Session, user_id: int) -> int:
+    return (
+        session.query(Notification)
+        .filter(Notification.user_id == user_id, Notification.is_read == False)
+        .count()
+    )
+
+
 @router.get("")
 async def list_notifications(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
     unread_only: bool = Query(False),
     user: User = Depends(require_permission("notifications.view")),
-    session: Session = Depends(get_db_session),
+    db: AsyncDBSession = Depends(get_async_read_session),
 ):
     """List current user's notifications (newest first)."""
-    query = (
-        session.query(Notification)
-        .filter(Notification.user_id == user.id)
-        .order_by(Notification.created_at.desc())
-    )
-    if unread_only:
-        query = query.filter(Notification.is_read == False)
-
-    total = query.count()
-    notifications = query.offset(offset).limit(limit).all()
+    total, notifications = await db.run_sync(_notifications_page, user.id, limit, offset, unread_only)
 
     return {
         "notifications": [
@@ -101,14 +112,10 @@ async def list_notifications(
 @router.get("/count")
 async def get_unread_count(
     user: User = Depends(require_permission("notifications.view")),
-    session: Session = Depends(get_db_session),
+    db: AsyncDBSession = Depends(get_async_read_session),
 ):
     """Get unread notification count for the current user."""
-    count = (
-        session.query(Notification)
-        .filter(Notification.user_id == user.id, Notification.is_read == False)
-        .count()
-    )
+    count = await db.run_sync(_unread_count, user.id)
     return NotificationCountOut(unread=count).model_dump()
 
 
@@ -18,7 +18,8 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel, field_validator
 from sqlalchemy.orm import Session
-from database import User, InventoryType, InventoryObject
+from sqlalchemy import func
+from database import User, InventoryType, InventoryObject, PersonalInstance
 from auth import get_current_user
 from permissions import require_permission, has_permission
 from db_session import get_db_session
@@ -135,159 +136,96 @@ def _generate_hostname(config: dict, username: str, service: str, region: str) -
     return template.format(username=username.lower(), service=service, region=region)
 
 
-def _get_user_instances(session: Session, username: str, service_name: str | None = None) -> list[dict]:
-    """Get all personal instances for a user by scanning server inventory objects."""
+def _instance_query(session: Session):
+    """(object, projection row) pairs for personal instance servers."""
     inv_type = session.query(InventoryType).filter_by(slug="server").first()
     if not inv_type:
-        return []
+        return None
+    return (
+        session.query(InventoryObject, PersonalInstance)
+        .join(PersonalInstance, PersonalInstance.object_id == InventoryObject.id)
+        .filter(InventoryObject.type_id == inv_type.id)
+    )
 
-    user_tag = f"{PI_USER_TAG_PREFIX}{username}"
-    service_tag = f"{PI_SERVICE_TAG_PREFIX}{service_name}" if service_name else None
-    results = []
 
-    for obj in session.query(InventoryObject).filter_by(type_id=inv_type.id).all():
-        data = json.loads(obj.data)
-        vultr_tags = data.get("vultr_tags", [])
-
-        if PI_TAG not in vultr_tags or user_tag not in vultr_tags:
-            continue
-
-        if service_tag and service_tag not in vultr_tags:
-            continue
-
-        ttl = None
-        service = None
-        for tag in vultr_tags:
-            if tag.startswith(PI_TTL_TAG_PREFIX):
-                try:
-                    ttl = int(tag.split(":", 1)[1])
-                except ValueError:
-                    pass
-            elif tag.startswith(PI_SERVICE_TAG_PREFIX):
-                service = tag.split(":", 1)[1]
-
-        hostname = data.get("hostname", "")
-        outputs = get_instance_outputs(service, hostname) if service and hostname else []
-        results.append({
-            "hostname": hostname,
-            "ip_address": data.get("ip_address", ""),
-            "region": data.get("region", ""),
-            "plan": data.get("plan", ""),
-            "power_status": data.get("power_status", "unknown"),
-            "vultr_id": data.get("vultr_id", ""),
-            "owner": username,
-            "service": service,
-            "ttl_hours": ttl,
-            "inventory_object_id": obj.id,
-            "created_at": _utc_iso(obj.created_at),
-            "outputs": outputs,
-        })
+def _instance_listing(obj: InventoryObject, instance: PersonalInstance) -> dict:
+    data = json.loads(obj.data)
+    hostname = instance.hostname
+    service = instance.service
+    outputs = get_instance_outputs(service, hostname) if service and hostname else []
+    return {
+        "hostname": hostname,
+        "ip_address": data.get("ip_address", ""),
+        "region": data.get("region", ""),
+        "plan": data.get("plan", ""),
+        "power_status": data.get("power_status", "unknown"),
+        "vultr_id": data.get("vultr_id", ""),
+        "owner": instance.owner,
+        "service": service,
+        "ttl_hours": instance.ttl_hours,
+        "inventory_object_id": obj.id,
+        "created_at": _utc_iso(obj.created_at),
+        "outputs": outputs,
+    }
 
-    return results
+
+def _get_user_instances(session: Session, username: str, service_name: str | None = None) -> list[dict]:
+    """Get all personal instances for a user (indexed on personal_instances.owner)."""
+    query = _instance_query(session)
+    if query is None:
+        return []
+    query = query.filter(PersonalInstance.owner == username)
+    if service_name:
+        query = query.filter(PersonalInstance.service == service_name)
+    return [_instance_listing(obj, instance) for obj, instance in query.order_by(InventoryObject.id)]
 
 
 def _get_all_instances(session: Session, service_name: str | None = None) -> list[dict]:
     """Get all personal instances across all users."""
-    inv_type = session.query(InventoryType).filter_by(slug="server").first()
-    if not inv_type:
+    query = _instance_query(session)
+    if query is None:
         return []
-
-    service_tag = f"{PI_SERVICE_TAG_PREFIX}{service_name}" if service_name else None
-    results = []
-
-    for obj in session.query(InventoryObject).filter_by(type_id=inv_type.id).all():
-        data = json.loads(obj.data)
-        vultr_tags = data.get("vultr_tags", [])
-
-        if PI_TAG not in vultr_tags:
-            continue
-
-        if service_tag and service_tag not in vultr_tags:
-            continue
-
-        owner = None
-        ttl = None
-        service = None
-        for tag in vultr_tags:
-            if tag.startswith(PI_USER_TAG_PREFIX):
-                owner = tag[len(PI_USER_TAG_PREFIX):]
-            elif tag.startswith(PI_TTL_TAG_PREFIX):
-                try:
-                    ttl = int(tag.split(":", 1)[1])
-                except ValueError:
-                    pass
-            elif tag.startswith(PI_SERVICE_TAG_PREFIX):
-                service = tag.split(":", 1)[1]
-
-        hostname = data.get("hostname", "")
-        outputs = get_instance_outputs(service, hostname) if service and hostname else []
-        results.append({
-            "hostname": hostname,
-            "ip_address": data.get("ip_address", ""),
-            "region": data.get("region", ""),
-            "plan": data.get("plan", ""),
-            "power_status": data.get("power_status", "unknown"),
-            "vultr_id": data.get("vultr_id", ""),
-            "owner": owner,
-            "service": service,
-            "ttl_hours": ttl,
-            "inventory_object_id": obj.id,
-            "created_at": _utc_iso(obj.created_at),
-            "outputs": outputs,
-        })
-
-    return results
+    if service_name:
+        query = query.filter(PersonalInstance.service == service_name)
+    return [_instance_listing(obj, instance) for obj, instance in query.order_by(InventoryObject.id)]
 
 
 def _count_user_instances(session: Session, username: str, service_name: str | None = None) -> int:
     """Count active personal instances for a user, optionally scoped to a service."""
-    return len(_get_user_instances(session, username, service_name))
+    query = _instance_query(session)
+    if query is None:
+        return 0
+    query = query.filter(PersonalInstance.owner == username)
+    if service_name:
+        query = query.filter(PersonalInstance.service == service_name)
+    return query.with_entities(func.count()).scalar()
 
 
 def _find_instance_by_hostname(session: Session, hostname: str) -> dict | None:
     """Find a personal instance by hostname."""
-    inv_type = session.query(InventoryType).filter_by(slug="server").first()
-    if not inv_type:
+    obj, instance = _find_instance_row(session, hostname)
+    if obj is None:
         return None
+    return {
+        "hostname": hostname,
+        "owner": instance.owner,
+        "service": instance.service,
+        "vultr_tags": json.loads(obj.data).get("vultr_tags", []),
+    }
 
-    for obj in session.query(InventoryObject).filter_by(type_id=inv_type.id).all():
-        data = json.loads(obj.data)
-        vultr_tags = data.get("vultr_tags", [])
-        if data.get("hostname") == hostname and PI_TAG in vultr_tags:
-            owner = None
-            service = None
-            for tag in vultr_tags:
-                if tag.startswith(PI_USER_TAG_PREFIX):
-                    owner = tag[len(PI_USER_TAG_PREFIX):]
-                elif tag.startswith(PI_SERVICE_TAG_PREFIX):
-                    service = tag[len(PI_SERVICE_TAG_PREFIX):]
-            return {
-                "hostname": hostname,
-                "owner": owner,
-                "service": service,
-                "vultr_tags": vultr_tags,
-            }
 
-    return None
+def _find_instance_row(session: Session, hostname: str) -> tuple[InventoryObject | None, PersonalInstance | None]:
+    query = _instance_query(session)
+    if query is None:
+        return None, None
+    row = query.filter(PersonalInstance.hostname == hostname).order_by(InventoryObject.id).first()
+    return (row[0], row[1]) if row else (None, None)
 
 
 def _find_instance_object(session: Session, hostname: str) -> tuple[InventoryObject | None, str | None]:
     """Find the inventory object for a personal instance. Returns (object, owner)."""
-    inv_type = session.query(InventoryType).filter_by(slug="server").first()
-    if not inv_type:
-        return None, None
-
-    for obj in session.query(InventoryObject).filter_by(type_id=inv_type.id).all():
-        data = json.loads(obj.data)
-        vultr_tags = data.get("vultr_tags", [])
-        if data.get("hostname") == hostname and PI_TAG in vultr_tags:
-            owner = None
-            for tag in vultr_tags:
-                if tag.startswith(PI_USER_TAG_PREFIX):
-                    owner = tag[len(PI_USER_TAG_PREFIX):]
-            return obj, owner
-
-    return None, None
+    obj, instance = _find_instance_row(session, hostname)
+    return (obj, instance.owner) if obj is not None else (None, None)
 
 
 @router.get("/services")
@@ -402,7 +340,7 @@ async def create_personal_instance(
     try:
         job = await runner.run_script(
             body.service, deploy_script, inputs,
-            user_id=user.id, username=user.username,
+            user_id=user.id, username=user.username, instance=hostname,
         )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -455,7 +393,7 @@ async def destroy_personal_instance(
     try:
         job = await runner.run_script(
             service_name, destroy_script, inputs,
-            user_id=user.id, username=user.username,
+            user_id=user.id, username=user.username, instance=hostname,
         )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -14,7 +14,7 @@ from typing import Optional
 from database import (
     PortalBookmark, HealthCheckResult, InventoryType, InventoryObject, User,
 )
-from db_session import get_db_session
+from db_session import AsyncDBSession, get_async_read_session, get_db_session
 from permissions import require_permission
 from health_checker import get_health_configs
 from service_outputs import get_all_service_outputs
@@ -197,15 +197,8 @@ class BookmarkUpdate(BaseModel):
         return _validate_bookmark_url(v)
 
 
-# --- Endpoints ---
-
-@router.get("/services")
-async def get_portal_services(
-    request: Request,
-    user: User = Depends(require_permission("portal.view")),
-    session: Session = Depends(get_db_session),
-):
-    """Aggregated portal data: outputs, health, inventory, connection guides, bookmarks."""
+def _portal_services(session: Session, user: User) -> dict:
+    """Build the /services payload; blocking (DB and service files)."""
     # 1. Service outputs
     all_outputs = get_all_service_outputs()
 
@@ -299,6 +292,19 @@ async def get_portal_services(
     }
 
 
+# --- Endpoints ---
+
+@router.get("/services")
+async def get_portal_services(
+    request: Request,
+    user: User = Depends(require_permission("portal.view")),
+    db: AsyncDBSession = Depends(get_async_read_session),
+):
+    """Aggregated portal data: outputs, health, inventory, connection guides, bookmarks."""
+    # Reads service files as well as the DB, so all of it runs off the loop
+    return await db.run_sync(_portal_services, user)
+
+
 @router.get("/bookmarks")
 async def list_bookmarks(
     user: User = Depends(require_permission("portal.view")),
@@ -3,7 +3,7 @@ from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
 from database import Role, Permission
 from auth import get_current_user
-from permissions import require_permission, invalidate_cache
+from permissions import require_permission, bump_authz_version
 from db_session import get_db_session
 from audit import log_action
 from models import RoleCreateRequest, RoleUpdateRequest
@@ -120,8 +120,8 @@ async def update_role(role_id: int, req: RoleUpdateRequest, request: Request,
 
     session.flush()
 
-    # Invalidate cache for all users with this role
-    invalidate_cache()
+    # Invalidate authz snapshots for all users with this role
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "role.edit", f"roles/{role_id}",
                details={"name": role.name},
@@ -145,7 +145,7 @@ async def delete_role(role_id: int, request: Request,
     session.delete(role)
     session.flush()
 
-    invalidate_cache()
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "role.delete", f"roles/{role_id}",
                details={"name": role.name},
@@ -15,7 +15,7 @@ from database import (
     AppMetadata, SessionLocal, ServiceACL, FileLibraryItem,
 )
 from auth import get_current_user
-from permissions import require_permission, invalidate_cache, has_permission
+from permissions import require_permission, bump_authz_version, has_permission
 from db_session import get_db_session
 from audit import log_action
 from service_auth import require_service_permission, filter_services_for_user, check_service_permission
@@ -136,7 +136,8 @@ async def bulk_stop(request: Request, body: BulkServiceActionRequest,
             total=len(body.service_names),
         ).model_dump()
 
-    job = await runner.bulk_stop(valid_names, user_id=user.id, username=user.username)
+    job = await runner.bulk_stop(valid_names, user_id=user.id, username=user.username,
+                                 parallelism=body.parallelism, fail_fast=body.fail_fast)
 
     log_action(session, user.id, user.username, "service.bulk_stop", "services",
                details={"services": valid_names, "job_id": job.id},
@@ -173,7 +174,8 @@ async def bulk_deploy(request: Request, body: BulkServiceActionRequest,
             total=len(body.service_names),
         ).model_dump()
 
-    job = await runner.bulk_deploy(valid_names, user_id=user.id, username=user.username)
+    job = await runner.bulk_deploy(valid_names, user_id=user.id, username=user.username,
+                                   parallelism=body.parallelism, fail_fast=body.fail_fast)
 
     log_action(session, user.id, user.username, "service.bulk_deploy", "services",
                details={"services": valid_names, "job_id": job.id},
@@ -219,10 +221,7 @@ async def bulk_acl(request: Request, body: BulkServiceACLRequest,
         succeeded.append(name)
 
     session.flush()
-
-    # Invalidate cache for all users with this role
-    for u in role.users:
-        invalidate_cache(u.id)
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "service.acl.bulk_add",
                "services",
@@ -1005,9 +1004,8 @@ async def add_service_acl(name: str, body: ServiceACLCreate, request: Request,
         session.flush()
         created.append(acl)
 
-    # Invalidate cache for all users with this role
-    for u in role.users:
-        invalidate_cache(u.id)
+    if created:
+        bump_authz_version(session)
 
     log_action(session, user.id, user.username, "service.acl.add", f"services/{name}",
                details={"role_id": body.role_id, "permissions": body.permissions},
@@ -1025,15 +1023,10 @@ async def delete_service_acl(name: str, acl_id: int, request: Request,
     if not acl:
         raise HTTPException(status_code=404, detail="ACL rule not found")
 
-    role = acl.role
     details = {"role_id": acl.role_id, "permission": acl.permission}
     session.delete(acl)
     session.flush()
-
-    # Invalidate cache for affected users
-    if role:
-        for u in role.users:
-            invalidate_cache(u.id)
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "service.acl.remove", f"services/{name}",
                details=details,
@@ -1059,10 +1052,6 @@ async def replace_service_acl(name: str, body: ServiceACLBulkSet, request: Reque
     if missing:
         raise HTTPException(status_code=400, detail=f"Roles not found: {sorted(missing)}")
 
-    # Collect affected users before deleting (old + new roles)
-    old_acls = session.query(ServiceACL).filter_by(service_name=name).all()
-    affected_role_ids = {a.role_id for a in old_acls} | role_ids
-
     # Delete existing
     session.query(ServiceACL).filter_by(service_name=name).delete()
 
@@ -1080,11 +1069,7 @@ async def replace_service_acl(name: str, body: ServiceACLBulkSet, request: Reque
             session.flush()
             created.append(acl)
 
-    # Invalidate cache for all affected users
-    affected_roles = session.query(Role).filter(Role.id.in_(affected_role_ids)).all()
-    for role in affected_roles:
-        for u in role.users:
-            invalidate_cache(u.id)
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "service.acl.replace", f"services/{name}",
                details={"rules": [{"role_id": r.role_id, "permissions": r.permissions} for r in body.rules]},
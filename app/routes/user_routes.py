@@ -11,8 +11,8 @@ def _utc_iso(dt: datetime | None) -> str | None:
     return dt.isoformat()
 from sqlalchemy.orm import Session
 from database import User, Role, SessionLocal, InviteToken, ServiceACL, UserMFA, MFABackupCode
-from auth import get_current_user, hash_password, create_invite_token
-from permissions import require_permission, get_user_permissions, invalidate_cache
+from auth import get_current_user, hash_password_async, create_invite_token
+from permissions import require_permission, get_user_permissions, bump_authz_version
 from db_session import get_db_session
 from audit import log_action
 from models import InviteUserRequest, UserUpdateRequest, UserRoleAssignment, AdminResetPasswordRequest
@@ -135,6 +135,9 @@ async def update_user(user_id: int, req: UserUpdateRequest,
         # Prevent deactivating yourself
         if user_id == user.id and not req.is_active:
             raise HTTPException(status_code=400, detail="Cannot deactivate your own account")
+        if target.is_active != req.is_active:
+            # Cached sessions of this user must see it in every process
+            bump_authz_version(session)
         target.is_active = req.is_active
     if req.storage_quota_mb is not None:
         if req.storage_quota_mb < 1:
@@ -163,6 +166,7 @@ async def delete_user(user_id: int, request: Request,
 
     session.delete(target)
     session.flush()
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "user.delete", f"users/{user_id}",
                details={"deleted_username": username},
@@ -183,8 +187,8 @@ async def assign_roles(user_id: int, req: UserRoleAssignment, request: Request,
     target.roles = roles
     session.flush()
 
-    # Invalidate permission cache for this user
-    invalidate_cache(user_id)
+    # Invalidate permission caches in every process
+    bump_authz_version(session)
 
     log_action(session, user.id, user.username, "user.roles.assign", f"users/{user_id}",
                details={"role_ids": req.role_ids},
@@ -288,7 +292,7 @@ async def admin_reset_password(user_id: int, req: AdminResetPasswordRequest, req
     if target.id == user.id:
         raise HTTPException(status_code=400, detail="Use the change-password endpoint for your own account")
 
-    target.password_hash = hash_password(req.new_password)
+    target.password_hash = await hash_password_async(req.new_password)
     session.flush()
 
     log_action(session, user.id, user.username, "user.password_reset", f"users/{user_id}",
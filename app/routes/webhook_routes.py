@@ -65,16 +65,21 @@ async def _update_webhook_status(webhook_id: int, job_id: str, runner):
     for _ in range(max_polls):
         await asyncio.sleep(5)
         job = runner.jobs.get(job_id)
-        if job and job.status in ("completed", "failed"):
-            session = SessionLocal()
-            try:
+        if job is not None and job.status not in ("completed", "failed"):
+            continue
+        session = SessionLocal()
+        try:
+            if job is None:
+                # Finished jobs are evicted from memory once persisted
+                job = session.query(JobRecord).filter_by(id=job_id).first()
+            if job and job.status in ("completed", "failed"):
                 wh = session.query(WebhookEndpoint).filter_by(id=webhook_id).first()
                 if wh:
                     wh.last_status = job.status
                     session.commit()
-            finally:
-                session.close()
-            return
+                return
+        finally:
+            session.close()
 
 
 @router.post("/trigger/{token}")
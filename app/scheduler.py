@@ -5,6 +5,8 @@ from datetime import datetime, timezone
 
 from croniter import croniter
 from database import SessionLocal, ScheduledJob, JobRecord
+from models import ACTIVE_JOB_STATUSES
+from metrics import poller_tick
 
 logger = logging.getLogger("scheduler")
 
@@ -23,7 +25,7 @@ class Scheduler:
         if self._task is not None:
             return
         self._running = True
-        self._task = asyncio.create_task(self._loop())
+        self._task = asyncio.create_task(self._loop(), name="scheduler")
         logger.info("Scheduler started (interval=%ds)", self.check_interval)
 
     async def stop(self):
@@ -42,8 +44,9 @@ class Scheduler:
         """Main scheduler loop — check for due jobs every `check_interval` seconds."""
         while self._running:
             try:
-                await self._check_and_dispatch()
-                await self._update_completed_schedules()
+                with poller_tick("scheduler"):
+                    await self._check_and_dispatch()
+                    await self._update_completed_schedules()
             except Exception:
                 logger.exception("Scheduler tick error")
             await asyncio.sleep(self.check_interval)
@@ -194,12 +197,12 @@ class Scheduler:
         """Check if a job is currently running (in-memory check first, then DB)."""
         # In-memory jobs
         if job_id in self.runner.jobs:
-            return self.runner.jobs[job_id].status == "running"
+            return self.runner.jobs[job_id].status in ACTIVE_JOB_STATUSES
         # Persisted jobs
         session = SessionLocal()
         try:
             record = session.query(JobRecord).filter_by(id=job_id).first()
-            return record is not None and record.status == "running"
+            return record is not None and record.status in ACTIVE_JOB_STATUSES
         finally:
             session.close()
 
@@ -219,13 +222,13 @@ class Scheduler:
                 # Check in-memory first
                 if schedule.last_job_id in self.runner.jobs:
                     job = self.runner.jobs[schedule.last_job_id]
-                    if job.status != "running":
+                    if job.status not in ACTIVE_JOB_STATUSES:
                         schedule.last_status = job.status
                         new_status = job.status
                 else:
                     # Check DB
                     record = session.query(JobRecord).filter_by(id=schedule.last_job_id).first()
-                    if record and record.status != "running":
+                    if record and record.status not in ACTIVE_JOB_STATUSES:
                         schedule.last_status = record.status
                         new_status = record.status
 
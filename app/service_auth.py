@@ -12,8 +12,8 @@ Resolution logic:
 
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from database import ServiceACL, User
-from permissions import get_user_permissions, has_permission
+from database import User
+from permissions import get_authz_snapshot, has_permission
 
 SERVICE_PERMISSIONS = {"view", "deploy", "stop", "config"}
 
@@ -32,48 +32,7 @@ def check_service_permission(session: Session, user: User, service_name: str,
 
     permission_suffix is one of: 'view', 'deploy', 'stop', 'config'.
     """
-    perms = get_user_permissions(session, user.id)
-
-    # 1. Wildcard — super-admin
-    if "*" in perms:
-        return True
-
-    # Get user's role IDs
-    role_ids = [r.id for r in user.roles]
-
-    # 2. Check if ANY ACL rows exist for this service
-    acl_exists = session.query(ServiceACL).filter(
-        ServiceACL.service_name == service_name,
-    ).first() is not None
-
-    if not acl_exists:
-        # No ACLs defined → fall back to global RBAC
-        global_perm = _GLOBAL_PERM_MAP.get(permission_suffix, f"services.{permission_suffix}")
-        return global_perm in perms
-
-    # ACLs exist for this service — user must have a matching ACL through their roles
-    if not role_ids:
-        return False
-
-    # Check for exact permission match
-    exact_match = session.query(ServiceACL).filter(
-        ServiceACL.service_name == service_name,
-        ServiceACL.role_id.in_(role_ids),
-        ServiceACL.permission == permission_suffix,
-    ).first()
-    if exact_match:
-        return True
-
-    # Check for "full" permission (grants all 4 permissions)
-    full_match = session.query(ServiceACL).filter(
-        ServiceACL.service_name == service_name,
-        ServiceACL.role_id.in_(role_ids),
-        ServiceACL.permission == "full",
-    ).first()
-    if full_match:
-        return True
-
-    return False
+    return check_service_permissions(session, user, [service_name], permission_suffix)[service_name]
 
 
 def get_user_service_permissions(session: Session, user: User,
@@ -86,13 +45,37 @@ def get_user_service_permissions(session: Session, user: User,
     return result
 
 
+def check_service_permissions(session: Session, user: User, service_names,
+                               permission_suffix: str) -> dict[str, bool]:
+    """Batch form of check_service_permission: {service_name: allowed}.
+
+    Resolved entirely from the user's compiled authz snapshot.
+    """
+    snapshot = get_authz_snapshot(session, user.id)
+    names = set(service_names)
+
+    # 1. Wildcard — super-admin
+    if "*" in snapshot.permissions:
+        return {name: True for name in names}
+
+    result = {}
+    global_perm = _GLOBAL_PERM_MAP.get(permission_suffix, f"services.{permission_suffix}")
+    for name in names:
+        if name not in snapshot.acl_services:
+            # 2. No ACLs defined → fall back to global RBAC
+            result[name] = global_perm in snapshot.permissions
+        else:
+            # ACLs exist — the user's roles need the exact permission or "full"
+            granted = snapshot.service_grants.get(name, frozenset())
+            result[name] = permission_suffix in granted or "full" in granted
+    return result
+
+
 def filter_services_for_user(session: Session, user: User,
                               service_names: list[str]) -> list[str]:
     """Filter a list of service names to only those the user can view."""
-    return [
-        name for name in service_names
-        if check_service_permission(session, user, name, "view")
-    ]
+    allowed = check_service_permissions(session, user, service_names, "view")
+    return [name for name in service_names if allowed[name]]
 
 
 def check_service_script_permission(session: Session, user: User,
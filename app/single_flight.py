@@ -0,0 +1,67 @@
+"""Single-flight coalescing for expensive operations such as inventory regeneration."""
+
+import asyncio
+import time
+
+
+class _Flight:
+    __slots__ = ("owner", "started", "done")
+
+    def __init__(self, owner: str):
+        self.owner = owner
+        self.started = time.monotonic()
+        self.done: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class SingleFlight:
+    """Runs one instance of an operation at a time and shares its result.
+
+    By default a caller attaches to the run in flight, or reuses the last
+    successful run if it started within `fresh_for` seconds. A caller passing
+    `not_before` only accepts runs started at or after that time; an older
+    run in flight is waited out rather than overlapped, then a new one starts.
+    invalidate() sets a floor that applies to every caller.
+    """
+
+    def __init__(self, fresh_for: float):
+        self.fresh_for = fresh_for
+        self._flight: _Flight | None = None
+        self._last: _Flight | None = None
+        self._floor = float("-inf")  # runs started before this are never reused
+
+    async def run(self, owner: str, fn, not_before: float | None = None) -> tuple[bool, str]:
+        """Return (ok, owner of the run whose result was used)."""
+        if not_before is None:
+            # Any in-flight run will do; finished ones only within fresh_for
+            attach_after = self._floor
+            reuse_after = max(time.monotonic() - self.fresh_for, self._floor)
+        else:
+            attach_after = reuse_after = max(not_before, self._floor)
+        while self._flight is not None:
+            flight = self._flight
+            ok = await asyncio.shield(flight.done)
+            if flight.started >= attach_after:
+                return ok, flight.owner
+
+        last = self._last
+        if last is not None and last.started >= reuse_after:
+            return True, last.owner
+
+        flight = self._flight = _Flight(owner)
+        ok = False
+        try:
+            ok = bool(await fn())
+        finally:
+            self._flight = None
+            if ok:
+                self._last = flight
+            flight.done.set_result(ok)
+        return ok, owner
+
+    def invalidate(self):
+        """Stop reusing any run that started before now, in flight or finished."""
+        self._floor = time.monotonic()
+
+    @property
+    def in_flight(self) -> str | None:
+        return self._flight.owner if self._flight else None
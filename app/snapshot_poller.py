@@ -2,6 +2,8 @@
 import asyncio
 import logging
 
+from metrics import poller_tick
+
 logger = logging.getLogger(__name__)
 
 SNAPSHOT_POLL_INTERVAL = 60  # seconds — check every minute
@@ -15,7 +17,7 @@ class SnapshotPoller:
 
     def start(self):
         self._running = True
-        self._task = asyncio.create_task(self._poll_loop())
+        self._task = asyncio.create_task(self._poll_loop(), name="snapshot-poller")
         logger.info("Snapshot poller started (interval: %ds)", SNAPSHOT_POLL_INTERVAL)
 
     async def stop(self):
@@ -32,7 +34,8 @@ class SnapshotPoller:
         await asyncio.sleep(30)
         while self._running:
             try:
-                await self._sync_if_pending()
+                with poller_tick("snapshot"):
+                    await self._sync_if_pending()
             except Exception:
                 logger.exception("Snapshot poll cycle failed")
             await asyncio.sleep(SNAPSHOT_POLL_INTERVAL)
@@ -296,6 +296,45 @@ def load_inventory_types():
     return configs
 
 
+def backfill_inventory_keys(type_configs):
+    """Index configured inventory fields, rebuilding the key table if the set changed."""
+    from database import SessionLocal
+    from inventory_keys import configure_key_fields, ensure_object_keys, ensure_personal_instances
+
+    fields = configure_key_fields(type_configs)
+    session = SessionLocal()
+    try:
+        if ensure_object_keys(session):
+            session.commit()
+            print(f"  Rebuilt inventory lookup keys ({', '.join(fields)})")
+        if ensure_personal_instances(session):
+            session.commit()
+            print("  Rebuilt personal instance index")
+    except Exception as e:
+        session.rollback()
+        print(f"Warning: Could not rebuild inventory lookup keys: {e}")
+    finally:
+        session.close()
+
+
+def backfill_inventory_search(type_configs):
+    """Rebuild the inventory full-text index if its field-scoped set changed."""
+    from database import SessionLocal
+    from inventory_search import configure_search_fields, ensure_search_index
+
+    configure_search_fields(type_configs)
+    session = SessionLocal()
+    try:
+        if ensure_search_index(session):
+            session.commit()
+            print("  Rebuilt inventory search index")
+    except Exception as e:
+        session.rollback()
+        print(f"Warning: Could not rebuild inventory search index: {e}")
+    finally:
+        session.close()
+
+
 def run_inventory_sync(type_configs):
     """Run sync adapters to populate inventory objects from external sources."""
     from inventory_sync import run_sync
@@ -312,6 +351,24 @@ def run_inventory_sync(type_configs):
         session.close()
 
 
+def fail_interrupted_jobs():
+    """Fail jobs left queued/running by the previous process, before the scheduler looks at them."""
+    from database import SessionLocal
+    from job_output import fail_interrupted_jobs as fail_jobs
+
+    session = SessionLocal()
+    try:
+        job_ids = fail_jobs(session)
+        session.commit()
+        if job_ids:
+            print(f"  Marked {len(job_ids)} interrupted job(s) as failed")
+    except Exception as e:
+        session.rollback()
+        print(f"Warning: Could not mark interrupted jobs as failed: {e}")
+    finally:
+        session.close()
+
+
 def init_database():
     """Initialize SQLite database: run migration if needed, create tables, seed permissions."""
     from migration import needs_migration, run_migration
@@ -324,6 +381,9 @@ def init_database():
     # Ensure all tables exist (including new inventory tables)
     create_tables()
 
+    # Jobs still marked running belonged to the previous process
+    fail_interrupted_jobs()
+
     # Seed initial config versions for existing files
     seed_initial_config_versions()
 
@@ -338,6 +398,10 @@ def init_database():
     finally:
         session.close()
 
+    # Index lookup fields before the sync adapters query them
+    backfill_inventory_keys(type_configs)
+    backfill_inventory_search(type_configs)
+
     # Run inventory sync
     run_inventory_sync(type_configs)
 
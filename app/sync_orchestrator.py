@@ -0,0 +1,211 @@
+"""Coalesced, off-loop inventory sync runs.
+
+Deploys, scripts, stops, inventory refreshes and POST /api/inventory/{type}/sync
+all ask for a sync source to be re-run. Instead of each running its own pass
+(loading every type YAML and opening a session), they go through
+request_sync() / request_sync_blocking():
+
+- Requests for a source within SYNC_DEBOUNCE_SECONDS of the first share one
+  run; a request arriving while that source is running waits for the next
+  run, which again absorbs everything that arrives meanwhile. N jobs
+  finishing together therefore cost at most two passes per source.
+- Runs execute on the DB writer thread, so they never block the event loop
+  and never contend with the other background writers for the SQLite lock.
+- Type configs are the ones loaded at startup, not re-read per run.
+
+Every caller awaits the report of the run that covered its request. When no
+orchestrator is running (tests, scripts) requests run directly.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from database import db_writer
+from metrics import INVENTORY_SYNC_REQUESTS, INVENTORY_SYNC_SECONDS
+
+logger = logging.getLogger(__name__)
+
+SYNC_DEBOUNCE_SECONDS = float(os.environ.get("SYNC_DEBOUNCE_MS", "500")) / 1000
+
+
+class _PendingRun:
+    """A run that hasn't started yet; later requests merge into it."""
+
+    __slots__ = ("services", "requests", "future")
+
+    def __init__(self, services: list[str] | None):
+        self.services = None if services is None else set(services)
+        self.requests = 1
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def merge(self, services: list[str] | None):
+        # None means every service, which covers any subset
+        if services is None or self.services is None:
+            self.services = None
+        else:
+            self.services.update(services)
+        self.requests += 1
+
+    @property
+    def options(self) -> dict:
+        return {} if self.services is None else {"services": sorted(self.services)}
+
+
+class _SourceStats:
+    __slots__ = ("requests", "coalesced", "runs", "failures", "total_seconds", "max_seconds",
+                 "last_seconds", "last_started_at", "last_error")
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self.runs = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds: float | None = None
+        self.last_started_at: str | None = None
+        self.last_error: str | None = None
+
+
+class SyncOrchestrator:
+    """Owns the sync adapters' runs: debounced, coalesced per source, one at a time."""
+
+    def __init__(self, type_configs: list[dict] | None = None, debounce: float = SYNC_DEBOUNCE_SECONDS):
+        self.debounce = debounce
+        self._configs = None if type_configs is None else self._index(type_configs)
+        self._pending: dict[str, _PendingRun] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._running: set[str] = set()
+        self._stats: dict[str, _SourceStats] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @staticmethod
+    def _index(type_configs: list[dict]) -> dict[str, dict]:
+        from inventory_sync import sync_source
+
+        configs = {}
+        for config in type_configs:
+            configs.setdefault(sync_source(config), config)
+        configs.pop(None, None)
+        return configs
+
+    def start(self):
+        global _orchestrator
+        self._loop = asyncio.get_running_loop()
+        _orchestrator = self
+        logger.info("Sync orchestrator started (debounce %.0f ms)", self.debounce * 1000)
+
+    async def stop(self):
+        """Stop taking requests and finish the runs already requested."""
+        global _orchestrator
+        if _orchestrator is self:
+            _orchestrator = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info("Sync orchestrator stopped")
+
+    async def request(self, source: str, services: list[str] | None = None):
+        """Sync source (only services' files, for adapters that take them) and return its report.
+
+        Returns None if the source has no adapter or type, or its run failed.
+        """
+        from inventory_sync import SYNC_ADAPTERS
+
+        if self._configs is None:
+            from type_loader import load_type_configs
+            self._configs = self._index(await asyncio.to_thread(load_type_configs))
+        if source not in SYNC_ADAPTERS or source not in self._configs:
+            return None
+
+        stats = self._stats.setdefault(source, _SourceStats())
+        stats.requests += 1
+        pending = self._pending.get(source)
+        if pending is not None:
+            pending.merge(services)
+            stats.coalesced += 1
+            INVENTORY_SYNC_REQUESTS.inc(source=source, outcome="coalesced")
+        else:
+            pending = self._pending[source] = _PendingRun(services)
+            INVENTORY_SYNC_REQUESTS.inc(source=source, outcome="scheduled")
+            task = asyncio.create_task(self._drive(source, pending), name=f"sync:{source}")
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return await asyncio.shield(pending.future)
+
+    async def _drive(self, source: str, pending: _PendingRun):
+        from inventory_sync import run_adapter
+
+        await asyncio.sleep(self.debounce)
+        lock = self._locks.setdefault(source, asyncio.Lock())
+        async with lock:
+            # From here on, new requests start the next run instead of joining this one
+            del self._pending[source]
+            stats = self._stats[source]
+            stats.runs += 1
+            stats.last_started_at = datetime.now(timezone.utc).isoformat()
+            self._running.add(source)
+            started = time.perf_counter()
+            report = None
+            try:
+                report = await db_writer.run_async(
+                    lambda: run_adapter(source, self._configs[source], **pending.options))
+                stats.last_error = None
+            except Exception as e:
+                stats.failures += 1
+                stats.last_error = str(e)
+                logger.exception("Sync failed for %s", source)
+            finally:
+                elapsed = time.perf_counter() - started
+                self._running.discard(source)
+                stats.last_seconds = elapsed
+                stats.total_seconds += elapsed
+                stats.max_seconds = max(stats.max_seconds, elapsed)
+                INVENTORY_SYNC_SECONDS.observe(elapsed, source=source)
+                pending.future.set_result(report)
+
+    def stats(self) -> dict:
+        sources = {}
+        for source, stats in sorted(self._stats.items()):
+            sources[source] = {
+                "requests": stats.requests,
+                "coalesced": stats.coalesced,
+                "runs": stats.runs,
+                "failures": stats.failures,
+                "pending": source in self._pending,
+                "running": source in self._running,
+                "last_started_at": stats.last_started_at,
+                "last_seconds": None if stats.last_seconds is None else round(stats.last_seconds, 4),
+                "avg_seconds": round(stats.total_seconds / stats.runs, 4) if stats.runs else None,
+                "max_seconds": round(stats.max_seconds, 4),
+                "last_error": stats.last_error,
+            }
+        return {"enabled": True, "debounce_seconds": self.debounce, "sources": sources}
+
+
+_orchestrator: SyncOrchestrator | None = None
+
+
+def _sync_options(services: list[str] | None) -> dict:
+    return {} if services is None else {"services": list(services)}
+
+
+async def request_sync(source: str, services: list[str] | None = None):
+    """Request a sync from the event loop and await its report."""
+    if _orchestrator is None:
+        import inventory_sync
+        return await db_writer.run_async(
+            lambda: inventory_sync.run_sync_for_source(source, **_sync_options(services)))
+    return await _orchestrator.request(source, services)
+
+
+def request_sync_blocking(source: str, services: list[str] | None = None):
+    """Request a sync from a worker thread (never the loop) and wait for its report."""
+    orchestrator = _orchestrator
+    if orchestrator is None or db_writer.on_writer_thread():
+        import inventory_sync
+        return inventory_sync.run_sync_for_source(source, **_sync_options(services))
+    return asyncio.run_coroutine_threadsafe(orchestrator.request(source, services), orchestrator._loop).result()
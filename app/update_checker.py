@@ -180,7 +180,7 @@ class UpdateChecker:
         if self._task is not None:
             return
         self._running = True
-        self._task = asyncio.create_task(self._loop())
+        self._task = asyncio.create_task(self._loop(), name="update-checker")
         logger.info("Update checker started (interval=%ds)", CHECK_INTERVAL)
 
     async def stop(self):
@@ -1,6 +1,7 @@
 import { Badge } from '@/components/ui/badge'
 
 const statusVariantMap: Record<string, 'success' | 'destructive' | 'running' | 'warning' | 'secondary'> = {
+  queued: 'warning',
   running: 'running',
   completed: 'success',
   failed: 'destructive',
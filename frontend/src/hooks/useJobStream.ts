@@ -2,6 +2,7 @@ import { useState, useEffect, useRef } from 'react'
 import { useQuery, useQueryClient } from '@tanstack/react-query'
 import api from '@/lib/api'
 import type { Job } from '@/types'
+import { isActiveJobStatus } from '@/lib/utils'
 
 export function useJobStream(jobId: string) {
   const queryClient = useQueryClient()
@@ -22,13 +23,13 @@ export function useJobStream(jobId: string) {
     setOutput(job.output || [])
     setStatus(job.status)
 
-    if (job.status === 'running') {
+    if (isActiveJobStatus(job.status)) {
       intervalRef.current = setInterval(async () => {
         try {
           const { data } = await api.get(`/api/jobs/${jobId}`)
           setOutput(data.output || [])
           setStatus(data.status)
-          if (data.status !== 'running') {
+          if (!isActiveJobStatus(data.status)) {
             clearInterval(intervalRef.current)
             // Invalidate inventory and service queries when job finishes
             queryClient.invalidateQueries({ queryKey: ['inventory'] })
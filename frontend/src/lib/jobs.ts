@@ -0,0 +1,31 @@
+import api from '@/lib/api'
+import type { Job, JobListResponse } from '@/types'
+
+// Largest page GET /api/jobs serves (MAX_PAGE_SIZE in job_routes.py)
+export const JOBS_MAX_PAGE_SIZE = 500
+
+type JobFilters = Record<string, string | number | undefined>
+
+export async function fetchJobsPage(
+  filters: JobFilters = {},
+  cursor: string | null = null,
+  limit?: number
+): Promise<JobListResponse> {
+  const params: JobFilters = { ...filters, limit }
+  if (cursor) params.cursor = cursor
+  const { data } = await api.get('/api/jobs', { params })
+  return { jobs: data.jobs || [], next_cursor: data.next_cursor ?? null }
+}
+
+// Follow next_cursor to the end, for filtered lists (bulk children, one
+// object's history) that must not stop at the first page
+export async function fetchAllJobs(filters: JobFilters): Promise<Job[]> {
+  const jobs: Job[] = []
+  let cursor: string | null = null
+  do {
+    const page = await fetchJobsPage(filters, cursor, JOBS_MAX_PAGE_SIZE)
+    jobs.push(...page.jobs)
+    cursor = page.next_cursor
+  } while (cursor)
+  return jobs
+}
@@ -24,6 +24,11 @@ export function formatDate(dateStr: string): string {
   return new Date(dateStr).toLocaleString()
 }
 
+/** Queued jobs are waiting for an executor slot and will still run. */
+export function isActiveJobStatus(status: string | undefined): boolean {
+  return status === 'running' || status === 'queued'
+}
+
 export function capitalize(str: string): string {
   return str.replace(/\b\w/g, l => l.toUpperCase()).replace(/_/g, ' ')
 }
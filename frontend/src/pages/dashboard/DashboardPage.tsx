@@ -16,6 +16,7 @@ import {
   arrayMove,
 } from '@dnd-kit/sortable'
 import api from '@/lib/api'
+import { fetchJobsPage } from '@/lib/jobs'
 import { cn } from '@/lib/utils'
 import { useHasPermission } from '@/lib/permissions'
 import { useInventoryStore } from '@/stores/inventoryStore'
@@ -29,7 +30,7 @@ import { Card, CardContent } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
 import { StatusBadge } from '@/components/shared/StatusBadge'
 import { Skeleton } from '@/components/ui/skeleton'
-import type { Job, Service } from '@/types'
+import type { JobCounts, Service } from '@/types'
 import type { HealthSummary, HealthStatusResponse } from '@/types/health'
 
 const ALL_SECTIONS = ['pinned_services', 'stats', 'quick_links', 'health', 'recent_jobs']
@@ -47,15 +48,22 @@ export default function DashboardPage() {
     useSensor(KeyboardSensor)
   )
 
-  const { data: jobs, isLoading: jobsLoading } = useQuery({
-    queryKey: ['jobs'],
+  // Counts come from the server: the job list is paged, so counting a page would undercount
+  const { data: jobCounts, isLoading: countsLoading } = useQuery({
+    queryKey: ['jobs', 'counts'],
     queryFn: async () => {
-      const { data } = await api.get('/api/jobs')
-      return (data.jobs || []) as Job[]
+      const { data } = await api.get('/api/jobs/counts')
+      return data as JobCounts
     },
     refetchInterval: 5000,
   })
 
+  const { data: recentJobs = [], isLoading: jobsLoading } = useQuery({
+    queryKey: ['jobs', 'recent'],
+    queryFn: async () => (await fetchJobsPage({}, null, 5)).jobs,
+    refetchInterval: 5000,
+  })
+
   const { data: services } = useQuery({
     queryKey: ['services'],
     queryFn: async () => {
@@ -130,10 +138,8 @@ export default function DashboardPage() {
     refetchInterval: 15000,
   })
 
-  const runningJobs = jobs?.filter((j) => j.status === 'running') || []
-  const completedJobs = jobs?.filter((j) => j.status === 'completed') || []
-  const failedJobs = jobs?.filter((j) => j.status === 'failed') || []
-  const recentJobs = jobs?.slice(0, 5) || []
+  const counts: JobCounts['counts'] = jobCounts?.counts ?? {}
+  const runningCount = (counts.running ?? 0) + (counts.queued ?? 0)
 
   const quickLinks: { service: string; label: string; url: string }[] = []
   if (serviceOutputs) {
@@ -193,21 +199,21 @@ export default function DashboardPage() {
 
           <StatCard
             title="Running Jobs"
-            value={runningJobs.length}
+            value={runningCount}
             icon={<Play className="h-4 w-4" />}
-            loading={jobsLoading}
+            loading={countsLoading}
           />
           <StatCard
             title="Completed Jobs"
-            value={completedJobs.length}
+            value={counts.completed ?? 0}
             icon={<CheckCircle className="h-4 w-4" />}
-            loading={jobsLoading}
+            loading={countsLoading}
           />
           <StatCard
             title="Failed Jobs"
-            value={failedJobs.length}
+            value={counts.failed ?? 0}
             icon={<XCircle className="h-4 w-4" />}
-            loading={jobsLoading}
+            loading={countsLoading}
           />
           <StatCard
             title="Service Health"
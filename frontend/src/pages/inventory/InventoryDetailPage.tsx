@@ -3,6 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { ArrowLeft, Trash2, Play, Plus, X, Terminal, Monitor, Camera, MoreHorizontal, RotateCcw } from 'lucide-react'
 import api from '@/lib/api'
+import { fetchAllJobs } from '@/lib/jobs'
 import { useInventoryStore } from '@/stores/inventoryStore'
 import { useHasPermission } from '@/lib/permissions'
 import { PageHeader } from '@/components/shared/PageHeader'
@@ -92,10 +93,7 @@ export default function InventoryDetailPage() {
 
   const { data: jobHistory = [], isLoading: jobsLoading } = useQuery({
     queryKey: ['inventory', typeSlug, objId, 'jobs'],
-    queryFn: async () => {
-      const { data } = await api.get(`/api/jobs?object_id=${objId}`)
-      return (data.jobs || []) as Job[]
-    },
+    queryFn: () => fetchAllJobs({ object_id: objId }),
     enabled: !!objId,
     refetchInterval: 10000,
   })
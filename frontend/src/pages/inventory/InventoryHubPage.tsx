@@ -30,6 +30,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { toast } from 'sonner'
 import { CredentialViewModal } from '@/components/inventory/CredentialViewModal'
 import { ReauthDialog } from '@/components/inventory/ReauthDialog'
+import { isActiveJobStatus } from '@/lib/utils'
 import type { ColumnDef, RowSelectionState } from '@tanstack/react-table'
 import type { InventoryObject, Tag } from '@/types'
 
@@ -329,7 +330,7 @@ function InventoryListView({ typeSlug }: { typeSlug: string }) {
         for (let i = 0; i < 120; i++) {
           await new Promise((r) => setTimeout(r, 2000))
           const { data: job } = await api.get(`/api/jobs/${jobId}`)
-          if (job.status !== 'running') {
+          if (!isActiveJobStatus(job.status)) {
             if (job.status === 'failed') {
               throw new Error('Refresh job failed')
             }
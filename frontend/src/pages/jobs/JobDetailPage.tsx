@@ -3,15 +3,15 @@ import { useParams, useNavigate } from 'react-router-dom'
 import { ArrowLeft, Loader2, RotateCcw } from 'lucide-react'
 import { useMutation, useQuery } from '@tanstack/react-query'
 import { useJobStream } from '@/hooks/useJobStream'
-import { formatDate } from '@/lib/utils'
+import { formatDate, isActiveJobStatus } from '@/lib/utils'
 import api from '@/lib/api'
+import { fetchAllJobs } from '@/lib/jobs'
 import { toast } from 'sonner'
 import { StatusBadge } from '@/components/shared/StatusBadge'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
 import { Badge } from '@/components/ui/badge'
 import { Button } from '@/components/ui/button'
 import { Skeleton } from '@/components/ui/skeleton'
-import type { Job } from '@/types'
 
 export default function JobDetailPage() {
   const { jobId } = useParams<{ jobId: string }>()
@@ -19,6 +19,7 @@ export default function JobDetailPage() {
   const outputRef = useRef<HTMLDivElement>(null)
 
   const { output, status, job } = useJobStream(jobId || '')
+  const isActive = isActiveJobStatus(status)
 
   const rerunMutation = useMutation({
     mutationFn: () => api.post(`/api/jobs/${jobId}/rerun`),
@@ -35,12 +36,9 @@ export default function JobDetailPage() {
 
   const { data: childJobs = [] } = useQuery({
     queryKey: ['jobs', jobId, 'children'],
-    queryFn: async () => {
-      const { data } = await api.get(`/api/jobs?parent_job_id=${jobId}`)
-      return (data.jobs || []) as Job[]
-    },
+    queryFn: () => fetchAllJobs({ parent_job_id: jobId }),
     enabled: !!job && isBulkJob,
-    refetchInterval: status === 'running' ? 3000 : false,
+    refetchInterval: isActive ? 3000 : false,
   })
 
   useEffect(() => {
@@ -68,8 +66,8 @@ export default function JobDetailPage() {
                 {job.deployment_id}
               </Badge>
             )}
-            {status === 'running' && <Loader2 className="h-4 w-4 animate-spin text-primary" />}
-            {job && status !== 'running' && (
+            {isActive && <Loader2 className="h-4 w-4 animate-spin text-primary" />}
+            {job && !isActive && (
               <Button
                 variant="outline"
                 size="sm"
@@ -181,7 +179,7 @@ export default function JobDetailPage() {
           <CardContent className="space-y-2">
             {childJobs.length === 0 ? (
               <p className="text-sm text-muted-foreground">
-                {status === 'running' ? 'Waiting for child jobs...' : 'No child jobs found.'}
+                {isActive ? 'Waiting for child jobs...' : 'No child jobs found.'}
               </p>
             ) : (
               childJobs.map((child) => (
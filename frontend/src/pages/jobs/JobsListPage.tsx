@@ -1,12 +1,13 @@
 import { useMemo } from 'react'
 import { useNavigate } from 'react-router-dom'
-import { useQuery } from '@tanstack/react-query'
-import api from '@/lib/api'
+import { useInfiniteQuery } from '@tanstack/react-query'
+import { fetchJobsPage } from '@/lib/jobs'
 import { relativeTime } from '@/lib/utils'
 import { PageHeader } from '@/components/shared/PageHeader'
 import { StatusBadge } from '@/components/shared/StatusBadge'
 import { DataTable } from '@/components/data/DataTable'
 import { Badge } from '@/components/ui/badge'
+import { Button } from '@/components/ui/button'
 import { Skeleton } from '@/components/ui/skeleton'
 import type { ColumnDef } from '@tanstack/react-table'
 import type { Job } from '@/types'
@@ -14,14 +15,15 @@ import type { Job } from '@/types'
 export default function JobsListPage() {
   const navigate = useNavigate()
 
-  const { data: jobs = [], isLoading } = useQuery({
-    queryKey: ['jobs'],
-    queryFn: async () => {
-      const { data } = await api.get('/api/jobs')
-      return (data.jobs || []) as Job[]
-    },
+  // The API pages by cursor; "Load more" appends the next page and refetches keep every loaded page fresh
+  const { data, isLoading, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: ['jobs', 'list'],
+    queryFn: ({ pageParam }) => fetchJobsPage({}, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
     refetchInterval: 5000,
   })
+  const jobs = useMemo(() => data?.pages.flatMap((page) => page.jobs) ?? [], [data])
 
   const columns = useMemo<ColumnDef<Job>[]>(
     () => [
@@ -108,7 +110,22 @@ export default function JobsListPage() {
           ))}
         </div>
       ) : (
-        <DataTable columns={columns} data={jobs} searchKey="service" searchPlaceholder="Search jobs..." />
+        <>
+          <DataTable columns={columns} data={jobs} searchKey="service" searchPlaceholder="Search jobs..." />
+          {hasNextPage && (
+            <div className="flex items-center justify-center gap-3 mt-4">
+              <span className="text-sm text-muted-foreground">{jobs.length} jobs loaded</span>
+              <Button
+                variant="outline"
+                size="sm"
+                disabled={isFetchingNextPage}
+                onClick={() => fetchNextPage()}
+              >
+                {isFetchingNextPage ? 'Loading...' : 'Load more'}
+              </Button>
+            </div>
+          )}
+        </>
       )}
     </div>
   )
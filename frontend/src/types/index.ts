@@ -77,7 +77,7 @@ export interface Job {
   action: string
   script?: string
   deployment_id?: string
-  status: 'running' | 'completed' | 'failed' | 'cancelled'
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled'
   output: string[]
   started_at: string
   finished_at?: string
@@ -93,6 +93,16 @@ export interface Job {
   type_slug?: string
 }
 
+export interface JobListResponse {
+  jobs: Job[]
+  next_cursor: string | null
+}
+
+export interface JobCounts {
+  counts: Partial<Record<Job['status'], number>>
+  total: number
+}
+
 export interface Service {
   name: string
   scripts: ServiceScript[]
@@ -14,6 +14,8 @@ from sqlalchemy.pool import StaticPool
 
 from database import Base, User, Role, Permission, AppMetadata
 from permissions import seed_permissions, invalidate_cache
+from auth import reset_auth_caches
+from audit import reset_count_cache
 
 
 # ---------------------------------------------------------------------------
@@ -45,8 +47,8 @@ def test_engine():
     return engine
 
 
-# All modules that do `from database import SessionLocal` at the top level.
-# We must patch every one so they use the test engine.
+# All modules that do `from database import SessionLocal` (or ReadSessionLocal)
+# at the top level. We must patch every one so they use the test engine.
 _SESSION_LOCAL_MODULES = [
     "database",
     "auth",
@@ -79,6 +81,7 @@ _SESSION_LOCAL_MODULES = [
     "routes.feedback_routes",
     "routes.file_routes",
     "mfa",
+    "routes.metrics_routes",
 ]
 
 
@@ -94,19 +97,34 @@ def setup_test_db(test_engine, monkeypatch):
     TestSession = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
     monkeypatch.setattr(database, "engine", test_engine)
+    monkeypatch.setattr(database, "read_engine", test_engine)
 
     for mod_name in _SESSION_LOCAL_MODULES:
         try:
             mod = importlib.import_module(mod_name)
-            if hasattr(mod, "SessionLocal"):
-                monkeypatch.setattr(mod, "SessionLocal", TestSession)
+            for attr in ("SessionLocal", "ReadSessionLocal"):
+                if hasattr(mod, attr):
+                    monkeypatch.setattr(mod, attr, TestSession)
         except ImportError:
             pass
 
     Base.metadata.create_all(bind=test_engine)
     yield
+    _drain_db_writer()
     Base.metadata.drop_all(bind=test_engine)
     invalidate_cache()
+    reset_auth_caches()
+    reset_count_cache()
+
+
+def _drain_db_writer():
+    """Wait for background writes still queued on db_writer.
+
+    They share the single in-memory connection, so one landing during
+    teardown would race the rollback.
+    """
+    import database
+    database.db_writer.submit(lambda: None).result()
 
 
 @pytest.fixture
@@ -118,6 +136,7 @@ def db_session(test_engine):
     try:
         yield session
     finally:
+        _drain_db_writer()
         session.rollback()
         session.close()
 
@@ -315,6 +334,12 @@ def test_app(test_engine, mock_services_dir, monkeypatch):
     from routes.file_routes import router as file_router
     app.include_router(file_router)
 
+    from routes.diagnostics_routes import router as diagnostics_router
+    app.include_router(diagnostics_router)
+
+    from routes.metrics_routes import router as metrics_router
+    app.include_router(metrics_router)
+
     return app
 
 
@@ -326,3 +351,8 @@ async def client(test_app):
     transport = ASGITransport(app=test_app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
+    # Let jobs a test started but didn't wait for finish their DB writes
+    # before the database is torn down
+    tasks = set(test_app.state.ansible_runner.executor._tasks)
+    if tasks:
+        await asyncio.wait(tasks, timeout=5)
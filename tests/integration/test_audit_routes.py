@@ -446,6 +446,28 @@ class TestExportAuditLog:
         assert len(data) == 1
         assert data[0]["resource"] == "my-special-server"
 
+    async def test_export_streams_without_its_own_entry(self, client, auth_headers, seeded_db):
+        for i in range(1200):
+            seeded_db.add(AuditLog(action="service.deploy", resource=f"svc-{i}"))
+        seeded_db.commit()
+
+        resp = await client.get("/api/audit/export?format=json&limit=50000", headers=auth_headers)
+        assert resp.status_code == 200
+        data = json.loads(resp.text)
+        assert len(data) == 1200
+        assert all(entry["action"] != "audit.export" for entry in data)
+
+        export = seeded_db.query(AuditLog).filter(AuditLog.action == "audit.export").one()
+        assert json.loads(export.details)["count"] == 1200
+
+    async def test_action_prefix_does_not_match_longer_category(self, client, auth_headers, seeded_db):
+        _seed_audit_entry(seeded_db, action="service.deploy")
+        _seed_audit_entry(seeded_db, action="services.deploy")
+        _seed_audit_entry(seeded_db, action="service")
+
+        resp = await client.get("/api/audit?action_prefix=service", headers=auth_headers)
+        assert [e["action"] for e in resp.json()["entries"]] == ["service.deploy"]
+
     async def test_export_with_action_prefix_filter(self, client, auth_headers, seeded_db):
         _seed_audit_entry(seeded_db, action="service.deploy")
         _seed_audit_entry(seeded_db, action="service.stop")
@@ -125,3 +125,17 @@ class TestAcceptInvite:
         })
         assert resp.status_code == 400
         assert "Invalid or expired" in resp.json()["detail"]
+
+
+class TestRotateSigningKey:
+    async def test_rotate_keeps_existing_token_valid(self, client, auth_headers):
+        resp = await client.post("/api/auth/signing-keys/rotate", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.json()["kid"]
+
+        resp = await client.get("/api/auth/me", headers=auth_headers)
+        assert resp.status_code == 200
+
+    async def test_requires_settings_edit(self, client, regular_auth_headers):
+        resp = await client.post("/api/auth/signing-keys/rotate", headers=regular_auth_headers)
+        assert resp.status_code == 403
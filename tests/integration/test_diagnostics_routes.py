@@ -0,0 +1,53 @@
+"""Integration tests for /api/system diagnostics routes."""
+from loop_monitor import LoopMonitor
+
+
+class TestLoopStalls:
+    async def test_requires_permission(self, client, regular_auth_headers):
+        resp = await client.get("/api/system/loop-stalls", headers=regular_auth_headers)
+        assert resp.status_code == 403
+
+    async def test_disabled_without_monitor(self, client, auth_headers):
+        resp = await client.get("/api/system/loop-stalls", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.json() == {"enabled": False, "stalls": []}
+
+    async def test_reports_recorded_stalls(self, client, auth_headers, test_app):
+        monitor = LoopMonitor()
+        monitor._record_stall(0.25, {"task": "GET /api/services", "stack": ["frame"]})
+        test_app.state.loop_monitor = monitor
+
+        resp = await client.get("/api/system/loop-stalls", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["enabled"] is False
+        assert data["stalls_total"] == 1
+        assert data["stalls"][0]["task"] == "GET /api/services"
+        assert data["stalls"][0]["duration_ms"] == 250.0
+
+
+class TestSyncStats:
+    async def test_requires_permission(self, client, regular_auth_headers):
+        resp = await client.get("/api/system/sync", headers=regular_auth_headers)
+        assert resp.status_code == 403
+
+    async def test_disabled_without_orchestrator(self, client, auth_headers):
+        resp = await client.get("/api/system/sync", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.json() == {"enabled": False, "sources": {}}
+
+    async def test_reports_per_source_stats(self, client, auth_headers, test_app, monkeypatch):
+        import inventory_sync
+        from sync_orchestrator import SyncOrchestrator
+
+        monkeypatch.setattr(inventory_sync, "run_adapter", lambda source, config, **options: None)
+        orchestrator = SyncOrchestrator([{"slug": "user", "sync": "user_sync"}], debounce=0)
+        test_app.state.sync_orchestrator = orchestrator
+        await orchestrator.request("user_sync")
+
+        resp = await client.get("/api/system/sync", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["enabled"] is True
+        assert data["sources"]["user_sync"]["runs"] == 1
+        assert data["sources"]["user_sync"]["requests"] == 1
@@ -140,6 +140,23 @@ class TestObjectCRUD:
         assert len(objects) == 1
         assert objects[0]["data"]["hostname"] == "alpha-server"
 
+    async def test_search_field_scope_and_highlight(self, client, auth_headers, setup_inventory_type):
+        for hostname in ("web-syd", "syd-db", "web-mel"):
+            await client.post("/api/inventory/server", headers=auth_headers, json={
+                "data": {"hostname": hostname},
+            })
+
+        resp = await client.get("/api/inventory/server?search=hostname:me", headers=auth_headers)
+        objects = resp.json()["objects"]
+        assert [o["data"]["hostname"] for o in objects] == ["web-mel"]
+        assert objects[0]["highlight"] == "web-<mark>mel</mark>"
+
+        resp = await client.get("/api/inventory/server?search=web%20mel", headers=auth_headers)
+        assert resp.json()["total"] == 1
+
+        resp = await client.get("/api/inventory/server?search=%22%22", headers=auth_headers)
+        assert resp.json()["objects"] == []
+
     async def test_no_permission(self, client, regular_auth_headers, setup_inventory_type):
         resp = await client.get("/api/inventory/server", headers=regular_auth_headers)
         assert resp.status_code == 403
@@ -280,3 +297,36 @@ class TestACL:
         resp = await client.delete(f"/api/inventory/server/{obj_id}/acl/{acl_id}",
                                    headers=auth_headers)
         assert resp.status_code == 200
+
+
+class TestSyncReport:
+    @pytest.fixture
+    def synced_type(self, setup_inventory_type, seeded_db, test_app, monkeypatch):
+        from database import AppMetadata
+        config = {**test_app.state.inventory_types[0], "sync": {"source": "vultr_inventory"}}
+        test_app.state.inventory_types = [config]
+        monkeypatch.setattr("type_loader.load_type_configs", lambda: [config])
+        AppMetadata.set(seeded_db, "instances_cache", {"all": {"hosts": {
+            "web1": {"ansible_host": "10.0.0.1"}, "web2": {"ansible_host": "10.0.0.2"},
+        }}})
+        seeded_db.commit()
+        return config
+
+    async def test_sync_returns_and_stores_report(self, client, auth_headers, synced_type):
+        resp = await client.get("/api/inventory/server/sync", headers=auth_headers)
+        assert resp.json()["report"] is None
+
+        resp = await client.post("/api/inventory/server/sync", headers=auth_headers)
+        assert resp.status_code == 200
+        report = resp.json()["report"]
+        assert (report["created"], report["unchanged"]) == (2, 0)
+        assert set(report["phases"]) == {"read", "index", "write"}
+
+        await client.post("/api/inventory/server/sync", headers=auth_headers)
+        resp = await client.get("/api/inventory/server/sync", headers=auth_headers)
+        assert resp.json()["source"] == "vultr_inventory"
+        assert (resp.json()["report"]["created"], resp.json()["report"]["unchanged"]) == (0, 2)
+
+    async def test_type_without_sync_source(self, client, auth_headers, setup_inventory_type):
+        resp = await client.get("/api/inventory/server/sync", headers=auth_headers)
+        assert resp.status_code == 400
@@ -271,6 +271,12 @@ class TestRerunEndpoint:
         assert resp.status_code == 400
         assert "running" in resp.json()["detail"].lower()
 
+    async def test_rerun_queued_job_rejected(self, client, auth_headers, db_session):
+        _insert_job(db_session, id="rque01", status="queued", inputs={})
+
+        resp = await client.post("/api/jobs/rque01/rerun", headers=auth_headers)
+        assert resp.status_code == 400
+
     async def test_rerun_no_auth(self, client):
         resp = await client.post("/api/jobs/someid/rerun")
         assert resp.status_code in (401, 403)
@@ -307,3 +307,195 @@ class TestObjectIdResponseFields:
         data = resp.json()
         assert data["object_id"] is None
         assert data["type_slug"] is None
+
+
+class TestJobListPagination:
+    """Keyset pagination and server-side filters on GET /api/jobs."""
+
+    def _insert_many(self, db_session, count, **kwargs):
+        for i in range(count):
+            record = JobRecord(
+                id=f"pg{i:03d}",
+                service=kwargs.get("service", "svc"),
+                action="deploy",
+                status=kwargs.get("status", "completed"),
+                started_at=f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}",
+                output=json.dumps([f"line {i}"]),
+                user_id=1,
+                username="admin",
+            )
+            db_session.add(record)
+        db_session.commit()
+
+    async def test_list_omits_output(self, client, auth_headers, db_session):
+        _insert_job(db_session, id="summ01")
+
+        resp = await client.get("/api/jobs", headers=auth_headers)
+        assert resp.status_code == 200
+        job = resp.json()["jobs"][0]
+        assert job["id"] == "summ01"
+        assert "output" not in job
+
+    async def test_cursor_walks_all_pages_in_order(self, client, auth_headers, db_session):
+        self._insert_many(db_session, 25)
+
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/jobs?limit=10" + (f"&cursor={cursor}" if cursor else "")
+            resp = await client.get(url, headers=auth_headers)
+            assert resp.status_code == 200
+            body = resp.json()
+            assert len(body["jobs"]) <= 10
+            seen.extend(j["id"] for j in body["jobs"])
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+
+        assert seen == [f"pg{i:03d}" for i in reversed(range(25))]
+
+    async def test_last_page_has_no_cursor(self, client, auth_headers, db_session):
+        self._insert_many(db_session, 3)
+
+        resp = await client.get("/api/jobs?limit=10", headers=auth_headers)
+        assert resp.status_code == 200
+        assert len(resp.json()["jobs"]) == 3
+        assert resp.json()["next_cursor"] is None
+
+    async def test_invalid_cursor_rejected(self, client, auth_headers):
+        resp = await client.get("/api/jobs?cursor=not-a-cursor", headers=auth_headers)
+        assert resp.status_code == 400
+
+    async def test_filter_by_status_and_service(self, client, auth_headers, db_session):
+        _insert_job(db_session, id="fs01", service="alpha", status="completed")
+        _insert_job(db_session, id="fs02", service="alpha", status="failed")
+        _insert_job(db_session, id="fs03", service="beta", status="failed")
+
+        resp = await client.get("/api/jobs?status=failed&service=alpha", headers=auth_headers)
+        assert resp.status_code == 200
+        assert [j["id"] for j in resp.json()["jobs"]] == ["fs02"]
+
+    async def test_filter_by_date_range(self, client, auth_headers, db_session):
+        self._insert_many(db_session, 5)
+
+        resp = await client.get(
+            "/api/jobs?started_after=2025-01-01T00:00:01&started_before=2025-01-01T00:00:04",
+            headers=auth_headers,
+        )
+        assert resp.status_code == 200
+        assert [j["id"] for j in resp.json()["jobs"]] == ["pg003", "pg002", "pg001"]
+
+    async def test_in_memory_running_job_overlays_page(self, client, auth_headers, db_session, test_app):
+        _insert_job(db_session, id="live01", status="running")
+        test_app.state.ansible_runner.jobs["live01"] = Job(
+            id="live01", service="test-service", action="deploy", status="completed",
+            started_at="2025-01-01T00:00:00", user_id=1, username="admin",
+        )
+
+        resp = await client.get("/api/jobs?status=running", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.json()["jobs"] == []
+
+
+class TestJobCounts:
+    async def test_counts_per_status_beyond_one_page(self, client, auth_headers, db_session):
+        for i in range(120):
+            _insert_job(db_session, id=f"cnt{i:03d}", status="failed" if i % 3 else "completed")
+
+        resp = await client.get("/api/jobs/counts", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.json() == {"counts": {"completed": 40, "failed": 80}, "total": 120}
+
+    async def test_live_status_overrides_row(self, client, auth_headers, db_session, test_app):
+        _insert_job(db_session, id="cntlive", status="running")
+        test_app.state.ansible_runner.jobs["cntlive"] = Job(
+            id="cntlive", service="test-service", action="deploy", status="completed",
+            started_at="2025-01-01T00:00:00", user_id=1, username="admin",
+        )
+        test_app.state.ansible_runner.jobs["cntnew"] = Job(
+            id="cntnew", service="test-service", action="deploy", status="queued",
+            started_at="2025-01-01T00:00:01", user_id=1, username="admin",
+        )
+
+        resp = await client.get("/api/jobs/counts", headers=auth_headers)
+        assert resp.json()["counts"] == {"completed": 1, "queued": 1}
+
+    async def test_no_permission_counts_nothing(self, client, regular_auth_headers):
+        resp = await client.get("/api/jobs/counts", headers=regular_auth_headers)
+        assert resp.status_code == 200
+        assert resp.json() == {"counts": {}, "total": 0}
+
+
+class TestJobOutput:
+    """GET /api/jobs/{id}/output returns line ranges."""
+
+    async def test_output_slice_from_db(self, client, auth_headers, db_session):
+        record = JobRecord(
+            id="out01", service="svc", action="deploy", status="completed",
+            started_at="2025-01-01T00:00:00",
+            output=json.dumps([f"line {i}" for i in range(10)]),
+            user_id=1, username="admin",
+        )
+        db_session.add(record)
+        db_session.commit()
+
+        resp = await client.get("/api/jobs/out01/output?offset=3&limit=4", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["total"] == 10
+        assert data["offset"] == 3
+        assert data["lines"] == ["line 3", "line 4", "line 5", "line 6"]
+
+    async def test_output_from_memory(self, client, auth_headers, test_app):
+        test_app.state.ansible_runner.jobs["out02"] = Job(
+            id="out02", service="svc", action="deploy", status="running",
+            started_at="2025-01-01T00:00:00", user_id=1, username="admin",
+            output=["a", "b", "c"],
+        )
+
+        resp = await client.get("/api/jobs/out02/output?offset=1", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.json()["lines"] == ["b", "c"]
+
+    async def test_output_not_found(self, client, auth_headers):
+        resp = await client.get("/api/jobs/missing/output", headers=auth_headers)
+        assert resp.status_code == 404
+
+    async def test_stream_finished_job(self, client, auth_headers, db_session):
+        _insert_job(db_session, id="strm01")
+
+        resp = await client.get("/api/jobs/strm01/stream", headers=auth_headers)
+        assert resp.status_code == 200
+        assert "data: done" in resp.text
+        assert "event: done" in resp.text
+
+    async def test_stream_requires_permission(self, client, regular_auth_headers, db_session):
+        _insert_job(db_session, id="strm02")
+
+        resp = await client.get("/api/jobs/strm02/stream", headers=regular_auth_headers)
+        assert resp.status_code == 403
+
+
+class TestEvictedJobs:
+    """Finished jobs evicted from the registry are served from the DB."""
+
+    async def test_get_job_after_eviction(self, client, auth_headers, test_app):
+        runner = test_app.state.ansible_runner
+        job = Job(
+            id="ev01", service="svc", action="deploy", status="completed",
+            started_at="2025-01-01T00:00:00", user_id=1, username="admin",
+            output=["a", "b"],
+        )
+        runner.jobs[job.id] = job
+        await runner._persist_job(job)
+        runner.jobs.prune(now=float("inf"))
+        assert "ev01" not in runner.jobs
+
+        resp = await client.get("/api/jobs/ev01", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.json()["output"] == ["a", "b"]
+
+    async def test_registry_stats(self, client, auth_headers):
+        resp = await client.get("/api/jobs/registry", headers=auth_headers)
+        assert resp.status_code == 200
+        assert "resident_bytes" in resp.json()
@@ -242,6 +242,27 @@ class TestMFAVerify:
             "mfa_token": mfa_token, "code": "000000"})
         assert resp.status_code == 401
 
+    async def test_indexed_backup_code_checks_one_hash(self, client, auth_headers, admin_user,
+                                                       mfa_enabled_admin, monkeypatch):
+        import mfa
+        from auth import create_mfa_token
+        resp = await client.post("/api/auth/mfa/backup-codes/regenerate", headers=auth_headers)
+        codes = resp.json()["backup_codes"]
+
+        checked = []
+        verify = mfa.verify_backup_code
+        monkeypatch.setattr(mfa, "verify_backup_code", lambda *a: checked.append(a) or verify(*a))
+
+        resp = await client.post("/api/auth/mfa/verify", json={
+            "mfa_token": create_mfa_token(admin_user), "code": "ZZZZ9999"})
+        assert resp.status_code == 401
+        assert checked == []
+
+        resp = await client.post("/api/auth/mfa/verify", json={
+            "mfa_token": create_mfa_token(admin_user), "code": codes[3].lower()})
+        assert resp.status_code == 200
+        assert len(checked) == 1
+
     async def test_verify_with_invalid_mfa_token(self, client, admin_user):
         resp = await client.post("/api/auth/mfa/verify", json={
             "mfa_token": "invalid.token.here",
@@ -200,7 +200,7 @@ class TestGuacamoleInstanceCreation:
         runner.run_script.assert_awaited_once_with(
             "personal-guacamole", "deploy",
             {"username": "alice", "region": "syd"},
-            user_id=user.id, username="alice",
+            user_id=user.id, username="alice", instance="alice-guac-syd",
         )
 
     @patch("routes.personal_instance_routes._load_personal_config")
@@ -360,5 +360,5 @@ class TestGuacamoleInstanceDestroy:
         runner.run_script.assert_awaited_once_with(
             "personal-guacamole", "destroy",
             {"hostname": "destroyer-guac-mel"},
-            user_id=user.id, username="destroyer",
+            user_id=user.id, username="destroyer", instance="destroyer-guac-mel",
         )
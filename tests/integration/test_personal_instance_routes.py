@@ -288,7 +288,7 @@ class TestCreateInstance:
         runner.run_script.assert_awaited_once_with(
             "personal-jump-hosts", "deploy",
             {"username": "creator", "region": "syd"},
-            user_id=user.id, username="creator",
+            user_id=user.id, username="creator", instance="creator-jump-syd",
         )
 
     @patch("routes.personal_instance_routes._load_personal_config")
@@ -439,7 +439,7 @@ class TestDestroyInstance:
         runner.run_script.assert_awaited_once_with(
             "personal-jump-hosts", "destroy",
             {"hostname": "destroyer-jump-mel"},
-            user_id=user.id, username="destroyer",
+            user_id=user.id, username="destroyer", instance="destroyer-jump-mel",
         )
 
     async def test_destroy_other_user_instance_forbidden(self, client, seeded_db, test_app):
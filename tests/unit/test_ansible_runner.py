@@ -326,3 +326,72 @@ class TestGetAllInstanceConfigs:
 
         runner = AnsibleRunner()
         assert runner.get_all_instance_configs() == {}
+
+
+class TestEventLoopResponsiveness:
+    async def test_stop_post_processing_does_not_stall_loop(self, mock_services_dir, tmp_path, monkeypatch):
+        import asyncio
+        import gc
+        import time
+        import ansible_runner
+        import inventory_sync
+        from models import Job
+
+        monkeypatch.setattr(ansible_runner, "SERVICES_DIR", str(mock_services_dir))
+        inventory_file = tmp_path / "vultr.yml"
+        inventory_file.write_text(yaml.dump({"all": {"hosts": {f"host{i}": {} for i in range(500)}}}))
+        monkeypatch.setattr(ansible_runner, "INVENTORY_FILE", str(inventory_file))
+
+        # Stand-ins for the slow blocking work that follows a real stop
+        monkeypatch.setattr(inventory_sync, "run_sync_for_source", lambda source: time.sleep(0.2))
+        persist_blocking = AnsibleRunner._persist_job_blocking
+
+        def slow_persist(self, *args):
+            time.sleep(0.2)
+            return persist_blocking(self, *args)
+
+        monkeypatch.setattr(AnsibleRunner, "_persist_job_blocking", slow_persist)
+
+        runner = AnsibleRunner()
+
+        async def fake_command(job, args, **kwargs):
+            job.output.append(f"$ {' '.join(args)}")
+            return True
+
+        async def fake_generate(job, not_before=None):
+            return True
+
+        async def no_notify(job):
+            pass
+
+        monkeypatch.setattr(runner, "_run_command", fake_command)
+        monkeypatch.setattr(runner, "_generate_inventory", fake_generate)
+        monkeypatch.setattr(runner, "_notify_job", no_notify)
+
+        job = Job(id="stop1", service="test-service", action="stop", status="running",
+                  started_at="2025-01-01T00:00:00", user_id=None, username="system:test")
+        runner.jobs[job.id] = job
+
+        max_gap = 0.0
+        stop = asyncio.Event()
+
+        async def heartbeat():
+            nonlocal max_gap
+            last = time.monotonic()
+            while not stop.is_set():
+                await asyncio.sleep(0.005)
+                now = time.monotonic()
+                max_gap = max(max_gap, now - last)
+                last = now
+
+        gc.collect()  # keep a collection of earlier tests' garbage out of the measurement
+        beat = asyncio.create_task(heartbeat())
+        await asyncio.sleep(0.01)
+        await runner._run_stop(job)
+        stop.set()
+        await beat
+
+        assert job.status == "completed"
+        assert "[Inventory cache updated]" in job.output
+        assert "[SSH credentials synced]" in job.output
+        assert max_gap < 0.05
@@ -1,7 +1,9 @@
 """Unit tests for audit.log_action() helper."""
+import asyncio
 import json
 import pytest
-from audit import log_action
+import audit
+from audit import AuditWriter, count_entries, log_action, search_filter
 from database import AuditLog
 
 
@@ -54,3 +56,116 @@ class TestLogAction:
         # But session is still dirty/uncommitted — rolling back removes it
         seeded_db.rollback()
         assert seeded_db.query(AuditLog).count() == 0
+
+
+@pytest.fixture
+async def writer():
+    w = AuditWriter(batch_size=3, interval=60, max_pending=5)
+    w.start()
+    yield w
+    await w.stop()
+
+
+class TestBufferedWriter:
+    async def test_entries_are_queued_on_commit(self, db_session, writer):
+        log_action(db_session, None, None, "service.deploy", resource="web")
+        assert db_session.query(AuditLog).count() == 0
+        assert writer.pending == 0
+
+        db_session.commit()
+        assert writer.pending == 1
+        await writer.flush()
+        entry = db_session.query(AuditLog).one()
+        assert entry.action == "service.deploy"
+        assert entry.created_at is not None
+
+    async def test_rollback_discards_entries(self, db_session, writer):
+        log_action(db_session, None, None, "service.deploy")
+        db_session.rollback()
+        db_session.commit()
+        assert writer.pending == 0
+
+    async def test_security_actions_are_written_in_the_request(self, db_session, writer):
+        log_action(db_session, None, None, "login")
+        log_action(db_session, None, None, "service.deploy", durable=True)
+        assert db_session.query(AuditLog).count() == 2
+        db_session.commit()
+        assert writer.pending == 0
+
+    async def test_full_batch_wakes_the_writer(self, db_session, writer):
+        for i in range(3):
+            log_action(db_session, None, None, "service.deploy", resource=str(i))
+        db_session.commit()
+        for _ in range(50):
+            if db_session.query(AuditLog).count() == 3:
+                break
+            await asyncio.sleep(0.01)
+        assert [e.resource for e in db_session.query(AuditLog).order_by(AuditLog.id)] == ["0", "1", "2"]
+        assert writer.pending == 0
+
+    async def test_overflow_writes_synchronously(self, db_session):
+        w = AuditWriter(batch_size=100, interval=60, max_pending=2)
+        w.start()
+        try:
+            for i in range(3):
+                log_action(db_session, None, None, "service.deploy", resource=str(i))
+            db_session.commit()
+            assert w.pending == 0
+            assert db_session.query(AuditLog).count() == 3
+        finally:
+            await w.stop()
+
+    async def test_stop_flushes_and_unbuffers(self, db_session, writer):
+        log_action(db_session, None, None, "service.deploy")
+        db_session.commit()
+        await writer.stop()
+        assert db_session.query(AuditLog).count() == 1
+
+        log_action(db_session, None, None, "service.stop")
+        assert db_session.query(AuditLog).count() == 2
+
+
+class TestSearchFilter:
+    def _matching(self, session, search):
+        return sorted(e.action for e in session.query(AuditLog).filter(search_filter(search)))
+
+    def test_words_are_prefix_matches_across_columns(self, db_session):
+        log_action(db_session, None, None, "service.deploy", resource="web-01")
+        log_action(db_session, None, None, "user.login", details={"msg": "deployed splunk"})
+
+        assert self._matching(db_session, "deplo") == ["service.deploy", "user.login"]
+        assert self._matching(db_session, "web deploy") == ["service.deploy"]
+        assert self._matching(db_session, "splunk") == ["user.login"]
+
+    def test_punctuation_only_matches_nothing(self, db_session):
+        log_action(db_session, None, None, "service.deploy")
+        assert self._matching(db_session, "%%") == []
+
+    def test_deleted_entries_leave_the_index(self, db_session):
+        log_action(db_session, None, None, "service.deploy")
+        db_session.query(AuditLog).delete()
+        log_action(db_session, None, None, "user.login")
+        assert self._matching(db_session, "deploy") == []
+
+
+class TestCountEntries:
+    def test_counts_only_new_rows_within_ttl(self, db_session):
+        for _ in range(3):
+            log_action(db_session, None, None, "service.deploy")
+        query = db_session.query(AuditLog).filter(AuditLog.action == "service.deploy")
+        assert count_entries(db_session, query, ("k",)) == 3
+
+        log_action(db_session, None, None, "service.deploy")
+        log_action(db_session, None, None, "user.login")
+        assert count_entries(db_session, query, ("k",)) == 4
+        assert audit._count_cache[("k",)][0] == db_session.query(AuditLog).count()
+
+    def test_expired_entry_is_recounted(self, db_session, monkeypatch):
+        log_action(db_session, None, None, "a.b")
+        query = db_session.query(AuditLog)
+        assert count_entries(db_session, query, ("k",)) == 1
+
+        db_session.query(AuditLog).delete()
+        log_action(db_session, None, None, "a.b")
+        monkeypatch.setattr(audit, "AUDIT_COUNT_CACHE_TTL", 0)
+        assert count_entries(db_session, query, ("k",)) == 1
@@ -77,6 +77,124 @@ class TestJWT:
         assert exc_info.value.status_code == 401
 
 
+def _bearer(token):
+    from fastapi.security import HTTPAuthorizationCredentials
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+class TestSigningKeys:
+    def test_token_header_names_its_key(self, admin_user):
+        from jose import jwt
+        assert jwt.get_unverified_header(create_access_token(admin_user))["kid"] == "default"
+
+    def test_rotation_keeps_old_tokens_valid(self, admin_user, db_session, monkeypatch):
+        import auth
+        from jose import JWTError, jwt
+        monkeypatch.setattr(auth, "SIGNING_KEYS_KEPT", 2)
+        old_token = create_access_token(admin_user)
+
+        kid = auth.rotate_signing_key(db_session)
+        db_session.commit()
+        new_token = create_access_token(admin_user)
+
+        assert jwt.get_unverified_header(new_token)["kid"] == kid
+        assert auth.decode_token(old_token)["uid"] == admin_user.id
+        assert auth.decode_token(new_token)["uid"] == admin_user.id
+
+        auth.rotate_signing_key(db_session)
+        db_session.commit()
+        with pytest.raises(JWTError):
+            auth.decode_token(old_token)
+        assert auth.decode_token(new_token)["uid"] == admin_user.id
+
+    def test_other_process_rotation_is_picked_up(self, admin_user, db_session):
+        import auth
+        create_access_token(admin_user)  # load the key set
+        auth.rotate_signing_key(db_session)
+        db_session.commit()
+        token = create_access_token(admin_user)
+
+        auth.reset_auth_caches()  # as seen by a process that never rotated
+        assert auth.decode_token(token)["uid"] == admin_user.id
+
+
+class TestUserCache:
+    def _count_queries(self, engine, fn):
+        from sqlalchemy import event
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            fn()
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        return len(statements)
+
+    def test_repeat_requests_skip_the_db(self, admin_user, db_session, monkeypatch):
+        import permissions
+        monkeypatch.setattr(permissions, "AUTHZ_VERSION_CHECK_INTERVAL", 3600)
+        creds = _bearer(create_access_token(admin_user))
+        get_current_user(creds)
+
+        assert self._count_queries(db_session.get_bind(), lambda: get_current_user(creds)) == 0
+
+    def test_deactivation_takes_effect_immediately(self, admin_user, db_session):
+        from fastapi import HTTPException
+        creds = _bearer(create_access_token(admin_user))
+        get_current_user(creds)
+
+        admin_user.is_active = False
+        db_session.commit()
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_user(creds)
+        assert exc_info.value.status_code == 401
+
+    def test_profile_change_is_visible(self, admin_user, db_session):
+        creds = _bearer(create_access_token(admin_user))
+        get_current_user(creds)
+
+        admin_user.display_name = "Renamed"
+        db_session.commit()
+
+        assert get_current_user(creds).display_name == "Renamed"
+
+    def test_cache_is_size_bounded(self, admin_user, db_session, monkeypatch):
+        import auth
+        monkeypatch.setattr(auth, "USER_CACHE_SIZE", 1)
+        other = User(username="other", password_hash="x", is_active=True, email="o@test.com")
+        db_session.add(other)
+        db_session.commit()
+
+        get_current_user(_bearer(create_access_token(admin_user)))
+        get_current_user(_bearer(create_access_token(other)))
+        assert list(auth._user_cache) == [other.id]
+
+
+class TestPasswordHashPool:
+    async def test_hashing_runs_off_the_event_loop(self):
+        import threading
+        from auth import run_hashing
+        loop_thread = threading.current_thread().name
+        name = await run_hashing("test", lambda: threading.current_thread().name)
+        assert name != loop_thread
+        assert name.startswith("password-hash")
+
+    async def test_verify_password_async(self):
+        from auth import hash_password_async, verify_password_async
+        hashed = await hash_password_async("s3cret")
+        assert await verify_password_async("s3cret", hashed)
+        assert not await verify_password_async("wrong", hashed)
+
+    async def test_full_queue_is_refused(self, monkeypatch):
+        import auth
+        from fastapi import HTTPException
+        monkeypatch.setattr(auth, "PASSWORD_HASH_MAX_PENDING", 0)
+        with pytest.raises(HTTPException) as exc_info:
+            await auth.run_hashing("test", lambda: None)
+        assert exc_info.value.status_code == 503
+
+
 class TestSetupComplete:
     def test_no_users_returns_false(self, db_session):
         assert is_setup_complete() is False
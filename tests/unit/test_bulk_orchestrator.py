@@ -0,0 +1,142 @@
+"""Unit tests for the shared bulk orchestration engine (bulk_orchestrator.py)."""
+import asyncio
+import time
+
+from ansible_runner import AnsibleRunner, JobExecutor
+from bulk_orchestrator import BulkOrchestrator, dependency_waves
+from models import Job
+
+
+def _parent():
+    return Job(id="parent", service="bulk", action="bulk_deploy", status="running",
+               started_at="2025-01-01T00:00:00", user_id=1, username="admin")
+
+
+class _FakeRunner:
+    """Runner stand-in whose children run through a real JobExecutor."""
+
+    def __init__(self, outcomes: dict[str, str], delay: float = 0.01):
+        self.executor = JobExecutor(max_workers=50)
+        self.stream_hub = AnsibleRunner().stream_hub
+        self.outcomes = outcomes
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.started: list[str] = []
+
+    def starter(self, name: str):
+        async def start():
+            job = Job(id=name, service=name, action="deploy", status="running",
+                      started_at="2025-01-01T00:00:00", user_id=1, username="admin")
+
+            async def run():
+                self.started.append(name)
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+                await asyncio.sleep(self.delay)
+                self.running -= 1
+                job.status = self.outcomes.get(name, "completed")
+
+            self.executor.submit(job, run)
+            return job
+        return start
+
+
+class TestDependencyWaves:
+    def test_dependencies_come_first(self):
+        deps = {"app": ["db", "cache"], "cache": ["db"], "db": []}
+        assert dependency_waves(["app", "cache", "db"], deps) == [["db"], ["cache"], ["app"]]
+
+    def test_reverse_puts_dependents_first(self):
+        deps = {"app": ["db"]}
+        assert dependency_waves(["db", "app", "solo"], deps, reverse=True) == [["app"], ["db", "solo"]]
+
+    def test_unselected_dependencies_and_cycles(self):
+        deps = {"a": ["b", "missing"], "b": ["a"]}
+        assert dependency_waves(["a", "b"], deps) == [["a", "b"]]
+
+
+class TestBulkOrchestrator:
+    async def test_hundred_children_bounded_and_no_polling(self):
+        names = [f"svc{i}" for i in range(100)]
+        runner = _FakeRunner({})
+        parent = _parent()
+        bulk = BulkOrchestrator(runner, parent, "deploy", parallelism=5)
+
+        began = time.monotonic()
+        results = await bulk.run([[(n, runner.starter(n)) for n in names]])
+        elapsed = time.monotonic() - began
+        bulk.finish()
+
+        assert runner.peak <= 5
+        assert len(results) == 100
+        assert parent.status == "completed"
+        # 20 rounds of 10ms; the old 1s polling loop alone would take 100s
+        assert elapsed < 2
+        assert parent.output.count("[svc7] finished: completed") == 1
+
+    async def test_waves_run_in_order(self):
+        runner = _FakeRunner({})
+        bulk = BulkOrchestrator(runner, _parent(), "stop", parallelism=10)
+        await bulk.run([[("app", runner.starter("app"))],
+                        [("db", runner.starter("db")), ("cache", runner.starter("cache"))]])
+        assert runner.started[0] == "app"
+        assert set(runner.started[1:]) == {"db", "cache"}
+        assert "--- Wave 2/2: db, cache ---" in bulk.parent.output
+
+    async def test_fail_fast_skips_remaining(self):
+        runner = _FakeRunner({"b": "failed"})
+        parent = _parent()
+        bulk = BulkOrchestrator(runner, parent, "deploy", parallelism=1, fail_fast=True)
+        results = await bulk.run([[(n, runner.starter(n)) for n in ("a", "b", "c")],
+                                  [("d", runner.starter("d"))]])
+        bulk.finish()
+
+        assert runner.started == ["a", "b"]
+        assert [(label, child is None) for label, child in results] == [
+            ("a", False), ("b", False), ("c", True), ("d", True)]
+        assert "[c] skipped (fail-fast)" in parent.output
+        assert parent.status == "completed"  # partial failure
+
+    async def test_continue_on_error(self):
+        runner = _FakeRunner({"a": "failed", "b": "failed"})
+        parent = _parent()
+        bulk = BulkOrchestrator(runner, parent, "deploy", parallelism=2)
+        await bulk.run([[(n, runner.starter(n)) for n in ("a", "b")]])
+        bulk.finish()
+
+        assert parent.status == "failed"
+        # Both finish together, so completion order is arbitrary
+        assert parent.output[-1] in ("[Failed: a, b]", "[Failed: b, a]")
+
+
+class TestRunnerBulkWaves:
+    async def test_bulk_stop_stops_dependents_first(self, mock_services_dir, monkeypatch):
+        import ansible_runner
+        monkeypatch.setattr(ansible_runner, "SERVICES_DIR", str(mock_services_dir))
+        for name, deps in (("db", ""), ("app", "depends_on: [db]\n")):
+            svc = mock_services_dir / name
+            svc.mkdir()
+            (svc / "deploy.sh").write_text("#!/bin/bash\n")
+            (svc / "instance.yaml").write_text(deps)
+
+        runner = AnsibleRunner()
+        order = []
+
+        async def fake_stop(job):
+            order.append(job.service)
+            job.status = "completed"
+
+        monkeypatch.setattr(runner, "_run_stop", fake_stop)
+        monkeypatch.setattr(runner, "_persist_job", lambda job: asyncio.sleep(0))
+        monkeypatch.setattr(runner, "_notify_job", lambda job: asyncio.sleep(0))
+        monkeypatch.setattr(runner, "_notify_bulk", lambda *a: asyncio.sleep(0))
+
+        parent = await runner.bulk_stop(["db", "app"], user_id=1, username="admin")
+        for _ in range(50):
+            if parent.status != "running":
+                break
+            await asyncio.sleep(0.01)
+
+        assert order == ["app", "db"]
+        assert parent.status == "completed"
@@ -1,9 +1,14 @@
 """Tests for app/database.py — AppMetadata, create_tables, relationships."""
 import pytest
 
+import threading
+
+from sqlalchemy import create_engine, event, text
+
 from database import (
     AppMetadata, User, Role, Permission, create_tables, Base,
     role_permissions, user_roles, InventoryObject, InventoryTag, InventoryType,
+    DBWriter, _apply_pragmas,
 )
 
 
@@ -110,3 +115,46 @@ class TestCreateTables:
         # Tables already created by setup_test_db, calling again shouldn't error
         create_tables()
         create_tables()
+
+
+class TestConnectionPragmas:
+    def _engine(self, tmp_path, read_only):
+        engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+        event.listen(engine, "connect", lambda conn, rec: _apply_pragmas(conn, read_only))
+        return engine
+
+    def test_tuning_applied(self, tmp_path):
+        with self._engine(tmp_path, False).connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA temp_store").scalar() == 2  # MEMORY
+            assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+
+    def test_read_connections_cannot_write(self, tmp_path):
+        with self._engine(tmp_path, False).begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        with self._engine(tmp_path, True).connect() as conn:
+            assert conn.exec_driver_sql("SELECT count(*) FROM t").scalar() == 0
+            with pytest.raises(Exception, match="readonly"):
+                conn.exec_driver_sql("INSERT INTO t VALUES (1)")
+
+
+class TestDBWriter:
+    def test_runs_in_order_on_one_thread(self):
+        writer = DBWriter()
+        seen = []
+        futures = [writer.submit(lambda i=i: seen.append((i, threading.get_ident()))) for i in range(20)]
+        for f in futures:
+            f.result()
+        assert [i for i, _ in seen] == list(range(20))
+        assert len({t for _, t in seen}) == 1
+        assert seen[0][1] != threading.get_ident()
+
+    def test_nested_run_executes_inline(self):
+        writer = DBWriter()
+        assert writer.run(lambda: writer.run(lambda: "inner")) == "inner"
+
+    async def test_run_async_propagates_errors(self):
+        writer = DBWriter()
+        with pytest.raises(ValueError):
+            await writer.run_async(lambda: (_ for _ in ()).throw(ValueError("boom")))
@@ -46,3 +46,66 @@ class TestGetDbSession:
             mock_session.rollback.assert_called_once()
             mock_session.commit.assert_not_called()
             mock_session.close.assert_called_once()
+
+
+class TestGetReadSession:
+    def test_closes_without_committing(self):
+        mock_session = MagicMock()
+        with patch("db_session.ReadSessionLocal", return_value=mock_session):
+            from db_session import get_read_session
+            gen = get_read_session()
+            assert next(gen) is mock_session
+            with pytest.raises(StopIteration):
+                next(gen)
+
+            mock_session.commit.assert_not_called()
+            mock_session.close.assert_called_once()
+
+
+class TestAsyncDBSession:
+    async def test_runs_off_the_loop_thread(self):
+        import threading
+        from db_session import AsyncDBSession
+        mock_session = MagicMock()
+        db = AsyncDBSession(lambda: mock_session, commit=True)
+
+        thread, session = await db.run_sync(lambda s: (threading.get_ident(), s))
+        assert session is mock_session
+        assert thread != threading.get_ident()
+
+    async def test_get_async_db_session_commits(self):
+        mock_session = MagicMock()
+        with patch("db_session.SessionLocal", return_value=mock_session):
+            from db_session import get_async_db_session
+            gen = get_async_db_session()
+            db = await gen.__anext__()
+            await db.run_sync(lambda s: s.query("x"))
+            with pytest.raises(StopAsyncIteration):
+                await gen.__anext__()
+
+        mock_session.commit.assert_called_once()
+        mock_session.close.assert_called_once()
+
+    async def test_get_async_db_session_rolls_back_on_error(self):
+        mock_session = MagicMock()
+        with patch("db_session.SessionLocal", return_value=mock_session):
+            from db_session import get_async_db_session
+            gen = get_async_db_session()
+            db = await gen.__anext__()
+            await db.run_sync(lambda s: None)
+            with pytest.raises(ValueError):
+                await gen.athrow(ValueError("test error"))
+
+        mock_session.rollback.assert_called_once()
+        mock_session.commit.assert_not_called()
+        mock_session.close.assert_called_once()
+
+    async def test_unused_session_is_never_opened(self):
+        factory = MagicMock()
+        with patch("db_session.ReadSessionLocal", factory):
+            from db_session import get_async_read_session
+            gen = get_async_read_session()
+            await gen.__anext__()
+            with pytest.raises(StopAsyncIteration):
+                await gen.__anext__()
+        factory.assert_not_called()
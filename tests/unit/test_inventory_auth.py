@@ -1,8 +1,9 @@
 """Tests for app/inventory_auth.py — 4-layer inventory RBAC permission resolution."""
 import json
 import pytest
+from sqlalchemy import event
 
-from inventory_auth import check_inventory_permission, check_type_permission
+from inventory_auth import check_inventory_permission, check_inventory_permissions, check_type_permission
 from permissions import seed_permissions, invalidate_cache
 from database import (
     InventoryType, InventoryObject, Permission, Role, User,
@@ -245,6 +246,68 @@ class TestRoleTypePermission:
         assert result is False
 
 
+class TestBatchPermissions:
+    @pytest.fixture
+    def mixed_objects(self, setup_inventory_type):
+        """100 servers: every 3rd denied by ACL, every 5th tagged, the rest plain."""
+        ctx = setup_inventory_type
+        session = ctx["session"]
+        tag_role = Role(name="batch-tag-role", description="Tag grants edit")
+        session.add(tag_role)
+        session.flush()
+        user = _make_user(session, "batch_user", roles=[ctx["viewer_role"], tag_role])
+
+        tag = InventoryTag(name="batch", color="#0000ff")
+        session.add(tag)
+        session.flush()
+        session.add(TagPermission(tag_id=tag.id, role_id=tag_role.id, permission="edit"))
+
+        objects = [InventoryObject(type_id=ctx["inv_type"].id, data=json.dumps({"hostname": f"h{i}"}))
+                   for i in range(100)]
+        session.add_all(objects)
+        session.flush()
+        for i, obj in enumerate(objects):
+            if i % 3 == 0:
+                session.add(ObjectACL(object_id=obj.id, role_id=ctx["viewer_role"].id,
+                                      permission="view", effect="deny"))
+            if i % 5 == 0:
+                session.execute(object_tags.insert().values(object_id=obj.id, tag_id=tag.id))
+        session.commit()
+        invalidate_cache()
+        return session, user, [obj.id for obj in objects]
+
+    @pytest.mark.parametrize("suffix", ["view", "edit"])
+    def test_matches_single_object_check(self, mixed_objects, suffix):
+        session, user, ids = mixed_objects
+        ids = ids + [999999]
+
+        batch = check_inventory_permissions(session, user, ids, suffix)
+
+        assert batch == {oid: check_inventory_permission(session, user, oid, suffix) for oid in ids}
+        assert batch[999999] is False
+        assert any(batch.values()) and not all(batch.values())
+
+    def test_query_count_independent_of_size(self, mixed_objects):
+        session, user, ids = mixed_objects
+        check_inventory_permissions(session, user, ids[:1], "view")  # warm permission cache
+
+        statements = []
+        engine = session.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            counts = []
+            for size in (10, 100):
+                statements.clear()
+                check_inventory_permissions(session, user, ids[:size], "view")
+                counts.append(len(statements))
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert counts[0] == counts[1]
+        assert counts[1] <= 5
+
+
 # ---------------------------------------------------------------------------
 # check_type_permission tests
 # ---------------------------------------------------------------------------
@@ -0,0 +1,200 @@
+"""Unit tests for indexed inventory lookups (inventory_keys.py)."""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import database
+from database import AppMetadata, InventoryObject, InventoryObjectKey, InventoryType, PersonalInstance
+from inventory_keys import (
+    KEY_FIELDS_META, configure_key_fields, ensure_object_keys, ensure_personal_instances, key_filter,
+    objects_with_key, rebuild_object_keys, rebuild_personal_instances,
+)
+from inventory_upsert import TypeIndex, UpsertRecord, delete_objects, field_key, upsert_objects
+
+
+@pytest.fixture
+def server_type(db_session):
+    t = InventoryType(slug="server", label="Server")
+    db_session.add(t)
+    db_session.flush()
+    return t
+
+
+@pytest.fixture
+def restore_key_fields():
+    saved = set(database.INVENTORY_KEY_FIELDS)
+    yield
+    database.INVENTORY_KEY_FIELDS.clear()
+    database.INVENTORY_KEY_FIELDS.update(saved)
+
+
+def _server(session, type_id, hostname, tags=(), **extra):
+    obj = InventoryObject(type_id=type_id, data=json.dumps(
+        {"hostname": hostname, "vultr_tags": list(tags), **extra}))
+    session.add(obj)
+    session.flush()
+    return obj
+
+
+def _keys(session, obj):
+    rows = session.query(InventoryObjectKey.field, InventoryObjectKey.value).filter_by(object_id=obj.id)
+    return set(rows)
+
+
+class TestKeyMaintenance:
+    def test_insert_indexes_scalars_and_list_elements(self, db_session, server_type):
+        obj = _server(db_session, server_type.id, "web1", ["personal-instance", "pi-user:alice"],
+                      vultr_id="abc", region="syd")
+        assert _keys(db_session, obj) == {
+            ("hostname", "web1"), ("vultr_id", "abc"),
+            ("vultr_tags", "personal-instance"), ("vultr_tags", "pi-user:alice"),
+        }
+
+    def test_update_replaces_keys(self, db_session, server_type):
+        obj = _server(db_session, server_type.id, "web1", ["a"])
+        obj.data = json.dumps({"hostname": "web2", "vultr_tags": ["b"]})
+        db_session.flush()
+        assert _keys(db_session, obj) == {("hostname", "web2"), ("vultr_tags", "b")}
+
+    def test_delete_removes_keys(self, db_session, server_type):
+        obj = _server(db_session, server_type.id, "web1")
+        object_id = obj.id
+        db_session.delete(obj)
+        db_session.flush()
+        assert db_session.query(InventoryObjectKey).filter_by(object_id=object_id).count() == 0
+
+
+class TestLookups:
+    def test_objects_with_key_matches_field_and_type(self, db_session, server_type):
+        other = InventoryType(slug="service", label="Service")
+        db_session.add(other)
+        db_session.flush()
+        target = _server(db_session, server_type.id, "web1")
+        _server(db_session, server_type.id, "web2")
+        _server(db_session, other.id, "web1")
+
+        assert objects_with_key(db_session, server_type.id, "hostname", "web1").all() == [target]
+
+    def test_tag_filters_combine(self, db_session, server_type):
+        mine = _server(db_session, server_type.id, "a", ["personal-instance", "pi-user:alice"])
+        _server(db_session, server_type.id, "b", ["personal-instance", "pi-user:bob"])
+        _server(db_session, server_type.id, "c", ["pi-user:alice"])
+
+        found = (objects_with_key(db_session, server_type.id, "vultr_tags", "pi-user:alice")
+                 .filter(key_filter(server_type.id, "vultr_tags", "personal-instance")).all())
+        assert found == [mine]
+
+    def test_unindexed_field_rejected(self, server_type):
+        with pytest.raises(ValueError):
+            key_filter(server_type.id, "region", "syd")
+
+    def test_personal_instance_lookup_uses_index(self, db_session, server_type):
+        from routes.personal_instance_routes import _find_instance_object
+        for i in range(20):
+            _server(db_session, server_type.id, f"host{i}", ["personal-instance", f"pi-user:u{i}"])
+
+        obj, owner = _find_instance_object(db_session, "host7")
+        assert json.loads(obj.data)["hostname"] == "host7"
+        assert owner == "u7"
+
+
+class TestConfigureAndRebuild:
+    def test_indexed_type_fields_are_added(self, restore_key_fields):
+        fields = configure_key_fields([{"slug": "server", "fields": [
+            {"name": "region", "type": "string", "indexed": True},
+            {"name": "root_password", "type": "secret", "indexed": True},
+            {"name": "plan", "type": "string"},
+        ]}])
+        assert "region" in fields
+        assert "root_password" not in fields
+        assert "plan" not in fields
+
+    def test_ensure_rebuilds_when_field_set_changes(self, db_session, server_type, restore_key_fields):
+        obj = _server(db_session, server_type.id, "web1", region="syd")
+        assert ensure_object_keys(db_session) is True
+        assert ensure_object_keys(db_session) is False
+
+        configure_key_fields([{"fields": [{"name": "region", "type": "string", "indexed": True}]}])
+        assert ensure_object_keys(db_session) is True
+        assert ("region", "syd") in _keys(db_session, obj)
+        assert "region" in AppMetadata.get(db_session, KEY_FIELDS_META)
+
+    def test_rebuild_restores_missing_rows(self, db_session, server_type):
+        obj = _server(db_session, server_type.id, "web1", ["x"])
+        db_session.query(InventoryObjectKey).delete()
+        assert rebuild_object_keys(db_session) == 2
+        assert _keys(db_session, obj) == {("hostname", "web1"), ("vultr_tags", "x")}
+
+
+PI_TAGS = ["personal-instance", "pi-user:alice", "pi-service:jump", "pi-ttl:4"]
+
+
+def _instance(session, obj):
+    return session.query(PersonalInstance).filter_by(object_id=obj.id).first()
+
+
+class TestPersonalInstances:
+    def test_insert_projects_tags(self, db_session, server_type):
+        obj = _server(db_session, server_type.id, "pi1", PI_TAGS)
+        _server(db_session, server_type.id, "web1", ["pi-user:alice"])
+
+        row = _instance(db_session, obj)
+        assert (row.hostname, row.owner, row.service, row.ttl_hours) == ("pi1", "alice", "jump", 4)
+        assert row.expires_at - row.created_at == timedelta(hours=4)
+        assert db_session.query(PersonalInstance).count() == 1
+
+    def test_no_ttl_never_expires(self, db_session, server_type):
+        obj = _server(db_session, server_type.id, "pi1", ["personal-instance", "pi-ttl:0"])
+        assert _instance(db_session, obj).expires_at is None
+
+    def test_update_and_extend(self, db_session, server_type):
+        obj = _server(db_session, server_type.id, "pi1", PI_TAGS)
+        obj.data = json.dumps({"hostname": "pi1", "vultr_tags": PI_TAGS[:3] + ["pi-ttl:8"]})
+        db_session.flush()
+        assert _instance(db_session, obj).ttl_hours == 8
+
+        later = datetime(2030, 1, 1, 12, 0)
+        obj.created_at = later
+        db_session.flush()
+        db_session.expire_all()
+        assert _instance(db_session, obj).expires_at == later + timedelta(hours=8)
+
+    def test_untagging_and_delete_remove_row(self, db_session, server_type):
+        obj = _server(db_session, server_type.id, "pi1", PI_TAGS)
+        obj.data = json.dumps({"hostname": "pi1", "vultr_tags": []})
+        db_session.flush()
+        assert _instance(db_session, obj) is None
+
+        other = _server(db_session, server_type.id, "pi2", PI_TAGS)
+        db_session.delete(other)
+        db_session.flush()
+        assert db_session.query(PersonalInstance).count() == 0
+
+    def test_bulk_upsert_maintains_projection(self, db_session, server_type):
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        result = upsert_objects(db_session, index, [
+            UpsertRecord({"hostname": "pi1", "vultr_tags": PI_TAGS}, "pi1"),
+            UpsertRecord({"hostname": "web1", "vultr_tags": []}, "web1"),
+        ])
+        object_id = result.ids["pi1"]
+        row = db_session.query(PersonalInstance).filter_by(object_id=object_id).one()
+        assert row.owner == "alice" and row.expires_at is not None
+
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        upsert_objects(db_session, index, [
+            UpsertRecord({"hostname": "pi1", "vultr_tags": PI_TAGS[:3] + ["pi-user:bob"]}, "pi1")])
+        db_session.expire_all()
+        assert db_session.query(PersonalInstance).filter_by(object_id=object_id).one().owner == "bob"
+
+        delete_objects(db_session, index, [object_id])
+        assert db_session.query(PersonalInstance).count() == 0
+
+    def test_ensure_rebuilds_once(self, db_session, server_type):
+        obj = _server(db_session, server_type.id, "pi1", PI_TAGS)
+        db_session.query(PersonalInstance).delete()
+
+        assert ensure_personal_instances(db_session) is True
+        assert _instance(db_session, obj).owner == "alice"
+        assert ensure_personal_instances(db_session) is False
+        assert rebuild_personal_instances(db_session) == 1
@@ -0,0 +1,141 @@
+"""Unit tests for inventory full-text search (inventory_search.py)."""
+import json
+
+import pytest
+from sqlalchemy import text
+
+import database
+from database import AppMetadata, InventoryObject, InventoryType
+from inventory_search import (
+    SEARCH_FIELDS_META, build_match, configure_search_fields, ensure_search_index, highlight_html,
+    rebuild_search_index, search_matches,
+)
+
+
+@pytest.fixture
+def server_type(db_session):
+    t = InventoryType(slug="server", label="Server")
+    db_session.add(t)
+    db_session.flush()
+    return t
+
+
+@pytest.fixture
+def restore_search_fields():
+    saved = set(database.INVENTORY_SEARCH_FIELDS)
+    yield
+    database.INVENTORY_SEARCH_FIELDS.clear()
+    database.INVENTORY_SEARCH_FIELDS.update(saved)
+
+
+def _server(session, type_id, hostname, search_text=None, **extra):
+    data = {"hostname": hostname, **extra}
+    obj = InventoryObject(type_id=type_id, data=json.dumps(data),
+                          search_text=search_text if search_text is not None else hostname)
+    session.add(obj)
+    session.flush()
+    return obj
+
+
+def _search(session, query):
+    matches = search_matches(build_match(query))
+    rows = (session.query(InventoryObject, matches.c.snippet)
+            .join(matches, matches.c.object_id == InventoryObject.id)
+            .order_by(matches.c.rank).all())
+    return [json.loads(obj.data)["hostname"] for obj, _ in rows]
+
+
+class TestBuildMatch:
+    def test_words_are_prefix_phrases(self):
+        assert build_match("web db") == 'body : "web"* AND body : "db"*'
+
+    def test_quoted_phrase_is_exact(self):
+        assert build_match('"web server"') == 'body : "web server"'
+
+    def test_field_scoped(self):
+        assert build_match("hostname:web*") == (
+            'fields : "hostname__web"* AND (body : "web"* OR fields : "hostname__web"*)')
+        assert build_match('Region:"New York"').startswith('fields : "region__new region__york" AND')
+
+    def test_unknown_field_searches_body(self):
+        assert build_match("10.0.0.1:22") == 'body : "10 0 0 1 22"*'
+
+    def test_fts_syntax_is_neutralised(self):
+        assert build_match('web" OR NEAR(x') == 'body : "web"* AND body : "or"* AND body : "near x"*'
+
+    def test_nothing_searchable(self):
+        assert build_match("!!! --") is None
+
+
+class TestSearch:
+    def test_prefix_and_phrase(self, db_session, server_type):
+        _server(db_session, server_type.id, "web01", "web01 frontend server")
+        _server(db_session, server_type.id, "db01", "db01 postgres server")
+
+        assert _search(db_session, "web") == ["web01"]
+        assert _search(db_session, '"postgres server"') == ["db01"]
+        assert sorted(_search(db_session, "server")) == ["db01", "web01"]
+
+    def test_field_scope_ignores_other_fields(self, db_session, server_type):
+        _server(db_session, server_type.id, "web01", region="syd")
+        _server(db_session, server_type.id, "syd-bastion", region="mel")
+
+        assert _search(db_session, "hostname:syd") == ["syd-bastion"]
+        assert _search(db_session, "region:syd") == ["web01"]
+
+    def test_secret_values_not_field_searchable(self, db_session, server_type):
+        _server(db_session, server_type.id, "web01", default_password="hunter2")
+        assert build_match("default_password:hunter2") == 'body : "default_password hunter2"*'
+        assert _search(db_session, "default_password:hunter2") == []
+
+    def test_bm25_orders_better_matches_first(self, db_session, server_type):
+        _server(db_session, server_type.id, "a", "alpha notes with many other words about beta")
+        _server(db_session, server_type.id, "b", "beta beta")
+        assert _search(db_session, "beta")[0] == "b"
+
+    def test_index_follows_updates_and_deletes(self, db_session, server_type):
+        obj = _server(db_session, server_type.id, "old-name")
+        obj.data = json.dumps({"hostname": "new-name"})
+        obj.search_text = "new-name"
+        db_session.flush()
+        assert _search(db_session, "old") == []
+        assert _search(db_session, "hostname:new") == ["new-name"]
+
+        db_session.delete(obj)
+        db_session.flush()
+        assert _search(db_session, "new") == []
+
+    def test_highlight_is_escaped(self, db_session, server_type):
+        _server(db_session, server_type.id, "x", "<b>web</b> box")
+        matches = search_matches(build_match("web"))
+        snippet = db_session.execute(matches.select()).first().snippet
+        assert highlight_html(snippet) == "&lt;b&gt;<mark>web</mark>&lt;/b&gt; box"
+
+
+class TestConfigureAndRebuild:
+    def test_searchable_type_fields_are_added(self, restore_search_fields):
+        fields = configure_search_fields([{"fields": [
+            {"name": "owner", "type": "string", "searchable": True},
+            {"name": "api_key", "type": "secret", "searchable": True},
+            {"name": "bad name", "type": "string", "searchable": True},
+        ]}])
+        assert "owner" in fields
+        assert "api_key" not in fields
+        assert "bad name" not in fields
+
+    def test_ensure_rebuilds_on_field_change(self, db_session, server_type, restore_search_fields):
+        _server(db_session, server_type.id, "web01", owner="alice")
+        assert ensure_search_index(db_session) is True
+        assert ensure_search_index(db_session) is False
+        assert _search(db_session, "owner:alice") == []
+
+        configure_search_fields([{"fields": [{"name": "owner", "type": "string", "searchable": True}]}])
+        assert ensure_search_index(db_session) is True
+        assert _search(db_session, "owner:alice") == ["web01"]
+        assert "owner" in AppMetadata.get(db_session, SEARCH_FIELDS_META)
+
+    def test_rebuild_restores_index(self, db_session, server_type):
+        _server(db_session, server_type.id, "web01")
+        db_session.execute(text("DELETE FROM inventory_fts"))
+        assert rebuild_search_index(db_session) == 1
+        assert _search(db_session, "web") == ["web01"]
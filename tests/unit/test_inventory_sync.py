@@ -8,7 +8,7 @@ from database import (
     InventoryType, InventoryObject, InventoryTag, AppMetadata, User, Role, JobRecord,
 )
 from inventory_sync import (
-    _build_search_text, _find_or_create_object,
+    _build_search_text,
     VultrInventorySync, ServiceDiscoverySync, UserSync, DeploymentSync,
     run_sync, run_sync_for_source, SYNC_ADAPTERS,
 )
@@ -73,50 +73,6 @@ class TestBuildSearchText:
         assert result == ""
 
 
-# ---------------------------------------------------------------------------
-# TestFindOrCreateObject
-# ---------------------------------------------------------------------------
-
-class TestFindOrCreateObject:
-    def test_creates_new_object(self, db_session, inventory_types_in_db):
-        inv_type = inventory_types_in_db["server"]
-        fields = [{"name": "hostname", "searchable": True}]
-        data = {"hostname": "new-host"}
-
-        obj = _find_or_create_object(db_session, inv_type.id, data, "hostname", fields)
-        db_session.flush()
-
-        assert obj.id is not None
-        assert json.loads(obj.data)["hostname"] == "new-host"
-
-    def test_updates_existing_object(self, db_session, inventory_types_in_db):
-        inv_type = inventory_types_in_db["server"]
-        fields = [{"name": "hostname", "searchable": True}]
-
-        # Create initial
-        _find_or_create_object(db_session, inv_type.id, {"hostname": "host1", "ip": "1.1.1.1"}, "hostname", fields)
-        db_session.flush()
-
-        # Update
-        obj = _find_or_create_object(db_session, inv_type.id, {"hostname": "host1", "ip": "2.2.2.2"}, "hostname", fields)
-        db_session.flush()
-
-        assert json.loads(obj.data)["ip"] == "2.2.2.2"
-        # Should still be only one object
-        count = db_session.query(InventoryObject).filter_by(type_id=inv_type.id).count()
-        assert count == 1
-
-    def test_creates_when_no_unique_value(self, db_session, inventory_types_in_db):
-        inv_type = inventory_types_in_db["server"]
-        fields = [{"name": "hostname", "searchable": True}]
-        data = {"hostname": None, "ip": "1.1.1.1"}
-
-        obj = _find_or_create_object(db_session, inv_type.id, data, "hostname", fields)
-        db_session.flush()
-
-        assert obj.id is not None
-
-
 # ---------------------------------------------------------------------------
 # TestVultrInventorySync
 # ---------------------------------------------------------------------------
@@ -152,6 +108,23 @@ class TestVultrInventorySync:
         hostnames = {json.loads(o.data)["hostname"] for o in objs}
         assert hostnames == {"web1", "web2"}
 
+    def test_report_counts_unchanged_on_resync(self, db_session, inventory_types_in_db):
+        hosts = {"web1": {"ansible_host": "10.0.0.1", "vultr_default_password": "pw"},
+                 "web2": {"ansible_host": "10.0.0.2"}}
+        AppMetadata.set(db_session, "instances_cache", {"all": {"hosts": hosts}})
+        db_session.flush()
+
+        first = VultrInventorySync().sync(db_session, self._make_type_config())
+        # Two servers plus web1's root password credential
+        assert (first.created, first.updated, first.unchanged) == (3, 0, 0)
+
+        hosts["web2"]["ansible_host"] = "10.0.0.3"
+        AppMetadata.set(db_session, "instances_cache", {"all": {"hosts": hosts}})
+        second = VultrInventorySync().sync(db_session, self._make_type_config())
+        assert (second.created, second.updated, second.unchanged, second.deleted) == (0, 1, 2, 0)
+        assert set(second.phases) == {"read", "index", "write"}
+        assert "1 updated" in second.summary()
+
     def test_removes_stale_objects(self, db_session, inventory_types_in_db):
         # First sync with two hosts
         cache = {
@@ -914,6 +887,16 @@ class TestRunSyncForSource:
         call_args = mock_adapter.sync.call_args
         assert call_args[0][1] == mock_configs[0]
 
+    def test_stores_report(self, db_session, inventory_types_in_db, monkeypatch):
+        from inventory_sync import last_sync_report
+        mock_configs = [{"slug": "user", "sync": {"source": "user_sync"}, "fields": []}]
+        monkeypatch.setattr("type_loader.load_type_configs", lambda: mock_configs)
+
+        report = run_sync_for_source("user_sync")
+
+        assert report.source == "user_sync"
+        assert last_sync_report(db_session, "user_sync") == report.to_dict()
+
     def test_skips_unknown_source(self, db_session, inventory_types_in_db, monkeypatch):
         """run_sync_for_source with unknown source name is a no-op."""
         mock_configs = [
@@ -0,0 +1,180 @@
+"""Unit tests for bulk inventory upserts (inventory_upsert.py)."""
+import json
+import time
+
+import pytest
+from sqlalchemy import text
+
+from database import InventoryObject, InventoryObjectKey, InventoryTag, InventoryType
+from inventory_upsert import (
+    TagCache, TypeIndex, UpsertRecord, content_hash, delete_objects, field_key, upsert_objects,
+)
+
+
+@pytest.fixture
+def server_type(db_session):
+    t = InventoryType(slug="server", label="Server")
+    db_session.add(t)
+    db_session.flush()
+    return t
+
+
+def _record(hostname, **extra):
+    data = {"hostname": hostname, **extra}
+    return UpsertRecord(data, hostname)
+
+
+def _hostnames(session, type_id):
+    rows = session.query(InventoryObject).filter_by(type_id=type_id).order_by(InventoryObject.id)
+    return [json.loads(obj.data)["hostname"] for obj in rows]
+
+
+def _fts_rowids(session, word):
+    rows = session.execute(text("SELECT rowid FROM inventory_fts WHERE inventory_fts MATCH :q"),
+                           {"q": f'body : "{word}"'})
+    return {row[0] for row in rows}
+
+
+class TestUpsertObjects:
+    def test_creates_new_objects(self, db_session, server_type):
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        result = upsert_objects(db_session, index, [_record("web1"), _record("web2")])
+
+        assert (result.created, result.updated) == (2, 0)
+        assert _hostnames(db_session, server_type.id) == ["web1", "web2"]
+        assert set(result.ids) == {"web1", "web2"}
+
+    def test_updates_existing_object(self, db_session, server_type):
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        upsert_objects(db_session, index, [_record("host1", ip="1.1.1.1")])
+
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        result = upsert_objects(db_session, index, [_record("host1", ip="2.2.2.2")])
+
+        assert (result.created, result.updated) == (0, 1)
+        obj = db_session.query(InventoryObject).filter_by(type_id=server_type.id).one()
+        assert json.loads(obj.data)["ip"] == "2.2.2.2"
+
+    def test_identical_record_is_not_rewritten(self, db_session, server_type):
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        upsert_objects(db_session, index, [_record("web1")])
+        obj = db_session.query(InventoryObject).filter_by(type_id=server_type.id).one()
+        stamp = obj.updated_at
+
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        result = upsert_objects(db_session, index, [_record("web1")])
+
+        assert (result.updated, result.unchanged) == (0, 1)
+        assert obj.updated_at == stamp
+
+    def test_edit_outside_sync_is_overwritten(self, db_session, server_type):
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        upsert_objects(db_session, index, [_record("web1", region="syd")])
+        obj = db_session.query(InventoryObject).filter_by(type_id=server_type.id).one()
+        assert obj.content_hash == content_hash({"hostname": "web1", "region": "syd"}, "web1")
+
+        obj.data = json.dumps({"hostname": "web1", "region": "edited"})
+        db_session.flush()
+        assert obj.content_hash is None
+
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        result = upsert_objects(db_session, index, [_record("web1", region="syd")])
+        assert result.updated == 1
+        assert json.loads(obj.data)["region"] == "syd"
+
+    def test_hash_ignores_key_order(self):
+        assert content_hash({"a": 1, "b": 2}, "x") == content_hash({"b": 2, "a": 1}, "x")
+        assert content_hash({"a": 1}, "x") != content_hash({"a": 1}, "y")
+
+    def test_creates_when_no_unique_value(self, db_session, server_type):
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        upsert_objects(db_session, index, [UpsertRecord({"hostname": None, "ip": "1.1.1.1"}, "")])
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        result = upsert_objects(db_session, index, [UpsertRecord({"hostname": None, "ip": "1.1.1.1"}, "")])
+
+        assert result.created == 1
+        assert db_session.query(InventoryObject).filter_by(type_id=server_type.id).count() == 2
+
+    def test_loaded_objects_are_refreshed(self, db_session, server_type):
+        obj = InventoryObject(type_id=server_type.id, data=json.dumps({"hostname": "web1"}))
+        db_session.add(obj)
+        db_session.flush()
+
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        upsert_objects(db_session, index, [_record("web1", region="syd")])
+
+        assert json.loads(obj.data)["region"] == "syd"
+
+    def test_delete_missing(self, db_session, server_type):
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        upsert_objects(db_session, index, [_record("keep"), _record("gone")])
+        stale = db_session.query(InventoryObject).filter_by(type_id=server_type.id).all()[1]
+
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        result = upsert_objects(db_session, index, [_record("keep")], delete_missing=True)
+
+        assert result.deleted == 1
+        assert _hostnames(db_session, server_type.id) == ["keep"]
+        assert stale not in db_session
+
+    def test_side_tables_follow_bulk_writes(self, db_session, server_type):
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        result = upsert_objects(db_session, index, [_record("alpha")])
+        object_id = result.ids["alpha"]
+        assert _fts_rowids(db_session, "alpha") == {object_id}
+        keys = db_session.query(InventoryObjectKey.value).filter_by(object_id=object_id, field="hostname")
+        assert [k for k, in keys] == ["alpha"]
+
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        upsert_objects(db_session, index, [UpsertRecord({"hostname": "alpha"}, "beta")])
+        assert _fts_rowids(db_session, "alpha") == set()
+        assert _fts_rowids(db_session, "beta") == {object_id}
+
+        delete_objects(db_session, index, [object_id])
+        assert _fts_rowids(db_session, "beta") == set()
+        assert db_session.query(InventoryObjectKey).filter_by(object_id=object_id).count() == 0
+
+
+class TestTags:
+    def test_tags_are_added_not_replaced(self, db_session, server_type):
+        tags = TagCache(db_session)
+        red, blue = tags.get("red", "#ff0000"), tags.get("blue", "#0000ff")
+
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"), with_tags=True)
+        upsert_objects(db_session, index, [UpsertRecord({"hostname": "web1"}, "", [red])])
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"), with_tags=True)
+        upsert_objects(db_session, index, [UpsertRecord({"hostname": "web1"}, "", [red, blue])])
+
+        obj = db_session.query(InventoryObject).filter_by(type_id=server_type.id).one()
+        assert {t.name for t in obj.tags} == {"red", "blue"}
+
+    def test_tag_cache_creates_once(self, db_session):
+        tags = TagCache(db_session)
+        assert tags.get("svc:web", "#8b5cf6") is tags.get("svc:web", "#000000")
+        assert db_session.query(InventoryTag).filter_by(name="svc:web").one().color == "#8b5cf6"
+
+    def test_ensure_creates_missing_in_one_pass(self, db_session):
+        tags = TagCache(db_session)
+        existing = tags.get("svc:web", "#8b5cf6")
+        tags.ensure({"svc:web": "#000000", "instance:a": "#6366f1", "instance:b": "#6366f1"})
+
+        assert tags.get("svc:web", "#000000") is existing
+        assert tags.get("instance:b", "#000000").color == "#6366f1"
+        assert db_session.query(InventoryTag).count() == 3
+
+
+class TestScale:
+    def test_five_thousand_objects(self, db_session, server_type):
+        records = [_record(f"host{i}", region="syd", vultr_tags=["web"]) for i in range(5000)]
+        moved = [_record(f"host{i}", region="mel" if i % 2 else "syd", vultr_tags=["web"])
+                 for i in range(4999)]
+
+        started = time.perf_counter()
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        upsert_objects(db_session, index, records)
+        index = TypeIndex(db_session, server_type.id, field_key("hostname"))
+        result = upsert_objects(db_session, index, moved, delete_missing=True)
+        elapsed = time.perf_counter() - started
+
+        assert (result.updated, result.unchanged, result.deleted) == (2499, 2500, 1)
+        assert elapsed < 5  # generous for CI; typically well under a second each pass
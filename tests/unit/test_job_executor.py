@@ -0,0 +1,213 @@
+"""Unit tests for the concurrency-controlled job executor in ansible_runner.py."""
+import asyncio
+
+from ansible_runner import (
+    AnsibleRunner, JobExecutor, job_priority,
+    PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, PRIORITY_SCHEDULED, PRIORITY_WEBHOOK,
+)
+from models import Job
+
+
+def _job(job_id, service="svc", user_id=1, username="admin"):
+    return Job(id=job_id, service=service, action="deploy", status="running",
+               started_at="2025-01-01T00:00:00", user_id=user_id, username=username)
+
+
+def _blocking(release: asyncio.Event, started: list, job: Job):
+    async def run():
+        started.append(job.id)
+        await release.wait()
+        job.status = "completed"
+    return run
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestJobPriority:
+    def test_priority_from_provenance(self):
+        assert job_priority(_job("a")) == PRIORITY_INTERACTIVE
+        assert job_priority(_job("b", username="scheduler:nightly")) == PRIORITY_SCHEDULED
+        assert job_priority(_job("c", username="webhook:ci")) == PRIORITY_WEBHOOK
+        assert job_priority(_job("d", user_id=None, username=None)) == PRIORITY_BACKGROUND
+        assert job_priority(_job("e", user_id=None, username="system:ttl-cleanup")) == PRIORITY_BACKGROUND
+
+
+class TestJobExecutor:
+    async def test_global_limit_queues_excess_jobs(self):
+        executor = JobExecutor(max_workers=2)
+        release, started = asyncio.Event(), []
+        jobs = [_job(f"j{i}") for i in range(5)]
+        for job in jobs:
+            executor.submit(job, _blocking(release, started, job))
+        await _settle()
+
+        assert [j.status for j in jobs] == ["running", "running", "queued", "queued", "queued"]
+        assert executor.metrics()["queue_depth"] == 3
+
+        release.set()
+        for _ in range(20):
+            await _settle()
+        assert started == ["j0", "j1", "j2", "j3", "j4"]
+        assert all(j.status == "completed" for j in jobs)
+        assert executor.metrics()["running"] == 0
+
+    async def test_same_key_is_serialized_without_blocking_others(self):
+        executor = JobExecutor(max_workers=4)
+        release, started = asyncio.Event(), []
+        first, second, other = _job("a1"), _job("a2"), _job("b1", service="other")
+        executor.submit(first, _blocking(release, started, first), key="service:svc")
+        executor.submit(second, _blocking(release, started, second), key="service:svc")
+        executor.submit(other, _blocking(release, started, other), key="service:other")
+        await _settle()
+
+        assert started == ["a1", "b1"]
+        assert second.status == "queued"
+
+        release.set()
+        for _ in range(20):
+            await _settle()
+        assert started == ["a1", "b1", "a2"]
+
+    async def test_priority_order(self):
+        executor = JobExecutor(max_workers=1)
+        release, started = asyncio.Event(), []
+        blocker = _job("block")
+        executor.submit(blocker, _blocking(release, started, blocker))
+        for job in (_job("bg", user_id=None, username=None),
+                    _job("hook", username="webhook:ci"),
+                    _job("sched", username="scheduler:nightly"),
+                    _job("user")):
+            executor.submit(job, _blocking(release, started, job))
+        await _settle()
+        assert executor.metrics()["queue_depth_by_priority"] == {
+            "interactive": 1, "scheduled": 1, "webhook": 1, "background": 1}
+
+        release.set()
+        for _ in range(30):
+            await _settle()
+        assert started == ["block", "user", "sched", "hook", "bg"]
+
+    async def test_crashed_job_is_failed_and_frees_slot(self):
+        executor = JobExecutor(max_workers=1)
+        job, after = _job("boom"), _job("after")
+
+        async def crash():
+            raise RuntimeError("kaboom")
+
+        async def ok():
+            after.status = "completed"
+
+        executor.submit(job, crash)
+        executor.submit(after, ok)
+        for _ in range(10):
+            await _settle()
+
+        assert job.status == "failed"
+        assert job.output[-1] == "[ERROR] kaboom"
+        assert after.status == "completed"
+
+    async def test_crash_hook_sees_the_failed_job(self):
+        seen = []
+
+        async def on_crash(job):
+            seen.append((job.id, job.status))
+
+        async def crash():
+            raise RuntimeError("kaboom")
+
+        executor = JobExecutor(max_workers=1, on_crash=on_crash)
+        job = _job("boom")
+        executor.submit(job, crash)
+        await executor.wait_for(job)
+        assert seen == [("boom", "failed")]
+
+
+class TestRunnerExecutor:
+    async def test_crashed_job_is_persisted_and_notified(self, db_session, monkeypatch):
+        from database import JobRecord
+        runner = AnsibleRunner()
+        notified = []
+
+        async def fake_deploy(job):
+            job.output.append("starting")
+            await runner._persist_job(job)
+            raise RuntimeError("kaboom")
+
+        async def fake_notify(job):
+            notified.append((job.id, job.status))
+
+        monkeypatch.setattr(runner, "_run_deploy", fake_deploy)
+        monkeypatch.setattr(runner, "_notify_job", fake_notify)
+        job = await runner.deploy_service("svc")
+        await runner.executor.wait_for(job)
+
+        db_session.expire_all()
+        record = db_session.query(JobRecord).filter_by(id=job.id).first()
+        assert record.status == "failed"
+        assert record.finished_at is not None
+        assert notified == [(job.id, "failed")]
+        assert job.id not in runner._output_writers
+        assert runner.jobs.metrics()["evictable_jobs"] == 1
+
+    async def test_second_deploy_of_same_service_is_queued(self, monkeypatch):
+        runner = AnsibleRunner()
+        release = asyncio.Event()
+
+        async def fake_deploy(job):
+            await release.wait()
+            job.status = "completed"
+
+        monkeypatch.setattr(runner, "_run_deploy", fake_deploy)
+        first = await runner.deploy_service("svc", user_id=1, username="admin")
+        second = await runner.deploy_service("svc", user_id=1, username="admin")
+        await _settle()
+
+        assert first.status == "running"
+        assert second.status == "queued"
+
+        release.set()
+        for _ in range(20):
+            await _settle()
+        assert second.status == "completed"
+        assert runner.executor.metrics()["started_total"] == 2
+
+    async def test_scripts_share_the_service_key_unless_scoped_to_an_instance(self, monkeypatch, tmp_path):
+        import ansible_runner
+        (tmp_path / "svc").mkdir()
+        (tmp_path / "svc" / "deploy.sh").write_text("true\n")
+        monkeypatch.setattr(ansible_runner, "SERVICES_DIR", str(tmp_path))
+        runner = AnsibleRunner()
+        monkeypatch.setattr(runner, "get_service", lambda name: {"name": name})
+        monkeypatch.setattr(runner, "get_service_scripts", lambda name: [{"name": "deploy", "file": "deploy.sh"}])
+        release = asyncio.Event()
+
+        async def fake_script(job, *args, **kwargs):
+            await release.wait()
+            job.status = "completed"
+
+        async def fake_deploy(job):
+            await release.wait()
+            job.status = "completed"
+
+        monkeypatch.setattr(runner, "_run_script_job", fake_script)
+        monkeypatch.setattr(runner, "_run_deploy", fake_deploy)
+        monkeypatch.setattr(runner, "_run_action_job", lambda job, *args: fake_deploy(job))
+        deploy = await runner.deploy_service("svc", user_id=1, username="admin")
+        script = await runner.run_script("svc", "deploy", {}, user_id=1, username="webhook:ci")
+        action = await runner.run_action({"name": "deploy", "type": "script"}, {"name": "svc"}, "service",
+                                         user_id=1, username="admin")
+        personal = [await runner.run_script("svc", "deploy", {}, user_id=1, username="admin",
+                                            instance=f"host{i}") for i in range(2)]
+        await _settle()
+
+        assert deploy.status == "running"
+        assert (script.status, action.status) == ("queued", "queued")
+        assert [job.status for job in personal] == ["running", "running"]
+
+        release.set()
+        for _ in range(20):
+            await _settle()
+        assert (script.status, action.status) == ("completed", "completed")
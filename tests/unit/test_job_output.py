@@ -0,0 +1,150 @@
+"""Unit tests for chunked job output storage (job_output.py)."""
+import json
+import sys
+
+import job_output
+from database import JobOutputChunk, JobRecord
+from job_output import (
+    INTERRUPTED_LINE, JobOutputWriter, append_chunk, compact_job_output, fail_interrupted_jobs,
+    read_chunk_lines, read_job_output, read_record_output,
+)
+from models import Job
+
+
+def _job(job_id="out1", **kwargs):
+    return Job(id=job_id, service="svc", action="deploy",
+               started_at="2025-01-01T00:00:00", **kwargs)
+
+
+class TestChunkReads:
+    def test_reads_line_range_across_chunks(self, db_session):
+        append_chunk(db_session, "j1", 0, ["a", "b", "c"])
+        append_chunk(db_session, "j1", 3, ["d", "e"], compress=True)
+        db_session.commit()
+
+        assert read_chunk_lines(db_session, "j1") == ["a", "b", "c", "d", "e"]
+        assert read_chunk_lines(db_session, "j1", 2, 2) == ["c", "d"]
+        assert read_chunk_lines(db_session, "j1", 4) == ["e"]
+        assert read_chunk_lines(db_session, "j1", 10) == []
+
+    def test_legacy_json_output_fallback(self, db_session):
+        record = JobRecord(id="legacy1", service="svc", action="deploy",
+                           status="completed", output=json.dumps(["x", "y", "z"]))
+        db_session.add(record)
+        db_session.commit()
+
+        lines, total = read_record_output(db_session, record, 1)
+        assert lines == ["y", "z"]
+        assert total == 3
+
+
+class TestCompaction:
+    def test_compacts_into_compressed_segments(self, db_session, monkeypatch):
+        monkeypatch.setattr(job_output, "SEGMENT_LINES", 4)
+        for start in range(0, 10, 2):
+            append_chunk(db_session, "j2", start, [f"l{start}", f"l{start + 1}"])
+        db_session.commit()
+
+        total = compact_job_output(db_session, "j2")
+        db_session.commit()
+
+        chunks = (db_session.query(JobOutputChunk).filter_by(job_id="j2")
+                  .order_by(JobOutputChunk.start_line).all())
+        assert total == 10
+        assert [c.line_count for c in chunks] == [4, 4, 2]
+        assert all(c.compressed for c in chunks)
+        assert read_chunk_lines(db_session, "j2") == [f"l{i}" for i in range(10)]
+
+    def test_compaction_is_idempotent(self, db_session):
+        append_chunk(db_session, "j3", 0, ["only"])
+        db_session.commit()
+        compact_job_output(db_session, "j3")
+        db_session.commit()
+
+        assert compact_job_output(db_session, "j3") == 1
+        assert db_session.query(JobOutputChunk).filter_by(job_id="j3").count() == 1
+
+
+class TestInterruptedJobs:
+    def test_active_rows_are_failed_with_a_trailing_line(self, db_session):
+        db_session.add_all([
+            JobRecord(id="run1", service="svc", action="deploy", status="running", output_lines=0),
+            JobRecord(id="queue1", service="svc", action="deploy", status="queued"),
+            JobRecord(id="legacy1", service="svc", action="deploy", status="running",
+                      output=json.dumps(["old"])),
+            JobRecord(id="done1", service="svc", action="deploy", status="completed",
+                      finished_at="2025-01-01T00:00:00"),
+        ])
+        # Flushed mid-run, after output_lines was last recorded
+        append_chunk(db_session, "run1", 0, ["a", "b"])
+        db_session.commit()
+
+        assert sorted(fail_interrupted_jobs(db_session)) == ["legacy1", "queue1", "run1"]
+        db_session.commit()
+
+        run1 = db_session.get(JobRecord, "run1")
+        assert (run1.status, run1.output_lines) == ("failed", 3)
+        assert run1.finished_at is not None
+        assert read_record_output(db_session, run1) == (["a", "b", INTERRUPTED_LINE], 3)
+        assert read_record_output(db_session, db_session.get(JobRecord, "queue1")) == ([INTERRUPTED_LINE], 1)
+        assert json.loads(db_session.get(JobRecord, "legacy1").output) == ["old", INTERRUPTED_LINE]
+        assert db_session.get(JobRecord, "done1").status == "completed"
+        assert fail_interrupted_jobs(db_session) == []
+
+
+class TestJobOutputWriter:
+    def test_flush_and_trim_bounds_resident_lines(self, db_session, monkeypatch):
+        monkeypatch.setattr(job_output, "MAX_RESIDENT_LINES", 5)
+        job = _job(output=[f"line {i}" for i in range(12)])
+        writer = JobOutputWriter(job)
+
+        writer.flush(db_session)
+        db_session.commit()
+        writer.trim()
+
+        assert len(job.output) == 5
+        assert job.output_offset == 7
+        lines, total = read_job_output(db_session, job)
+        assert total == 12
+        assert lines == [f"line {i}" for i in range(12)]
+
+    def test_should_flush_after_line_threshold(self, monkeypatch):
+        monkeypatch.setattr(job_output, "FLUSH_LINES", 3)
+        job = _job()
+        writer = JobOutputWriter(job)
+        job.output.extend(["a", "b"])
+        assert not writer.should_flush()
+        job.output.append("c")
+        assert writer.should_flush()
+
+
+class TestRunnerIntegration:
+    async def test_long_running_command_keeps_memory_bounded(self, db_session, monkeypatch):
+        from ansible_runner import AnsibleRunner
+        monkeypatch.setattr(job_output, "MAX_RESIDENT_LINES", 100)
+        monkeypatch.setattr(job_output, "FLUSH_LINES", 50)
+
+        runner = AnsibleRunner()
+        job = _job("long1", status="running")
+        runner.jobs[job.id] = job
+
+        ok = await runner._run_command(
+            job, [sys.executable, "-c", "for i in range(1000): print(f'row {i}')"])
+        assert ok
+        assert len(job.output) <= 100 + 50
+
+        # Lines are already durable while the job is still running
+        assert db_session.query(JobRecord).filter_by(id="long1").first().status == "running"
+        assert read_chunk_lines(db_session, "long1", 1, 2) == ["row 0", "row 1"]
+
+        job.status = "completed"
+        await runner._persist_job(job)
+        db_session.expire_all()
+
+        record = db_session.query(JobRecord).filter_by(id="long1").first()
+        assert record.output is None
+        assert record.output_lines == 1001
+        lines, total = read_record_output(db_session, record, 999, 5)
+        assert total == 1001
+        assert lines == ["row 998", "row 999"]
+        assert all(c.compressed for c in db_session.query(JobOutputChunk).filter_by(job_id="long1"))
@@ -0,0 +1,96 @@
+"""Unit tests for the bounded in-memory job registry (job_registry.py)."""
+import time
+
+from ansible_runner import AnsibleRunner
+from database import JobRecord
+from job_registry import JobRegistry
+from models import Job
+
+
+def _job(job_id, status="completed", lines=0):
+    return Job(id=job_id, service="svc", action="deploy", status=status,
+               started_at="2025-01-01T00:00:00",
+               output=[f"line {i}" for i in range(lines)])
+
+
+class TestJobRegistry:
+    def test_unpersisted_finished_jobs_are_kept(self):
+        reg = JobRegistry(ttl=0, max_finished=0)
+        reg["a"] = _job("a")
+        reg.prune()
+        assert "a" in reg
+
+    def test_ttl_evicts_persisted_finished_jobs(self):
+        reg = JobRegistry(ttl=60)
+        job = _job("a")
+        reg["a"] = job
+        reg.mark_persisted(job)
+
+        assert reg.prune() == 0
+        assert reg.prune(now=time.monotonic() + 61) == 1
+        assert "a" not in reg
+        assert reg.get("a") is None
+
+    def test_running_jobs_are_never_evicted(self):
+        reg = JobRegistry(ttl=0, max_finished=0, max_bytes=0)
+        job = _job("r", status="running", lines=100)
+        reg["r"] = job
+        reg.mark_persisted(job)
+        reg.prune()
+        assert reg["r"] is job
+
+    def test_lru_eviction_over_count_budget(self):
+        reg = JobRegistry(ttl=3600, max_finished=2)
+        for jid in ("a", "b"):
+            reg[jid] = _job(jid)
+            reg.mark_persisted(reg[jid])
+        reg["a"]  # touch: "b" is now least recently used
+        reg["c"] = _job("c")
+        reg.mark_persisted(reg["c"])
+
+        assert set(reg) == {"a", "c"}
+        assert reg.evictions == 1
+
+    def test_byte_budget_and_metrics(self):
+        reg = JobRegistry(ttl=3600, max_bytes=15_000)
+        reg["run"] = _job("run", status="running", lines=10)
+        for jid in ("a", "b", "c"):
+            reg[jid] = _job(jid, lines=100)
+            reg.mark_persisted(reg[jid])
+
+        m = reg.metrics()
+        assert m["active_jobs"] == 1
+        assert m["evictable_bytes"] <= 15_000
+        assert m["resident_jobs"] == 1 + m["evictable_jobs"]
+        assert m["resident_bytes"] > m["evictable_bytes"]
+        assert m["evictions_total"] >= 1
+
+
+class TestRunnerEviction:
+    async def test_persist_makes_finished_job_evictable_and_db_has_it(self, db_session):
+        runner = AnsibleRunner()
+        runner.jobs = JobRegistry(ttl=0)
+        job = _job("p1", status="running", lines=3)
+        runner.jobs[job.id] = job
+        await runner._persist_job(job)
+        assert "p1" in runner.jobs
+
+        job.status = "completed"
+        await runner._persist_job(job)
+
+        assert "p1" not in runner.jobs
+        record = db_session.query(JobRecord).filter_by(id="p1").first()
+        assert record.status == "completed"
+        assert record.output_lines == 3
+
+    async def test_repersisting_finished_job_does_not_duplicate_output(self, db_session):
+        runner = AnsibleRunner()
+        job = _job("p2", lines=3)
+        runner.jobs[job.id] = job
+        await runner._persist_job(job)
+        job.output.append("trailer")
+        await runner._persist_job(job)
+
+        record = db_session.query(JobRecord).filter_by(id="p2").first()
+        assert record.output_lines == 4
+
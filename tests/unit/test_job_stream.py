@@ -0,0 +1,101 @@
+"""Unit tests for the push-based job streaming hub and SSE generator."""
+import asyncio
+import json
+
+from ansible_runner import AnsibleRunner
+from database import JobRecord
+from job_stream import JobStreamHub
+from models import Job
+from routes.job_routes import _job_event_stream
+
+
+def _running_job(job_id="s1"):
+    return Job(id=job_id, service="svc", action="deploy", status="running",
+               started_at="2025-01-01T00:00:00", user_id=1, username="admin")
+
+
+async def _collect(gen) -> tuple[list[str], list[dict]]:
+    lines, frames = [], []
+    async for frame in gen:
+        frames.append(frame)
+        if "event" not in frame:
+            lines.extend(frame["data"].split("\n"))
+    return lines, frames
+
+
+class TestJobStreamHub:
+    async def test_publish_wakes_all_waiters(self):
+        hub = JobStreamHub()
+        signal = hub.signal("j1")
+        waiters = [asyncio.create_task(hub.wait(signal, 5)) for _ in range(10)]
+        await asyncio.sleep(0)
+
+        hub.publish("j1")
+
+        assert await asyncio.gather(*waiters) == [True] * 10
+        assert hub.active_jobs == 0
+
+    async def test_publish_without_viewers_is_noop(self):
+        hub = JobStreamHub()
+        hub.publish("nobody")
+        assert hub.active_jobs == 0
+
+    async def test_wait_times_out(self):
+        hub = JobStreamHub()
+        assert await hub.wait(hub.signal("j2"), 0.01) is False
+
+
+class TestJobEventStream:
+    async def test_resume_from_offset(self):
+        runner = AnsibleRunner()
+        job = _running_job()
+        job.output = [f"line {i}" for i in range(5)]
+        job.status = "completed"
+        runner.jobs[job.id] = job
+
+        lines, frames = await _collect(_job_event_stream(runner, job.id, start=3))
+
+        assert lines == ["line 3", "line 4"]
+        assert frames[0]["id"] == "5"
+        assert frames[-1] == {"event": "done", "data": "completed"}
+
+    async def test_persisted_job_streams_remaining_lines(self, db_session):
+        db_session.add(JobRecord(id="done1", service="svc", action="deploy",
+                                 status="failed", output=json.dumps(["a", "b", "c"])))
+        db_session.commit()
+
+        lines, frames = await _collect(_job_event_stream(AnsibleRunner(), "done1", start=1))
+
+        assert lines == ["b", "c"]
+        assert frames[-1] == {"event": "done", "data": "failed"}
+
+    async def test_unknown_job(self):
+        _, frames = await _collect(_job_event_stream(AnsibleRunner(), "nope"))
+        assert frames == [{"event": "error", "data": "Job not found"}]
+
+    async def test_many_viewers_on_chatty_job(self):
+        """200 viewers of one chatty job each get every line in few batched frames."""
+        runner = AnsibleRunner()
+        job = _running_job("chatty")
+        runner.jobs[job.id] = job
+
+        viewers = [asyncio.create_task(_collect(_job_event_stream(runner, job.id)))
+                   for _ in range(200)]
+        await asyncio.sleep(0.01)
+
+        bursts, per_burst = 20, 100
+        for b in range(bursts):
+            for i in range(per_burst):
+                job.output.append(f"{b}:{i}")
+                runner.stream_hub.publish(job.id)
+            await asyncio.sleep(0.06)
+        job.status = "completed"
+        runner.stream_hub.publish(job.id)
+
+        results = await asyncio.wait_for(asyncio.gather(*viewers), timeout=20)
+
+        expected = [f"{b}:{i}" for b in range(bursts) for i in range(per_burst)]
+        for lines, frames in results:
+            assert lines == expected
+            # One frame per burst (plus slack), not one per line
+            assert len(frames) <= bursts + 5
@@ -0,0 +1,89 @@
+"""Unit tests for the event-loop stall detector (loop_monitor.py)."""
+import asyncio
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from loop_monitor import LoopMonitor, LoopMonitorMiddleware
+
+
+async def _run_blocked(seconds: float):
+    time.sleep(seconds)
+    await asyncio.sleep(0)
+
+
+async def _drain(monitor: LoopMonitor):
+    # Give the heartbeat a couple of beats to record the finished stall
+    await asyncio.sleep(monitor.interval * 3)
+
+
+class TestLoopMonitor:
+    async def test_stall_captures_task_and_stack(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.03)
+            await asyncio.create_task(_run_blocked(0.2), name="nightly-poller")
+            await _drain(monitor)
+        finally:
+            await monitor.stop()
+
+        assert monitor.stalls_total == 1
+        stall = monitor.recent_stalls()[0]
+        assert stall["task"] == "nightly-poller"
+        assert stall["duration_ms"] >= 150
+        assert any("_run_blocked" in line for line in stall["stack"])
+
+        metrics = monitor.metrics()
+        assert metrics["stalls_total"] == 1
+        assert metrics["max_lag_ms"] >= 150
+        assert metrics["lag_ms_buckets"]["+Inf"] == metrics["samples"]
+        assert metrics["lag_ms_buckets"]["100"] == metrics["samples"] - 1
+
+    async def test_short_lag_is_not_a_stall(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.2)
+        monitor.start()
+        try:
+            await _run_blocked(0.05)
+            await _drain(monitor)
+        finally:
+            await monitor.stop()
+
+        assert monitor.stalls_total == 0
+        assert monitor.metrics()["samples"] >= 2
+
+    async def test_ring_buffer_keeps_most_recent(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.03, history=2)
+        monitor.start()
+        try:
+            for _ in range(3):
+                await _run_blocked(0.08)
+                await _drain(monitor)
+        finally:
+            await monitor.stop()
+
+        assert monitor.stalls_total == 3
+        assert len(monitor.recent_stalls()) == 2
+
+    async def test_stall_in_request_is_labelled_with_route_template(self):
+        app = FastAPI()
+        app.add_middleware(LoopMonitorMiddleware)
+
+        @app.get("/things/{thing_id}")
+        async def slow_thing(thing_id: int):
+            time.sleep(0.2)
+            return {"id": thing_id}
+
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        app.state.loop_monitor = monitor
+        monitor.start()
+        try:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+                resp = await ac.get("/things/7")
+            await _drain(monitor)
+        finally:
+            await monitor.stop()
+
+        assert resp.status_code == 200
+        assert monitor.recent_stalls()[0]["task"] == "GET /things/{thing_id}"
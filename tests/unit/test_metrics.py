@@ -0,0 +1,113 @@
+"""Unit tests for the in-process Prometheus metrics (metrics.py)."""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, text
+
+import metrics
+from metrics import (
+    Counter, Gauge, Histogram, MetricsMiddleware, MetricsRegistry,
+    HTTP_REQUEST_DB_QUERIES, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_TOTAL,
+    JOB_DURATION_SECONDS, POLLER_TICK_ERRORS, POLLER_TICK_SECONDS,
+    instrument_sqlalchemy, poller_tick,
+)
+
+
+class TestExposition:
+    def test_counter_and_gauge(self):
+        registry = MetricsRegistry()
+        requests = Counter("demo_total", "Demo counter.", ("route",), registry=registry)
+        depth = Gauge("demo_depth", "Demo gauge.", registry=registry)
+        requests.inc(route="/a")
+        requests.inc(2, route='/b"x')
+        depth.set(3)
+        depth.dec()
+
+        assert registry.render().splitlines() == [
+            "# HELP demo_total Demo counter.",
+            "# TYPE demo_total counter",
+            'demo_total{route="/a"} 1',
+            'demo_total{route="/b\\"x"} 2',
+            "# HELP demo_depth Demo gauge.",
+            "# TYPE demo_depth gauge",
+            "demo_depth 2",
+        ]
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        hist = Histogram("demo_seconds", "Demo histogram.", ("op",), buckets=(0.1, 1), registry=registry)
+        for value in (0.05, 0.5, 0.7, 3):
+            hist.observe(value, op="x")
+
+        lines = registry.render().splitlines()
+        assert 'demo_seconds_bucket{op="x",le="0.1"} 1' in lines
+        assert 'demo_seconds_bucket{op="x",le="1"} 3' in lines
+        assert 'demo_seconds_bucket{op="x",le="+Inf"} 4' in lines
+        assert 'demo_seconds_sum{op="x"} 4.25' in lines
+        assert 'demo_seconds_count{op="x"} 4' in lines
+
+    def test_poller_tick_counts_errors(self):
+        before = POLLER_TICK_SECONDS.count(poller="unit-test")
+        with pytest.raises(RuntimeError):
+            with poller_tick("unit-test"):
+                raise RuntimeError("boom")
+        assert POLLER_TICK_SECONDS.count(poller="unit-test") == before + 1
+        assert POLLER_TICK_ERRORS.value(poller="unit-test") >= 1
+
+
+class TestRequestInstrumentation:
+    async def test_latency_and_queries_per_route_template(self):
+        instrument_sqlalchemy()
+        engine = create_engine("sqlite://")
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/metrics-demo/{item_id}")
+        def read_item(item_id: int):
+            with engine.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("SELECT 1"))
+            return {"id": item_id}
+
+        route = "/metrics-demo/{item_id}"
+        before = HTTP_REQUEST_SECONDS.count(method="GET", route=route)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            assert (await ac.get("/metrics-demo/1")).status_code == 200
+            assert (await ac.get("/metrics-demo/2")).status_code == 200
+            assert (await ac.get("/nowhere")).status_code == 404
+
+        assert HTTP_REQUEST_SECONDS.count(method="GET", route=route) == before + 2
+        assert HTTP_REQUESTS_TOTAL.value(method="GET", route=route, status=200) >= 2
+        assert HTTP_REQUESTS_TOTAL.value(method="GET", route="unmatched", status=404) >= 1
+        # Both requests ran exactly three statements
+        counts, total = HTTP_REQUEST_DB_QUERIES._values[("GET", route)]
+        assert total == 3 * HTTP_REQUEST_DB_QUERIES.count(method="GET", route=route)
+
+
+class TestJobMetrics:
+    async def test_executor_records_duration_by_service_and_action(self):
+        from ansible_runner import JobExecutor
+        from models import Job
+
+        executor = JobExecutor(max_workers=1)
+        job = Job(id="m1", service="metrics-svc", action="deploy", status="running",
+                  started_at="2025-01-01T00:00:00", user_id=1, username="admin")
+
+        async def run():
+            job.status = "completed"
+
+        executor.submit(job, run)
+        await executor.wait_for(job)
+        await asyncio.sleep(0)
+
+        assert JOB_DURATION_SECONDS.count(service="metrics-svc", action="deploy", status="completed") == 1
+
+    def test_update_job_gauges(self):
+        from ansible_runner import AnsibleRunner
+
+        metrics.update_job_gauges(AnsibleRunner())
+        text_out = metrics.REGISTRY.render()
+        assert 'clm_job_queue_depth{priority="interactive"} 0' in text_out
+        assert "clm_jobs_running 0" in text_out
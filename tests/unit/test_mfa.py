@@ -12,6 +12,8 @@ from mfa import (
     generate_backup_codes,
     hash_backup_code,
     verify_backup_code,
+    backup_code_lookup,
+    hash_backup_codes_async,
     BACKUP_CODE_COUNT,
     BACKUP_CODE_LENGTH,
 )
@@ -126,3 +128,29 @@ class TestBackupCodeHashing:
         hashed = hash_backup_code(code)
         assert verify_backup_code("abcd1234", hashed) is True
         assert verify_backup_code("Abcd1234", hashed) is True
+
+
+class TestBackupCodeLookup:
+    def test_normalised_and_distinct(self):
+        assert backup_code_lookup("abcd1234 ") == backup_code_lookup("ABCD1234")
+        assert backup_code_lookup("ABCD1234") != backup_code_lookup("ABCD1235")
+        assert len(backup_code_lookup("ABCD1234")) == 16
+
+    async def test_hash_backup_codes_async(self):
+        hashes = await hash_backup_codes_async(["AAAA1111", "BBBB2222"])
+        assert verify_backup_code("aaaa1111", hashes[0])
+        assert verify_backup_code("BBBB2222", hashes[1])
+
+    async def test_hash_backup_codes_takes_one_pool_slot(self, monkeypatch):
+        import mfa
+        calls = []
+        real_run_hashing = mfa.run_hashing
+
+        async def counting(op, fn, *args):
+            calls.append(op)
+            return await real_run_hashing(op, fn, *args)
+
+        monkeypatch.setattr(mfa, "run_hashing", counting)
+        hashes = await hash_backup_codes_async([f"CODE{i:04d}" for i in range(10)])
+        assert len(hashes) == 10
+        assert calls == ["hash_backup_codes"]
@@ -2,11 +2,15 @@
 import pytest
 import time
 
+from sqlalchemy import event
+
+import permissions
 from permissions import (
     seed_permissions, generate_inventory_permissions, get_user_permissions,
     invalidate_cache, has_permission, STATIC_PERMISSION_DEFS, _cache,
+    AUTHZ_VERSION_KEY, bump_authz_version, get_authz_snapshot,
 )
-from database import Permission, Role, User, role_permissions, user_roles
+from database import AppMetadata, Permission, Role, ServiceACL, User, role_permissions, user_roles
 
 
 class TestSeedPermissions:
@@ -161,6 +165,66 @@ class TestPermissionCache:
         assert len(_cache) == 0
 
 
+class TestAuthzSnapshot:
+    @pytest.fixture
+    def viewer(self, regular_user, seeded_db):
+        session = seeded_db
+        role = Role(name="snapshot-viewer", description="")
+        role.permissions = [session.query(Permission).filter_by(codename="services.view").first()]
+        session.add(role)
+        session.flush()
+        session.add(ServiceACL(service_name="locked", role_id=role.id, permission="deploy"))
+        regular_user.roles.append(role)
+        session.commit()
+        invalidate_cache()
+        return regular_user
+
+    def test_checks_after_compile_run_no_queries(self, viewer, seeded_db, monkeypatch):
+        from service_auth import check_service_permission
+        session = seeded_db
+        monkeypatch.setattr(permissions, "AUTHZ_VERSION_CHECK_INTERVAL", 3600)
+        get_authz_snapshot(session, viewer.id)
+
+        statements = []
+        engine = session.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            assert has_permission(session, viewer.id, "services.view")
+            assert check_service_permission(session, viewer, "locked", "deploy")
+            assert not check_service_permission(session, viewer, "locked", "view")
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        assert statements == []
+
+    def test_version_bump_by_another_process_recompiles(self, viewer, seeded_db, monkeypatch):
+        session = seeded_db
+        monkeypatch.setattr(permissions, "AUTHZ_VERSION_CHECK_INTERVAL", 3600)
+        assert not has_permission(session, viewer.id, "users.view")
+
+        # Another process grants the permission and bumps the version
+        role = session.query(Role).filter_by(name="snapshot-viewer").first()
+        role.permissions.append(session.query(Permission).filter_by(codename="users.view").first())
+        AppMetadata.set(session, AUTHZ_VERSION_KEY, (AppMetadata.get(session, AUTHZ_VERSION_KEY) or 0) + 1)
+        session.commit()
+        assert not has_permission(session, viewer.id, "users.view")  # version not re-read yet
+
+        monkeypatch.setattr(permissions, "AUTHZ_VERSION_CHECK_INTERVAL", 0)
+        assert has_permission(session, viewer.id, "users.view")
+
+    def test_bump_invalidates_local_snapshots(self, viewer, seeded_db):
+        session = seeded_db
+        before = get_authz_snapshot(session, viewer.id).version
+
+        bump_authz_version(session)
+        assert viewer.id not in _cache
+        get_authz_snapshot(session, viewer.id)  # compiled mid-transaction
+        session.commit()
+
+        assert viewer.id not in _cache
+        assert get_authz_snapshot(session, viewer.id).version == before + 1
+
+
 class TestHasPermission:
     def test_admin_has_wildcard(self, admin_user, seeded_db):
         session = seeded_db
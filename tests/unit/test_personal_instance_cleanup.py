@@ -238,7 +238,7 @@ class TestCheckAndCleanupExpired:
         runner.run_script.assert_awaited_once_with(
             "personal-jump-hosts", "destroy",
             {"hostname": "expire1-jump-mel"},
-            user_id=None, username="system:ttl-cleanup",
+            user_id=None, username="system:ttl-cleanup", instance="expire1-jump-mel",
         )
 
     async def test_returns_empty_when_nothing_expired(self, db_session):
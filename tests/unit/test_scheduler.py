@@ -57,6 +57,24 @@ class TestIsJobRunning:
 
         assert scheduler._is_job_running("job-db-1") is True
 
+    def test_queued_in_db(self, db_session):
+        runner = MagicMock()
+        runner.jobs = {}
+        scheduler = Scheduler(runner)
+
+        record = JobRecord(
+            id="job-db-q",
+            service="test",
+            action="run",
+            status="queued",
+            started_at="2025-01-01T00:00:00Z",
+            username="admin",
+        )
+        db_session.add(record)
+        db_session.commit()
+
+        assert scheduler._is_job_running("job-db-q") is True
+
     def test_completed_in_db(self, db_session):
         runner = MagicMock()
         runner.jobs = {}
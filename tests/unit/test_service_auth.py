@@ -2,7 +2,7 @@
 import pytest
 
 from service_auth import (
-    check_service_permission, get_user_service_permissions,
+    check_service_permission, check_service_permissions, get_user_service_permissions,
     filter_services_for_user, check_service_script_permission,
 )
 from permissions import seed_permissions, invalidate_cache
@@ -319,6 +319,28 @@ class TestFilterServicesForUser:
         assert result == ["open-svc", "restricted-svc2"]
 
 
+class TestCheckServicePermissionsBatch:
+    def test_matches_single_service_check(self, setup_service_perms):
+        ctx = setup_service_perms
+        session = ctx["session"]
+        session.add_all([
+            ServiceACL(service_name="acl-deploy", role_id=ctx["viewer_role"].id, permission="deploy"),
+            ServiceACL(service_name="acl-full", role_id=ctx["viewer_role"].id, permission="full"),
+            ServiceACL(service_name="acl-other", role_id=ctx["deployer_role"].id, permission="deploy"),
+        ])
+        session.commit()
+        invalidate_cache()
+        user = _make_user(session, "batch_svc_user", roles=[ctx["viewer_role"]])
+        names = ["open-svc", "acl-deploy", "acl-full", "acl-other"]
+
+        for suffix in ("view", "deploy"):
+            batch = check_service_permissions(session, user, names, suffix)
+            assert batch == {n: check_service_permission(session, user, n, suffix) for n in names}
+        assert check_service_permissions(session, user, names, "deploy") == {
+            "open-svc": False, "acl-deploy": True, "acl-full": True, "acl-other": False,
+        }
+
+
 # ---------------------------------------------------------------------------
 # check_service_script_permission
 # ---------------------------------------------------------------------------
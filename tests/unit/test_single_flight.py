@@ -0,0 +1,97 @@
+"""Unit tests for single-flight coalescing and shared inventory regeneration."""
+import asyncio
+import time
+
+from ansible_runner import AnsibleRunner
+from models import Job
+from single_flight import SingleFlight
+
+
+def _job(job_id):
+    return Job(id=job_id, service="svc", action="stop", status="running",
+               started_at="2025-01-01T00:00:00", user_id=1, username="admin")
+
+
+class TestSingleFlight:
+    async def test_concurrent_callers_share_one_run(self):
+        flight = SingleFlight(fresh_for=0)
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return True
+
+        results = await asyncio.gather(*(flight.run(f"j{i}", work) for i in range(5)))
+
+        assert len(calls) == 1
+        assert results == [(True, "j0")] * 5
+
+    async def test_fresh_result_is_reused_until_invalidated(self):
+        flight = SingleFlight(fresh_for=60)
+        calls = []
+
+        async def work():
+            calls.append(1)
+            return True
+
+        assert await flight.run("a", work) == (True, "a")
+        assert await flight.run("b", work) == (True, "a")
+        flight.invalidate()
+        assert await flight.run("c", work) == (True, "c")
+        assert len(calls) == 2
+
+    async def test_not_before_waits_out_older_flight_then_runs(self):
+        flight = SingleFlight(fresh_for=60)
+        started = asyncio.Event()
+        calls = []
+
+        async def slow():
+            calls.append("slow")
+            started.set()
+            await asyncio.sleep(0.02)
+            return True
+
+        async def fresh():
+            calls.append("fresh")
+            return True
+
+        first = asyncio.create_task(flight.run("a", slow))
+        await started.wait()
+        ok, ran_by = await flight.run("b", fresh, not_before=time.monotonic())
+
+        assert (ok, ran_by) == (True, "b")
+        assert calls == ["slow", "fresh"]
+        assert await first == (True, "a")
+
+    async def test_failed_run_is_not_cached(self):
+        flight = SingleFlight(fresh_for=60)
+
+        async def fail():
+            return False
+
+        async def succeed():
+            return True
+
+        assert await flight.run("a", fail) == (False, "a")
+        assert await flight.run("b", succeed) == (True, "b")
+
+
+class TestSharedInventoryRefresh:
+    async def test_concurrent_jobs_log_reuse(self, monkeypatch):
+        runner = AnsibleRunner()
+        runs = []
+
+        async def fake_run_command(job, args, cwd=None, env=None):
+            runs.append(job.id)
+            await asyncio.sleep(0.01)
+            return True
+
+        monkeypatch.setattr(runner, "_run_command", fake_run_command)
+        jobs = [_job(f"stop{i}") for i in range(3)]
+        results = await asyncio.gather(*(runner._generate_inventory(j) for j in jobs))
+
+        assert results == [True, True, True]
+        assert runs == ["stop0"]
+        assert jobs[1].output == ["[Reused shared inventory refresh from job stop0]"]
+        assert jobs[0].output == []
@@ -432,3 +432,88 @@ class TestSSHCredentialSync:
         assert first_count == second_count
         # Should have exactly 2: one SSH key + one password
         assert second_count == 2
+
+
+def _host(tmp_path, service_name, hostname, pub="ssh-ed25519 KEY", subdir=None, **extra):
+    key_dir = tmp_path / service_name / "outputs" / (subdir or "")
+    return _make_service_fs(tmp_path, service_name, {hostname: {
+        "ansible_ssh_private_key_file": str(key_dir / "sshkey"), "ansible_user": "root",
+        "_pub_content": pub, **extra}}, subdir=subdir)
+
+
+def _age(*paths):
+    """Backdate files so their stat is trusted by the manifest."""
+    import os
+    for path in paths:
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+
+
+def _ssh_hosts(db_session, cred_type):
+    creds = db_session.query(InventoryObject).filter_by(type_id=cred_type.id).all()
+    return sorted(json.loads(c.data)["name"].split(" — ")[0] for c in creds
+                  if json.loads(c.data)["credential_type"] == "ssh_key")
+
+
+class TestSSHCredentialManifest:
+
+    def test_unchanged_files_are_not_parsed(self, db_session, cred_type, tmp_path, monkeypatch):
+        _host(tmp_path, "svc", "host-a")
+        adapter = SSHCredentialSync()
+        adapter.SERVICES_DIR = str(tmp_path)
+        assert adapter.sync(db_session, TYPE_CONFIG).created == 1
+
+        monkeypatch.setattr(adapter, "_read_inventory", lambda *a: pytest.fail("re-parsed"))
+        report = adapter.sync(db_session, TYPE_CONFIG)
+        assert (report.created, report.updated, report.unchanged) == (0, 0, 1)
+
+    def test_settled_files_are_not_read(self, db_session, cred_type, tmp_path, monkeypatch):
+        import inventory_sync
+        _host(tmp_path, "svc", "host-a")
+        out = tmp_path / "svc" / "outputs"
+        _age(out / "temp_inventory.yaml", out / "sshkey.pub")
+        adapter = SSHCredentialSync()
+        adapter.SERVICES_DIR = str(tmp_path)
+        adapter.sync(db_session, TYPE_CONFIG)
+
+        reads = []
+        real_read = inventory_sync._read_bytes
+        monkeypatch.setattr(inventory_sync, "_read_bytes", lambda path: reads.append(path) or real_read(path))
+        adapter.sync(db_session, TYPE_CONFIG)
+        assert reads == []
+
+    def test_public_key_appearing_later_is_picked_up(self, db_session, cred_type, tmp_path):
+        _host(tmp_path, "svc", "host-a", pub=None)
+        adapter = SSHCredentialSync()
+        adapter.SERVICES_DIR = str(tmp_path)
+        adapter.sync(db_session, TYPE_CONFIG)
+        assert _ssh_hosts(db_session, cred_type) == []
+
+        (tmp_path / "svc" / "outputs" / "sshkey.pub").write_text("ssh-ed25519 LATE")
+        adapter.sync(db_session, TYPE_CONFIG)
+        assert _ssh_hosts(db_session, cred_type) == ["host-a"]
+
+    def test_scoped_sync_only_looks_at_given_services(self, db_session, cred_type, tmp_path):
+        _host(tmp_path, "svc-a", "host-a")
+        adapter = SSHCredentialSync()
+        adapter.SERVICES_DIR = str(tmp_path)
+        adapter.sync(db_session, TYPE_CONFIG)
+
+        _host(tmp_path, "svc-b", "host-b")
+        adapter.sync(db_session, TYPE_CONFIG, services=["svc-a"])
+        assert _ssh_hosts(db_session, cred_type) == ["host-a"]
+
+        adapter.sync(db_session, TYPE_CONFIG, services=["svc-b"])
+        assert _ssh_hosts(db_session, cred_type) == ["host-a", "host-b"]
+
+    def test_scoped_sync_removes_only_that_services_keys(self, db_session, cred_type, tmp_path):
+        import shutil
+        _host(tmp_path, "svc-a", "host-a", subdir="alice")
+        _host(tmp_path, "svc-b", "host-b")
+        adapter = SSHCredentialSync()
+        adapter.SERVICES_DIR = str(tmp_path)
+        adapter.sync(db_session, TYPE_CONFIG)
+
+        shutil.rmtree(tmp_path / "svc-a" / "outputs" / "alice")
+        report = adapter.sync(db_session, TYPE_CONFIG, services=["svc-a"])
+        assert report.deleted == 1
+        assert _ssh_hosts(db_session, cred_type) == ["host-b"]
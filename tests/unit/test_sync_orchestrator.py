@@ -0,0 +1,106 @@
+"""Unit tests for coalesced inventory sync runs (sync_orchestrator.py)."""
+import asyncio
+import threading
+
+import pytest
+
+import inventory_sync
+import sync_orchestrator
+from sync_orchestrator import SyncOrchestrator, request_sync, request_sync_blocking
+
+CONFIGS = [
+    {"slug": "user", "sync": "user_sync"},
+    {"slug": "credential", "sync": {"source": "ssh_credential_sync"}},
+    {"slug": "note"},
+]
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Record run_adapter calls instead of syncing; returns the call list."""
+    calls = []
+
+    def fake_run_adapter(source, config, **options):
+        calls.append((source, config["slug"], options))
+        return f"report-{len(calls)}"
+
+    monkeypatch.setattr(inventory_sync, "run_adapter", fake_run_adapter)
+    return calls
+
+
+@pytest.fixture
+async def orchestrator():
+    orch = SyncOrchestrator(CONFIGS, debounce=0.01)
+    orch.start()
+    yield orch
+    await orch.stop()
+
+
+class TestSyncOrchestrator:
+    async def test_concurrent_requests_share_one_run(self, orchestrator, runs):
+        results = await asyncio.gather(*(orchestrator.request("user_sync") for _ in range(5)))
+
+        assert runs == [("user_sync", "user", {})]
+        assert results == ["report-1"] * 5
+        stats = orchestrator.stats()["sources"]["user_sync"]
+        assert (stats["requests"], stats["coalesced"], stats["runs"]) == (5, 4, 1)
+
+    async def test_requests_during_a_run_coalesce_into_one_more(self, orchestrator, monkeypatch):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow_run_adapter(source, config, **options):
+            calls.append(source)
+            started.set()
+            release.wait(5)
+
+        monkeypatch.setattr(inventory_sync, "run_adapter", slow_run_adapter)
+        first = asyncio.create_task(orchestrator.request("user_sync"))
+        await asyncio.to_thread(started.wait, 5)
+        later = [asyncio.create_task(orchestrator.request("user_sync")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert orchestrator.stats()["sources"]["user_sync"]["running"] is True
+        release.set()
+        await asyncio.gather(first, *later)
+
+        assert calls == ["user_sync", "user_sync"]
+
+    async def test_service_scopes_are_merged(self, orchestrator, runs):
+        await asyncio.gather(orchestrator.request("ssh_credential_sync", ["web"]),
+                             orchestrator.request("ssh_credential_sync", ["db", "web"]))
+        await asyncio.gather(orchestrator.request("ssh_credential_sync", ["web"]),
+                             orchestrator.request("ssh_credential_sync"))
+
+        assert [options for _, _, options in runs] == [{"services": ["db", "web"]}, {}]
+
+    async def test_unknown_or_unconfigured_source_does_not_run(self, orchestrator, runs):
+        assert await orchestrator.request("nope") is None
+        assert await orchestrator.request("deployment_sync") is None
+        assert runs == []
+
+    async def test_failed_run_returns_none_and_counts(self, orchestrator, monkeypatch):
+        def broken(source, config, **options):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(inventory_sync, "run_adapter", broken)
+        assert await orchestrator.request("user_sync") is None
+        stats = orchestrator.stats()["sources"]["user_sync"]
+        assert (stats["failures"], stats["last_error"]) == (1, "boom")
+
+    async def test_blocking_requests_go_through_the_orchestrator(self, orchestrator, runs):
+        results = await asyncio.gather(*(asyncio.to_thread(request_sync_blocking, "user_sync")
+                                         for _ in range(3)))
+        assert results == ["report-1"] * 3
+        assert len(runs) == 1
+
+
+class TestWithoutOrchestrator:
+    async def test_requests_run_directly(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(sync_orchestrator, "_orchestrator", None)
+        monkeypatch.setattr(inventory_sync, "run_sync_for_source",
+                            lambda source, **options: calls.append((source, options)) or "direct")
+
+        assert await request_sync("user_sync") == "direct"
+        assert request_sync_blocking("ssh_credential_sync", ["web"]) == "direct"
+        assert calls == [("user_sync", {}), ("ssh_credential_sync", {"services": ["web"]})]